@@ -8,10 +8,16 @@ import math
 from flask import Flask, jsonify, request
 
 from cache_fetcher import (
+    CHAIN_QUERY_MODE,
+    CHANGE_LOG_PATH as CACHE_CHANGE_LOG_PATH,
     ensure_cache_dir as cache_ensure_cache_dir,
     fetch_once as cache_fetch_once,
     STATUS_FILE as CACHE_STATUS_FILE,
 )
+from cache_diff import ChangeLog
+from cache_snapshot import JsonFileCache
+from chain_client import ChainQueryError, client_for
+from wsgi_server import serve
 
 app = Flask(__name__)
 
@@ -72,13 +78,16 @@ def _format_arkeo_amount(uarkeo) -> str:
     return f"{sign}{whole}.{frac:0{ARKEO_DECIMALS}d}"
 
 
+_CACHE_FILES = JsonFileCache()
+
+
 def _load_cached(name: str) -> dict:
+    """Parsed cache file, shared and read-only; re-read only after the fetcher replaces it."""
     path = os.path.join(CACHE_DIR, f"{name}.json")
     if not os.path.isfile(path):
         return {}
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return _CACHE_FILES.load(path)
     except Exception:
         return {}
 
@@ -102,6 +111,11 @@ def _tail_file(path: str, max_lines: int = 400) -> tuple[list[str], bool]:
 
 
 def _latest_block_height() -> tuple[int | None, str | None]:
+    if CHAIN_QUERY_MODE != "cli" and ARKEOD_NODE:
+        try:
+            return client_for(ARKEOD_NODE).latest_height(), None
+        except ChainQueryError:
+            pass
     cmd = ["arkeod", "--home", ARKEOD_HOME, "status", "--output", "json"]
     if NODE_ARGS:
         cmd[1:1] = NODE_ARGS
@@ -269,10 +283,8 @@ def providers_with_contracts():
             entries = ps["service"]
         elif entries := [ps]:
             pass
-        if pk in prov_services_lookup:
-            prov_services_lookup[pk].extend(entries)
-        else:
-            prov_services_lookup[pk] = entries
+        # entries may be a list from the shared (read-only) cache; extend a list of our own
+        prov_services_lookup.setdefault(pk, []).extend(entries)
 
     def contract_matches_provider(contract: dict, pubkey: str) -> bool:
         if not isinstance(contract, dict):
@@ -398,6 +410,16 @@ def cache_status():
     return jsonify(payload)
 
 
+@app.get("/api/cache-changes")
+def cache_changes():
+    """Return provider/service/contract change sets recorded by the cache sync after ?since=<seq>."""
+    try:
+        since = int(request.args.get("since", "0"))
+    except (TypeError, ValueError):
+        since = 0
+    return jsonify(ChangeLog(CACHE_CHANGE_LOG_PATH).since(since))
+
+
 @app.get("/api/cache-counts")
 def cache_counts():
     """Return counts derived from cached files (active providers/services/contracts/chains)."""
@@ -644,4 +666,5 @@ def contracts_range():
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=API_PORT)
+    # Read-only over the cache files, so gunicorn may fork worker processes.
+    serve(app, API_PORT, multiprocess=True)
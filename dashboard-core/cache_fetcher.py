@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 """Periodic Arkeo cache fetcher for dashboard-core.
 
-Fetches providers, contracts, validators, and services from arkeod every CACHE_FETCH_INTERVAL
-seconds and writes JSON to CACHE_DIR for use by the UI or other helpers.
+Fetches providers, contracts, validators, and services from the Arkeo node every CACHE_FETCH_INTERVAL
+seconds and writes JSON to CACHE_DIR for use by the UI or other helpers. Queries go to the
+node's REST endpoint (chain_client) and fall back to the arkeod CLI.
 """
 
 from __future__ import annotations
@@ -10,13 +11,21 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import re
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Tuple
 from urllib import request
 from urllib.parse import urlparse
 
+from cache_snapshot import load_json_file, write_snapshot
+from cache_diff import BuildState, ChangeLog, PartCache, content_hash, diff_hashes, diff_is_empty, record_hashes
+from chain_client import ChainClient, ChainQueryError, client_for
+from metadata_fetcher import MetadataFetcher
+from sync_scheduler import BlockSyncScheduler
+
 ARKEOD_HOME = os.path.expanduser(os.getenv("ARKEOD_HOME", "/root/.arkeo"))
 # These are dynamically refreshed from subscriber-settings.json before each fetch cycle (if present)
 ARKEOD_NODE = os.getenv("ARKEOD_NODE") or os.getenv("EXTERNAL_ARKEOD_NODE") or "tcp://127.0.0.1:26657"
@@ -26,8 +35,14 @@ STATUS_FILE = os.path.join(CACHE_DIR, "_sync_status.json")
 SUBSCRIBER_SETTINGS_PATH = os.path.join(CONFIG_DIR, "subscriber-settings.json")
 LEGACY_SUBSCRIBER_SETTINGS_PATH = os.path.join(CACHE_DIR, "subscriber-settings.json")
 METADATA_CACHE_PATH = os.path.join(CACHE_DIR, "metadata.json")
+BUILD_STATE_PATH = os.path.join(CACHE_DIR, "_build_state.json")
+CHANGE_LOG_PATH = os.path.join(CACHE_DIR, "cache_changes.json")
 # Static service type metadata (to merge chain fields) now lives under /app/admin
 SERVICE_TYPE_RESOURCES_PATH = os.getenv("SERVICE_TYPE_RESOURCES_PATH", "/app/admin/service-type_resources.json")
+# Chain queries go to the node's REST endpoint first ("native"); "cli" always shells out to arkeod.
+CHAIN_QUERY_MODE = (os.getenv("CHAIN_QUERY_MODE") or "native").strip().lower()
+ARKEOD_REST = os.getenv("ARKEOD_REST", "")  # REST (LCD) base; derived from ARKEOD_NODE when empty
+_NATIVE_LAST_ERR = None
 
 
 def run_list(cmd: List[str]) -> Tuple[int, str]:
@@ -39,6 +54,57 @@ def run_list(cmd: List[str]) -> Tuple[int, str]:
         return e.returncode, e.output.decode("utf-8")
 
 
+def _chain_client() -> ChainClient | None:
+    """Native chain client for the current ARKEOD_NODE, or None in CLI mode."""
+    if CHAIN_QUERY_MODE == "cli":
+        return None
+    return client_for(ARKEOD_NODE, ARKEOD_REST or None)
+
+
+def _native_failed(what: str, err: Exception) -> None:
+    global _NATIVE_LAST_ERR
+    msg = f"{what}: {err}"
+    if msg != _NATIVE_LAST_ERR:
+        print(f"[cache] native query failed, using arkeod CLI ({msg})", flush=True)
+    _NATIVE_LAST_ERR = msg
+
+
+def _native_page(
+    resource: str,
+    page_key: str | None = None,
+    page: int | None = None,
+    limit: int | None = None,
+    count_total: bool = True,
+) -> Dict[str, Any] | None:
+    """One list page from the REST endpoint; None means fall back to the CLI."""
+    client = _chain_client()
+    if client is None:
+        return None
+    offset = None
+    if page and page > 1:
+        if not limit:
+            return None
+        offset = (page - 1) * limit
+    try:
+        return client.list_page(resource, page_key=page_key, offset=offset, limit=limit, count_total=count_total)
+    except ChainQueryError as e:
+        _native_failed(resource, e)
+        return None
+
+
+def fetch_validators(cmd: List[str]) -> Dict[str, Any]:
+    """Bonded validators from the REST endpoint, falling back to `query staking validators`."""
+    client = _chain_client()
+    if client is not None:
+        try:
+            data = client.validators(status="BOND_STATUS_BONDED", limit=1000)
+            return {"fetched_at": timestamp(), "exit_code": 0, "cmd": cmd, "data": data}
+        except ChainQueryError as e:
+            _native_failed("validators", e)
+    code, out = run_list(cmd)
+    return normalize_result("validators", code, out, cmd)
+
+
 def timestamp() -> str:
     return datetime.now(timezone.utc).isoformat()
 
@@ -195,149 +261,234 @@ def _service_types_cmd() -> list[str]:
     return cmd
 
 
-def _contracts_list_cmd(page_key: str | None = None, limit: int | None = None) -> list[str]:
+_NEXT_KEY_RE = re.compile(r'"next_?[kK]ey"\s*:\s*"([^"]+)"')
+
+
+class _Page:
+    """One fetched list page: parsed REST data, or raw CLI output parsed on demand."""
+
+    def __init__(self, cmd: List[str], code: int = 0, out: str = "", data: Any = None):
+        self.cmd = cmd
+        self.code = code
+        self.out = out
+        self.data = data
+
+    def next_key_hint(self) -> str | None:
+        """next_key without a full parse; pagination trails the list in CLI JSON."""
+        if self.data is not None:
+            pagination = _extract_pagination(self.data)
+            next_key = pagination.get("next_key") or pagination.get("nextKey") if isinstance(pagination, dict) else None
+            return str(next_key) if next_key else None
+        match = _NEXT_KEY_RE.search(self.out[-1024:])
+        return match.group(1) if match else None
+
+    def parsed(self) -> Any:
+        if self.data is None:
+            self.data = json.loads(self.out)
+        return self.data
+
+
+def _fetch_list_page(
+    resource: str,
+    cmd_fn: Callable[..., List[str]],
+    page_key: str | None = None,
+    page: int | None = None,
+    limit: int | None = None,
+    count_total: bool = False,
+) -> _Page:
+    cmd = cmd_fn(page_key=page_key, page=page, limit=limit, count_total=count_total)
+    data = _native_page(resource, page_key=page_key, page=page, limit=limit, count_total=count_total)
+    if data is not None:
+        return _Page(cmd, data=data)
+    code, out = run_list(cmd)
+    return _Page(cmd, code, out)
+
+
+def _page_data(pg: _Page, what: str) -> Tuple[Any, Dict[str, Any] | None]:
+    """(parsed page, None) or (None, error payload)."""
+    if pg.code != 0:
+        return None, {"fetched_at": timestamp(), "exit_code": pg.code, "cmd": pg.cmd, "error": pg.out}
+    try:
+        return pg.parsed(), None
+    except json.JSONDecodeError:
+        return None, {"fetched_at": timestamp(), "exit_code": 1, "cmd": pg.cmd, "error": f"invalid JSON from {what}"}
+
+
+def _next_key(pagination: Any) -> str | None:
+    if not isinstance(pagination, dict):
+        return None
+    next_key = pagination.get("next_key") or pagination.get("nextKey")
+    return str(next_key) if next_key else None
+
+
+def _fetch_all_pages(
+    resource: str,
+    cmd_fn: Callable[..., List[str]],
+    extract: Callable[[Any], list],
+    what: str,
+    page_mode: str,
+    limit: int | None,
+    total_cap: int,
+) -> Dict[str, Any]:
+    """Collect every page of a list query.
+
+    page-key mode requests the next page as soon as its key shows up in the raw output, so the
+    fetch overlaps parsing the current page. page mode reads the total from the first page and
+    fetches the remaining offsets on PAGE_FETCH_WORKERS threads, reassembled in page order.
+    Returns {"items", "pages", "pagination"}, {"error": payload}, or {"unsupported": True}
+    when the CLI rejects --page-key.
+    """
+    items: list = []
+    pages = 0
+    last_pagination: Dict[str, Any] = {}
+    pool = ThreadPoolExecutor(max_workers=max(1, PAGE_FETCH_WORKERS), thread_name_prefix=f"pages-{resource}")
+    try:
+        if page_mode == "page-key":
+            seen_keys: set[str] = set()
+            pending = pool.submit(_fetch_list_page, resource, cmd_fn, limit=limit, count_total=True)
+            hint = None
+            while pending is not None:
+                pg = pending.result()
+                pending = None
+                if pg.code != 0 and "unknown flag" in pg.out and "page-key" in pg.out:
+                    return {"unsupported": True}
+                hint = pg.next_key_hint() if pg.code == 0 else None
+                if hint and hint not in seen_keys and not (total_cap and len(items) >= total_cap):
+                    pending = pool.submit(_fetch_list_page, resource, cmd_fn, page_key=hint, limit=limit)
+                data, err = _page_data(pg, what)
+                if err is not None:
+                    return {"error": err}
+                items.extend(extract(data))
+                pages += 1
+                last_pagination = _extract_pagination(data)
+                next_key = _next_key(last_pagination)
+                if (total_cap and len(items) >= total_cap) or not next_key or next_key in seen_keys:
+                    break
+                seen_keys.add(next_key)
+                if pending is None or next_key != hint:
+                    if pending is not None:
+                        pending.cancel()
+                    pending = pool.submit(_fetch_list_page, resource, cmd_fn, page_key=next_key, limit=limit)
+        else:
+            data, err = _page_data(_fetch_list_page(resource, cmd_fn, page=1, limit=limit, count_total=True), what)
+            if err is not None:
+                return {"error": err}
+            page_items = extract(data)
+            items.extend(page_items)
+            pages = 1
+            last_pagination = _extract_pagination(data)
+            try:
+                total = int(last_pagination.get("total") or 0) if isinstance(last_pagination, dict) else 0
+            except (TypeError, ValueError):
+                total = 0
+            if total_cap:
+                total = min(total, total_cap) if total else 0
+            done = not page_items or (limit and len(page_items) < limit) or (total_cap and len(items) >= total_cap)
+            page = 2
+            while not done:
+                # First batch covers the reported total; after that probe a window at a time
+                # until an empty or short page (the set may have grown mid-walk).
+                last = -(-total // limit) if (total and limit and page == 2) else 0
+                if last >= page:
+                    batch = list(range(page, last + 1))
+                else:
+                    batch = list(range(page, page + max(1, PAGE_FETCH_WORKERS)))
+                futures = [pool.submit(_fetch_list_page, resource, cmd_fn, page=p, limit=limit) for p in batch]
+                for fut in futures:
+                    data, err = _page_data(fut.result(), what)
+                    if err is not None:
+                        return {"error": err}
+                    page_items = extract(data)
+                    if not page_items:
+                        done = True
+                        break
+                    items.extend(page_items)
+                    pages += 1
+                    last_pagination = _extract_pagination(data)
+                    if (limit and len(page_items) < limit) or (total_cap and len(items) >= total_cap):
+                        done = True
+                        break
+                page += len(batch)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return {"items": items, "pages": pages, "pagination": last_pagination}
+
+
+def _contracts_list_cmd(
+    page_key: str | None = None,
+    page: int | None = None,
+    limit: int | None = None,
+    count_total: bool = True,
+) -> list[str]:
     cmd = ["arkeod", "--home", ARKEOD_HOME]
     if ARKEOD_NODE:
         cmd.extend(["--node", ARKEOD_NODE])
     cmd.extend(["query", "arkeo", "list-contracts", "-o", "json"])
     if limit:
         cmd.extend(["--limit", str(limit)])
-    cmd.append("--count-total")
+    if count_total:
+        cmd.append("--count-total")
     if page_key:
         cmd.extend(["--page-key", str(page_key)])
+    elif page:
+        cmd.extend(["--page", str(page)])
     return cmd
 
 
-def _providers_list_cmd(page_key: str | None = None, limit: int | None = None) -> list[str]:
+def _providers_list_cmd(
+    page_key: str | None = None,
+    page: int | None = None,
+    limit: int | None = None,
+    count_total: bool = True,
+) -> list[str]:
     cmd = ["arkeod", "--home", ARKEOD_HOME]
     if ARKEOD_NODE:
         cmd.extend(["--node", ARKEOD_NODE])
     cmd.extend(["query", "arkeo", "list-providers", "-o", "json"])
     if limit:
         cmd.extend(["--limit", str(limit)])
-    cmd.append("--count-total")
+    if count_total:
+        cmd.append("--count-total")
     if page_key:
         cmd.extend(["--page-key", str(page_key)])
+    elif page:
+        cmd.extend(["--page", str(page)])
     return cmd
 
 
 def fetch_contracts_paginated() -> Dict[str, Any]:
     """Fetch all contracts across pages, honoring pagination next_key when present."""
-    page_key = None
-    pages = 0
-    seen_keys: set[str] = set()
-    contracts: list[dict[str, Any]] = []
-    raw_seen = 0
+    page_mode = _env_page_mode("CONTRACTS_PAGE_MODE") or "page-key"
     total_cap = _env_int("CONTRACTS_PAGE_LIMIT", 0)
-    per_page_limit = _page_limit("CONTRACTS_PAGE_SIZE")
-    last_pagination: Dict[str, Any] = {}
-
-    while True:
-        cmd = _contracts_list_cmd(page_key=page_key, limit=per_page_limit or None)
-        code, out = run_list(cmd)
-        if code != 0:
-            return {
-                "fetched_at": timestamp(),
-                "exit_code": code,
-                "cmd": cmd,
-                "error": out,
-            }
-        try:
-            data = json.loads(out)
-        except json.JSONDecodeError:
-            return {
-                "fetched_at": timestamp(),
-                "exit_code": 1,
-                "cmd": cmd,
-                "error": "invalid JSON from list-contracts",
-            }
-        page_contracts = _extract_contracts_list(data)
-        if page_contracts:
-            contracts.extend(page_contracts)
-            raw_seen += len(page_contracts)
-        pages += 1
-        last_pagination = _extract_pagination(data)
-
-        if total_cap and raw_seen >= total_cap:
-            break
-
-        next_key = None
-        if isinstance(last_pagination, dict):
-            next_key = last_pagination.get("next_key") or last_pagination.get("nextKey")
-        if not next_key:
-            break
-        next_key = str(next_key)
-        if next_key in seen_keys:
-            break
-        seen_keys.add(next_key)
-        page_key = next_key
+    per_page_limit = _page_limit("CONTRACTS_PAGE_SIZE") or None
 
+    result = _fetch_all_pages("contracts", _contracts_list_cmd, _extract_contracts_list, "list-contracts", page_mode, per_page_limit, total_cap)
+    if "error" in result:
+        return result["error"]
     return {
         "fetched_at": timestamp(),
         "exit_code": 0,
-        "cmd": _contracts_list_cmd(limit=per_page_limit or None),
-        "data": {"contracts": contracts, "pagination": last_pagination},
-        "pages": pages,
+        "cmd": _contracts_list_cmd(limit=per_page_limit),
+        "data": {"contracts": result["items"], "pagination": result["pagination"]},
+        "pages": result["pages"],
     }
 
 
 def fetch_provider_services_paginated() -> Dict[str, Any]:
     """Fetch all providers across pages, honoring pagination next_key when present."""
-    page_key = None
-    pages = 0
-    seen_keys: set[str] = set()
-    providers: list[dict[str, Any]] = []
-    raw_seen = 0
+    page_mode = _env_page_mode("PROVIDER_SERVICES_PAGE_MODE") or "page-key"
     total_cap = _env_int("PROVIDER_SERVICES_PAGE_LIMIT", 0)
-    per_page_limit = _page_limit("PROVIDER_SERVICES_PAGE_SIZE")
-    last_pagination: Dict[str, Any] = {}
-
-    while True:
-        cmd = _providers_list_cmd(page_key=page_key, limit=per_page_limit or None)
-        code, out = run_list(cmd)
-        if code != 0:
-            return {
-                "fetched_at": timestamp(),
-                "exit_code": code,
-                "cmd": cmd,
-                "error": out,
-            }
-        try:
-            data = json.loads(out)
-        except json.JSONDecodeError:
-            return {
-                "fetched_at": timestamp(),
-                "exit_code": 1,
-                "cmd": cmd,
-                "error": "invalid JSON from list-providers",
-            }
-        page_providers = _extract_providers_list(data)
-        if page_providers:
-            providers.extend(page_providers)
-            raw_seen += len(page_providers)
-        pages += 1
-        last_pagination = _extract_pagination(data)
-
-        if total_cap and raw_seen >= total_cap:
-            break
-
-        next_key = None
-        if isinstance(last_pagination, dict):
-            next_key = last_pagination.get("next_key") or last_pagination.get("nextKey")
-        if not next_key:
-            break
-        next_key = str(next_key)
-        if next_key in seen_keys:
-            break
-        seen_keys.add(next_key)
-        page_key = next_key
+    per_page_limit = _page_limit("PROVIDER_SERVICES_PAGE_SIZE") or None
 
+    result = _fetch_all_pages("providers", _providers_list_cmd, _extract_providers_list, "list-providers", page_mode, per_page_limit, total_cap)
+    if "error" in result:
+        return result["error"]
     return {
         "fetched_at": timestamp(),
         "exit_code": 0,
-        "cmd": _providers_list_cmd(limit=per_page_limit or None),
-        "data": {"providers": providers, "pagination": last_pagination},
-        "pages": pages,
+        "cmd": _providers_list_cmd(limit=per_page_limit),
+        "data": {"providers": result["items"], "pagination": result["pagination"]},
+        "pages": result["pages"],
     }
 
 
@@ -351,48 +502,50 @@ def fetch_service_types_paginated() -> Dict[str, Any]:
 
     while True:
         cmd = _service_types_cmd()
-        code, out = run_list(cmd)
-        if code != 0:
-            return {
-                "fetched_at": timestamp(),
-                "exit_code": code,
-                "cmd": cmd,
-                "error": out,
-            }
-        try:
-            data = json.loads(out)
-        except json.JSONDecodeError:
-            parsed = _parse_service_types_text(out)
-            if parsed:
+        data = _native_page("services")
+        if data is None:
+            code, out = run_list(cmd)
+            if code != 0:
                 return {
                     "fetched_at": timestamp(),
-                    "exit_code": 0,
+                    "exit_code": code,
                     "cmd": cmd,
-                    "data": parsed,
-                    "parsed_from": "arkeod all-services",
+                    "error": out,
                 }
-            return {
-                "fetched_at": timestamp(),
-                "exit_code": 1,
-                "cmd": cmd,
-                "error": "invalid JSON from all-services",
-            }
-        if isinstance(data, str):
-            parsed = _parse_service_types_text(data)
-            if parsed:
+            try:
+                data = json.loads(out)
+            except json.JSONDecodeError:
+                parsed = _parse_service_types_text(out)
+                if parsed:
+                    return {
+                        "fetched_at": timestamp(),
+                        "exit_code": 0,
+                        "cmd": cmd,
+                        "data": parsed,
+                        "parsed_from": "arkeod all-services",
+                    }
                 return {
                     "fetched_at": timestamp(),
-                    "exit_code": 0,
+                    "exit_code": 1,
                     "cmd": cmd,
-                    "data": parsed,
-                    "parsed_from": "arkeod all-services",
+                    "error": "invalid JSON from all-services",
+                }
+            if isinstance(data, str):
+                parsed = _parse_service_types_text(data)
+                if parsed:
+                    return {
+                        "fetched_at": timestamp(),
+                        "exit_code": 0,
+                        "cmd": cmd,
+                        "data": parsed,
+                        "parsed_from": "arkeod all-services",
+                    }
+                return {
+                    "fetched_at": timestamp(),
+                    "exit_code": 1,
+                    "cmd": cmd,
+                    "error": "invalid JSON from all-services",
                 }
-            return {
-                "fetched_at": timestamp(),
-                "exit_code": 1,
-                "cmd": cmd,
-                "error": "invalid JSON from all-services",
-            }
 
         page_services = _extract_service_types_list(data)
         if page_services:
@@ -736,6 +889,15 @@ def _env_int(name: str, default: int) -> int:
         return default
 
 
+def _env_page_mode(name: str) -> str | None:
+    raw = (os.getenv(name) or "").strip().lower().replace("_", "-")
+    if raw in ("page", "offset"):
+        return "page"
+    if raw in ("page-key", "pagekey", "key", "cursor"):
+        return "page-key"
+    return None
+
+
 def _page_limit(override_env: str) -> int | None:
     per_resource = _env_int(override_env, 0)
     if per_resource and per_resource > 0:
@@ -751,6 +913,21 @@ METADATA_TTL_SECONDS = _env_int("METADATA_TTL_SECONDS", 3600)
 SERVICE_TYPES_TTL_SECONDS = _env_int("SERVICE_TYPES_TTL_SECONDS", 3600)
 MIN_SERVICE_BOND = _env_int("MIN_SERVICE_BOND", 100_000_000)
 PAGE_LIMIT = _env_int("PAGE_LIMIT", 1000)
+PAGE_FETCH_WORKERS = _env_int("PAGE_FETCH_WORKERS", 4)
+# metadata_uri fetches: pool size, per-host cap, timeout, and max backoff for unreachable hosts
+_METADATA_FETCHER = MetadataFetcher(
+    timeout=_env_int("METADATA_FETCH_TIMEOUT", 5),
+    workers=_env_int("METADATA_FETCH_WORKERS", 16),
+    per_host=_env_int("METADATA_FETCH_PER_HOST", 2),
+    backoff_max=_env_int("METADATA_BACKOFF_MAX_SECONDS", 3600),
+)
+# Incremental rebuilds: record-level change log, last derived payloads, per-record active_services parts
+_CHANGE_LOG = ChangeLog(CHANGE_LOG_PATH, _env_int("CACHE_CHANGE_LOG_MAX", 200))
+_LAST_BUILT: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+_ACTIVE_SERVICE_PARTS = PartCache()
+# "blocks" follows new blocks and refreshes only what their events touched; "interval" is the fixed loop
+CACHE_SYNC_MODE = (os.getenv("CACHE_SYNC_MODE") or "blocks").strip().lower()
+CACHE_BLOCK_POLL_SECONDS = max(1, _env_int("CACHE_BLOCK_POLL_SECONDS", 3))
 
 
 def _load_metadata_cache() -> dict[str, dict[str, Any]]:
@@ -806,8 +983,7 @@ def _metadata_entry_ok(entry: Any) -> bool:
 
 def _load_cache_file(path: str) -> Dict[str, Any]:
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = load_json_file(path)
         return data if isinstance(data, dict) else {}
     except Exception:
         return {}
@@ -883,6 +1059,10 @@ def _update_metadata_cache_from_providers(provider_services_payload: Any) -> dic
         if isinstance(entry, dict) and ("status" in entry or "error" in entry):
             changed = True
         cache_map[mu] = {"metadata_uri": mu, "fetched_at": fetched_at, "data": meta}
+        if isinstance(entry, dict):
+            for key in ("etag", "last_modified"):
+                if entry.get(key):
+                    cache_map[mu][key] = entry[key]
 
     if isinstance(items, dict):
         for mu, entry in items.items():
@@ -924,18 +1104,30 @@ def _update_metadata_cache_from_providers(provider_services_payload: Any) -> dic
             return True
         return (now - ts) > METADATA_TTL_SECONDS
 
+    jobs: dict[str, tuple[str | None, str | None]] = {}
     for mu in uris:
         entry = cache_map.get(mu)
         if isinstance(entry, dict) and not _is_stale(entry):
             continue
+        if isinstance(entry, dict):
+            jobs[mu] = (entry.get("etag"), entry.get("last_modified"))
+        else:
+            jobs[mu] = (None, None)
 
-        data_val, _err_val, status_val = fetch_metadata_uri(mu)
-        if status_val == 1 and isinstance(data_val, dict):
-            cache_map[mu] = {"metadata_uri": mu, "fetched_at": timestamp(), "data": data_val}
-            changed = True
+    for mu, res in _METADATA_FETCHER.fetch_many(jobs).items():
+        if res.not_modified and isinstance(cache_map.get(mu), dict):
+            cache_map[mu] = dict(cache_map[mu], fetched_at=timestamp())
+        elif res.status == 1 and isinstance(res.data, dict):
+            cache_map[mu] = {"metadata_uri": mu, "fetched_at": timestamp(), "data": res.data}
         else:
             # Drop failures: keep any previous successful entry, but never write a failed placeholder.
             continue
+        for key, val in (("etag", res.etag), ("last_modified", res.last_modified)):
+            if val:
+                cache_map[mu][key] = val
+            else:
+                cache_map[mu].pop(key, None)
+        changed = True
 
     if changed:
         _save_metadata_cache(cache_map)
@@ -1003,47 +1195,69 @@ def _min_payg_rate(raw: Dict[str, Any]) -> tuple[int | None, str | None]:
     return best_amt, best_denom
 
 
+def _active_services_for_entry(entry: dict[str, Any], meta_cache: dict[str, dict[str, Any]]) -> list[dict[str, Any]]:
+    """active_services items contributed by one provider-services record (zero or one)."""
+    pk = entry.get("pub_key") or entry.get("pubkey") or entry.get("pubKey")
+    if not pk:
+        return []
+    if not _status_is_online(entry.get("status")):
+        return []
+    bond_amt = _bond_amount_uarkeo(entry)
+    if bond_amt < MIN_SERVICE_BOND:
+        return []
+    payg_amt, payg_denom = _min_payg_rate(entry)
+    if payg_amt is None or payg_amt <= 0:
+        return []
+    mu = entry.get("metadata_uri") or entry.get("metadataUri")
+    if not mu or not _is_external(mu):
+        return []
+    meta_entry = meta_cache.get(str(mu))
+    if not _metadata_entry_ok(meta_entry):
+        return []
+    return [
+        {
+            "provider_pubkey": str(pk),
+            "service_id": entry.get("service_id") or entry.get("id") or entry.get("service"),
+            "service": entry.get("service") or entry.get("name"),
+            "metadata_uri": str(mu),
+            "pay_as_you_go_rate": {"amount": payg_amt, "denom": payg_denom},
+            "raw": entry,
+        }
+    ]
+
+
 def build_active_services(
     provider_services_payload: Any,
     metadata_cache: Any | None = None,
+    parts: PartCache | None = None,
 ) -> Dict[str, Any]:
-    """Build active_services.json: pick ONLINE services with usable metadata.json and a minimum bond."""
+    """Build active_services.json: pick ONLINE services with usable metadata.json and a minimum bond.
+
+    With parts, items of records whose content and metadata are unchanged are reused from the last build.
+    """
     meta_cache = _metadata_cache_map_from_payload(metadata_cache)
     prov_entries = _service_records_from_provider_services_payload(provider_services_payload)
 
     active_services: list[dict[str, Any]] = []
+    meta_hashes: dict[str, str] = {}
+    if parts is not None:
+        parts.begin()
 
     for entry in prov_entries:
         if not isinstance(entry, dict):
             continue
-        pk = entry.get("pub_key") or entry.get("pubkey") or entry.get("pubKey")
-        if not pk:
-            continue
-        if not _status_is_online(entry.get("status")):
-            continue
-        bond_amt = _bond_amount_uarkeo(entry)
-        if bond_amt < MIN_SERVICE_BOND:
-            continue
-        payg_amt, payg_denom = _min_payg_rate(entry)
-        if payg_amt is None or payg_amt <= 0:
+        if parts is None:
+            active_services.extend(_active_services_for_entry(entry, meta_cache))
             continue
-        mu = entry.get("metadata_uri") or entry.get("metadataUri")
-        if not mu or not _is_external(mu):
-            continue
-        meta_entry = meta_cache.get(str(mu))
-        if not _metadata_entry_ok(meta_entry):
-            continue
-        active_services.append(
-            {
-                "provider_pubkey": str(pk),
-                "service_id": entry.get("service_id") or entry.get("id") or entry.get("service"),
-                "service": entry.get("service") or entry.get("name"),
-                "metadata_uri": str(mu),
-                "pay_as_you_go_rate": {"amount": payg_amt, "denom": payg_denom},
-                "raw": entry,
-            }
-        )
-
+        mu = str(entry.get("metadata_uri") or entry.get("metadataUri") or "")
+        if mu not in meta_hashes:
+            meta_hashes[mu] = content_hash(meta_cache.get(mu)) if mu else ""
+        sig = content_hash(entry) + meta_hashes[mu]
+        active_services.extend(parts.get(sig, lambda e=entry: _active_services_for_entry(e, meta_cache)))
+
+    if parts is not None:
+        reused, rebuilt = parts.end()
+        print(f"[cache] active_services records reused={reused} rebuilt={rebuilt}", flush=True)
     return {
         "fetched_at": timestamp(),
         "source": "provider-services",
@@ -1239,6 +1453,7 @@ def write_cache(name: str, payload: Dict[str, Any]) -> None:
             json.dump(payload, f, ensure_ascii=True, indent=2)
         os.replace(tmp_path, path)
         print(f"[cache] wrote {name} -> {path} (exit={payload.get('exit_code')})", flush=True)
+        write_snapshot(path, payload)
     except OSError as e:
         print(f"[cache] failed to write {name}: {e}", flush=True)
         try:
@@ -1248,18 +1463,110 @@ def write_cache(name: str, payload: Dict[str, Any]) -> None:
             pass
 
 
-def fetch_once(commands: Dict[str, List[str]] | None = None, record_status: bool = False) -> Dict[str, Dict[str, Any]]:
+def _write_cache_if_changed(state: BuildState, name: str, payload: Dict[str, Any], digest: str | None = None) -> bool:
+    """write_cache unless the file still holds the same content (fetched_at aside)."""
+    path = os.path.join(CACHE_DIR, f"{name}.json")
+    digest = digest or content_hash(payload)
+    if state.output_current(name, path, digest):
+        print(f"[cache] {name} unchanged; skip write", flush=True)
+        return False
+    write_cache(name, payload)
+    state.set_output(name, path, digest)
+    return True
+
+
+def _derive_cache(state: BuildState, name: str, input_digest: str, build: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+    """Build and write a derived cache unless its inputs are unchanged since the last build; (payload, built)."""
+    path = os.path.join(CACHE_DIR, f"{name}.json")
+    if state.input_unchanged(name, input_digest) and os.path.isfile(path):
+        last = _LAST_BUILT.get(name)
+        if last and last[0] == input_digest:
+            return last[1], False
+        payload = _load_cache_file(path)
+        if payload:
+            _LAST_BUILT[name] = (input_digest, payload)
+            return payload, False
+    payload = build()
+    _write_cache_if_changed(state, name, payload)
+    state.set_input(name, input_digest)
+    _LAST_BUILT[name] = (input_digest, payload)
+    return payload, True
+
+
+def _provider_record_key(rec: dict) -> str | None:
+    pk = rec.get("pub_key") or rec.get("pubkey") or rec.get("pubKey")
+    if not pk:
+        return None
+    svc = rec.get("service") or rec.get("service_id") or rec.get("id") or ""
+    return f"{pk}/{svc}"
+
+
+def _contract_record_key(rec: dict) -> str | None:
+    cid = rec.get("id") or rec.get("contract_id")
+    return str(cid) if cid is not None else None
+
+
+def _log_record_changes(state: BuildState, name: str, records: list, key_fn: Callable[[dict], str | None], kind: str) -> bool:
+    """Diff records against the last build and append the change set to the change log."""
+    hashes = record_hashes(records, key_fn)
+    old = state.swap_records(name, hashes)
+    if old is None:
+        _CHANGE_LOG.append(name, {"reset": True, "counts": {kind: len(hashes)}})
+        return True
+    diff = diff_hashes(old, hashes)
+    if diff_is_empty(diff):
+        return False
+    changes: Dict[str, Any] = {kind: diff}
+    if kind == "services":
+        # provider-services records are per provider/service; roll them up per provider pubkey.
+        old_pks = {k.split("/", 1)[0] for k in old}
+        new_pks = {k.split("/", 1)[0] for k in hashes}
+        touched = {k.split("/", 1)[0] for k in diff["added"] + diff["removed"] + diff["updated"]}
+        changes["providers"] = {
+            "added": sorted(new_pks - old_pks),
+            "removed": sorted(old_pks - new_pks),
+            "updated": sorted(touched & old_pks & new_pks),
+        }
+    seq = _CHANGE_LOG.append(name, changes)
+    print(
+        f"[cache] {name} changed seq={seq} +{len(diff['added'])} -{len(diff['removed'])} ~{len(diff['updated'])}",
+        flush=True,
+    )
+    return True
+
+
+# Datasets whose payloads feed the derived caches (and the BuildState hashes behind them).
+_DERIVED_SOURCES = {"provider-services", "provider-contracts"}
+
+
+def fetch_once(
+    commands: Dict[str, List[str]] | None = None,
+    record_status: bool = False,
+    datasets: set[str] | None = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Fetch every dataset (or only datasets) and rebuild the caches derived from what was fetched."""
     results: Dict[str, Dict[str, Any]] = {}
     _refresh_runtime_settings()
     commands = build_commands()
+    if datasets is not None:
+        wanted = set(datasets)
+        if "provider-services" in wanted:
+            # TTL-cached; active_service_types needs it next to fresh provider-services
+            wanted.add("service-types")
+        commands = {k: v for k, v in commands.items() if k in wanted}
+    # Per-block height/validator refreshes derive nothing: skip the build state and the start/done lines.
+    derived = datasets is None or bool(set(datasets) & _DERIVED_SOURCES)
     start_ts = timestamp()
-    print(f"[cache] sync started at {start_ts} node={ARKEOD_NODE}", flush=True)
+    if derived:
+        print(f"[cache] sync started at {start_ts} node={ARKEOD_NODE}", flush=True)
     if record_status:
         mark_sync_start(start_ts)
     ok = True
     error_msg = None
     try:
         metadata_cache: dict[str, dict[str, Any]] | None = None
+        state = BuildState(BUILD_STATE_PATH) if derived else None
+        digests: Dict[str, str] = {}
         for name, cmd in commands.items():
             if name == "service-types":
                 cache_path = os.path.join(CACHE_DIR, "service-types.json")
@@ -1279,6 +1586,8 @@ def fetch_once(commands: Dict[str, List[str]] | None = None, record_status: bool
                 payload = fetch_provider_services_paginated()
             elif name == "provider-contracts":
                 payload = fetch_contracts_paginated()
+            elif name == "validators":
+                payload = fetch_validators(cmd)
             else:
                 code, out = run_list(cmd)
                 payload = normalize_result(name, code, out, cmd)
@@ -1296,10 +1605,20 @@ def fetch_once(commands: Dict[str, List[str]] | None = None, record_status: bool
                 payload = merge_service_types_with_resources(payload)
             if name == "provider-services" and payload.get("exit_code") == 0:
                 metadata_cache = _update_metadata_cache_from_providers(payload)
-            write_cache(name, payload)
+            if name in ("provider-services", "provider-contracts") and payload.get("exit_code") == 0:
+                if name == "provider-services":
+                    _log_record_changes(
+                        state, name, _service_records_from_provider_services_payload(payload), _provider_record_key, "services"
+                    )
+                else:
+                    _log_record_changes(state, name, _extract_contracts_list(payload.get("data")), _contract_record_key, "contracts")
+                digests[name] = content_hash(payload)
+                _write_cache_if_changed(state, name, payload, digests[name])
+            else:
+                write_cache(name, payload)
             results[name] = payload
 
-        if metadata_cache is None:
+        if metadata_cache is None and datasets is None:
             try:
                 metadata_cache = _load_metadata_cache()
             except Exception:
@@ -1307,29 +1626,59 @@ def fetch_once(commands: Dict[str, List[str]] | None = None, record_status: bool
         if metadata_cache is not None:
             results["metadata"] = {"metadata": metadata_cache, "exit_code": 0}
 
+        # Each derived cache is rebuilt (and rewritten) only when the hash of its inputs changed.
         active_services_payload = None
+        services_in = None
         if "provider-services" in results and results["provider-services"].get("exit_code") == 0:
-            active_services_payload = build_active_services(results["provider-services"], metadata_cache or {})
-            write_cache("active_services", active_services_payload)
+            services_in = content_hash(
+                [
+                    digests.get("provider-services") or content_hash(results["provider-services"]),
+                    content_hash(metadata_cache or {}),
+                    MIN_SERVICE_BOND,
+                ]
+            )
+            active_services_payload, _built = _derive_cache(
+                state,
+                "active_services",
+                services_in,
+                lambda: build_active_services(results["provider-services"], metadata_cache or {}, parts=_ACTIVE_SERVICE_PARTS),
+            )
             results["active_services"] = active_services_payload
 
         active_providers_payload = None
-        if active_services_payload is not None and "provider-services" in results:
-            active_providers_payload = build_active_providers_from_active_services(
-                active_services_payload, results["provider-services"], metadata_cache or {}
+        if active_services_payload is not None and services_in is not None:
+            active_providers_payload, _built = _derive_cache(
+                state,
+                "active_providers",
+                services_in,
+                lambda: build_active_providers_from_active_services(
+                    active_services_payload, results["provider-services"], metadata_cache or {}
+                ),
             )
-            write_cache("active_providers", active_providers_payload)
             results["active_providers"] = active_providers_payload
 
         if active_services_payload is not None and "service-types" in results and results["service-types"].get("exit_code") == 0:
-            ast_payload = build_active_service_types(active_services_payload, results["service-types"])
-            write_cache("active_service_types", ast_payload)
+            types_in = content_hash(
+                [state.output_hash("active_services") or content_hash(active_services_payload), content_hash(results["service-types"])]
+            )
+            ast_payload, _built = _derive_cache(
+                state,
+                "active_service_types",
+                types_in,
+                lambda: build_active_service_types(active_services_payload, results["service-types"]),
+            )
             results["active_service_types"] = ast_payload
 
         if "provider-contracts" in results and results["provider-contracts"].get("exit_code") == 0:
-            subscribers_payload = build_subscribers_from_contracts(results["provider-contracts"])
-            write_cache("subscribers", subscribers_payload)
+            subscribers_payload, _built = _derive_cache(
+                state,
+                "subscribers",
+                digests.get("provider-contracts") or content_hash(results["provider-contracts"]),
+                lambda: build_subscribers_from_contracts(results["provider-contracts"]),
+            )
             results["subscribers"] = subscribers_payload
+        if state is not None:
+            state.save()
     except Exception as e:
         ok = False
         error_msg = str(e)
@@ -1337,12 +1686,34 @@ def fetch_once(commands: Dict[str, List[str]] | None = None, record_status: bool
     finally:
         if record_status:
             mark_sync_end(ok=ok, error=error_msg)
-        end_ts = timestamp()
-        status = "success" if ok else f"failed ({error_msg})"
-        print(f"[cache] sync completed at {end_ts} [{status}]", flush=True)
+        if derived or not ok:
+            end_ts = timestamp()
+            status = "success" if ok else f"failed ({error_msg})"
+            print(f"[cache] sync completed at {end_ts} [{status}]", flush=True)
     return results
 
 
+def _block_scheduler(full_interval: int) -> BlockSyncScheduler:
+    """Follow new blocks and re-fetch only the datasets their events touched; full cycle every full_interval."""
+
+    def _sync(datasets: set[str] | None) -> None:
+        # Height-only updates do not flip the UI's sync-in-progress status.
+        fetch_once(record_status=datasets is None or bool(datasets - {"status"}), datasets=datasets)
+
+    print(f"[cache] following blocks every {CACHE_BLOCK_POLL_SECONDS}s (full sync every {full_interval}s)", flush=True)
+    return BlockSyncScheduler(
+        latest_height=lambda: _chain_client().latest_height(timeout=5),
+        block_events=lambda height: _chain_client().block_events(height, timeout=10),
+        sync=_sync,
+        datasets=build_commands().keys(),
+        full_interval=full_interval,
+        poll_interval=CACHE_BLOCK_POLL_SECONDS,
+        max_catchup=_env_int("CACHE_BLOCK_MAX_CATCHUP", 50),
+        # Settles/claims land almost every block; coalesce their contract refetches.
+        min_refresh={"provider-contracts": max(0, _env_int("CACHE_CONTRACTS_MIN_REFRESH_SECONDS", 60))},
+    )
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Arkeo cache fetcher")
     parser.add_argument("--once", action="store_true", help="Run a single fetch cycle then exit")
@@ -1366,9 +1737,11 @@ def main() -> None:
     if args.once:
         fetch_once(record_status=True)
         return
-    while True:
-        fetch_once(record_status=True)
-        time.sleep(interval)
+    if CACHE_SYNC_MODE == "interval" or _chain_client() is None:
+        while True:
+            fetch_once(record_status=True)
+            time.sleep(interval)
+    _block_scheduler(interval).run_forever()
 
 
 if __name__ == "__main__":
@@ -13,6 +13,8 @@ import time
 from datetime import datetime, timezone
 from typing import Tuple
 
+from chain_client import ChainQueryError, client_for
+
 ARKEOD_HOME = os.path.expanduser(os.getenv("ARKEOD_HOME", "/root/.arkeo"))
 ARKEOD_NODE = (
     os.getenv("ARKEOD_NODE")
@@ -27,6 +29,8 @@ except ValueError:
     BLOCK_HEIGHT_INTERVAL = 60
 
 NODE_ARGS = ["--node", ARKEOD_NODE] if ARKEOD_NODE else []
+# Height comes from the node's RPC /status first ("native"); "cli" always runs `arkeod status`.
+CHAIN_QUERY_MODE = (os.getenv("CHAIN_QUERY_MODE") or "native").strip().lower()
 
 
 def timestamp() -> str:
@@ -50,6 +54,11 @@ def run_list(cmd: list[str]) -> Tuple[int, str]:
 
 
 def latest_block_height() -> tuple[int | None, str | None]:
+    if CHAIN_QUERY_MODE != "cli" and ARKEOD_NODE:
+        try:
+            return client_for(ARKEOD_NODE).latest_height(), None
+        except ChainQueryError as e:
+            print(f"[dashboard-info] native status failed, using arkeod CLI ({e})", flush=True)
     cmd = ["arkeod", "--home", ARKEOD_HOME, "status", "--output", "json"]
     if NODE_ARGS:
         cmd[1:1] = NODE_ARGS
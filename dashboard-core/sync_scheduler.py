@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Block-driven scheduling for the cache fetcher.
+
+The fetcher does not run a full fetch_once every CACHE_FETCH_INTERVAL. It follows new blocks
+with a cheap RPC /status poll, a stand-in for a websocket subscription that needs no extra
+dependency. It reads each new block's events from /block_results and re-fetches only the
+datasets those events touch. A full cycle still runs every CACHE_FETCH_INTERVAL to cover what
+events do not, such as metadata TTLs, missed blocks or an unreachable RPC.
+
+Some events land in almost every block (contract settles and claims), and each refresh of their
+dataset is a full paginated fetch. A dataset can therefore carry a minimum refresh interval:
+events arriving sooner are coalesced into one pending refresh, which runs once the interval has
+passed since the last one, whether or not more events arrive.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# dataset -> lowercase fragments matched against event types and message actions
+# ("arkeo.arkeo.EventOpenContract", "/arkeo.arkeo.MsgModProvider", legacy "open_contract", ...)
+DEFAULT_EVENT_DATASETS: Dict[str, Tuple[str, ...]] = {
+    "provider-contracts": (
+        "opencontract",
+        "open_contract",
+        "closecontract",
+        "close_contract",
+        "settle",
+        "claimcontract",
+        "claim_contract",
+    ),
+    "provider-services": ("bondprovider", "provider_bond", "modprovider", "provider_mod"),
+    "validators": (
+        "createvalidator",
+        "create_validator",
+        "editvalidator",
+        "edit_validator",
+        "delegate",
+        "unbond",
+        "slash",
+        "jail",
+    ),
+}
+
+
+# dataset -> minimum seconds between event-driven refreshes
+DEFAULT_MIN_REFRESH: Dict[str, float] = {"provider-contracts": 60.0}
+
+
+def datasets_for_events(events: Iterable[Any], mapping: Dict[str, Tuple[str, ...]] = DEFAULT_EVENT_DATASETS) -> Set[str]:
+    """Datasets whose on-chain state the given block events may have changed."""
+    hits: Set[str] = set()
+    for ev in events:
+        if not isinstance(ev, dict):
+            continue
+        names = [str(ev.get("type") or "").lower()]
+        for attr in ev.get("attributes") or []:
+            if isinstance(attr, dict) and attr.get("key") == "action":
+                names.append(str(attr.get("value") or "").lower())
+        for dataset, fragments in mapping.items():
+            if dataset not in hits and any(frag in name for name in names for frag in fragments):
+                hits.add(dataset)
+        if len(hits) == len(mapping):
+            break
+    return hits
+
+
+class BlockSyncScheduler:
+    """Poll the chain height and sync only the datasets touched by new blocks."""
+
+    def __init__(
+        self,
+        latest_height: Callable[[], int],
+        block_events: Callable[[int], List[Dict[str, Any]]],
+        sync: Callable[[Optional[Set[str]]], Any],
+        datasets: Iterable[str],
+        full_interval: float,
+        poll_interval: float = 3.0,
+        max_catchup: int = 50,
+        always: Iterable[str] = ("status",),
+        mapping: Dict[str, Tuple[str, ...]] = DEFAULT_EVENT_DATASETS,
+        min_refresh: Optional[Dict[str, float]] = None,
+    ):
+        self.latest_height = latest_height
+        self.block_events = block_events
+        self.sync = sync
+        self.datasets = set(datasets)
+        self.full_interval = full_interval
+        self.poll_interval = poll_interval
+        self.max_catchup = max(1, int(max_catchup))
+        self.always = set(always) & self.datasets
+        self.mapping = mapping
+        self.min_refresh = dict(DEFAULT_MIN_REFRESH if min_refresh is None else min_refresh)
+        self.last_height = 0
+        self.last_full = 0.0
+        self.full_due = 0.0
+        # datasets touched by events but held back by their minimum refresh interval
+        self.pending: Set[str] = set()
+        self.last_synced: Dict[str, float] = {}
+        self.stats = {"polls": 0, "blocks": 0, "partial_syncs": 0, "full_syncs": 0, "idle_polls": 0, "coalesced": 0}
+
+    def _height(self) -> int:
+        try:
+            return int(self.latest_height())
+        except Exception as e:
+            print(f"[cache] block poll failed: {e}", flush=True)
+            return 0
+
+    def _full(self, height: int, reason: str) -> None:
+        print(f"[cache] full sync ({reason}) at height {height or '?'}", flush=True)
+        # Take the height before syncing so blocks committed meanwhile are replayed next poll.
+        if height:
+            self.last_height = height
+        self.last_full = time.time()
+        self.full_due = self.last_full + self.full_interval
+        self.stats["full_syncs"] += 1
+        self.pending.clear()
+        for name in self.datasets:
+            self.last_synced[name] = self.last_full
+        self.sync(None)
+
+    def step(self) -> Optional[Set[str]]:
+        """One poll; returns the datasets synced (None for a full cycle, empty when nothing was due)."""
+        self.stats["polls"] += 1
+        height = self._height()
+        if time.time() >= self.full_due:
+            self._full(height, "interval" if self.last_full else "startup")
+            return None
+        if height - self.last_height > self.max_catchup:
+            self._full(height, f"{height - self.last_height} blocks behind")
+            return None
+        new_block = height > self.last_height
+        dirty: Set[str] = set()
+        if new_block:
+            for h in range(self.last_height + 1, height + 1):
+                try:
+                    dirty |= datasets_for_events(self.block_events(h), self.mapping)
+                except Exception as e:
+                    # Without events we cannot tell what changed; bring the next full sync forward
+                    # (at most one a minute) rather than syncing everything on every poll.
+                    self.full_due = min(self.full_due, self.last_full + min(self.full_interval, 60.0))
+                    print(f"[cache] block_results {h} failed ({e}); full sync due in {max(0, int(self.full_due - time.time()))}s", flush=True)
+                    dirty = set()
+                    break
+                self.stats["blocks"] += 1
+            self.last_height = height
+            dirty &= self.datasets
+            if not dirty:
+                self.stats["idle_polls"] += 1
+        now = time.time()
+        self.pending |= dirty
+        due = {d for d in self.pending if now >= self.last_synced.get(d, 0.0) + self.min_refresh.get(d, 0.0)}
+        self.pending -= due
+        self.stats["coalesced"] += len(dirty - due)
+        targets = due | (self.always if new_block else set())
+        if not targets:
+            return set()
+        if due:
+            print(f"[cache] height {height or self.last_height}: refreshing {', '.join(sorted(due))}", flush=True)
+            self.stats["partial_syncs"] += 1
+            for name in due:
+                self.last_synced[name] = now
+        self.sync(targets)
+        return targets
+
+    def run_forever(self) -> None:
+        while True:
+            started = time.time()
+            try:
+                self.step()
+            except Exception as e:
+                print(f"[cache] sync failed: {e}", flush=True)
+            time.sleep(max(0.0, self.poll_interval - (time.time() - started)))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Production serving for the admin APIs.
+
+API_SERVER selects the server:
+- waitress (the default) serves requests from a thread pool inside this process.
+- gunicorn runs pre-forked worker processes, each with API_THREADS threads.
+- flask runs the development server.
+
+gunicorn is only allowed for APIs that keep no runtime state in the process. The subscriber
+API hosts its listener servers, nonce locks and metrics in the same process as its routes, and
+the provider API starts background threads on import. Forked workers would each hold a copy
+of that state that no thread updates, so those APIs always run threaded in one process. If the
+chosen server is not installed, the next one in line is used.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except (TypeError, ValueError):
+        return default
+
+
+API_SERVER = (os.getenv("API_SERVER") or "").strip().lower()
+API_THREADS = max(1, _env_int("API_THREADS", 16))
+API_WORKERS = max(1, _env_int("API_WORKERS", min(4, os.cpu_count() or 1)))
+# Slow endpoints shell out to arkeod; keep gunicorn from killing workers mid-request.
+API_TIMEOUT = max(1, _env_int("API_TIMEOUT", 120))
+
+
+def _gunicorn(app: Any, host: str, port: int) -> bool:
+    try:
+        from gunicorn.app.base import BaseApplication  # type: ignore
+    except ImportError:
+        return False
+
+    options: Dict[str, Any] = {
+        "bind": f"{host}:{port}",
+        "workers": API_WORKERS,
+        "threads": API_THREADS,
+        "worker_class": "gthread" if API_THREADS > 1 else "sync",
+        "timeout": API_TIMEOUT,
+        "graceful_timeout": 10,
+        "accesslog": None,
+        "errorlog": "-",
+    }
+
+    class _App(BaseApplication):
+        def load_config(self) -> None:
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self) -> Any:
+            return app
+
+    print(f"[api] gunicorn on {host}:{port} workers={API_WORKERS} threads={API_THREADS}", flush=True)
+    _App().run()
+    return True
+
+
+def _waitress(app: Any, host: str, port: int) -> bool:
+    try:
+        import waitress  # type: ignore
+    except ImportError:
+        return False
+    print(f"[api] waitress on {host}:{port} threads={API_THREADS}", flush=True)
+    waitress.serve(app, host=host, port=port, threads=API_THREADS, channel_timeout=API_TIMEOUT, ident=None)
+    return True
+
+
+def serve(app: Any, port: int, host: str = "0.0.0.0", multiprocess: bool = False) -> None:
+    """Serve a Flask app with the configured server; multiprocess=True permits gunicorn workers."""
+    mode = API_SERVER or ("gunicorn" if multiprocess else "waitress")
+    if mode == "gunicorn" and not multiprocess:
+        print("[api] API_SERVER=gunicorn needs a stateless API; using threaded waitress", flush=True)
+        mode = "waitress"
+    if mode == "gunicorn":
+        if _gunicorn(app, host, port):
+            return
+        print("[api] gunicorn is not installed; trying waitress", flush=True)
+        mode = "waitress"
+    if mode == "waitress":
+        if _waitress(app, host, port):
+            return
+        print("[api] waitress is not installed; using the Flask development server", flush=True)
+    elif mode != "flask":
+        print(f"[api] unknown API_SERVER={mode!r}; using the Flask development server", flush=True)
+    app.run(host=host, port=port, threaded=True)
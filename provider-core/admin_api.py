@@ -20,6 +20,10 @@ import uuid
 from contextlib import contextmanager
 from flask import Flask, jsonify, request
 
+from chain_client import ChainClient, ChainNotFound, ChainQueryError, client_for
+from cache_snapshot import load_json_file, write_snapshot
+from wsgi_server import serve
+
 app = Flask(__name__)
 # Configure logging to stdout at INFO so supervisor captures our app logs
 handler = logging.StreamHandler(sys.stdout)
@@ -222,6 +226,8 @@ _CONTRACTS_PAGE_MODE = None
 _PROVIDERS_PAGE_MODE = None
 _SERVICE_TYPES_PAGE_MODE = None
 _PAGE_MODE_LOCK = threading.Lock()
+# Chain queries go to the node's REST/RPC endpoints first ("native"); "cli" always shells out to arkeod.
+CHAIN_QUERY_MODE = (os.getenv("CHAIN_QUERY_MODE") or "native").strip().lower()
 
 TX_LOCK = threading.Lock()
 PROVIDER_SETTINGS_LOCK = threading.Lock()
@@ -482,6 +488,65 @@ PROVIDER_EXPORT_PATH = os.getenv("PROVIDER_EXPORT_PATH") or os.path.join(
 )
 
 
+def _chain() -> ChainClient | None:
+    """Native REST/RPC client for ARKEOD_NODE (REST from ARKEOD_REST or PROVIDER_HUB_URI); None in CLI mode."""
+    if CHAIN_QUERY_MODE == "cli":
+        return None
+    rest = os.getenv("ARKEOD_REST") or os.getenv("PROVIDER_HUB_URI") or DEFAULT_ARKEO_REST
+    return client_for(ARKEOD_NODE, rest)
+
+
+def _native_page(resource: str, page_key: str | None = None, page: int | None = None, limit: int | None = None) -> dict | None:
+    """One list page from the REST endpoint; None means fall back to the CLI."""
+    client = _chain()
+    if client is None:
+        return None
+    offset = None
+    if page and page > 1:
+        if not limit:
+            return None
+        offset = (page - 1) * limit
+    try:
+        return client.list_page(resource, page_key=page_key, offset=offset, limit=limit)
+    except ChainQueryError:
+        return None
+
+
+def _query_tx(txhash: str) -> dict | None:
+    """tx_response for txhash, or None while it is not found (REST first, `arkeod q tx` fallback)."""
+    client = _chain()
+    if client is not None:
+        try:
+            return client.tx(txhash)
+        except ChainNotFound:
+            return None
+        except ChainQueryError:
+            pass
+    code, out = run_list(["arkeod", "q", "tx", txhash, "-o", "json", *NODE_ARGS])
+    if code != 0 or not out:
+        return None
+    try:
+        data = json.loads(out)
+    except Exception:
+        return None
+    if isinstance(data, dict) and isinstance(data.get("tx_response"), dict):
+        return data["tx_response"]
+    return data if isinstance(data, dict) else None
+
+
+def _native_txs_page(query: str, page: int, limit: int = 1000) -> dict | None:
+    """One `q txs` page from the REST endpoint; None means fall back to the CLI."""
+    client = _chain()
+    if client is None:
+        return None
+    try:
+        return client.search_txs(query, page=page, limit=limit)
+    except ChainQueryError as e:
+        if "page should be within" in str(e):
+            return {"txs": []}
+        return None
+
+
 def run_list(cmd: list[str], timeout: float | None = None) -> tuple[int, str]:
     """Run a command without a shell and return (exit_code, output)."""
     try:
@@ -726,36 +791,43 @@ def _fetch_contracts_paginated() -> dict:
             page=page if page_mode == "page" else None,
             limit=per_page_limit or None,
         )
-        code, out = run_list(cmd)
-        if code != 0:
-            if page_mode == "page-key" and "unknown flag" in out and "page-key" in out:
-                page_mode = "page"
-                if not forced_mode:
-                    with _PAGE_MODE_LOCK:
-                        _CONTRACTS_PAGE_MODE = "page"
-                page_key = None
-                page = 1
-                pages = 0
-                seen_keys.clear()
-                contracts = []
-                raw_seen = 0
-                last_pagination = {}
-                continue
-            return {
-                "fetched_at": _timestamp(),
-                "exit_code": code,
-                "cmd": cmd,
-                "error": out,
-            }
-        try:
-            data = json.loads(out)
-        except json.JSONDecodeError:
-            return {
-                "fetched_at": _timestamp(),
-                "exit_code": 1,
-                "cmd": cmd,
-                "error": "invalid JSON from list-contracts",
-            }
+        data = _native_page(
+            "contracts",
+            page_key=page_key if page_mode == "page-key" else None,
+            page=page if page_mode == "page" else None,
+            limit=per_page_limit or None,
+        )
+        if data is None:
+            code, out = run_list(cmd)
+            if code != 0:
+                if page_mode == "page-key" and "unknown flag" in out and "page-key" in out:
+                    page_mode = "page"
+                    if not forced_mode:
+                        with _PAGE_MODE_LOCK:
+                            _CONTRACTS_PAGE_MODE = "page"
+                    page_key = None
+                    page = 1
+                    pages = 0
+                    seen_keys.clear()
+                    contracts = []
+                    raw_seen = 0
+                    last_pagination = {}
+                    continue
+                return {
+                    "fetched_at": _timestamp(),
+                    "exit_code": code,
+                    "cmd": cmd,
+                    "error": out,
+                }
+            try:
+                data = json.loads(out)
+            except json.JSONDecodeError:
+                return {
+                    "fetched_at": _timestamp(),
+                    "exit_code": 1,
+                    "cmd": cmd,
+                    "error": "invalid JSON from list-contracts",
+                }
         page_contracts = _extract_contracts_list(data)
         if page_contracts:
             contracts.extend(page_contracts)
@@ -813,47 +885,54 @@ def _fetch_provider_services_paginated() -> dict:
             page=page if page_mode == "page" else None,
             limit=per_page_limit or None,
         )
-        code, out = run_list(cmd)
-        if code != 0:
-            if page_mode == "page-key" and "unknown flag" in out and "page-key" in out:
-                page_mode = "page"
-                if not forced_mode:
-                    with _PAGE_MODE_LOCK:
-                        _PROVIDERS_PAGE_MODE = "page"
-                page_key = None
-                page = 1
-                pages = 0
-                seen_keys.clear()
-                providers = []
-                raw_seen = 0
-                last_pagination = {}
-                continue
-            # Handle --limit not supported by retrying without limit
-            if "unknown flag" in out and "limit" in out and per_page_limit:
-                per_page_limit = None
-                page_key = None
-                page = 1
-                pages = 0
-                seen_keys.clear()
-                providers = []
-                raw_seen = 0
-                last_pagination = {}
-                continue
-            return {
-                "fetched_at": _timestamp(),
-                "exit_code": code,
-                "cmd": cmd,
-                "error": out,
-            }
-        try:
-            data = json.loads(out)
-        except json.JSONDecodeError:
-            return {
-                "fetched_at": _timestamp(),
-                "exit_code": 1,
-                "cmd": cmd,
-                "error": "invalid JSON from list-providers",
-            }
+        data = _native_page(
+            "providers",
+            page_key=page_key if page_mode == "page-key" else None,
+            page=page if page_mode == "page" else None,
+            limit=per_page_limit or None,
+        )
+        if data is None:
+            code, out = run_list(cmd)
+            if code != 0:
+                if page_mode == "page-key" and "unknown flag" in out and "page-key" in out:
+                    page_mode = "page"
+                    if not forced_mode:
+                        with _PAGE_MODE_LOCK:
+                            _PROVIDERS_PAGE_MODE = "page"
+                    page_key = None
+                    page = 1
+                    pages = 0
+                    seen_keys.clear()
+                    providers = []
+                    raw_seen = 0
+                    last_pagination = {}
+                    continue
+                # Handle --limit not supported by retrying without limit
+                if "unknown flag" in out and "limit" in out and per_page_limit:
+                    per_page_limit = None
+                    page_key = None
+                    page = 1
+                    pages = 0
+                    seen_keys.clear()
+                    providers = []
+                    raw_seen = 0
+                    last_pagination = {}
+                    continue
+                return {
+                    "fetched_at": _timestamp(),
+                    "exit_code": code,
+                    "cmd": cmd,
+                    "error": out,
+                }
+            try:
+                data = json.loads(out)
+            except json.JSONDecodeError:
+                return {
+                    "fetched_at": _timestamp(),
+                    "exit_code": 1,
+                    "cmd": cmd,
+                    "error": "invalid JSON from list-providers",
+                }
         page_providers = _extract_providers_list(data)
         if page_providers:
             providers.extend(page_providers)
@@ -1142,18 +1221,12 @@ def _log_tx_result(label: str, exit_code: int, out: str) -> str | None:
 def _poll_tx_height(txhash: str, attempts: int = 12, delay: float = 1.0) -> str | None:
     if not txhash:
         return None
-    cmd = ["arkeod", "q", "tx", txhash, "-o", "json", *NODE_ARGS]
     for _ in range(attempts):
-        code, out = run_list(cmd)
-        if code == 0:
-            try:
-                data = json.loads(out or "{}")
-            except Exception:
-                data = {}
-            if isinstance(data, dict):
-                height = data.get("height") or (data.get("tx_response") or {}).get("height")
-                if height and str(height) != "0":
-                    return str(height)
+        data = _query_tx(txhash)
+        if data:
+            height = data.get("height")
+            if height and str(height) != "0":
+                return str(height)
         time.sleep(delay)
     return None
 
@@ -1672,6 +1745,12 @@ def _wait_for_osmo_balance_increase(
 
 def _arkeo_balance(addr: str) -> tuple[int, str | None]:
     """Return (amount_base_units, error) for Arkeo wallet."""
+    client = _chain()
+    if client is not None:
+        try:
+            return client.balance(addr, "uarkeo"), None
+        except ChainQueryError:
+            pass
     try:
         cmd = [
             "arkeod",
@@ -2406,6 +2485,7 @@ def write_cache_json(name: str, data: dict | list | str):
     try:
         if isinstance(data, (dict, list)):
             _atomic_write_json(path, data)
+            write_snapshot(path, data)
         else:
             _atomic_write(path, str(data))
     except OSError as e:
@@ -2438,8 +2518,7 @@ def read_cache_json(name: str):
     if not os.path.isfile(path):
         return None
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return load_json_file(path)
     except Exception as e:
         app.logger.debug("read_cache_json failed for %s: %s", name, e)
         return None
@@ -2453,8 +2532,31 @@ def add_cors(resp):
     return resp
 
 
+_PUBKEY_CACHE: dict[tuple[str, str, str], tuple[float, tuple[str, str, None]]] = {}
+_PUBKEY_CACHE_LOCK = threading.Lock()
+
+
 def derive_pubkeys(user: str, keyring_backend: str) -> tuple[str, str, str | None]:
-    """Return (raw_pubkey, bech32_pubkey, error)."""
+    """Return (raw_pubkey, bech32_pubkey, error); cached until the keyring directory changes."""
+    keyring_dir = os.path.join(ARKEOD_HOME, f"keyring-{keyring_backend}")
+    try:
+        stamp = os.stat(keyring_dir).st_mtime
+    except OSError:
+        stamp = None
+    key = (ARKEOD_HOME, str(user), str(keyring_backend))
+    if stamp is not None:
+        with _PUBKEY_CACHE_LOCK:
+            hit = _PUBKEY_CACHE.get(key)
+        if hit and hit[0] == stamp:
+            return hit[1]
+    result = _derive_pubkeys_cli(user, keyring_backend)
+    if stamp is not None and not result[2]:
+        with _PUBKEY_CACHE_LOCK:
+            _PUBKEY_CACHE[key] = (stamp, result)
+    return result
+
+
+def _derive_pubkeys_cli(user: str, keyring_backend: str) -> tuple[str, str, str | None]:
     pubkey_cmd = [
         "arkeod",
         "--home",
@@ -5968,19 +6070,12 @@ def provider_claims():
         """Poll tx until a DeliverTx result is available. Returns (code, raw_log, height)."""
         if not txhash:
             return None, "", ""
-        cmd = ["arkeod", "q", "tx", txhash, "-o", "json", *NODE_ARGS]
         for _ in range(attempts):
             try:
-                code, out = run_list(cmd)
-            except Exception:
-                code = 1
-                out = ""
-            if code != 0 or not out:
-                time.sleep(delay)
-                continue
-            try:
-                txobj = json.loads(out)
+                txobj = _query_tx(txhash)
             except Exception:
+                txobj = None
+            if not txobj:
                 time.sleep(delay)
                 continue
             deliver_code = txobj.get("code")
@@ -6169,30 +6264,12 @@ def claims_ledger():
     from_h = str(request.args.get("from_height") or request.args.get("from") or 0)
     to_h = str(request.args.get("to_height") or request.args.get("to") or 999_999_999)
 
-    # Derive provider pubkey (bech32)
-    key_cmd = ["arkeod", "--home", ARKEOD_HOME, "keys", "show", KEY_NAME, "-p", "--keyring-backend", KEYRING]
-    code, out = run_list(key_cmd)
-    if code != 0:
-        return jsonify({"error": "failed to get provider pubkey", "detail": out}), 500
-    raw_pub = ""
-    try:
-        parsed = json.loads(out)
-        if isinstance(parsed, dict):
-            raw_pub = parsed.get("key") or ""
-    except Exception:
-        pass
-    bech_pub = ""
-    if raw_pub:
-        c2, o2 = run_list(["arkeod", "debug", "pubkey-raw", raw_pub])
-        if c2 == 0:
-            for line in o2.splitlines():
-                if "Bech32 Acc:" in line:
-                    bech_pub = line.split("Bech32 Acc:")[-1].strip()
-                    break
+    # Derive provider pubkey (bech32); cached until the keyring changes
+    raw_pub, bech_pub, pub_err = derive_pubkeys(KEY_NAME, KEYRING)
+    if not raw_pub:
+        return jsonify({"error": "failed to get provider pubkey", "detail": pub_err}), 500
     provider_pubkey = bech_pub or raw_pub
     provider_pubkey_alts = {provider_pubkey.strip(), raw_pub.strip()}
-    if not provider_pubkey:
-        return jsonify({"error": "failed to derive provider pubkey", "detail": out}), 500
 
     node = ARKEOD_NODE
     query = f"message.action='/arkeo.arkeo.MsgClaimContractIncome' AND tx.height>={from_h} AND tx.height<={to_h}"
@@ -6216,24 +6293,26 @@ def claims_ledger():
         ]
         if node:
             tx_cmd.extend(["--node", node])
-        code, out = run_list(tx_cmd)
-        if code != 0:
-            return jsonify(
-                {
-                    "error": "failed to query txs",
-                    "detail": out,
-                    "cmd": tx_cmd,
-                    "exit_code": code,
-                    "provider_pubkey": provider_pubkey,
-                    "service_filter": service_filter or None,
-                    "from_height": from_h,
-                    "to_height": to_h,
-                }
-            ), 500
-        try:
-            data = json.loads(out)
-        except Exception:
-            break
+        data = _native_txs_page(query, page)
+        if data is None:
+            code, out = run_list(tx_cmd)
+            if code != 0:
+                return jsonify(
+                    {
+                        "error": "failed to query txs",
+                        "detail": out,
+                        "cmd": tx_cmd,
+                        "exit_code": code,
+                        "provider_pubkey": provider_pubkey,
+                        "service_filter": service_filter or None,
+                        "from_height": from_h,
+                        "to_height": to_h,
+                    }
+                ), 500
+            try:
+                data = json.loads(out)
+            except Exception:
+                break
         txs = data.get("txs") or []
         if not txs:
             break
@@ -6338,29 +6417,11 @@ def provider_contracts_summary():
         heartbeat = read_heartbeat(CLAIMS_HEARTBEAT_PATH) or {}
 
         provider_pubkey = ""
-        # Derive provider pubkey (bech32)
-        key_cmd = ["arkeod", "--home", ARKEOD_HOME, "keys", "show", KEY_NAME, "-p", "--keyring-backend", KEYRING]
-        code, out = run_list(key_cmd)
-        if code != 0:
-            return empty_summary("", "failed to get provider pubkey", out)
-        raw_pub = ""
-        try:
-            parsed = json.loads(out)
-            if isinstance(parsed, dict):
-                raw_pub = parsed.get("key") or ""
-        except Exception:
-            raw_pub = ""
-        bech_pub = ""
-        if raw_pub:
-            c2, o2 = run_list(["arkeod", "debug", "pubkey-raw", raw_pub])
-            if c2 == 0:
-                for line in o2.splitlines():
-                    if "Bech32 Acc:" in line:
-                        bech_pub = line.split("Bech32 Acc:")[-1].strip()
-                        break
+        # Derive provider pubkey (bech32); cached until the keyring changes
+        raw_pub, bech_pub, pub_err = derive_pubkeys(KEY_NAME, KEYRING)
+        if not raw_pub:
+            return empty_summary("", "failed to get provider pubkey", pub_err)
         provider_pubkey = bech_pub or raw_pub
-        if not provider_pubkey:
-            return empty_summary("", "failed to derive provider pubkey", out)
         provider_pubkey_alts = {provider_pubkey.strip(), raw_pub.strip()}
 
         node = ARKEOD_NODE
@@ -6596,29 +6657,11 @@ def provider_totals():
             }
         )
 
-    # Derive provider pubkey (bech32)
-    key_cmd = ["arkeod", "--home", ARKEOD_HOME, "keys", "show", KEY_NAME, "-p", "--keyring-backend", KEYRING]
-    code, out = run_list(key_cmd)
-    if code != 0:
-        return empty_totals("", "failed to get provider pubkey", out), 200
-    raw_pub = ""
-    try:
-        parsed = json.loads(out)
-        if isinstance(parsed, dict):
-            raw_pub = parsed.get("key") or ""
-    except Exception:
-        pass
-    bech_pub = ""
-    if raw_pub:
-        c2, o2 = run_list(["arkeod", "debug", "pubkey-raw", raw_pub])
-        if c2 == 0:
-            for line in o2.splitlines():
-                if "Bech32 Acc:" in line:
-                    bech_pub = line.split("Bech32 Acc:")[-1].strip()
-                    break
+    # Derive provider pubkey (bech32); cached until the keyring changes
+    raw_pub, bech_pub, pub_err = derive_pubkeys(KEY_NAME, KEYRING)
+    if not raw_pub:
+        return empty_totals("", "failed to get provider pubkey", pub_err), 200
     provider_pubkey = bech_pub or raw_pub
-    if not provider_pubkey:
-        return empty_totals("", "failed to derive provider pubkey", out), 200
     provider_pubkey_alts = {provider_pubkey.strip(), raw_pub.strip()}
     cache_key = f"{provider_pubkey}|{service_filter}|{from_h}|{to_h}"
     cache_name = f"provider-totals-{hashlib.sha256(cache_key.encode('utf-8')).hexdigest()}"
@@ -6723,46 +6766,48 @@ def provider_totals():
         ]
         if node:
             tx_cmd.extend(["--node", node])
-        code, out = run_list(tx_cmd)
-        if code != 0:
-            out = out or ""
-            if "page should be within" in out and "range" in out:
-                app.logger.info("provider-totals reached last page pages=%s", pages)
+        data = _native_txs_page(query, page)
+        if data is None:
+            code, out = run_list(tx_cmd)
+            if code != 0:
+                out = out or ""
+                if "page should be within" in out and "range" in out:
+                    app.logger.info("provider-totals reached last page pages=%s", pages)
+                    break
+                app.logger.warning(
+                    "provider-totals txs failed exit=%s pages=%s cmd=%s out_len=%s out=%s",
+                    code,
+                    pages,
+                    tx_cmd,
+                    len(out),
+                    out[:4000],
+                )
+                if cached_payload and cached_age is not None:
+                    payload = dict(cached_payload)
+                    payload["cached"] = True
+                    payload["stale"] = True
+                    payload["cache_age_s"] = int(cached_age)
+                    payload["error"] = "failed to query txs"
+                    payload["detail"] = {
+                        "cmd": tx_cmd,
+                        "exit_code": code,
+                        "detail": out,
+                    }
+                    app.logger.warning("provider-totals serving stale cache age_s=%s", int(cached_age))
+                    return jsonify(payload)
+                return empty_totals(
+                    provider_pubkey,
+                    "failed to query txs",
+                    {
+                        "cmd": tx_cmd,
+                        "exit_code": code,
+                        "detail": out,
+                    },
+                ), 200
+            try:
+                data = json.loads(out)
+            except Exception:
                 break
-            app.logger.warning(
-                "provider-totals txs failed exit=%s pages=%s cmd=%s out_len=%s out=%s",
-                code,
-                pages,
-                tx_cmd,
-                len(out),
-                out[:4000],
-            )
-            if cached_payload and cached_age is not None:
-                payload = dict(cached_payload)
-                payload["cached"] = True
-                payload["stale"] = True
-                payload["cache_age_s"] = int(cached_age)
-                payload["error"] = "failed to query txs"
-                payload["detail"] = {
-                    "cmd": tx_cmd,
-                    "exit_code": code,
-                    "detail": out,
-                }
-                app.logger.warning("provider-totals serving stale cache age_s=%s", int(cached_age))
-                return jsonify(payload)
-            return empty_totals(
-                provider_pubkey,
-                "failed to query txs",
-                {
-                    "cmd": tx_cmd,
-                    "exit_code": code,
-                    "detail": out,
-                },
-            ), 200
-        try:
-            data = json.loads(out)
-        except Exception:
-            break
         pages += 1
         txs = data.get("txs") or []
         if not txs:
@@ -7029,4 +7074,4 @@ def provider_totals():
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=API_PORT)
+    serve(app, API_PORT)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""Compact binary snapshots written next to the JSON cache files.
+
+Cache files stay JSON for the UI and for tools outside Python. Parsing megabytes of indented
+JSON on every request is slow, though, so write_snapshot stores the same payload as
+<name>.snap next to <name>.json. It uses msgpack when python3-msgpack is installed and marshal
+otherwise. The header carries a schema version, the codec and the mtime/size of the JSON file
+the snapshot mirrors. load_json_file uses a snapshot only when it still matches its JSON file
+and falls back to json.load otherwise.
+
+JsonFileCache keeps parsed files in memory across requests, keyed on path and the file's
+(mtime, size, inode). A file is re-read only after the fetcher replaces it. The cached values
+are shared between threads, so they are frozen: FrozenDict and FrozenList still serialize and
+pass isinstance checks like dict and list, but raise TypeError on mutation.
+"""
+
+from __future__ import annotations
+
+import json
+import marshal
+import os
+import struct
+import sys
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+try:  # optional: portable and compact; marshal is the stdlib fallback
+    import msgpack  # type: ignore
+except ImportError:  # pragma: no cover - depends on the image
+    msgpack = None
+
+MAGIC = b"ARKSNAP"
+SCHEMA_VERSION = 1
+CODEC_MSGPACK = 1
+CODEC_MARSHAL = 2
+# magic, schema version, codec, python major/minor (marshal only), json mtime_ns, json size
+_HEADER = struct.Struct("<7sBBBBqq")
+
+# auto (msgpack when installed, else marshal) | msgpack | marshal | off
+SNAPSHOT_MODE = (os.getenv("CACHE_SNAPSHOTS") or "auto").strip().lower()
+
+
+def snapshot_path(json_path: str) -> str:
+    base = json_path[:-5] if json_path.endswith(".json") else json_path
+    return f"{base}.snap"
+
+
+def _codec() -> Optional[int]:
+    if SNAPSHOT_MODE in ("off", "0", "false", "no", "json"):
+        return None
+    if SNAPSHOT_MODE == "marshal" or msgpack is None:
+        return CODEC_MARSHAL
+    return CODEC_MSGPACK
+
+
+def _encode(codec: int, payload: Any) -> bytes:
+    if codec == CODEC_MSGPACK:
+        return msgpack.packb(payload, use_bin_type=True)
+    return marshal.dumps(payload)
+
+
+def _decode(codec: int, blob: bytes) -> Any:
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise ValueError("msgpack snapshot but msgpack is not installed")
+        return msgpack.unpackb(blob, raw=False, strict_map_key=False)
+    return marshal.loads(blob)
+
+
+def _discard(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def write_snapshot(json_path: str, payload: Any) -> bool:
+    """Write <name>.snap for a JSON file that was just written with payload; False when skipped."""
+    snap = snapshot_path(json_path)
+    codec = _codec()
+    if codec is None:
+        _discard(snap)
+        return False
+    try:
+        st = os.stat(json_path)
+        blob = _encode(codec, payload)
+    except (OSError, TypeError, ValueError, OverflowError) as e:
+        # Unencodable payloads (huge ints, odd types) stay JSON-only; drop any stale snapshot.
+        print(f"[cache] snapshot skipped for {json_path}: {e}", flush=True)
+        _discard(snap)
+        return False
+    major, minor = sys.version_info[:2]
+    header = _HEADER.pack(MAGIC, SCHEMA_VERSION, codec, major, minor, st.st_mtime_ns, st.st_size)
+    tmp_path = f"{snap}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(blob)
+        os.replace(tmp_path, snap)
+        return True
+    except OSError:
+        _discard(tmp_path)
+        return False
+
+
+def read_snapshot(json_path: str, json_stat: Optional[os.stat_result] = None) -> Tuple[bool, Any]:
+    """(True, payload) from a snapshot matching the current JSON file, else (False, None)."""
+    try:
+        st = json_stat or os.stat(json_path)
+        with open(snapshot_path(json_path), "rb") as f:
+            raw = f.read()
+    except OSError:
+        return False, None
+    if len(raw) < _HEADER.size:
+        return False, None
+    magic, version, codec, major, minor, mtime_ns, size = _HEADER.unpack_from(raw)
+    if magic != MAGIC or version != SCHEMA_VERSION or (mtime_ns, size) != (st.st_mtime_ns, st.st_size):
+        return False, None
+    if codec == CODEC_MARSHAL and (major, minor) != tuple(sys.version_info[:2]):
+        return False, None
+    try:
+        return True, _decode(codec, raw[_HEADER.size:])
+    except Exception:
+        return False, None
+
+
+def load_json_file(path: str) -> Any:
+    """Parsed contents of a JSON cache file, from its snapshot when one matches; raises like json.load."""
+    st = os.stat(path)
+    ok, payload = read_snapshot(path, st)
+    if ok:
+        return payload
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _read_only(self, *args: Any, **kwargs: Any) -> Any:
+    raise TypeError(f"{type(self).__name__} is shared and read-only; copy it before changing it")
+
+
+class FrozenDict(dict):
+    """dict that refuses mutation; dict(x) or copy.copy(x) gives a mutable shallow copy."""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self) -> dict:
+        return dict(self)
+
+    def __deepcopy__(self, memo: dict) -> Any:
+        return thaw(self)
+
+    def __reduce__(self) -> Any:
+        return dict, (dict(self),)
+
+
+class FrozenList(list):
+    """list that refuses mutation; list(x) or copy.copy(x) gives a mutable shallow copy."""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = clear = extend = insert = pop = remove = reverse = sort = _read_only
+
+    def __copy__(self) -> list:
+        return list(self)
+
+    def __deepcopy__(self, memo: dict) -> Any:
+        return thaw(self)
+
+    def __reduce__(self) -> Any:
+        return list, (list(self),)
+
+
+def freeze(obj: Any) -> Any:
+    """Read-only copy of a parsed JSON value."""
+    if isinstance(obj, dict):
+        return FrozenDict((k, freeze(v)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return FrozenList(freeze(v) for v in obj)
+    return obj
+
+
+def thaw(obj: Any) -> Any:
+    """Mutable deep copy of a (possibly frozen) JSON value."""
+    if isinstance(obj, dict):
+        return {k: thaw(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [thaw(v) for v in obj]
+    return obj
+
+
+class JsonFileCache:
+    """Frozen parsed JSON files shared across requests, reloaded when the file is replaced."""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        # path -> ((mtime_ns, size, inode), frozen payload)
+        self._entries: Dict[str, Tuple[Tuple[int, int, int], Any]] = {}
+        self.stats = {"hits": 0, "loads": 0}
+
+    def load(self, path: str) -> Any:
+        """Frozen contents of path; raises like json.load when it is missing or invalid."""
+        st = os.stat(path)
+        sig = (st.st_mtime_ns, st.st_size, st.st_ino)
+        with self._lock:
+            hit = self._entries.get(path)
+            if hit is not None and hit[0] == sig:
+                self.stats["hits"] += 1
+                return hit[1]
+        ok, payload = read_snapshot(path, st)
+        if not ok:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        frozen = freeze(payload)
+        with self._lock:
+            if path not in self._entries and len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[path] = (sig, frozen)
+            self.stats["loads"] += 1
+        return frozen
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""Native Arkeo chain queries over the node's REST (LCD) and Tendermint RPC endpoints.
+
+Replaces `arkeod query ...` / `arkeod status` subprocess calls on hot paths: no Go binary
+start per call, keep-alive connections per thread and decoded JSON straight from the node.
+Responses keep the shape the CLI prints with `-o json` (proto field names, int64 as strings)
+so callers parse both paths the same way. Callers keep the CLI as a fallback: every query
+raises ChainQueryError on failure, and a base whose transport fails is skipped for a short
+backoff so a dead endpoint does not cost a timeout on every call.
+
+This file is shared verbatim by the cores that query the chain.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import socket
+import threading
+import time
+import urllib.parse
+from typing import Any, Dict, List, Optional, Tuple
+
+# Resource name -> REST path and the key the list is returned under.
+LIST_ROUTES = {
+    "contracts": ("/arkeo/contracts", "contract"),
+    "providers": ("/arkeo/providers", "provider"),
+    "services": ("/arkeo/services", "services"),
+}
+
+
+class ChainQueryError(Exception):
+    """A native query failed (transport, HTTP status or undecodable body)."""
+
+    def __init__(self, message: str, status: int = 0):
+        super().__init__(message)
+        self.status = status
+
+
+class ChainNotFound(ChainQueryError):
+    """The node answered that the requested object does not exist."""
+
+
+def rpc_http_url(node: str | None) -> str:
+    """Tendermint RPC URL usable over HTTP (tcp:// nodes speak HTTP on the same port)."""
+    val = str(node or "").strip().strip('"').strip("'")
+    if not val:
+        return ""
+    if val.startswith("tcp://"):
+        val = "http://" + val[len("tcp://"):]
+    if "://" not in val:
+        val = "http://" + val
+    return val.rstrip("/")
+
+
+def derive_rest_url(node: str | None) -> str:
+    """Best-guess REST (LCD) URL for an RPC node: rpc-* host -> rest-*, port 26657 -> 1317."""
+    rpc = rpc_http_url(node)
+    if not rpc:
+        return ""
+    parts = urllib.parse.urlsplit(rpc)
+    host = parts.hostname or ""
+    port = parts.port
+    if host.startswith("rpc"):
+        host = "rest" + host[len("rpc"):]
+    elif port == 26657:
+        port = 1317
+    else:
+        return ""
+    netloc = f"{host}:{port}" if port else host
+    return urllib.parse.urlunsplit((parts.scheme, netloc, "", "", "")).rstrip("/")
+
+
+def _as_int(val: Any, default: int = 0) -> int:
+    try:
+        return int(val)
+    except (TypeError, ValueError):
+        return default
+
+
+class ChainClient:
+    """Query client for one node: rest() for LCD routes, rpc() for Tendermint RPC routes."""
+
+    def __init__(self, rpc_url: str, rest_url: str | None = None, timeout: float = 10.0, backoff: float = 30.0):
+        self.rpc_url = rpc_http_url(rpc_url)
+        self.rest_url = (rest_url or "").rstrip("/") or derive_rest_url(rpc_url)
+        self.timeout = float(timeout)
+        self.backoff = float(backoff)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.down_until: Dict[str, float] = {}
+        self.stats = {"requests": 0, "errors": 0, "reused": 0}
+
+    def _count(self, key: str) -> None:
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def available(self, base: str) -> bool:
+        if not base:
+            return False
+        with self.lock:
+            return time.time() >= self.down_until.get(base, 0.0)
+
+    def _mark_down(self, base: str) -> None:
+        with self.lock:
+            self.down_until[base] = time.time() + self.backoff
+
+    def _conn(self, parts: urllib.parse.SplitResult, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        conns = getattr(self.local, "conns", None)
+        if conns is None:
+            conns = self.local.conns = {}
+        key = (parts.scheme, parts.hostname, parts.port)
+        conn = conns.get(key)
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        if parts.scheme == "https":
+            conn = http.client.HTTPSConnection(parts.hostname, port, timeout=timeout)
+        else:
+            conn = http.client.HTTPConnection(parts.hostname, port, timeout=timeout)
+        conns[key] = conn
+        return conn, False
+
+    def _drop(self, parts: urllib.parse.SplitResult) -> None:
+        conns = getattr(self.local, "conns", None) or {}
+        conn = conns.pop((parts.scheme, parts.hostname, parts.port), None)
+        if conn is not None:
+            conn.close()
+
+    def get_json(self, base: str, path: str, params: Optional[Dict[str, Any]] = None, timeout: float | None = None) -> Any:
+        if not self.available(base):
+            raise ChainQueryError(f"{base or 'endpoint'} unavailable")
+        url = base + path
+        query = {k: v for k, v in (params or {}).items() if v is not None and v != ""}
+        if query:
+            url += "?" + urllib.parse.urlencode(query, doseq=True)
+        parts = urllib.parse.urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        tmo = float(timeout or self.timeout)
+        self._count("requests")
+        for attempt in (0, 1):
+            conn, reused = self._conn(parts, tmo)
+            try:
+                conn.request("GET", target, headers={"Accept": "application/json"})
+                resp = conn.getresponse()
+                body = resp.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError, http.client.BadStatusLine) as e:
+                self._drop(parts)
+                if reused and attempt == 0:
+                    continue
+                self._count("errors")
+                self._mark_down(base)
+                raise ChainQueryError(f"{url}: {e}") from e
+            except (OSError, socket.timeout, http.client.HTTPException) as e:
+                self._drop(parts)
+                self._count("errors")
+                self._mark_down(base)
+                raise ChainQueryError(f"{url}: {e}") from e
+            if reused:
+                self._count("reused")
+            if resp.will_close:
+                self._drop(parts)
+            break
+        try:
+            data = json.loads(body.decode("utf-8") or "null")
+        except ValueError as e:
+            self._count("errors")
+            raise ChainQueryError(f"{url}: invalid JSON", resp.status) from e
+        msg = data.get("message") if isinstance(data, dict) else None
+        if (resp.status == 404 or (isinstance(data, dict) and data.get("code") == 5)) and msg and msg != "Not Found":
+            # A handler's NotFound carries its own message; a bare "Not Found" is an unknown route.
+            raise ChainNotFound(f"{url}: {msg}", resp.status)
+        if resp.status >= 400:
+            self._count("errors")
+            raise ChainQueryError(f"{url}: HTTP {resp.status} {msg or ''}".rstrip(), resp.status)
+        return data
+
+    def rest(self, path: str, params: Optional[Dict[str, Any]] = None, timeout: float | None = None) -> Any:
+        return self.get_json(self.rest_url, path, params, timeout)
+
+    def rpc(self, path: str, params: Optional[Dict[str, Any]] = None, timeout: float | None = None) -> Any:
+        data = self.get_json(self.rpc_url, path, params, timeout)
+        if isinstance(data, dict) and data.get("error"):
+            raise ChainQueryError(f"{path}: {data.get('error')}")
+        return data.get("result") if isinstance(data, dict) and "result" in data else data
+
+    # ---- typed helpers
+
+    def status(self, timeout: float | None = None) -> Dict[str, Any]:
+        """Same shape as `arkeod status` (node_info / sync_info / validator_info)."""
+        data = self.rpc("/status", timeout=timeout)
+        if not isinstance(data, dict) or not isinstance(data.get("sync_info"), dict):
+            raise ChainQueryError("status: unexpected response")
+        return data
+
+    def latest_height(self, timeout: float | None = None) -> int:
+        height = _as_int(self.status(timeout)["sync_info"].get("latest_block_height"))
+        if height <= 0:
+            raise ChainQueryError("status: missing latest_block_height")
+        return height
+
+    def list_page(
+        self,
+        resource: str,
+        page_key: str | None = None,
+        offset: int | None = None,
+        limit: int | None = None,
+        count_total: bool = False,
+        timeout: float | None = None,
+    ) -> Dict[str, Any]:
+        """One page of contracts/providers/services: {<list key>: [...], "pagination": {...}}."""
+        path, list_key = LIST_ROUTES[resource]
+        data = self.rest(
+            path,
+            {
+                "pagination.key": page_key,
+                "pagination.offset": offset,
+                "pagination.limit": limit,
+                "pagination.count_total": "true" if count_total else None,
+            },
+            timeout=timeout,
+        )
+        if not isinstance(data, dict) or not isinstance(data.get(list_key, []), list):
+            raise ChainQueryError(f"{path}: unexpected response")
+        data.setdefault(list_key, [])
+        return data
+
+    def active_contract(self, spender: str, provider: str, service: str, timeout: float | None = None) -> Optional[dict]:
+        """Open contract for spender/provider/service, or None when the chain has none."""
+        path = "/arkeo/active-contract/" + "/".join(urllib.parse.quote(str(p), safe="") for p in (provider, service, spender))
+        try:
+            data = self.rest(path, timeout=timeout)
+        except ChainNotFound:
+            return None
+        c = data.get("contract") if isinstance(data, dict) else None
+        if not isinstance(c, dict) or _as_int(c.get("id")) <= 0:
+            return None
+        return c
+
+    def validators(self, status: str | None = None, limit: int | None = None, timeout: float | None = None) -> Dict[str, Any]:
+        """Same shape as `query staking validators` ({"validators": [...], "pagination": {...}})."""
+        data = self.rest(
+            "/cosmos/staking/v1beta1/validators",
+            {"status": status, "pagination.limit": limit, "pagination.count_total": "true"},
+            timeout=timeout,
+        )
+        if not isinstance(data, dict) or not isinstance(data.get("validators"), list):
+            raise ChainQueryError("validators: unexpected response")
+        return data
+
+    def balances(self, address: str, timeout: float | None = None) -> List[Dict[str, Any]]:
+        data = self.rest(f"/cosmos/bank/v1beta1/balances/{urllib.parse.quote(address, safe='')}", timeout=timeout)
+        balances = data.get("balances") if isinstance(data, dict) else None
+        if not isinstance(balances, list):
+            raise ChainQueryError("balances: unexpected response")
+        return balances
+
+    def balance(self, address: str, denom: str, timeout: float | None = None) -> int:
+        for b in self.balances(address, timeout):
+            if isinstance(b, dict) and b.get("denom") == denom:
+                return _as_int(b.get("amount"))
+        return 0
+
+    def tx(self, txhash: str, timeout: float | None = None) -> Dict[str, Any]:
+        """tx_response for a hash (same shape as `arkeod query tx`); ChainNotFound until it is included."""
+        data = self.rest(f"/cosmos/tx/v1beta1/txs/{urllib.parse.quote(txhash, safe='')}", timeout=timeout)
+        resp = data.get("tx_response") if isinstance(data, dict) else None
+        if not isinstance(resp, dict):
+            raise ChainQueryError("tx: unexpected response")
+        return resp
+
+    def search_txs(
+        self, query: str, page: int = 1, limit: int = 100, order_by: str = "ORDER_BY_ASC", timeout: float | None = None
+    ) -> Dict[str, Any]:
+        """Same shape as `query txs` ({"txs": [tx_response, ...], "total_count": ...}) for an event query."""
+        params: Dict[str, Any] = {"query": query, "page": page, "limit": limit, "order_by": order_by}
+        try:
+            data = self.rest("/cosmos/tx/v1beta1/txs", params, timeout=timeout)
+        except ChainQueryError as e:
+            if e.status != 400 or "page should be within" in str(e):
+                raise
+            # Older SDKs take the conditions as repeated events= parameters instead of query=.
+            params.pop("query")
+            params["events"] = [c.strip() for c in query.split(" AND ") if c.strip()]
+            data = self.rest("/cosmos/tx/v1beta1/txs", params, timeout=timeout)
+        if not isinstance(data, dict):
+            raise ChainQueryError("txs: unexpected response")
+        txs = data.get("tx_responses") or []
+        pagination = data.get("pagination") if isinstance(data.get("pagination"), dict) else {}
+        return {"txs": txs, "total_count": data.get("total") or pagination.get("total"), "page_number": str(page), "limit": str(limit)}
+
+    def block_events(self, height: int, timeout: float | None = None) -> List[Dict[str, Any]]:
+        """Events of a committed block: successful tx events followed by begin/end/finalize block events."""
+        data = self.rpc("/block_results", {"height": height}, timeout=timeout)
+        if not isinstance(data, dict):
+            raise ChainQueryError("block_results: unexpected response")
+        events: List[Dict[str, Any]] = []
+        for res in data.get("txs_results") or []:
+            if isinstance(res, dict) and _as_int(res.get("code")) == 0:
+                events.extend(e for e in res.get("events") or [] if isinstance(e, dict))
+        for key in ("begin_block_events", "end_block_events", "finalize_block_events"):
+            events.extend(e for e in data.get(key) or [] if isinstance(e, dict))
+        return events
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        with self.lock:
+            out = dict(self.stats)
+            out["down"] = {b: int(t - now) for b, t in self.down_until.items() if t > now}
+        out["rpc_url"] = self.rpc_url
+        out["rest_url"] = self.rest_url
+        return out
+
+
+_CLIENTS: Dict[Tuple[str, str], ChainClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def client_for(node: str | None, rest_url: str | None = None, timeout: float = 10.0) -> ChainClient:
+    """Shared ChainClient per (node, rest) so every caller reuses its connections."""
+    key = (rpc_http_url(node), (rest_url or "").rstrip("/"))
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = ChainClient(key[0], key[1] or None, timeout=timeout)
+            _CLIENTS[key] = client
+        return client
@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 import base64
+import asyncio
+import atexit
 import binascii
+import hashlib
+import hmac
 import json
 import os
 import queue
@@ -13,7 +17,7 @@ import socket
 import socketserver
 import subprocess
 import threading
-from contextlib import contextmanager
+from contextlib import contextmanager, nullcontext
 import time
 import traceback
 import urllib.error
@@ -28,11 +32,46 @@ from flask import Flask, jsonify, request
 import uuid
 
 from cache_fetcher import (
+    ARKEOD_REST,
+    CHAIN_QUERY_MODE,
+    CHANGE_LOG_PATH as CACHE_CHANGE_LOG_PATH,
     build_commands as cache_build_commands,
     ensure_cache_dir as cache_ensure_cache_dir,
     fetch_once as cache_fetch_once,
     STATUS_FILE as CACHE_STATUS_FILE,
 )
+from async_http import AsyncHttpServer, AsyncResponse, AsyncUpstreamPool
+from cache_diff import ChangeLog
+from cache_snapshot import JsonFileCache, freeze
+from chain_client import ChainClient, ChainQueryError, client_for
+from provider_index import (
+    INDEX_VERSION as PROVIDER_INDEX_VERSION,
+    build_provider_index,
+    min_payg_rate as _min_payg_rate,
+    provider_location as _provider_location_from_meta,
+)
+from provider_router import POLICIES as ROUTING_POLICIES, ProviderRouter
+from circuit_breaker import CircuitBreakers
+from response_cache import ResponseCache, hit_body as cache_hit_body, rule_for_request as cache_rule_for_request
+from contract_index import ContractIndex
+from http_pool import REDIRECT_STATUSES, HttpPool, PoolUnsupported, StreamedResponse
+from runtime_state import (
+    MetricsAggregator,
+    RuntimeStateStore,
+    overlay_runtime_fields,
+    strip_runtime_fields,
+)
+from wsgi_server import serve
+
+try:  # optional: libsecp256k1 bindings, constant-time signing (preferred by the resident signer)
+    import coincurve  # type: ignore
+except ImportError:  # pragma: no cover - depends on the image
+    coincurve = None
+try:  # optional: pure-Python fallback for the resident signer
+    from ecdsa import SECP256k1 as ECDSA_SECP256K1, SigningKey as EcdsaSigningKey  # type: ignore
+    from ecdsa.util import sigencode_string_canonize as ecdsa_sigencode_string_canonize  # type: ignore
+except ImportError:  # pragma: no cover - depends on the image
+    ECDSA_SECP256K1 = EcdsaSigningKey = ecdsa_sigencode_string_canonize = None
 
 app = Flask(__name__)
 CONFIG_DIR = os.getenv("CONFIG_DIR", "/app/config")
@@ -60,6 +99,10 @@ ADMIN_SESSIONS: dict[str, float] = {}
 _LISTENER_SERVERS: dict[int, dict] = {}
 _LISTENER_LOCK = threading.Lock()
 _LISTENERS_RW_LOCK = threading.RLock()
+# Runtime state (status, rt metrics, last contract, nonces) lives in SQLite, not listeners.json.
+_RUNTIME_STORE: RuntimeStateStore | None = None
+_RUNTIME_STORE_LOCK = threading.Lock()
+_RUNTIME_STORE_FAILED = False
 TX_LOCK = threading.Lock()
 _PORT_FLOOR = None
 HOTWALLET_LOG = os.path.join(CACHE_DIR, "logs", "hotwallet-tx.log")
@@ -189,7 +232,7 @@ def _service_slug_for_id(service_id: str) -> str:
 _NONCE_CACHE: dict[str, int] = {}
 _NONCE_LOCK = threading.Lock()
 
-# Single-lane executor primitives (serialize nonce/sign/forward per listener)
+# Lane executor primitives (serialize nonce/sign/forward per listener, or per contract with N lanes)
 class WorkItem:
     def __init__(
         self,
@@ -216,32 +259,86 @@ class WorkItem:
         self.raw_path = raw_path
         self.raw_query = raw_query
         self.request_id = uuid.uuid4().hex
+        # Optional callback(resp) run on the lane thread once the response is ready (async engine).
+        self.on_done = None
+        # Optional callback(call, lane) that awaits a sentinel call on the event loop (async engine);
+        # steps/step_result hold the suspended lane steps and the call's result meanwhile.
+        self.defer_upstream = None
+        self.steps = None
+        self.step_result = None
+
+    def complete(self, resp: dict) -> None:
+        try:
+            self.response.put_nowait(resp)
+        except Exception:
+            return
+        if self.cancelled:
+            _discard_lane_result(self)
+            return
+        cb = self.on_done
+        if cb is not None:
+            try:
+                cb(resp)
+            except Exception:
+                pass
+
+
+def _discard_lane_result(work: WorkItem) -> None:
+    """Drop a lane result nobody will send, releasing a streamed upstream body if there is one."""
+    try:
+        resp = work.response.get_nowait()
+    except Exception:
+        return
+    body = resp.get("body") if isinstance(resp, dict) else None
+    if isinstance(body, StreamedResponse):
+        body.close()
 
 
 class NonceStore:
-    def __init__(self, path: str):
+    """Per-contract nonce counter that reserves blocks of nonces with one durable write per block.
+
+    While the store is in use the file holds the reserved ceiling (high-water mark). A clean stop
+    (flush) writes back the last nonce actually used, marked clean, so a restart continues from it;
+    only when that marker is missing (crash) does the store resume above the ceiling, which is safe
+    because the sentinel accepts any nonce above the last claimed one.
+    """
+
+    def __init__(self, path: str, block: int | None = None):
         self.path = path
         try:
             Path(self.path).parent.mkdir(parents=True, exist_ok=True)
         except Exception:
             pass
         self.lock = threading.Lock()
-        self.nonce = self._load()
+        # Upper bound on a reservation; the actual block follows recent request rate (see _next_block).
+        self.block = max(1, _safe_int(block if block is not None else PROXY_NONCE_BLOCK, 1))
+        # clean: the file holds the last used nonce from a flush rather than a reserved ceiling.
+        self.clean = False
+        self.ceiling = self._load()
+        self.nonce = self.ceiling
+        # Highest ceiling mirrored into listeners.json nonce_cache.
+        self.mirrored = 0
+        # Nonce and time of the last reservation, for sizing the next block (None until the first one).
+        self.reserved_at = None
+        self.reserved_nonce = self.nonce
 
     def _load(self) -> int:
         try:
             with open(self.path, "r", encoding="utf-8") as f:
                 data = json.load(f)
+            self.clean = bool(data.get("clean"))
             return int(data.get("nonce", 0))
         except Exception:
             return 0
 
-    def _save(self, val: int) -> None:
+    def _save(self, val: int, clean: bool = False) -> None:
         tmp = f"{self.path}.tmp"
         try:
             Path(self.path).parent.mkdir(parents=True, exist_ok=True)
             with open(tmp, "w", encoding="utf-8") as f:
-                json.dump({"nonce": val}, f)
+                json.dump({"nonce": val, "clean": clean}, f)
+                f.flush()
+                os.fsync(f.fileno())
             os.replace(tmp, self.path)
         except Exception:
             try:
@@ -250,10 +347,28 @@ class NonceStore:
             except Exception:
                 pass
 
+    def _next_block(self, now: float) -> int:
+        """Size a reservation to cover PROXY_NONCE_BLOCK_SECS of recent traffic, capped at self.block."""
+        if self.block <= PROXY_NONCE_BLOCK_MIN or self.reserved_at is None:
+            return min(self.block, PROXY_NONCE_BLOCK_MIN)
+        elapsed = max(0.001, now - self.reserved_at)
+        rate = max(0, self.nonce - self.reserved_nonce) / elapsed
+        want = -int(-rate * PROXY_NONCE_BLOCK_SECS // 1)
+        return max(PROXY_NONCE_BLOCK_MIN, min(self.block, want))
+
+    def _reserve_from(self, floor: int) -> None:
+        """Persist a new ceiling covering [floor, floor + block). Caller holds the lock."""
+        now = time.time()
+        self.ceiling = floor + self._next_block(now) - 1
+        self.reserved_at = now
+        self.reserved_nonce = floor
+        self._save(self.ceiling)
+
     def next(self) -> int:
         with self.lock:
             self.nonce += 1
-            self._save(self.nonce)
+            if self.nonce > self.ceiling:
+                self._reserve_from(self.nonce)
             return self.nonce
 
     def set(self, val: int) -> None:
@@ -262,30 +377,102 @@ class NonceStore:
                 self.nonce = int(val)
             except Exception:
                 return
-            self._save(self.nonce)
+            if self.nonce > self.ceiling:
+                self._reserve_from(self.nonce)
+
+    def advance(self, val: int) -> None:
+        """Raise the nonce to at least val; never moves back under nonces already handed out."""
+        with self.lock:
+            try:
+                val = int(val)
+            except Exception:
+                return
+            if val > self.nonce:
+                self.nonce = val
+                if self.nonce > self.ceiling:
+                    self._reserve_from(self.nonce)
+
+    def flush(self) -> int:
+        """Write the last used nonce back as a clean stop; the next nonce reserves a fresh block."""
+        with self.lock:
+            self.ceiling = self.nonce
+            self.mirrored = self.nonce
+            self._save(self.nonce, clean=True)
+            return self.nonce
+
+    def take_unmirrored_ceiling(self) -> int | None:
+        """Return the ceiling once after each new reservation (for mirroring into listeners.json)."""
+        with self.lock:
+            if self.ceiling > self.mirrored:
+                self.mirrored = self.ceiling
+                return self.ceiling
+            return None
+
+
+# Returned by _run_lane_steps when the request's sentinel call is being awaited on the event loop.
+_LANE_DEFERRED = object()
+
+
+def _run_lane_steps(work: WorkItem, cfg: dict, lane) -> dict | None:
+    """Run a request's lane steps up to its response, or until a sentinel call is handed to the loop.
+
+    Work items from async listeners carry defer_upstream: their buffered sentinel calls are awaited
+    on the event loop and the item comes back through lane.resume() with the result, so the lane
+    thread is free while the provider answers. Other calls are sent on this thread.
+    """
+    steps = work.steps
+    if steps is None:
+        steps = _handle_forward_lane(work, cfg)
+        result = None
+    else:
+        result = work.step_result
+        work.steps = None
+        work.step_result = None
+    try:
+        while True:
+            call = steps.send(result)
+            defer = work.defer_upstream
+            if defer is not None and not call.stream:
+                work.steps = steps
+                try:
+                    defer(call, lane)
+                    return _LANE_DEFERRED
+                except Exception:
+                    # Loop unavailable: send it here instead.
+                    work.steps = None
+            result = _perform_upstream_call(call)
+    except StopIteration as stop:
+        return stop.value
 
 
 class SingleLaneExecutor:
     def __init__(self, cfg: dict, maxsize: int = 16):
-        self.q = queue.Queue(maxsize=maxsize)
+        # Unbounded so resumed requests always get back in; submit() enforces maxsize for new ones.
+        self.q = queue.Queue()
+        self.maxsize = maxsize
         self.cfg = cfg
         self.thread = threading.Thread(target=self._worker, daemon=True)
         self.thread.start()
 
     def submit(self, work: WorkItem) -> bool:
-        try:
-            self.q.put_nowait(work)
-            return True
-        except queue.Full:
+        if self.q.qsize() >= self.maxsize:
             return False
+        self.q.put_nowait(work)
+        return True
+
+    def resume(self, work: WorkItem) -> None:
+        """Queue a request whose deferred sentinel call finished (work.step_result holds the result)."""
+        self.q.put_nowait(work)
 
     def _worker(self):
         while True:
             work: WorkItem = self.q.get()
-            if work.cancelled:
+            resuming = work.steps is not None
+            # A resumed request runs to completion even if cancelled, so routing/breaker accounting settles.
+            if work.cancelled and not resuming:
                 continue
             try:
-                if work.deadline and time.time() > work.deadline:
+                if not resuming and work.deadline and time.time() > work.deadline:
                     resp = {
                         "status": 503,
                         "body": json.dumps(
@@ -298,14 +485,17 @@ class SingleLaneExecutor:
                         "headers": {"Content-Type": "application/json"},
                     }
                 else:
-                    resp = _handle_forward_lane(work, self.cfg)
-                try:
-                    work.response.put_nowait(resp)
-                except Exception:
-                    pass
+                    resp = _run_lane_steps(work, self.cfg, self)
+                    if resp is None or resp is _LANE_DEFERRED:
+                        # Parked until a contract opens (the ContractOpener puts it back on the lane),
+                        # or waiting on the event loop for its sentinel call (resume() puts it back).
+                        continue
+                    if getattr(work, "cache_rule", None) is not None:
+                        _response_cache_store(work.cache_rule, resp, self.cfg)
+                work.complete(resp)
             except Exception as e:
                 try:
-                    work.response.put_nowait(
+                    work.complete(
                         {
                             "status": 502,
                             "body": json.dumps(
@@ -321,10 +511,51 @@ class SingleLaneExecutor:
                     pass
 
 
+class MultiLaneExecutor(SingleLaneExecutor):
+    """N workers draining one queue; nonce reservation stays serialized per contract (NonceStore lock).
+
+    Each worker runs a request's steps. A sentinel call from a threaded listener is sent on the
+    worker, so a slow provider occupies the lane until it answers or timeout_secs passes; async
+    listeners hand buffered sentinel calls to the event loop instead (see _run_lane_steps).
+    """
+
+    def __init__(self, cfg: dict, lanes: int = 2, maxsize: int = 16):
+        self.q = queue.Queue()
+        self.maxsize = maxsize
+        self.cfg = cfg
+        self.lanes = max(1, int(lanes or 1))
+        self.threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(self.lanes)]
+        self.thread = self.threads[0]
+        for t in self.threads:
+            t.start()
+
+
+def _lane_lock(server_ref, kind: str, key) -> threading.Lock:
+    """Per-listener named lock shared by all lanes (contract selection, nonce store setup)."""
+    if server_ref is None:
+        return threading.Lock()
+    guard = getattr(server_ref, "lane_locks_guard", None)
+    locks = getattr(server_ref, "lane_locks", None)
+    if guard is None or not isinstance(locks, dict):
+        return threading.Lock()
+    with guard:
+        lk = locks.get((kind, str(key)))
+        if lk is None:
+            lk = threading.Lock()
+            locks[(kind, str(key))] = lk
+        return lk
+
+
 def _read_persisted_nonce(listener_id: str | None, contract_id: str | int | None) -> int | None:
-    """Return persisted nonce for a listener/contract from listeners.json if present."""
+    """Return the persisted nonce high-water mark for a listener/contract if present."""
     if not listener_id or contract_id is None:
         return None
+    store = _runtime_store()
+    if store is not None:
+        try:
+            return store.get_nonce(str(listener_id), str(contract_id))
+        except Exception:
+            return None
     try:
         data = _ensure_listeners_file()
         listeners = data.get("listeners") if isinstance(data, dict) else []
@@ -347,17 +578,23 @@ def _read_persisted_nonce(listener_id: str | None, contract_id: str | int | None
         return None
 
 
-def _persist_listener_nonce(listener_id: str | None, contract_id: str | int | None, nonce: int | None) -> None:
-    """Persist the last nonce used for a contract into listeners.json."""
+def _persist_listener_nonce(listener_id: str | None, contract_id: str | int | None, nonce: int | None, exact: bool = False) -> None:
+    """Persist a contract's nonce high-water mark (only ever moves forward unless exact)."""
     if not listener_id or contract_id is None or nonce is None:
         return
-    try:
-        data = _ensure_listeners_file()
+    store = _runtime_store()
+    if store is not None:
+        try:
+            store.set_nonce(str(listener_id), str(contract_id), int(nonce), exact=exact)
+        except Exception:
+            pass
+        return
+    cid_str = str(contract_id)
+
+    def _mut(data: dict) -> bool:
         listeners = data.get("listeners") if isinstance(data, dict) else []
         if not isinstance(listeners, list):
-            return
-        cid_str = str(contract_id)
-        changed = False
+            return False
         for l in listeners:
             if not isinstance(l, dict):
                 continue
@@ -368,14 +605,18 @@ def _persist_listener_nonce(listener_id: str | None, contract_id: str | int | No
                 nc = {}
                 l["nonce_cache"] = nc
             try:
-                nc[cid_str] = int(nonce)
+                val = int(nonce)
             except Exception:
-                nc[cid_str] = nonce
+                return False
+            if _safe_int(nc.get(cid_str), 0) >= val and not exact:
+                return False
+            nc[cid_str] = val
             l["updated_at"] = _timestamp()
-            changed = True
-            break
-        if changed:
-            _write_listeners(data)
+            return True
+        return False
+
+    try:
+        _update_listeners_atomic(_mut)
     except Exception:
         pass
 
@@ -1567,6 +1808,12 @@ def _wait_for_osmo_tx_success(tx_hash: str, attempts: int = 10, sleep_s: int = 3
 
 def _arkeo_balance(addr: str) -> tuple[int, str | None]:
     """Return (amount_base_units, error) for Arkeo wallet."""
+    client = _chain()
+    if client is not None:
+        try:
+            return client.balance(addr, "uarkeo"), None
+        except ChainQueryError:
+            pass
     try:
         cmd = [
             "arkeod",
@@ -2425,13 +2672,96 @@ PROXY_CREATE_DELEGATE = os.getenv("PROXY_CREATE_DELEGATE", "")
 PROXY_CREATE_FEES = os.getenv("PROXY_CREATE_FEES", "300uarkeo")
 PROXY_CREATE_TIMEOUT = int(os.getenv("PROXY_CREATE_TIMEOUT", "30"))
 PROXY_CREATE_BACKOFF = int(os.getenv("PROXY_CREATE_BACKOFF", "2"))
+# Seconds a request may stay parked while its provider's contract is opened in the background
+PROXY_CREATE_PARK_SECS = int(os.getenv("PROXY_CREATE_PARK_SECS", str(PROXY_CREATE_TIMEOUT)))
+# Requests parked per listener at once; beyond this they get 503 contract_opening right away
+PROXY_CREATE_PARK_MAX = max(0, int(os.getenv("PROXY_CREATE_PARK_MAX", "64") or 64))
 PROXY_MAX_DEPOSIT = os.getenv("PROXY_MAX_DEPOSIT", "50000000")
 PROXY_SIGN_TEMPLATE = os.getenv("PROXY_SIGN_TEMPLATE", "{contract_id}:{nonce}:")
+# native = resident in-process signer via coincurve, else ecdsa (falls back to signhere when neither is
+# installed or the key cannot be loaded); signhere = spawn signhere per signature
+PROXY_SIGN_MODE = (os.getenv("PROXY_SIGN_MODE", "native") or "native").strip().lower()
+# raw = sha256(preimage) like signhere; adr036 = sign the ADR-036 StdSignDoc wrapping the preimage
+PROXY_SIGN_SCHEME = (os.getenv("PROXY_SIGN_SCHEME", "raw") or "raw").strip().lower()
+# Retry a failed resident signer load after this many seconds, doubling up to the max
+PROXY_SIGNER_RETRY_SECS = max(1.0, float(os.getenv("PROXY_SIGNER_RETRY_SECS", "30") or 30))
+PROXY_SIGNER_RETRY_MAX_SECS = max(PROXY_SIGNER_RETRY_SECS, float(os.getenv("PROXY_SIGNER_RETRY_MAX_SECS", "600") or 600))
+# How long a request waits for another thread's in-flight load of the same key
+PROXY_SIGNER_LOAD_WAIT_SECS = max(0.0, float(os.getenv("PROXY_SIGNER_LOAD_WAIT_SECS", "10") or 10))
 PROXY_ARKAUTH_FORMAT = os.getenv("PROXY_ARKAUTH_FORMAT", "4part")
 PROXY_TIMEOUT_SECS = int(os.getenv("PROXY_TIMEOUT_SECS", "15"))
+# Concurrent lane workers per listener (1 = strict single lane: one request in flight on threaded
+# listeners). A threaded listener's lane blocks on its upstream call until the sentinel answers or
+# timeout_secs passes, so a slow provider holds one lane per request sent to it; async listeners
+# free the lane while a buffered sentinel call is pending (see PROXY_ENGINE).
+PROXY_LANES = max(1, int(os.getenv("PROXY_LANES", "1") or 1))
+# Most nonces reserved per durable write of a contract's nonce high-water mark (1 = write every nonce).
+# A clean stop writes back the last used nonce; only a crash skips the unused rest of a block.
+PROXY_NONCE_BLOCK = max(1, int(os.getenv("PROXY_NONCE_BLOCK", "200") or 200))
+# Blocks are sized to this many seconds of the contract's recent request rate, but never below the minimum
+PROXY_NONCE_BLOCK_SECS = max(0.0, _safe_float(os.getenv("PROXY_NONCE_BLOCK_SECS") or "5.0", 5.0))
+PROXY_NONCE_BLOCK_MIN = max(1, min(PROXY_NONCE_BLOCK, int(os.getenv("PROXY_NONCE_BLOCK_MIN", "10") or 10)))
+# Seconds between flushes of in-memory response-time aggregates to the runtime store
+PROXY_METRICS_FLUSH_SECS = _safe_float(os.getenv("PROXY_METRICS_FLUSH_SECS") or "5.0", 5.0)
 PROXY_BYPASS_TIMEOUT = _safe_float(os.getenv("PROXY_BYPASS_TIMEOUT") or "3.0", 3.0)
+# Keep-alive upstream pool shared by all listeners/lanes (sentinel + bypass forwarding)
+PROXY_HTTP_POOL = str(os.getenv("PROXY_HTTP_POOL", "true")).lower() in ("1", "true", "yes", "on")
+PROXY_POOL_MAX_IDLE = int(os.getenv("PROXY_POOL_MAX_IDLE", "8"))
+PROXY_POOL_IDLE_SECS = _safe_float(os.getenv("PROXY_POOL_IDLE_SECS") or "30.0", 30.0)
+PROXY_DNS_TTL = _safe_float(os.getenv("PROXY_DNS_TTL") or "60.0", 60.0)
+# Stream successful upstream bodies to the client in bounded chunks instead of buffering them
+PROXY_STREAM_RESPONSES = str(os.getenv("PROXY_STREAM_RESPONSES", "false")).lower() in ("1", "true", "yes", "on")
+PROXY_STREAM_CHUNK = max(4096, int(os.getenv("PROXY_STREAM_CHUNK", "65536") or 65536))
+# Client-side keep-alive on listener ports: idle seconds before a persistent connection is dropped,
+# and requests served per connection before the proxy answers with Connection: close
+PROXY_CLIENT_KEEPALIVE = str(os.getenv("PROXY_CLIENT_KEEPALIVE", "true")).lower() in ("1", "true", "yes", "on")
+PROXY_CLIENT_IDLE_SECS = _safe_float(os.getenv("PROXY_CLIENT_IDLE_SECS") or "15.0", 15.0)
+PROXY_CLIENT_MAX_REQUESTS = max(1, int(os.getenv("PROXY_CLIENT_MAX_REQUESTS", "100") or 100))
+# Listener engine: threaded = one thread per client connection; async = shared asyncio loop for all async listeners.
+# async listeners also await buffered sentinel calls on that loop, so lanes only run contract/nonce/sign
+# steps; streamed responses, hedged reads and bypass forwards are still sent from the lane threads.
+PROXY_ENGINE = (os.getenv("PROXY_ENGINE", "threaded") or "threaded").strip().lower()
+PROXY_ENGINES = ("threaded", "async")
+# Requests one async listener holds at once (admitted and not yet answered); 0 = no limit
+PROXY_ASYNC_MAX_INFLIGHT = max(0, int(os.getenv("PROXY_ASYNC_MAX_INFLIGHT", "4096") or 0))
 PROXY_BYPASS_COOLDOWN = _safe_float(os.getenv("PROXY_BYPASS_COOLDOWN") or "60.0", 60.0)
 PROXY_PROVIDER_COOLDOWN = _safe_float(os.getenv("PROXY_PROVIDER_COOLDOWN") or "60.0", 60.0)
+# Hedged reads (opt-in): a read-only request still unanswered after the provider's recent
+# PROXY_HEDGE_QUANTILE latency is also sent to the next candidate that already has a contract.
+# PROXY_HEDGE_DELAY_MS is the delay used until a provider has enough samples.
+PROXY_HEDGE = str(os.getenv("PROXY_HEDGE", "false")).lower() in ("1", "true", "yes", "on")
+PROXY_HEDGE_QUANTILE = min(0.999, max(0.5, _safe_float(os.getenv("PROXY_HEDGE_QUANTILE") or "0.95", 0.95)))
+PROXY_HEDGE_DELAY_MS = _safe_float(os.getenv("PROXY_HEDGE_DELAY_MS") or "500", 500.0)
+PROXY_HEDGE_MIN_DELAY_MS = _safe_float(os.getenv("PROXY_HEDGE_MIN_DELAY_MS") or "20", 20.0)
+# Candidate routing policy (see provider_router.py): ordered = location then rate, as listed;
+# ewma = lowest latency/load/error cost first; p2c = power of two choices over healthy providers.
+# Outcomes are kept for PROXY_ROUTING_WINDOW_SECS; providers failing more than
+# PROXY_ROUTING_MAX_ERROR_RATE of them go last.
+PROXY_ROUTING = (os.getenv("PROXY_ROUTING", "ordered") or "ordered").strip().lower()
+PROXY_ROUTING_WINDOW_SECS = _safe_float(os.getenv("PROXY_ROUTING_WINDOW_SECS") or "60.0", 60.0)
+PROXY_ROUTING_MAX_ERROR_RATE = _safe_float(os.getenv("PROXY_ROUTING_MAX_ERROR_RATE") or "0.5", 0.5)
+# Price ceiling: skip providers whose pay-as-you-go amount is above this (blank = no ceiling)
+PROXY_MAX_PAYG_RATE = (os.getenv("PROXY_MAX_PAYG_RATE") or "").strip()
+# Per-provider circuit breakers (see circuit_breaker.py): trip after PROXY_BREAKER_CONSECUTIVE
+# failures in a row or a PROXY_BREAKER_ERROR_RATE error rate over the last PROXY_BREAKER_WINDOW
+# requests (at least PROXY_BREAKER_MIN_REQUESTS), then probe the sentinel's /metadata.json after
+# PROXY_BREAKER_OPEN_SECS (doubling up to PROXY_BREAKER_OPEN_MAX_SECS) instead of sending paid rechecks.
+PROXY_BREAKER = str(os.getenv("PROXY_BREAKER", "true")).lower() in ("1", "true", "yes", "on")
+PROXY_BREAKER_CONSECUTIVE = max(1, int(os.getenv("PROXY_BREAKER_CONSECUTIVE", "3") or 3))
+PROXY_BREAKER_ERROR_RATE = _safe_float(os.getenv("PROXY_BREAKER_ERROR_RATE") or "0.5", 0.5)
+PROXY_BREAKER_WINDOW = max(1, int(os.getenv("PROXY_BREAKER_WINDOW", "20") or 20))
+PROXY_BREAKER_MIN_REQUESTS = max(1, int(os.getenv("PROXY_BREAKER_MIN_REQUESTS", "5") or 5))
+PROXY_BREAKER_OPEN_SECS = _safe_float(os.getenv("PROXY_BREAKER_OPEN_SECS") or "10.0", 10.0)
+PROXY_BREAKER_OPEN_MAX_SECS = _safe_float(os.getenv("PROXY_BREAKER_OPEN_MAX_SECS") or "300.0", 300.0)
+PROXY_BREAKER_PROBE_TIMEOUT = _safe_float(os.getenv("PROXY_BREAKER_PROBE_TIMEOUT") or "3.0", 3.0)
+# Response cache for results that cannot change (opt-in per listener; see response_cache.py).
+# Shared byte budget and per-entry limit; head-dependent calls are cached only with a head TTL;
+# EVM receipts/blocks by number are cached once PROXY_CACHE_FINALITY_BLOCKS behind the head.
+PROXY_RESPONSE_CACHE = str(os.getenv("PROXY_RESPONSE_CACHE", "false")).lower() in ("1", "true", "yes", "on")
+PROXY_CACHE_MAX_MB = _safe_float(os.getenv("PROXY_CACHE_MAX_MB") or "64", 64.0)
+PROXY_CACHE_MAX_ENTRY_KB = _safe_float(os.getenv("PROXY_CACHE_MAX_ENTRY_KB") or "1024", 1024.0)
+PROXY_CACHE_HEAD_TTL_MS = _safe_float(os.getenv("PROXY_CACHE_HEAD_TTL_MS") or "0", 0.0)
+PROXY_CACHE_FINALITY_BLOCKS = max(0, int(os.getenv("PROXY_CACHE_FINALITY_BLOCKS", "64") or 64))
 PROXY_HEIGHT_SKEW = int(os.getenv("PROXY_HEIGHT_SKEW", "6"))
 PROXY_WHITELIST_IPS = os.getenv("PROXY_WHITELIST_IPS", "0.0.0.0")
 PROXY_TRUST_FORWARDED = str(os.getenv("PROXY_TRUST_FORWARDED", "true")).lower() in ("1", "true", "yes", "on")
@@ -2442,10 +2772,21 @@ PROXY_CONTRACT_TIMEOUT = int(os.getenv("PROXY_CONTRACT_TIMEOUT", "10"))
 PROXY_CONTRACT_LIMIT = int(os.getenv("PROXY_CONTRACT_LIMIT", "5000"))
 # Pagination mode for list-contracts; resolved at runtime on first use.
 _CONTRACTS_PAGE_MODE = None
+# Per-client active-contract query (`arkeod query arkeo active-contract`); support is probed on first use.
+PROXY_CONTRACT_QUERY = str(os.getenv("PROXY_CONTRACT_QUERY", "true")).lower() in ("1", "true", "yes", "on")
+_ACTIVE_CONTRACT_QUERY = None
+_NATIVE_ACTIVE_QUERY = None
 # Poll/test helper timeout (UI “Poll” and “Test” buttons). Default aligns with lane worst-case
 # (timeout_secs + create_timeout) so first-time contract opens can complete.
 PROXY_TEST_TIMEOUT = float(os.getenv("PROXY_TEST_TIMEOUT", "45.0"))
 PROXY_OPEN_COOLDOWN = int(os.getenv("PROXY_OPEN_COOLDOWN", "0"))  # seconds to cool down a provider after open failure
+# Background contract manager: refresh cadence, renew lead time and assumed block time (seconds)
+PROXY_CONTRACT_MANAGER = str(os.getenv("PROXY_CONTRACT_MANAGER", "true")).lower() in ("1", "true", "yes", "on")
+PROXY_CONTRACT_REFRESH_SECS = _safe_float(os.getenv("PROXY_CONTRACT_REFRESH_SECS") or "30.0", 30.0)
+PROXY_CONTRACT_RENEW_SECS = _safe_float(os.getenv("PROXY_CONTRACT_RENEW_SECS") or "600.0", 600.0)
+# Only renew contracts that served a request this recently; idle providers and first opens are left to requests
+PROXY_CONTRACT_ACTIVE_SECS = _safe_float(os.getenv("PROXY_CONTRACT_ACTIVE_SECS") or "900.0", 900.0)
+PROXY_BLOCK_TIME_SECS = _safe_float(os.getenv("PROXY_BLOCK_TIME_SECS") or "6.0", 6.0)
 PROXY_CONTRACT_CACHE_TTL = 0  # TTL disabled; cached contract reused until invalid
 DOWN_PROVIDER_RECHECK_INTERVAL = _safe_float(os.getenv("DOWN_PROVIDER_RECHECK_INTERVAL") or "600.0", 600.0)
 DOWN_PROVIDER_RECHECK_MAX = int(_safe_float(os.getenv("DOWN_PROVIDER_RECHECK_MAX") or "0", 0.0))
@@ -2471,6 +2812,13 @@ def run(cmd: str) -> tuple[int, str]:
         return 1, str(e)
 
 
+def _chain(node: str | None = None) -> ChainClient | None:
+    """Native REST/RPC client for node (default ARKEOD_NODE); None when CHAIN_QUERY_MODE=cli."""
+    if CHAIN_QUERY_MODE == "cli":
+        return None
+    return client_for(node or ARKEOD_NODE, ARKEOD_REST or None, timeout=PROXY_CONTRACT_TIMEOUT)
+
+
 def run_list(cmd: list[str]) -> tuple[int, str]:
     """Run a command without a shell and return (exit_code, output)."""
     try:
@@ -2935,8 +3283,31 @@ def _write_hotwallet_mnemonic(settings: dict, mnemonic: str) -> None:
     return
 
 
+# Resident signer registry (signers themselves are defined with the secp256k1 code below).
+# Lives here because the import-time wallet bootstrap resets it through _delete_hotwallet.
+_RESIDENT_SIGNERS: dict[str, "ResidentSigner"] = {}
+# cache_key -> (retry_at, backoff_secs) after a failed load
+_RESIDENT_SIGNER_FAILS: dict[str, tuple[float, float]] = {}
+# cache_key -> Event set when the in-flight load finishes
+_RESIDENT_SIGNER_LOADING: dict[str, threading.Event] = {}
+_RESIDENT_SIGNERS_LOCK = threading.Lock()
+_RESIDENT_SIGNERS_GEN = 0
+
+
+def _reset_resident_signers() -> None:
+    """Drop loaded keys and failed loads (e.g. after the hot wallet is replaced)."""
+    global _RESIDENT_SIGNERS_GEN
+    with _RESIDENT_SIGNERS_LOCK:
+        _RESIDENT_SIGNERS.clear()
+        _RESIDENT_SIGNER_FAILS.clear()
+        _RESIDENT_SIGNER_LOADING.clear()
+        _RESIDENT_SIGNERS_GEN += 1
+
+
 def _delete_hotwallet(key_name: str, keyring_backend: str, home: str) -> tuple[int, str]:
     """Delete the existing key if present."""
+    # Any resident signer holds the old key; reload on next use.
+    _reset_resident_signers()
     cmd = [
         "arkeod",
         "--home",
@@ -3423,8 +3794,31 @@ def _telemetry_bootstrap() -> None:
     _telemetry_save_state(state)
 
 
+_PUBKEY_CACHE: dict[tuple[str, str, str], tuple[float, tuple[str, str, None]]] = {}
+_PUBKEY_CACHE_LOCK = threading.Lock()
+
+
 def derive_pubkeys(user: str, keyring_backend: str) -> tuple[str, str, str | None]:
-    """Return (raw_pubkey, bech32_pubkey, error)."""
+    """Return (raw_pubkey, bech32_pubkey, error); cached until the keyring directory changes."""
+    keyring_dir = os.path.join(ARKEOD_HOME, f"keyring-{keyring_backend}")
+    try:
+        stamp = os.stat(keyring_dir).st_mtime
+    except OSError:
+        stamp = None
+    key = (ARKEOD_HOME, str(user), str(keyring_backend))
+    if stamp is not None:
+        with _PUBKEY_CACHE_LOCK:
+            hit = _PUBKEY_CACHE.get(key)
+        if hit and hit[0] == stamp:
+            return hit[1]
+    result = _derive_pubkeys_cli(user, keyring_backend)
+    if stamp is not None and not result[2]:
+        with _PUBKEY_CACHE_LOCK:
+            _PUBKEY_CACHE[key] = (stamp, result)
+    return result
+
+
+def _derive_pubkeys_cli(user: str, keyring_backend: str) -> tuple[str, str, str | None]:
     pubkey_cmd = [
         "arkeod",
         "--home",
@@ -4567,6 +4961,17 @@ def payg_status():
     return jsonify(payload)
 
 
+@app.get("/api/upstream-pool")
+def upstream_pool_stats():
+    """Keep-alive upstream pool counters (per sentinel/bypass host, plus DNS cache and the async listeners' client)."""
+    if _HTTP_POOL is None:
+        return jsonify({"enabled": False, "async": _ASYNC_UPSTREAM.stats()})
+    payload = _HTTP_POOL.stats()
+    payload["enabled"] = True
+    payload["async"] = _ASYNC_UPSTREAM.stats()
+    return jsonify(payload)
+
+
 @app.get("/api/services")
 def list_services():
     """Return available services from arkeod."""
@@ -4961,16 +5366,129 @@ def _all_services_lookup() -> dict[str, str]:
     return lookup
 
 
+_CACHE_FILES = JsonFileCache()
+
+
 def _load_cached(name: str) -> dict:
+    """Parsed cache file, shared and read-only; re-read only after the fetcher replaces it."""
     path = os.path.join(CACHE_DIR, f"{name}.json")
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (OSError, json.JSONDecodeError):
+        return _CACHE_FILES.load(path)
+    except (OSError, ValueError):
         return {}
 
 
+_PROVIDER_INDEX_LOCK = threading.Lock()
+_PROVIDER_INDEX_FALLBACK: dict = {}
+
+
+def _provider_index() -> dict:
+    """Provider/service lookup maps from provider_index.json (see provider_index.py).
+
+    Until the fetcher has written one, the maps are built here from active_services and
+    active_providers, once per version of those files.
+    """
+    idx = _load_cached("provider_index")
+    if isinstance(idx, dict) and idx.get("version") == PROVIDER_INDEX_VERSION:
+        return idx
+    services = _load_cached("active_services")
+    providers = _load_cached("active_providers")
+    with _PROVIDER_INDEX_LOCK:
+        memo = _PROVIDER_INDEX_FALLBACK
+        if memo.get("services") is services and memo.get("providers") is providers:
+            return memo["index"]
+        idx = freeze(build_provider_index(services, providers))
+        memo.update(services=services, providers=providers, index=idx)
+        return idx
+
+
+def _runtime_store() -> RuntimeStateStore | None:
+    """Return the shared runtime-state store (opened once; imports legacy listeners.json runtime fields)."""
+    global _RUNTIME_STORE, _RUNTIME_STORE_FAILED
+    if _RUNTIME_STORE is not None or _RUNTIME_STORE_FAILED:
+        return _RUNTIME_STORE
+    with _RUNTIME_STORE_LOCK:
+        if _RUNTIME_STORE is None and not _RUNTIME_STORE_FAILED:
+            try:
+                cache_ensure_cache_dir()
+                store = RuntimeStateStore(os.getenv("RUNTIME_STATE_DB") or os.path.join(CACHE_DIR, "runtime_state.sqlite3"))
+                store.import_listeners(_load_listeners_file())
+                _RUNTIME_STORE = store
+            except Exception as e:
+                _RUNTIME_STORE_FAILED = True
+                print(f"[runtime] state store unavailable, keeping runtime fields in listeners.json: {e}", flush=True)
+    return _RUNTIME_STORE
+
+
+# Live response-time aggregates (EWMA, mean, p50/p95/p99); flushed to the runtime store on a timer.
+_RT_METRICS = MetricsAggregator(_runtime_store)
+# Sliding-window latency/error/in-flight stats per listener and provider, for candidate routing.
+_ROUTER = ProviderRouter(window_secs=PROXY_ROUTING_WINDOW_SECS, max_error_rate=PROXY_ROUTING_MAX_ERROR_RATE)
+
+
+def _probe_sentinel(sentinel: str) -> bool:
+    """Unpaid health probe for a circuit breaker: GET the sentinel's /metadata.json."""
+    url = f"{_normalize_sentinel_url(sentinel).rstrip('/')}/metadata.json"
+    status, _body, _hdrs = _upstream_fetch("GET", url, None, {"Accept": "application/json"}, PROXY_BREAKER_PROBE_TIMEOUT)
+    return 200 <= int(status or 0) < 300
+
+
+def _breaker_closed(listener_id: str, provider_pubkey: str) -> None:
+    print(f"[breaker] closed listener={listener_id} provider={provider_pubkey} (probe ok)", flush=True)
+    # A provider marked Down is left out of _candidate_providers; put it back in rotation.
+    _set_top_service_status(listener_id, provider_pubkey, "Up")
+
+
+_BREAKERS = CircuitBreakers(
+    _probe_sentinel,
+    error_rate=PROXY_BREAKER_ERROR_RATE,
+    min_requests=PROXY_BREAKER_MIN_REQUESTS,
+    window=PROXY_BREAKER_WINDOW,
+    consecutive=PROXY_BREAKER_CONSECUTIVE,
+    open_secs=PROXY_BREAKER_OPEN_SECS,
+    open_max_secs=PROXY_BREAKER_OPEN_MAX_SECS,
+    on_close=_breaker_closed,
+)
+
+
+_RESPONSE_CACHE = ResponseCache(
+    int(PROXY_CACHE_MAX_MB * 1024 * 1024),
+    int(PROXY_CACHE_MAX_ENTRY_KB * 1024),
+    finality_blocks=PROXY_CACHE_FINALITY_BLOCKS,
+)
+
+
+def _breaker_probe_loop() -> None:
+    if not PROXY_BREAKER:
+        return
+    _BREAKERS.run_probe_loop(1.0, log=lambda msg: print(msg, flush=True))
+
+
+def _flush_rt_metrics() -> None:
+    try:
+        _RT_METRICS.flush()
+    except Exception as e:
+        print(f"[metrics] flush failed: {e}", flush=True)
+
+
+def _rt_metrics_flush_loop() -> None:
+    _RT_METRICS.run_flush_loop(PROXY_METRICS_FLUSH_SECS, log=lambda msg: print(msg, flush=True))
+
+
 def _ensure_listeners_file() -> dict:
+    """Load listeners.json with runtime state (status/metrics/contracts) merged into top_services."""
+    data = _load_listeners_file()
+    store = _runtime_store()
+    if store is not None:
+        try:
+            overlay_runtime_fields(data, store.provider_states())
+            overlay_runtime_fields(data, _RT_METRICS.snapshot())
+        except Exception:
+            pass
+    return data
+
+
+def _load_listeners_file() -> dict:
     """Load listeners.json; if missing, return an empty structure."""
     cache_ensure_cache_dir()
     payload = {"fetched_at": _timestamp(), "listeners": []}
@@ -5023,8 +5541,10 @@ def _ensure_listeners_file() -> dict:
 
 
 def _write_listeners(data: dict) -> None:
-    """Write listeners.json atomically."""
+    """Write listeners.json atomically (config only; runtime fields belong to the runtime store)."""
     cache_ensure_cache_dir()
+    if _RUNTIME_STORE is not None:
+        data = strip_runtime_fields(data)
     path = LISTENERS_FILE
     tmp_path = f"{path}.tmp.{os.getpid()}.{int(time.time() * 1000)}"
     lock_path = f"{path}.lock"
@@ -5205,19 +5725,6 @@ def _provider_moniker_from_meta(p: dict | None) -> str | None:
     return moniker or None
 
 
-def _provider_location_from_meta(p: dict | None) -> str | None:
-    if not isinstance(p, dict):
-        return None
-    meta = p.get("metadata") or {}
-    location = (
-        (meta.get("config") or {}).get("location")
-        or meta.get("location")
-        or (p.get("provider") or {}).get("location")
-        or p.get("location")
-    )
-    return location or None
-
-
 def _normalize_location_value(value: str | None) -> str:
     if not value:
         return ""
@@ -5583,9 +6090,19 @@ def _start_listener_server(listener: dict) -> tuple[bool, str | None]:
         "service_name": service_name,
         "service_description": service_desc,
         "service_id": listener.get("service_id"),
+        "service_family": _service_family(listener.get("service_id"), service_name),
         "whitelist_ips": listener.get("whitelist_ips") or PROXY_WHITELIST_IPS,
         "trust_forwarded": listener.get("trust_forwarded", PROXY_TRUST_FORWARDED),
         "decorate_response": listener.get("decorate_response", PROXY_DECORATE_RESPONSE),
+        "stream_responses": _safe_bool(listener.get("stream_responses", PROXY_STREAM_RESPONSES), PROXY_STREAM_RESPONSES),
+        "hedge": _safe_bool(listener.get("hedge", PROXY_HEDGE), PROXY_HEDGE),
+        "hedge_delay_ms": _safe_float(listener.get("hedge_delay_ms", PROXY_HEDGE_DELAY_MS), PROXY_HEDGE_DELAY_MS),
+        "routing": str(listener.get("routing") or PROXY_ROUTING).strip().lower(),
+        "response_cache": _safe_bool(listener.get("response_cache", PROXY_RESPONSE_CACHE), PROXY_RESPONSE_CACHE),
+        "response_cache_head_ttl_ms": _safe_float(
+            listener.get("response_cache_head_ttl_ms", PROXY_CACHE_HEAD_TTL_MS), PROXY_CACHE_HEAD_TTL_MS
+        ),
+        "max_payg_rate": listener.get("max_payg_rate", PROXY_MAX_PAYG_RATE),
         "arkauth_as_header": listener.get("arkauth_as_header", PROXY_ARKAUTH_AS_HEADER),
         "auto_create": listener.get("auto_create", PROXY_AUTO_CREATE),
         "create_provider_pubkey": provider_pubkey or listener.get("create_provider_pubkey"),
@@ -5602,9 +6119,17 @@ def _start_listener_server(listener: dict) -> tuple[bool, str | None]:
         "max_deposit": listener.get("max_deposit", PROXY_MAX_DEPOSIT),
         "create_timeout_sec": listener.get("create_timeout_sec", PROXY_CREATE_TIMEOUT),
         "create_backoff_sec": listener.get("create_backoff_sec", PROXY_CREATE_BACKOFF),
+        "create_park_sec": listener.get("create_park_sec", PROXY_CREATE_PARK_SECS),
         "sign_template": listener.get("sign_template", PROXY_SIGN_TEMPLATE),
+        "sign_mode": str(listener.get("sign_mode") or PROXY_SIGN_MODE).strip().lower(),
+        "sign_scheme": str(listener.get("sign_scheme") or PROXY_SIGN_SCHEME).strip().lower(),
         "arkauth_format": listener.get("arkauth_format", PROXY_ARKAUTH_FORMAT),
         "timeout_secs": listener.get("timeout_secs", PROXY_TIMEOUT_SECS),
+        "lanes": max(1, _safe_int(listener.get("lanes") or PROXY_LANES, PROXY_LANES)),
+        "engine": str(listener.get("engine") or PROXY_ENGINE).strip().lower(),
+        "client_keepalive": _safe_bool(listener.get("client_keepalive", PROXY_CLIENT_KEEPALIVE), PROXY_CLIENT_KEEPALIVE),
+        "client_idle_secs": _safe_float(listener.get("client_idle_secs", PROXY_CLIENT_IDLE_SECS), PROXY_CLIENT_IDLE_SECS),
+        "client_max_requests": max(1, _safe_int(listener.get("client_max_requests", PROXY_CLIENT_MAX_REQUESTS), PROXY_CLIENT_MAX_REQUESTS)),
         "bypass_uri": listener.get("bypass_uri") or "",
         "bypass_username": listener.get("bypass_username") or "",
         "bypass_password": listener.get("bypass_password") or "",
@@ -5624,7 +6149,10 @@ def _start_listener_server(listener: dict) -> tuple[bool, str | None]:
     }
 
     try:
-        srv = PaygProxyServer(("0.0.0.0", port), PaygProxyHandler)
+        if cfg.get("engine") == "async":
+            srv = AsyncPaygProxyServer(("0.0.0.0", port))
+        else:
+            srv = PaygProxyServer(("0.0.0.0", port), PaygProxyHandler)
     except OSError as e:
         return False, f"failed to bind port {port}: {e}"
     srv.cfg = cfg
@@ -5641,14 +6169,40 @@ def _start_listener_server(listener: dict) -> tuple[bool, str | None]:
     srv.contract_cache = {}
     srv.nonce_stores = {}
     srv.cooldowns = {}
-    # Single-lane executor: serialize nonce/sign/forward per listener
-    srv.lane_exec = SingleLaneExecutor(cfg, maxsize=16)
+    # Locks shared by lanes: one contract lookup/auto-create per provider, one nonce store per contract
+    srv.lane_locks = {}
+    srv.lane_locks_guard = threading.Lock()
+    lanes = _safe_int(cfg.get("lanes"), 1)
+    if lanes > 1:
+        # Multi-lane: nonce reservation is serialized per contract; sign/forward run concurrently
+        srv.lane_exec = MultiLaneExecutor(cfg, lanes=lanes, maxsize=16 * lanes)
+    else:
+        # Single-lane executor: serialize nonce/sign/forward per listener
+        srv.lane_exec = SingleLaneExecutor(cfg, maxsize=16)
     timeout_secs = _safe_int(cfg.get("timeout_secs", PROXY_TIMEOUT_SECS), PROXY_TIMEOUT_SECS)
     create_timeout = _safe_int(cfg.get("create_timeout_sec", PROXY_CREATE_TIMEOUT), PROXY_CREATE_TIMEOUT)
     # Worst-case: a request may need to open a contract then forward upstream.
     srv.lane_timeout = max(timeout_secs, timeout_secs + create_timeout)
-    # Limit simultaneous handler threads waiting on the lane to avoid unbounded growth
-    srv.lane_sem = threading.BoundedSemaphore(32)
+    # Limit simultaneous handler threads waiting on the lane to avoid unbounded growth. Async listeners
+    # have no handler threads; they are bounded by inflight_max instead.
+    srv.lane_sem = None if cfg.get("engine") == "async" else threading.BoundedSemaphore(32 * max(1, lanes))
+    # Contract opens run here, off the lanes; requests needing one are rerouted or parked.
+    srv.contract_opener = ContractOpener(srv)
+    srv.contract_opener.start()
+    # Resident signer: load the client key once (off the request path) instead of spawning signhere per request
+    srv.signer = None
+    if cfg.get("sign_mode") == "native":
+
+        def _preload_signer():
+            srv.signer = _resident_signer(cfg.get("client_key"), cfg.get("sign_scheme") or "raw", log_cb=_log)
+
+        def _log(level: str, msg: str):
+            try:
+                getattr(srv.logger, level, srv.logger.info)(msg)
+            except Exception:
+                pass
+
+        threading.Thread(target=_preload_signer, daemon=True).start()
 
     with _LISTENER_LOCK:
         if port in _LISTENER_SERVERS:
@@ -5657,9 +6211,32 @@ def _start_listener_server(listener: dict) -> tuple[bool, str | None]:
         thread = threading.Thread(target=srv.serve_forever, kwargs={"poll_interval": 0.5}, daemon=True)
         _LISTENER_SERVERS[port] = {"server": srv, "thread": thread, "listener_id": listener.get("id")}
         thread.start()
+    if PROXY_CONTRACT_MANAGER:
+        srv.contract_mgr = ContractManager(srv)
+        srv.contract_mgr.start()
     return True, None
 
 
+def _flush_listener_nonces(srv, listener_id: str | None) -> None:
+    """Write each contract's last used nonce back on a clean stop so a restart does not skip a block."""
+    stores = getattr(srv, "nonce_stores", None)
+    if not isinstance(stores, dict):
+        return
+    for cid, store in list(stores.items()):
+        try:
+            nonce = store.flush()
+            _persist_listener_nonce(listener_id, cid, nonce, exact=True)
+        except Exception:
+            pass
+
+
+def _flush_all_listener_nonces() -> None:
+    with _LISTENER_LOCK:
+        entries = list(_LISTENER_SERVERS.values())
+    for entry in entries:
+        _flush_listener_nonces(entry.get("server"), entry.get("listener_id"))
+
+
 def _stop_listener_server(port: int) -> None:
     """Stop a running listener server if present."""
     srv_entry = None
@@ -5670,8 +6247,17 @@ def _stop_listener_server(port: int) -> None:
     srv = srv_entry.get("server")
     try:
         if srv:
+            # Persistent client connections finish their in-flight request and then close.
+            srv.shutting_down = True
+            mgr = getattr(srv, "contract_mgr", None)
+            if mgr is not None:
+                mgr.stop()
+            opener = getattr(srv, "contract_opener", None)
+            if opener is not None:
+                opener.stop()
             srv.shutdown()
             srv.server_close()
+            _flush_listener_nonces(srv, srv_entry.get("listener_id"))
     except Exception:
         pass
 
@@ -5699,6 +6285,8 @@ def _ensure_listener_runtime(listener: dict, previous_port: int | None = None, p
             "bypass_password",
             "bypass_timeout_sec",
             "bypass_cooldown_sec",
+            "lanes",
+            "engine",
         ]
         for k in keys_to_check:
             if previous_entry.get(k) != listener.get(k):
@@ -5744,11 +6332,7 @@ def _next_available_port(used: set[int]) -> int | None:
 
 
 def _load_active_service_types_lookup() -> dict[str, dict]:
-    try:
-        with open(ACTIVE_SERVICE_TYPES_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except (OSError, json.JSONDecodeError):
-        return {}
+    data = _load_cached("active_service_types")
     items = data.get("active_service_types") if isinstance(data, dict) else []
     if not isinstance(items, list):
         return {}
@@ -5956,53 +6540,19 @@ def _normalize_sentinel_url(url: str | None) -> str | None:
 
 
 def _active_provider_moniker(provider_pubkey: str | None) -> str | None:
-    """Lookup provider moniker from active_providers cache."""
+    """Lookup provider moniker (from its metadata) in the provider index."""
     if not provider_pubkey:
         return None
-    try:
-        data = _load_cached("active_providers")
-    except Exception:
-        return None
-    prov_list = data.get("providers") if isinstance(data, dict) else []
-    if not isinstance(prov_list, list):
-        return None
-    for p in prov_list:
-        if not isinstance(p, dict):
-            continue
-        pk = p.get("pubkey") or p.get("pub_key") or p.get("pubKey")
-        if str(pk) != str(provider_pubkey):
-            continue
-        meta = p.get("metadata") or {}
-        try:
-            cfg = meta.get("config") or {}
-            mon = cfg.get("moniker") or meta.get("moniker")
-            if mon:
-                return mon
-        except Exception:
-            pass
-    return None
+    info = (_provider_index().get("providers") or {}).get(str(provider_pubkey)) or {}
+    return info.get("moniker") or None
 
 
 def _active_service_lookup(provider_pubkey: str | None, service_id: str | int | None) -> dict:
-    """Lookup active_services entry by provider/service from cache."""
+    """Lookup active_services entry by provider/service in the provider index."""
     if not provider_pubkey or service_id is None:
         return {}
-    try:
-        data = _load_cached("active_services")
-    except Exception:
-        return {}
-    entries = data.get("active_services") if isinstance(data, dict) else []
-    if not isinstance(entries, list):
-        return {}
-    sid_str = str(service_id)
-    for e in entries:
-        if not isinstance(e, dict):
-            continue
-        pk = e.get("provider_pubkey")
-        sid_val = e.get("service_id") or e.get("service") or e.get("id")
-        if str(pk) == str(provider_pubkey) and str(sid_val) == sid_str:
-            return e
-    return {}
+    by_sid = (_provider_index().get("services") or {}).get(str(provider_pubkey)) or {}
+    return by_sid.get(str(service_id)) or {}
 
 
 def _extract_paygo_rate(raw: dict) -> dict | None:
@@ -6031,10 +6581,12 @@ def _tail_file(path: str, max_lines: int = 200) -> str:
 
 
 def _set_top_service_status(listener_id: str | None, provider_pubkey: str | None, status: str | None):
-    """Persist status for a provider entry inside listeners.json top_services."""
+    """Persist status for a listener's provider (runtime store; listeners.json fallback)."""
     if not listener_id or not provider_pubkey or status is None:
         return
 
+    store = _runtime_store()
+
     def _mut(data: dict) -> bool:
         listeners = data.get("listeners") if isinstance(data, dict) else []
         if not isinstance(listeners, list):
@@ -6062,9 +6614,13 @@ def _set_top_service_status(listener_id: str | None, provider_pubkey: str | None
         return False
 
     try:
-        _update_listeners_atomic(_mut)
+        if store is not None:
+            store.set_status(str(listener_id), str(provider_pubkey), status)
+        else:
+            _update_listeners_atomic(_mut)
     except Exception:
         pass
+    breaker_cfg = None
     try:
         with _LISTENER_LOCK:
             for entry in _LISTENER_SERVERS.values():
@@ -6084,9 +6640,20 @@ def _set_top_service_status(listener_id: str | None, provider_pubkey: str | None
                         continue
                     ts["status"] = status
                     ts["status_updated_at"] = _timestamp()
+                    if PROXY_BREAKER and str(status).lower() == "down":
+                        breaker_cfg = cfg
                     break
     except Exception:
         pass
+    if breaker_cfg is not None:
+        # The breaker probes it back into rotation; without a sentinel to probe, the paid
+        # recheck loop keeps handling it.
+        try:
+            sentinel = _top_service_sentinel(breaker_cfg, str(provider_pubkey))
+            if sentinel:
+                _BREAKERS.trip(str(listener_id), str(provider_pubkey), sentinel)
+        except Exception:
+            pass
 
 
 def _update_top_service_metrics(
@@ -6096,10 +6663,11 @@ def _update_top_service_metrics(
     include_in_avg: bool = True,
 ):
     """
-    Update response-time fields for a provider entry in listeners.json.
+    Record a response time for a listener's provider (in-memory aggregate; listeners.json fallback).
 
     - Always stores the last observed timing (rt_last_ms).
-    - Updates avg/count only when include_in_avg=True and warmup is not active.
+    - Updates avg/EWMA/percentiles/count only when include_in_avg=True and warmup is not active.
+    - Never touches disk on the request path when the runtime store is available.
     """
     if not listener_id or not provider_pubkey or response_time_sec is None:
         return
@@ -6152,7 +6720,10 @@ def _update_top_service_metrics(
         return False
 
     try:
-        _update_listeners_atomic(_mut)
+        if _runtime_store() is not None:
+            _RT_METRICS.record(str(listener_id), str(provider_pubkey), rt_ms, include_in_avg=include_in_avg)
+        else:
+            _update_listeners_atomic(_mut)
     except Exception:
         pass
 
@@ -6164,7 +6735,7 @@ def _update_top_service_contract(
     origins: str | list | None = None,
     cors_configured: bool | None = None,
 ):
-    """Persist last contract id/origins per provider entry in listeners.json (best effort)."""
+    """Persist last contract id/origins per provider (runtime store; listeners.json fallback; best effort)."""
     if not listener_id or provider_pubkey is None or contract_id is None:
         return
     cid = str(contract_id)
@@ -6197,41 +6768,26 @@ def _update_top_service_contract(
         return False
 
     try:
-        _update_listeners_atomic(_mut)
+        store = _runtime_store()
+        if store is not None:
+            store.set_contract(str(listener_id), str(provider_pubkey), cid, origins, cors_configured)
+        else:
+            _update_listeners_atomic(_mut)
     except Exception:
         pass
 
 
 def _lookup_settlement_duration(provider_pubkey: str | None, service_id: str | int | None) -> str | None:
     """Try to find settlement_duration for a provider/service from active_services cache."""
-    if not provider_pubkey or service_id is None:
-        return None
-    try:
-        data = _load_cached("active_services")
-    except Exception:
+    e = _active_service_lookup(provider_pubkey, service_id)
+    if not e:
         return None
-    entries = data.get("active_services") if isinstance(data, dict) else []
-    if not isinstance(entries, list):
-        return None
-    sid_str = str(service_id)
-    for e in entries:
-        if not isinstance(e, dict):
-            continue
-        if str(e.get("provider_pubkey")) != provider_pubkey:
-            continue
-        sid_val = e.get("service_id") or e.get("service") or e.get("id")
-        if sid_str != str(sid_val):
-            continue
-        # prefer explicit field, else raw blob
-        settle = e.get("settlement_duration")
-        if settle is not None:
-            return settle
-        raw = e.get("raw") if isinstance(e.get("raw"), dict) else {}
-        if isinstance(raw, dict):
-            settle = raw.get("settlement_duration")
-            if settle is not None:
-                return settle
-    return None
+    # prefer explicit field, else raw blob
+    settle = e.get("settlement_duration")
+    if settle is not None:
+        return settle
+    raw = e.get("raw") if isinstance(e.get("raw"), dict) else {}
+    return raw.get("settlement_duration")
 
 
 def _candidate_providers(cfg: dict) -> list[dict]:
@@ -6241,36 +6797,6 @@ def _candidate_providers(cfg: dict) -> list[dict]:
     if not top:
         return []
     svc_id_for_lookup = cfg.get("service_id") or cfg.get("service")
-    # cache lookups for active services/providers
-    active_lookup = {}
-    try:
-        data = _load_cached("active_services")
-        entries = data.get("active_services") if isinstance(data, dict) else []
-        if isinstance(entries, list):
-            for e in entries:
-                if not isinstance(e, dict):
-                    continue
-                pk = e.get("provider_pubkey")
-                sid_val = e.get("service_id") or e.get("service") or e.get("id")
-                if not pk or sid_val is None:
-                    continue
-                active_lookup[(str(pk), str(sid_val))] = e
-    except Exception:
-        pass
-    prov_meta_cache = {}
-    try:
-        ap = _load_cached("active_providers")
-        prov_list = ap.get("providers") if isinstance(ap, dict) else []
-        if isinstance(prov_list, list):
-            for p in prov_list:
-                if not isinstance(p, dict):
-                    continue
-                    # skip bad rows
-                pk = p.get("pubkey") or p.get("pub_key") or p.get("pubKey")
-                if pk:
-                    prov_meta_cache[pk] = p
-    except Exception:
-        pass
     include_down = True
     # If we have at least one healthy entry, skip "Down"/misconfigured providers from the live candidate set.
     # This keeps a failed provider in the UI list but avoids routing to it during normal operation.
@@ -6294,7 +6820,7 @@ def _candidate_providers(cfg: dict) -> list[dict]:
             if not pk:
                 continue
             svc_for_ts = ts.get("service_id") or ts.get("service") or svc_id_for_lookup
-            active = active_lookup.get((str(pk), str(svc_for_ts))) or _active_service_lookup(pk, svc_for_ts)
+            active = _active_service_lookup(pk, svc_for_ts)
             active_raw = active.get("raw") if isinstance(active, dict) else {}
             mu = (active.get("metadata_uri") if isinstance(active, dict) else None) or active_raw.get("metadata_uri")
             sentinel_url = _normalize_sentinel_url(ts.get("sentinel_url")) if ts.get("sentinel_url") else None
@@ -6315,9 +6841,6 @@ def _candidate_providers(cfg: dict) -> list[dict]:
             min_dur = active_raw.get("min_contract_duration") if isinstance(active_raw, dict) else None
             max_dur = active_raw.get("max_contract_duration") if isinstance(active_raw, dict) else None
             moniker = _active_provider_moniker(pk)
-            if not moniker and pk in prov_meta_cache:
-                meta = prov_meta_cache[pk].get("metadata") or {}
-                moniker = (meta.get("config") or {}).get("moniker") or meta.get("moniker")
             candidates.append(
                 {
                     "provider_pubkey": pk,
@@ -6446,6 +6969,16 @@ def _get_current_height(node: str) -> int:
     if cached is not None:
         if cached.get("ok") and cached.get("height") is not None:
             return _safe_int(cached.get("height"))
+    client = _chain(node)
+    if client is not None:
+        try:
+            data = client.status()
+            height = _safe_int(data["sync_info"].get("latest_block_height"))
+            if height > 0:
+                _write_arkeo_status(True, node, height, None, data)
+                return height
+        except ChainQueryError:
+            pass
     cmd = ["arkeod", "--home", ARKEOD_HOME]
     if node:
         cmd.extend(["--node", node])
@@ -6489,13 +7022,32 @@ def _contracts_list_cmd(node: str, page_key: str | None = None, page: int | None
     return cmd
 
 
-def _fetch_contracts(
+def _native_contracts_page(
+    node: str, page_key: str | None = None, page: int | None = None, limit: int | None = None, timeout: int | None = None
+) -> dict | None:
+    """One list-contracts page from the node's REST endpoint; None means use the CLI."""
+    client = _chain(node)
+    if client is None:
+        return None
+    offset = None
+    if page and page > 1:
+        if not limit:
+            return None
+        offset = (page - 1) * limit
+    try:
+        return client.list_page("contracts", page_key=page_key, offset=offset, limit=limit, timeout=timeout)
+    except ChainQueryError:
+        return None
+
+
+def _scan_contracts(
     node: str,
     timeout: int | None = None,
     active_only: bool = True,
     limit: int | None = None,
     client_filter: str | None = None,
-) -> list:
+) -> tuple[list | None, bool]:
+    """(contracts, complete): contracts is None when the CLI query failed."""
     global _CONTRACTS_PAGE_MODE
     use_limit = limit if limit is not None else PROXY_CONTRACT_LIMIT
     max_total = use_limit if use_limit and use_limit > 0 else None
@@ -6513,32 +7065,40 @@ def _fetch_contracts(
             page=page if page_mode == "page" else None,
             limit=use_limit,
         )
-        try:
-            completed = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
-            stdout = completed.stdout or ""
-            stderr = completed.stderr or ""
-            if completed.returncode != 0:
-                err_out = stdout + stderr
-                if page_mode == "page-key" and "unknown flag" in err_out and "page-key" in err_out:
-                    page_mode = "page"
-                    _CONTRACTS_PAGE_MODE = "page"
-                    page_key = None
-                    page = 1
-                    seen_keys.clear()
-                    raw_seen = 0
-                    filtered = []
-                    continue
-                return []
-        except subprocess.TimeoutExpired:
-            return []
-        except Exception:
-            return []
+        data = _native_contracts_page(
+            node,
+            page_key=page_key if page_mode == "page-key" else None,
+            page=page if page_mode == "page" else None,
+            limit=use_limit,
+            timeout=timeout,
+        )
+        if data is None:
+            try:
+                completed = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+                stdout = completed.stdout or ""
+                stderr = completed.stderr or ""
+                if completed.returncode != 0:
+                    err_out = stdout + stderr
+                    if page_mode == "page-key" and "unknown flag" in err_out and "page-key" in err_out:
+                        page_mode = "page"
+                        _CONTRACTS_PAGE_MODE = "page"
+                        page_key = None
+                        page = 1
+                        seen_keys.clear()
+                        raw_seen = 0
+                        filtered = []
+                        continue
+                    return None, False
+            except subprocess.TimeoutExpired:
+                return None, False
+            except Exception:
+                return None, False
 
-        try:
-            data = json.loads(stdout)
-        except Exception:
-            return []
-        contracts = data.get("contract") or data.get("contracts") or []
+            try:
+                data = json.loads(stdout)
+            except Exception:
+                return None, False
+        contracts = data.get("contract") or data.get("contracts") or []
         if not isinstance(contracts, list):
             contracts = []
 
@@ -6556,7 +7116,7 @@ def _fetch_contracts(
             filtered.append(c)
 
         if max_total and raw_seen >= max_total:
-            break
+            return filtered, False
 
         if page_mode == "page-key":
             pagination = data.get("pagination") if isinstance(data, dict) else {}
@@ -6575,7 +7135,27 @@ def _fetch_contracts(
                 break
             page += 1
 
-    return filtered
+    return filtered, True
+
+
+def _fetch_contracts(
+    node: str,
+    timeout: int | None = None,
+    active_only: bool = True,
+    limit: int | None = None,
+    client_filter: str | None = None,
+) -> list:
+    scanned_at = time.time()
+    contracts, complete = _scan_contracts(node, timeout=timeout, active_only=active_only, limit=limit, client_filter=client_filter)
+    if contracts is None:
+        return []
+    if client_filter and active_only and complete:
+        # A complete client-filtered scan is authoritative for that client's open contracts.
+        try:
+            _CONTRACT_INDEX.sync_client(str(client_filter), contracts, scanned_at)
+        except Exception:
+            pass
+    return contracts
 
 
 def _select_active_contract(
@@ -6613,6 +7193,132 @@ def _select_active_contract(
     return usable[0] if usable else None
 
 
+_CONTRACT_INDEX = ContractIndex()
+
+
+def _contract_index(client_pub: str | None = None) -> ContractIndex:
+    """Process-wide contract index; tracks client_pub and picks up a newer provider-contracts snapshot."""
+    idx = _CONTRACT_INDEX
+    if client_pub:
+        idx.track_client(str(client_pub))
+    try:
+        idx.load_snapshot(os.path.join(CACHE_DIR, "provider-contracts.json"))
+    except Exception:
+        pass
+    return idx
+
+
+def _native_active_query(node: str | None = None) -> ChainClient | None:
+    client = _chain(node)
+    if client is None or _NATIVE_ACTIVE_QUERY is False or not client.available(client.rest_url):
+        return None
+    return client
+
+
+def _contract_query_enabled(node: str | None = None) -> bool:
+    if not PROXY_CONTRACT_QUERY:
+        return False
+    return _native_active_query(node) is not None or _ACTIVE_CONTRACT_QUERY is not False
+
+
+def _active_contract_matches(c: dict, client_pub: str, provider: str, svc_id: int) -> bool:
+    return str(c.get("client")) == str(client_pub) and str(c.get("provider")) == str(provider) and _safe_int(c.get("service")) == svc_id
+
+
+def _query_active_contract(
+    node: str, client_pub: str, provider: str, svc_id: int, service_name: str | None = None
+) -> tuple[bool, dict | None]:
+    """(ok, contract) from the per-client chain query; ok is False when the query failed or is unsupported."""
+    global _ACTIVE_CONTRACT_QUERY, _NATIVE_ACTIVE_QUERY
+    if not _contract_query_enabled(node):
+        return False, None
+    client = _native_active_query(node)
+    if client is not None:
+        try:
+            c = client.active_contract(client_pub, provider, str(service_name or svc_id))
+            if c is None or _active_contract_matches(c, client_pub, provider, svc_id):
+                _NATIVE_ACTIVE_QUERY = True
+                return True, c
+            _NATIVE_ACTIVE_QUERY = False
+        except ChainQueryError as e:
+            if e.status in (400, 404, 501):
+                # Route missing or arguments rejected: this node has no usable REST active-contract query.
+                _NATIVE_ACTIVE_QUERY = False
+    if _ACTIVE_CONTRACT_QUERY is False:
+        return False, None
+    cmd = ["arkeod", "--home", ARKEOD_HOME]
+    if node:
+        cmd.extend(["--node", node])
+    cmd.extend(["query", "arkeo", "active-contract", str(client_pub), str(provider), str(service_name or svc_id), "-o", "json"])
+    try:
+        completed = subprocess.run(cmd, capture_output=True, text=True, timeout=PROXY_CONTRACT_TIMEOUT)
+    except Exception:
+        return False, None
+    out = (completed.stdout or "") + (completed.stderr or "")
+    if completed.returncode != 0:
+        if "unknown command" in out or "arg(s)" in out:
+            _ACTIVE_CONTRACT_QUERY = False
+            return False, None
+        if "not found" in out.lower():
+            return True, None
+        return False, None
+    try:
+        data = json.loads(completed.stdout or "{}")
+    except Exception:
+        return False, None
+    c = data.get("contract") if isinstance(data, dict) else None
+    if not isinstance(c, dict) or c.get("id") in (None, "", "0", 0):
+        return True, None
+    if not _active_contract_matches(c, client_pub, provider, svc_id):
+        # The CLI read our arguments differently; fall back to client-filtered scans.
+        _ACTIVE_CONTRACT_QUERY = False
+        return False, None
+    _ACTIVE_CONTRACT_QUERY = True
+    return True, c
+
+
+def _lookup_active_contract(
+    node: str,
+    client_pub: str,
+    svc_id: int,
+    cur_height: int,
+    provider_filter: str | None,
+    height_skew: int = 0,
+    service_name: str | None = None,
+    fresh: bool = False,
+    allow_scan: bool = True,
+) -> tuple[dict | None, str]:
+    """(contract, source): contract index, then the per-client chain query, then a client-filtered scan.
+
+    fresh skips the index hit so the answer reflects the chain (deposit/paid move as claims settle).
+    """
+    try:
+        effective_height = cur_height + int(height_skew or 0)
+    except Exception:
+        effective_height = cur_height
+    idx = _contract_index(client_pub)
+    if provider_filter:
+        if not fresh:
+            c = idx.active(client_pub, provider_filter, svc_id, effective_height)
+            if c:
+                return c, "index"
+        asked_at = time.time()
+        ok, c = _query_active_contract(node, client_pub, provider_filter, svc_id, service_name)
+        if ok:
+            if c:
+                idx.upsert(c, asked_at)
+            else:
+                idx.drop_key(client_pub, provider_filter, svc_id, asked_at)
+            return idx.active(client_pub, provider_filter, svc_id, effective_height), "chain_query"
+        if not allow_scan:
+            return idx.active(client_pub, provider_filter, svc_id, effective_height), "index"
+    contracts = _fetch_contracts(node, timeout=PROXY_CONTRACT_TIMEOUT, active_only=True, client_filter=client_pub)
+    c = _select_active_contract(
+        contracts or [], client_pub, svc_id, cur_height, provider_filter=provider_filter, height_skew=height_skew
+    )
+    return c, "chain_scan"
+
+
 def _claims_highest_nonce(sentinel: str, contract_id: str, client_pub: str) -> int:
     failed = 0
     for key in ("client", "spender"):
@@ -6659,8 +7365,23 @@ def _nonce_store_path(listener_id: str | None, contract_id: str | None) -> str:
     return os.path.join(NONCE_STORE_DIR, f"nonce_store_{lid}_{cid}.json")
 
 
-def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
-    """Single-lane worker: select/auto-create contract, allocate nonce, sign, forward, return response."""
+def _client_timings_header(timings: dict) -> str:
+    """X-Arkeo-Timings value for the client: signing time is folded into other_ms, never reported on its own.
+
+    Signing time can leak bits of the per-signature nonce; logs and srv.last_timings keep sign_ms.
+    """
+    out = dict(timings)
+    sign_ms = out.pop("sign_ms", 0) or 0
+    out["other_ms"] = (out.get("other_ms") or 0) + sign_ms
+    return json.dumps(out, separators=(",", ":"))
+
+
+def _handle_forward_lane(work: WorkItem, cfg: dict):
+    """Lane steps: select/auto-create contract, allocate nonce, sign, forward, return response.
+
+    A generator: each sentinel request is yielded as an UpstreamCall and the driver sends back
+    its result (see _run_lane_steps). Returns the response dict, or None when the request was parked.
+    """
     t_start = time.time()
     method = (work.method or "POST").upper()
     service_path = work.path or ""
@@ -6696,9 +7417,13 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
     svc_id = _safe_int(cfg.get("service_id"), 0)
     client_key = cfg.get("client_key") or KEY_NAME
     sign_template = cfg.get("sign_template", PROXY_SIGN_TEMPLATE)
+    sign_mode = cfg.get("sign_mode") or PROXY_SIGN_MODE
+    sign_scheme = cfg.get("sign_scheme") or PROXY_SIGN_SCHEME
 
     server_ref = cfg.get("_server_ref", None)
     logger = getattr(server_ref, "logger", None) if server_ref is not None else None
+    resident_signer = getattr(server_ref, "signer", None) if server_ref is not None else None
+    sign_engine = ""
 
     def _log(level: str, msg: str) -> None:
         if not logger:
@@ -6738,6 +7463,12 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
             "headers": {"Content-Type": "application/json", "X-Arkeo-Request-Id": req_id},
         }
 
+    # Streamed 2xx bodies go from the upstream socket to the client in bounded chunks (see _StreamFrames).
+    stream_body = _safe_bool(cfg.get("stream_responses", PROXY_STREAM_RESPONSES), PROXY_STREAM_RESPONSES) and method != "HEAD"
+    # Cacheable answers are buffered so the worker can store them.
+    if getattr(work, "cache_rule", None) is not None:
+        stream_body = False
+
     bypass_uri = (cfg.get("bypass_uri") or "").strip()
     bypass_skip_reason = None
     try:
@@ -6780,6 +7511,7 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
                 headers=getattr(work, "headers", None),
                 username=bypass_username,
                 password=bypass_password,
+                stream=stream_body,
             )
             if not isinstance(resp_hdrs, dict):
                 resp_hdrs = {"Content-Type": "application/json"}
@@ -6832,7 +7564,7 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
                         if val is not None and str(val).strip().lower() not in ("", "0", "false", "no", "off", "null"):
                             want_timings = True
                         if want_timings:
-                            resp_hdrs["X-Arkeo-Timings"] = json.dumps(timings_payload, separators=(",", ":"))
+                            resp_hdrs["X-Arkeo-Timings"] = _client_timings_header(timings_payload)
                     except Exception:
                         pass
                     server_ref.last_code = code
@@ -6854,7 +7586,7 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
                             safe_headers.pop(hk, None)
                     server_ref.last_upstream = {
                         "code": code,
-                        "body": resp_body.decode(errors="ignore") if isinstance(resp_body, (bytes, bytearray)) else str(resp_body),
+                        "body": _upstream_body_preview(resp_body),
                         "url": _redact_url_userinfo(fwd_url),
                         "headers": safe_headers,
                         "method": method,
@@ -6928,6 +7660,8 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
             server_ref.cooldowns = {}
         if not hasattr(server_ref, "cors_configured"):
             server_ref.cors_configured = cfg.get("last_contracts") or {}
+        if not hasattr(server_ref, "hedge_stats"):
+            server_ref.hedge_stats = {"fired": 0, "won": 0}
 
     # Candidate providers (ordered failover).
     forced_provider = None
@@ -6965,6 +7699,30 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
     candidates = _candidate_providers(candidate_cfg)
     if forced_provider:
         candidates = [c for c in candidates if isinstance(c, dict) and str(c.get("provider_pubkey") or "") == str(forced_provider)]
+    else:
+        routing = str(cfg.get("routing") or PROXY_ROUTING).strip().lower()
+        if routing not in ROUTING_POLICIES:
+            routing = "ordered"
+        max_rate = str(cfg.get("max_payg_rate") if cfg.get("max_payg_rate") is not None else "").strip()
+        try:
+            # Providers holding a cached contract rank first, so routing never triggers a paid open.
+            contract_cache = getattr(server_ref, "contract_cache", None) if server_ref is not None else None
+            contracted = (
+                {pk for pk, entry in list(contract_cache.items()) if isinstance(entry, dict) and entry.get("contract")}
+                if isinstance(contract_cache, dict)
+                else None
+            )
+            candidates = _ROUTER.order(
+                str(listener_id),
+                candidates,
+                routing,
+                max_rate=_safe_int(max_rate, 0) if max_rate else None,
+                contracted=contracted,
+            )
+            if PROXY_BREAKER:
+                candidates = _BREAKERS.allowed(str(listener_id), candidates)
+        except Exception:
+            pass
     if not candidates:
         if forced_provider:
             try:
@@ -7038,80 +7796,31 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
             return False
         return True
 
-    def _open_contract_error_detail(
-        out_text: str | None,
-        deposit_val: int | None,
-        fees_val: str | None,
-    ) -> tuple[str | None, str | None]:
-        if not out_text:
-            return None, None
-        low = str(out_text).lower()
-        if "insufficient funds" in low or "not enough balance" in low:
-            acct = ""
-            try:
-                m = re.search(r"account\s+([a-z0-9]+):\s+insufficient funds", out_text, re.IGNORECASE)
-                if not m:
-                    m = re.search(r"for account\s+([a-z0-9]+)", out_text, re.IGNORECASE)
-                if m:
-                    acct = m.group(1)
-            except Exception:
-                acct = ""
-            parts = ["insufficient funds to open contract"]
-            if acct:
-                parts.append(f"account={acct}")
-            if deposit_val is not None:
-                parts.append(f"deposit={deposit_val}")
-            if fees_val:
-                parts.append(f"fees={fees_val}")
-            return "insufficient_funds", " ".join(parts)
-        if "account sequence mismatch" in low:
-            expected = ""
-            got = ""
-            try:
-                m_exp = re.search(r"expected\s+(\d+)", out_text, re.IGNORECASE)
-                m_got = re.search(r"got\s+(\d+)", out_text, re.IGNORECASE)
-                if m_exp:
-                    expected = m_exp.group(1)
-                if m_got:
-                    got = m_got.group(1)
-            except Exception:
-                expected, got = "", ""
-            detail = "account sequence mismatch"
-            if expected or got:
-                detail = f"{detail} expected={expected or '?'} got={got or '?'}"
-            return "account_sequence_mismatch", detail
-        if "signature verification failed" in low or "verify account number" in low:
-            acct_num = ""
-            chain_id = ""
-            try:
-                m_acc = re.search(r"account number\s*\((\d+)\)", out_text, re.IGNORECASE)
-                m_chain = re.search(r"chain-id\s*\(([^)]+)\)", out_text, re.IGNORECASE)
-                if m_acc:
-                    acct_num = m_acc.group(1)
-                if m_chain:
-                    chain_id = m_chain.group(1)
-            except Exception:
-                acct_num, chain_id = "", ""
-            detail = "signature verification failed"
-            if acct_num:
-                detail += f" account_number={acct_num}"
-            if chain_id:
-                detail += f" chain_id={chain_id}"
-            return "signature_verification_failed", detail
-        if "chain-id" in low and ("mismatch" in low or "wrong chain-id" in low):
-            chain_id = ""
-            try:
-                m_chain = re.search(r"chain-id\s*\(([^)]+)\)", out_text, re.IGNORECASE)
-                if m_chain:
-                    chain_id = m_chain.group(1)
-            except Exception:
-                chain_id = ""
-            detail = "chain-id mismatch"
-            if chain_id:
-                detail += f" chain_id={chain_id}"
-            return "chain_id_mismatch", detail
-        return None, None
-
+    auto_create = _safe_bool(cfg.get("auto_create", PROXY_AUTO_CREATE), bool(PROXY_AUTO_CREATE))
+    opener = getattr(server_ref, "contract_opener", None) if server_ref is not None else None
+    # Opens this request already waited on (it is re-run from the lane once they finish).
+    open_jobs = getattr(work, "open_jobs", None) or {}
+    # Background open this request will park on if no candidate has a contract yet.
+    wait_job = None
+    hedge_enabled = _safe_bool(cfg.get("hedge", PROXY_HEDGE), bool(PROXY_HEDGE))
+    try:
+        # Clients may turn hedging off for a request but never on: a hedge can double paid requests.
+        hedge_hdr = _req_header("X-Arkeo-Hedge")
+        if hedge_hdr is not None and str(hedge_hdr).strip().lower() in ("0", "false", "no", "off", "none"):
+            hedge_enabled = False
+    except Exception:
+        pass
+    hedge_enabled = (
+        hedge_enabled
+        and not forced_provider
+        and len(candidates) > 1
+        and _is_hedgeable_request(
+            method,
+            service_path,
+            body,
+            cfg.get("service_family") or _service_family(cfg.get("service_id"), cfg.get("service_name")),
+        )
+    )
     last_err = None
     last_err_detail = None
     for idx, cand in enumerate(candidates, start=1):
@@ -7150,132 +7859,100 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
         except Exception:
             pass
 
-        # Chain select (slow path).
-        if not active:
-            t_fetch = time.time()
-            contracts = _fetch_contracts(node, timeout=PROXY_CONTRACT_TIMEOUT, active_only=True, client_filter=client_pub)
-            contract_fetch_ms = int((time.time() - t_fetch) * 1000)
-            _log("info", f"contracts fetched count={len(contracts) if isinstance(contracts, list) else 0}")
-            active = _select_active_contract(
-                contracts or [],
-                client_pub,
-                svc_id,
-                cur_height,
-                provider_filter=provider_filter,
-                height_skew=height_skew,
-            )
-            if active:
-                _log(
-                    "info",
-                    f"contract_chain_select provider={provider_filter} contract_id={active.get('id')} height={active.get('height')}",
-                )
-                try:
-                    if server_ref is not None:
-                        server_ref.contract_cache[provider_filter] = {"contract": active, "cached_at": time.time()}
-                except Exception:
-                    pass
+        # A re-run after a background open counts as auto-created (its latency includes the open).
+        auto_created = provider_filter in open_jobs
+        if not active and opener is not None:
+            done_job = open_jobs.get(provider_filter)
+            if done_job is not None and not done_job.contract:
+                # The open this request was parked on failed (the opener marked the provider Down).
+                last_err = done_job.err or "no_active_contract"
+                last_err_detail = done_job.detail or last_err_detail
+                continue
+            pending = opener.pending(provider_filter)
+            if pending is not None:
+                # Do not wait behind the open; use a provider that already has a contract meanwhile.
+                _log("info", f"contract opening in background provider={provider_filter}; trying next candidate")
+                wait_job = wait_job or pending
+                last_err = "contract_opening"
+                continue
 
-        auto_created = False
-        # Auto-create if needed.
-        if not active and _safe_bool(cfg.get("auto_create", PROXY_AUTO_CREATE), bool(PROXY_AUTO_CREATE)):
-            auto_created = True
-            _log("info", f"no active contract -> attempting auto-create (provider={provider_filter})")
-            cfg_create = dict(cfg)
-            cfg_create["create_provider_pubkey"] = provider_filter
-            cfg_create["create_delegate"] = client_pub
-            cfg_create["provider_pubkey"] = provider_filter
-            cfg_create["provider_sentinel_api"] = sentinel
-            # Align settlement duration with provider if known.
-            try:
-                if cand.get("settlement_duration"):
-                    cfg_create["create_settlement"] = cand.get("settlement_duration")
-            except Exception:
-                pass
-            # Align pay-as-you-go rate if advertised.
-            try:
-                rate_info = cand.get("pay_as_you_go_rate")
-                if isinstance(rate_info, dict) and rate_info.get("amount"):
-                    amt = str(rate_info.get("amount"))
-                    denom = str(rate_info.get("denom") or "")
-                    cfg_create["create_rate"] = f"{amt}{denom}"
-            except Exception:
-                pass
-            # Align QPM if advertised.
-            try:
-                if cand.get("queries_per_minute") is not None:
-                    cfg_create["create_qpm"] = cand.get("queries_per_minute")
-            except Exception:
-                pass
-            start_height = cur_height or _get_current_height(node)
-            try:
-                _log(
-                    "info",
-                    "open-contract attempt "
-                    f"deposit={_safe_int(cfg_create.get('create_deposit', PROXY_CREATE_DEPOSIT), PROXY_CREATE_DEPOSIT)} "
-                    f"rate={cfg_create.get('create_rate', PROXY_CREATE_RATE)} "
-                    f"dur={_safe_int(cfg_create.get('create_duration', PROXY_CREATE_DURATION), PROXY_CREATE_DURATION)} "
-                    f"qpm={_safe_int(cfg_create.get('create_qpm', PROXY_CREATE_QPM), PROXY_CREATE_QPM)} "
-                    f"settlement={_safe_int(cfg_create.get('create_settlement', PROXY_CREATE_SETTLEMENT), PROXY_CREATE_SETTLEMENT)} "
-                    f"provider={provider_filter}"
-                )
-            except Exception:
-                pass
-            txhash, out, _dep, ok = _create_contract_now(cfg_create, client_pub, log_cb=_log)
-            if out:
-                _log("info", f"open-contract response: {out.strip()}")
-            if txhash:
-                _log("info", f"open-contract txhash={txhash}")
-            if not ok:
-                _log("info", "open-contract failed; skipping contract wait")
-                err_code, err_detail = _open_contract_error_detail(
-                    out,
-                    _dep,
-                    cfg_create.get("create_fees", PROXY_CREATE_FEES),
-                )
-                if err_code:
-                    last_err = err_code
-                    last_err_detail = err_detail
-                else:
-                    last_err = "open_contract_failed"
+        # Chain select (slow path): one lane per provider; others wait and reuse its result.
+        contract_lock = _lane_lock(server_ref, "contract", provider_filter) if not active else None
+        opening = False
+        with contract_lock or nullcontext():
+            if contract_lock is not None:
                 try:
-                    _set_top_service_status(listener_id, provider_filter, "Down")
-                except Exception:
-                    pass
-                try:
-                    _update_top_service_metrics(listener_id, provider_filter, (time.time() - cand_start), include_in_avg=False)
-                except Exception:
-                    pass
-                try:
-                    if server_ref is not None and PROXY_OPEN_COOLDOWN:
-                        server_ref.cooldowns[provider_filter] = time.time() + PROXY_OPEN_COOLDOWN
+                    cache_entry = getattr(server_ref, "contract_cache", {}).get(provider_filter) if server_ref is not None else None
+                    if isinstance(cache_entry, dict) and _contract_is_usable(cache_entry.get("contract"), provider_filter):
+                        active = cache_entry.get("contract")
+                        _log("info", f"contract_cache_hit provider={provider_filter} contract_id={active.get('id')} (after wait)")
                 except Exception:
                     pass
-                continue
-            wait_sec = _safe_int(cfg_create.get("create_timeout_sec", PROXY_CREATE_TIMEOUT), PROXY_CREATE_TIMEOUT)
-            active = _wait_for_new_contract(cfg_create, client_pub, svc_id, start_height, wait_sec)
-            if active:
-                _log(
-                    "info",
-                    f"auto-created contract id={active.get('id')} height={active.get('height')} provider={provider_filter}",
+            if not active:
+                # Cache miss: have the manager refresh right away for the lanes behind this one.
+                mgr = getattr(server_ref, "contract_mgr", None) if server_ref is not None else None
+                if mgr is not None:
+                    mgr.poke()
+                t_fetch = time.time()
+                active, contract_source = _lookup_active_contract(
+                    node,
+                    client_pub,
+                    svc_id,
+                    cur_height,
+                    provider_filter,
+                    height_skew=height_skew,
+                    service_name=cfg.get("service_name"),
                 )
-                try:
-                    if server_ref is not None:
-                        server_ref.contract_cache[provider_filter] = {"contract": active, "cached_at": time.time()}
-                except Exception:
-                    pass
-                # New contract: reset CORS configured flag for this provider.
-                try:
-                    desired = cfg.get("cors_allowed_origins")
-                    if server_ref is not None and isinstance(server_ref.cors_configured, dict):
-                        server_ref.cors_configured[provider_filter] = {
-                            "contract_id": str(active.get("id")),
-                            "cors_origins": desired,
-                            "cors_configured": False,
-                        }
-                    _update_top_service_contract(listener_id, provider_filter, active.get("id"), desired, cors_configured=False)
-                except Exception:
-                    pass
+                contract_fetch_ms = int((time.time() - t_fetch) * 1000)
+                if active:
+                    _log(
+                        "info",
+                        f"contract_chain_select provider={provider_filter} contract_id={active.get('id')} height={active.get('height')} source={contract_source}",
+                    )
+                    try:
+                        if server_ref is not None:
+                            server_ref.contract_cache[provider_filter] = {"contract": active, "cached_at": time.time()}
+                    except Exception:
+                        pass
+
+            if not active and auto_create and opener is not None:
+                # Open in the background and move on. Only the first provider without a contract is
+                # opened per request; later ones are used only if they already have one.
+                opening = True
+                if wait_job is None and provider_filter not in open_jobs:
+                    _log("info", f"no active contract -> opening in background (provider={provider_filter})")
+                    wait_job = opener.request(cand, provider_filter, sentinel, client_pub, svc_id)
+                    last_err = "contract_opening"
+            elif not active and auto_create:
+                # No opener (listener not started through _start_listener_server): open inline.
+                auto_created = True
+                _log("info", f"no active contract -> attempting auto-create (provider={provider_filter})")
+                active, open_err, open_err_detail = _open_candidate_contract(
+                    cfg, cand, provider_filter, sentinel, client_pub, svc_id, cur_height, log_cb=_log
+                )
+                if open_err:
+                    last_err = open_err
+                    if open_err_detail:
+                        last_err_detail = open_err_detail
+                    try:
+                        _set_top_service_status(listener_id, provider_filter, "Down")
+                    except Exception:
+                        pass
+                    try:
+                        _update_top_service_metrics(listener_id, provider_filter, (time.time() - cand_start), include_in_avg=False)
+                    except Exception:
+                        pass
+                    try:
+                        if server_ref is not None and PROXY_OPEN_COOLDOWN:
+                            server_ref.cooldowns[provider_filter] = time.time() + PROXY_OPEN_COOLDOWN
+                    except Exception:
+                        pass
+                    continue
+                if active:
+                    _adopt_new_contract(server_ref, cfg, provider_filter, active)
 
+        if not active and opening:
+            continue
         if not active:
             last_err = "no_active_contract"
             try:
@@ -7342,6 +8019,8 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
         nonce_persist_ms = 0
         nonce_store = None
         nonce_store_start = time.time()
+        nonce_setup_lock = _lane_lock(server_ref, "nonce", cid)
+        nonce_setup_lock.acquire()
         try:
             stores = getattr(server_ref, "nonce_stores", None) if server_ref is not None else None
             if not isinstance(stores, dict):
@@ -7351,7 +8030,8 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
             nonce_store = stores.get(cid) if isinstance(stores, dict) else None
             if nonce_store is None:
                 nonce_store = NonceStore(_nonce_store_path(listener_id, cid))
-                persisted = _read_persisted_nonce(listener_id, cid) or 0
+                # After a clean stop the file holds the last used nonce; the mirrored ceiling is stale.
+                persisted = 0 if nonce_store.clean else (_read_persisted_nonce(listener_id, cid) or 0)
                 highest = 0
                 try:
                     highest = _claims_highest_nonce(sentinel, cid, contract_client)
@@ -7366,6 +8046,7 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
             # Fallback to a throwaway store (still persisted on disk).
             nonce_store = NonceStore(_nonce_store_path(listener_id, cid))
         finally:
+            nonce_setup_lock.release()
             try:
                 nonce_store_ms = int((time.time() - nonce_store_start) * 1000)
             except Exception:
@@ -7375,9 +8056,12 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
         nonce_prep_start = time.time()
         nonce = nonce_store.next()
         nonce_prep_ms = int((time.time() - nonce_prep_start) * 1000)
+        # Mirror the reserved ceiling (not every nonce) into listeners.json; once per block.
         persist_start = time.time()
         try:
-            _persist_listener_nonce(listener_id, cid, nonce)
+            ceiling = nonce_store.take_unmirrored_ceiling()
+            if ceiling is not None:
+                _persist_listener_nonce(listener_id, cid, ceiling)
         except Exception:
             pass
         finally:
@@ -7387,7 +8071,10 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
                 pass
 
         sign_start = time.time()
-        sig_hex, sig_err = _sign_message(client_key, cid, nonce, sign_template)
+        sig_hex, sig_err, sign_engine = _sign_message_engine(
+            client_key, cid, nonce, sign_template, signer=resident_signer, sign_mode=sign_mode,
+            sign_scheme=sign_scheme, log_cb=_log,
+        )
         sign_ms = int((time.time() - sign_start) * 1000)
         if not sig_hex:
             last_err = sig_err or "sign_error"
@@ -7422,9 +8109,15 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
             text = text.lower()
             return "parseint" in text or "invalid syntax" in text
 
-        def _forward_with_arkauth(nonce_val, sig_val):
-            arkauth4_val = f"{cid}:{contract_client}:{nonce_val}:{sig_val}"
-            arkauth3_val = f"{cid}:{nonce_val}:{sig_val}"
+        def _forward_with_arkauth(nonce_val, sig_val, leg=None):
+            # leg: a hedge target (see _prepare_hedge_leg); defaults to this candidate.
+            # Generator: yields each sentinel request (see UpstreamCall) and gets the forward result back.
+            leg_provider = leg["provider"] if leg else provider_filter
+            leg_sentinel = leg["sentinel"] if leg else sentinel
+            leg_cid = leg["cid"] if leg else cid
+            leg_client = leg["client"] if leg else contract_client
+            arkauth4_val = f"{leg_cid}:{leg_client}:{nonce_val}:{sig_val}"
+            arkauth3_val = f"{leg_cid}:{nonce_val}:{sig_val}"
             if use_four_part:
                 primary = arkauth4_val
                 primary_label = "4-part"
@@ -7437,11 +8130,13 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
                 fallback_label = "4-part"
             _log(
                 "info",
-                f"forwarding {primary_label} to sentinel={sentinel} svc={service} "
-                f"cid={cid} nonce={nonce_val} provider={provider_filter}",
+                f"forwarding {primary_label} to sentinel={leg_sentinel} svc={service} "
+                f"cid={leg_cid} nonce={nonce_val} provider={leg_provider}",
             )
-            code_val, body_val, hdrs_val, url_val, headers_val = _forward_to_sentinel(
-                sentinel,
+            _ROUTER.start(str(listener_id), leg_provider)
+            route_start = time.time()
+            code_val, body_val, hdrs_val, url_val, headers_val = yield _sentinel_call(
+                leg_sentinel,
                 service_path,
                 body,
                 primary,
@@ -7449,15 +8144,16 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
                 as_header=as_header,
                 method=method,
                 query_string=query_string,
+                stream=stream_body,
             )
             if allow_fallback and _is_arkauth_format_error(code_val, body_val):
                 _log(
                     "info",
-                    f"retrying with {fallback_label} arkauth sentinel={sentinel} svc={service} "
-                    f"cid={cid} nonce={nonce_val} provider={provider_filter}",
+                    f"retrying with {fallback_label} arkauth sentinel={leg_sentinel} svc={service} "
+                    f"cid={leg_cid} nonce={nonce_val} provider={leg_provider}",
                 )
-                code_val, body_val, hdrs_val, url_val, headers_val = _forward_to_sentinel(
-                    sentinel,
+                code_val, body_val, hdrs_val, url_val, headers_val = yield _sentinel_call(
+                    leg_sentinel,
                     service_path,
                     body,
                     fallback,
@@ -7465,11 +8161,204 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
                     as_header=as_header,
                     method=method,
                     query_string=query_string,
+                    stream=stream_body,
                 )
+            # Caller errors (4xx other than auth/rate limiting) do not count against the provider.
+            route_code = int(code_val or 0)
+            route_ok = route_code < 500 and route_code not in (401, 403, 429)
+            _ROUTER.finish(str(listener_id), leg_provider, (time.time() - route_start) * 1000.0, ok=route_ok)
+            mgr = getattr(server_ref, "contract_mgr", None) if server_ref is not None else None
+            if mgr is not None and route_ok:
+                mgr.note_served(leg_provider)
+            if PROXY_BREAKER and _BREAKERS.record(str(listener_id), leg_provider, route_ok, sentinel=leg_sentinel):
+                _log("warning", f"circuit open provider={leg_provider} sentinel={leg_sentinel} code={route_code}")
             return code_val, body_val, hdrs_val, url_val, headers_val
 
+        def _prepare_hedge_leg():
+            """Next candidate with a cached contract and nonce store, with a nonce reserved and signed.
+
+            A hedge never waits on chain lookups, contract opens or sentinel claim queries; the
+            nonce comes from the hedge contract's own store, so each contract's nonces stay unique.
+            """
+            if server_ref is None:
+                return None
+            for hcand in candidates[idx:]:
+                hprov = hcand.get("provider_pubkey") if isinstance(hcand, dict) else None
+                if not hprov or hprov == provider_filter:
+                    continue
+                try:
+                    hcd = server_ref.cooldowns.get(hprov)
+                    if hcd and time.time() < hcd:
+                        continue
+                    hentry = server_ref.contract_cache.get(hprov)
+                    hcontract = hentry.get("contract") if isinstance(hentry, dict) else None
+                    if not _contract_is_usable(hcontract, hprov):
+                        continue
+                    hcid = str(hcontract.get("id"))
+                    hstore = server_ref.nonce_stores.get(hcid)
+                except Exception:
+                    continue
+                if hstore is None:
+                    continue
+                hsentinel = _normalize_sentinel_url(
+                    hcand.get("sentinel_url")
+                    or candidate_cfg.get("provider_sentinel_api")
+                    or cfg.get("provider_sentinel_api")
+                    or SENTINEL_URI_DEFAULT
+                )
+                if not hsentinel:
+                    continue
+                hnonce = hstore.next()
+                try:
+                    ceiling = hstore.take_unmirrored_ceiling()
+                    if ceiling is not None:
+                        _persist_listener_nonce(listener_id, hcid, ceiling)
+                except Exception:
+                    pass
+                hsig, hsig_err, _ = _sign_message_engine(
+                    client_key, hcid, hnonce, sign_template, signer=resident_signer, sign_mode=sign_mode,
+                    sign_scheme=sign_scheme, log_cb=_log,
+                )
+                if not hsig:
+                    _log("warning", f"hedge sign failed provider={hprov} err={hsig_err}")
+                    continue
+                return {
+                    "provider": hprov,
+                    "sentinel": hsentinel,
+                    "cid": hcid,
+                    "client": str(hcontract.get("client") or client_pub),
+                    "contract": hcontract,
+                    "nonce_store": hstore,
+                    "nonce": hnonce,
+                    "sig": hsig,
+                }
+            return None
+
+        def _settle_hedge_loser(leg, result, elapsed):
+            """Record the losing leg like any other request to its provider, and drop its body."""
+            lcode, lbody = result[0], result[1]
+            if isinstance(lbody, StreamedResponse):
+                lbody.close()
+            try:
+                ignore_hdr = _req_header("X-Arkeo-Ignore-Metrics")
+                if ignore_hdr is None or str(ignore_hdr).strip().lower() in ("", "0", "false", "no", "off", "null"):
+                    _update_top_service_metrics(listener_id, leg["provider"], elapsed, include_in_avg=int(lcode or 0) < 400)
+            except Exception:
+                pass
+            try:
+                if _is_proxy_upstream_error(lcode, lbody) and PROXY_PROVIDER_COOLDOWN > 0:
+                    server_ref.cooldowns[leg["provider"]] = time.time() + float(PROXY_PROVIDER_COOLDOWN)
+            except Exception:
+                pass
+            _log("info", f"hedge loser code={lcode} provider={leg['provider']} cid={leg['cid']} nonce={leg['nonce']}")
+
+        def _forward_hedged(delay):
+            """Forward to this candidate; if it has not answered after `delay`, also to a hedge leg.
+
+            Returns (winning leg or None for this candidate, forward result, hedge leg or None).
+            The first 2xx/3xx answer wins; if both legs fail, this candidate's answer is returned.
+            """
+            results: queue.Queue = queue.Queue()
+            primary = {"provider": provider_filter, "sentinel": sentinel, "cid": cid, "client": contract_client, "nonce": nonce}
+
+            def _run_leg(leg, nonce_val, sig_val):
+                leg_start = time.time()
+                try:
+                    result = _run_upstream_calls(_forward_with_arkauth(nonce_val, sig_val, leg))
+                except Exception as e:
+                    result = (
+                        502,
+                        json.dumps({"error": "proxy_upstream_error", "detail": str(e)}).encode(),
+                        {"Content-Type": "application/json"},
+                        "",
+                        {},
+                    )
+                results.put((leg, result, time.time() - leg_start))
+
+            # Bound every wait: each leg may forward twice (arkauth format fallback).
+            wait_limit = 2 * float(timeout_secs) + 5.0
+            threading.Thread(target=_run_leg, args=(None, nonce, sig_hex), daemon=True).start()
+            try:
+                leg, result, _ = results.get(timeout=delay)
+                return None, result, None
+            except queue.Empty:
+                pass
+            hedge_leg = _prepare_hedge_leg()
+            if hedge_leg is None:
+                try:
+                    leg, result, _ = results.get(timeout=wait_limit)
+                    return None, result, None
+                except queue.Empty:
+                    return None, (504, json.dumps({"error": "proxy_upstream_timeout"}).encode(), {"Content-Type": "application/json"}, "", {}), None
+            _log(
+                "info",
+                f"hedging after {int(delay * 1000)}ms provider={hedge_leg['provider']} "
+                f"cid={hedge_leg['cid']} nonce={hedge_leg['nonce']} (primary={provider_filter})",
+            )
+            threading.Thread(target=_run_leg, args=(hedge_leg, hedge_leg["nonce"], hedge_leg["sig"]), daemon=True).start()
+            try:
+                server_ref.hedge_stats["fired"] += 1
+            except Exception:
+                pass
+            finished = []
+            winner = None
+            deadline = time.time() + wait_limit
+            while len(finished) < 2:
+                try:
+                    leg, result, elapsed = results.get(timeout=max(0.0, deadline - time.time()))
+                except queue.Empty:
+                    break
+                finished.append((leg, result, elapsed))
+                if int(result[0] or 0) < 400:
+                    winner = finished[-1]
+                    break
+            if winner is None:
+                # Both failed (or one timed out): prefer this candidate's answer, so its error handling applies.
+                winner = next((f for f in finished if f[0] is None), finished[0] if finished else None)
+            if winner is None:
+                return None, (504, json.dumps({"error": "proxy_upstream_timeout"}).encode(), {"Content-Type": "application/json"}, "", {}), hedge_leg
+
+            losers = [f for f in finished if f is not winner]
+            pending = 2 - len(finished)
+
+            def _drain():
+                for loser in losers:
+                    _settle_hedge_loser(loser[0] or primary, loser[1], loser[2])
+                for _ in range(pending):
+                    try:
+                        leg, result, elapsed = results.get(timeout=wait_limit)
+                    except queue.Empty:
+                        return
+                    _settle_hedge_loser(leg or primary, result, elapsed)
+
+            threading.Thread(target=_drain, daemon=True).start()
+            if winner[0] is not None:
+                try:
+                    server_ref.hedge_stats["won"] += 1
+                except Exception:
+                    pass
+            return winner[0], winner[1], hedge_leg
+
+        hedge_provider = None
+        hedge_won = False
         fwd_start = time.time()
-        code, resp_body, resp_hdrs, fwd_url, fwd_headers = _forward_with_arkauth(nonce, sig_hex)
+        if hedge_enabled and not auto_created:
+            hedge_win, fwd_result, hedge_leg = _forward_hedged(_hedge_delay_secs(cfg, listener_id, provider_filter))
+            code, resp_body, resp_hdrs, fwd_url, fwd_headers = fwd_result
+            if hedge_leg is not None:
+                hedge_provider = hedge_leg["provider"]
+            if hedge_win is not None:
+                # The rest of the request (nonce sync, status, metrics, headers) is about the winning leg.
+                hedge_won = True
+                provider_filter = hedge_win["provider"]
+                sentinel = hedge_win["sentinel"]
+                cid = hedge_win["cid"]
+                contract_client = hedge_win["client"]
+                active = hedge_win["contract"]
+                nonce_store = hedge_win["nonce_store"]
+                nonce = hedge_win["nonce"]
+        else:
+            code, resp_body, resp_hdrs, fwd_url, fwd_headers = yield from _forward_with_arkauth(nonce, sig_hex)
         sentinel_forward_ms = int((time.time() - fwd_start) * 1000)
 
         def _is_nonce_error(code_val, body_val) -> bool:
@@ -7492,13 +8381,16 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
             try:
                 highest = _claims_highest_nonce(sentinel, cid, contract_client)
                 if highest >= 0:
-                    nonce_store.set(highest)
+                    # advance (not set): other lanes may already hold nonces above the sentinel's claim
+                    nonce_store.advance(highest)
             except Exception:
                 pass
             nonce = nonce_store.next()
             persist_start = time.time()
             try:
-                _persist_listener_nonce(listener_id, cid, nonce)
+                ceiling = nonce_store.take_unmirrored_ceiling()
+                if ceiling is not None:
+                    _persist_listener_nonce(listener_id, cid, ceiling)
             except Exception:
                 pass
             finally:
@@ -7507,7 +8399,10 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
                 except Exception:
                     pass
             sign_start = time.time()
-            sig_hex, sig_err = _sign_message(client_key, cid, nonce, sign_template)
+            sig_hex, sig_err, sign_engine = _sign_message_engine(
+                client_key, cid, nonce, sign_template, signer=resident_signer, sign_mode=sign_mode,
+                sign_scheme=sign_scheme, log_cb=_log,
+            )
             sign_ms += int((time.time() - sign_start) * 1000)
             if not sig_hex:
                 last_err = sig_err or "sign_error"
@@ -7517,7 +8412,7 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
                     pass
                 continue
             fwd_start = time.time()
-            code, resp_body, resp_hdrs, fwd_url, fwd_headers = _forward_with_arkauth(nonce, sig_hex)
+            code, resp_body, resp_hdrs, fwd_url, fwd_headers = yield from _forward_with_arkauth(nonce, sig_hex)
             sentinel_forward_ms = int((time.time() - fwd_start) * 1000)
 
         if int(code or 0) >= 400:
@@ -7587,9 +8482,12 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
             "nonce_prep_ms": nonce_prep_ms,
             "nonce_persist_ms": nonce_persist_ms,
             "sign_ms": sign_ms,
+            "sign_engine": sign_engine,
             "sentinel_forward_ms": sentinel_forward_ms,
             "other_ms": other_ms,
             "auto_create": bool(auto_created),
+            "hedge_provider": hedge_provider,
+            "hedge_won": hedge_won,
         }
         if int(code or 0) >= 400:
             try:
@@ -7640,7 +8538,7 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
                 if val is not None and str(val).strip().lower() not in ("", "0", "false", "no", "off", "null"):
                     want_timings = True
             if want_timings:
-                hdrs["X-Arkeo-Timings"] = json.dumps(timings_payload, separators=(",", ":"))
+                hdrs["X-Arkeo-Timings"] = _client_timings_header(timings_payload)
         except Exception:
             pass
 
@@ -7658,7 +8556,7 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
                 }
                 server_ref.last_upstream = {
                     "code": code,
-                    "body": resp_body.decode(errors="ignore") if isinstance(resp_body, (bytes, bytearray)) else str(resp_body),
+                    "body": _upstream_body_preview(resp_body),
                     "url": fwd_url,
                     "headers": fwd_headers,
                     "method": method,
@@ -7695,13 +8593,26 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
             f"total_ms={total_ms} queue_wait_ms={queue_wait_ms} height_ms={height_ms} "
             f"contract_fetch_ms={contract_fetch_ms} contract_select_ms={contract_select_ms} cors_ms={cors_ms} "
             f"nonce_store_ms={nonce_store_ms} nonce_prep_ms={nonce_prep_ms} nonce_persist_ms={nonce_persist_ms} "
-            f"sign_ms={sign_ms} sentinel_forward_ms={sentinel_forward_ms} other_ms={other_ms} "
-            f"auto_create={auto_created} provider={provider_filter} sentinel={sentinel} contract_id={cid}",
+            f"sign_ms={sign_ms} sign_engine={sign_engine} sentinel_forward_ms={sentinel_forward_ms} other_ms={other_ms} "
+            f"auto_create={auto_created} hedge_provider={hedge_provider} hedge_won={hedge_won} "
+            f"provider={provider_filter} sentinel={sentinel} contract_id={cid}",
         )
         _log("info", f"proxy done code={code} cid={cid} nonce={nonce} provider={provider_filter}")
 
         return {"status": code or 502, "body": resp_body or b"", "headers": hdrs}
 
+    if wait_job is not None:
+        park_sec = _safe_float(cfg.get("create_park_sec", PROXY_CREATE_PARK_SECS), float(PROXY_CREATE_PARK_SECS))
+        park_until = time.time() + max(0.0, park_sec)
+        if work.deadline:
+            # Leave the re-run at least a second before the client gives up.
+            park_until = min(park_until, float(work.deadline) - 1.0)
+        # Set before parking: the opener may put the request back on the lane at once.
+        work.open_jobs = dict(open_jobs, **{wait_job.provider: wait_job})
+        if opener.park(work, wait_job, park_until):
+            _log("info", f"parked request_id={req_id} until contract opens provider={wait_job.provider}")
+            return None
+        last_err = "contract_opening"
     try:
         provider_list = []
         for c in candidates:
@@ -7724,10 +8635,13 @@ def _handle_forward_lane(work: WorkItem, cfg: dict) -> dict:
     if last_err_detail:
         err_payload["detail"] = last_err_detail
     err_payload["request_id"] = req_id
+    err_headers = {"Content-Type": "application/json", "X-Arkeo-Request-Id": req_id}
+    if last_err == "contract_opening":
+        err_headers["Retry-After"] = str(max(1, _safe_int(cfg.get("create_timeout_sec", PROXY_CREATE_TIMEOUT), PROXY_CREATE_TIMEOUT)))
     return {
         "status": 503,
         "body": json.dumps(err_payload),
-        "headers": {"Content-Type": "application/json", "X-Arkeo-Request-Id": req_id},
+        "headers": err_headers,
     }
 
 
@@ -7830,42 +8744,305 @@ def _build_arkeo_meta_clean(active: dict | None, nonce: int | None, svc_id: int,
     return {k: meta[k] for k in sorted(meta.keys())}
 
 
-def _sign_message(
-    client_key: str, contract_id: str, nonce: int, sign_template: str = PROXY_SIGN_TEMPLATE
-) -> tuple[str | None, str]:
-    preimage = sign_template.format(contract_id=contract_id, nonce=nonce)
-            # signhere has no home/keyring flags; ensure ~/.arkeo -> ARKEOD_HOME exists, then call plainly.
-    _ensure_signhere_home()
-    cmd = f'signhere -u "{client_key}" -m "{preimage}" | tail -n 1'
-    code, out = run(cmd)
-    out_clean = out.strip() if isinstance(out, str) else ""
-    if code != 0 or not out_clean:
-        return None, f"signhere_exit={code} output={out_clean}"
-    sig_hex = _b64_or_hex_to_rs_hex(out_clean).lower()
-    if not sig_hex or len(sig_hex) != 128:
-        return None, f"sig_parse_failed len={len(sig_hex)} raw={out_clean}"
-    return sig_hex, ""
+# ─────────────────────────────────────
+# Resident secp256k1 signer (replaces the per-request signhere pipeline)
+# ─────────────────────────────────────
+_SECP256K1_N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+COSMOS_HD_PATH = os.getenv("COSMOS_HD_PATH", "m/44'/118'/0'/0/0")
 
 
-def _fetch_contract_config(
-    contract_id: int | str,
-    sentinel_url: str | None,
-    client_key: str,
-    sign_template: str = PROXY_SIGN_TEMPLATE,
-    timeout: int = 10,
-) -> tuple[bool, dict | None, str | None]:
-    """Fetch manage/contract/{id} from sentinel with signed arkauth."""
-    try:
-        cid = str(int(contract_id))
-    except Exception:
-        return False, None, "invalid contract id"
-    base = _normalize_sentinel_url(sentinel_url) or ""
-    base = base.rstrip("/")
-    if not base:
-        return False, None, "invalid sentinel url"
-    nonce = int(time.time())
-    sig, err = _sign_message(client_key, cid, nonce, sign_template)
-    if err or not sig:
+def _secp_backend() -> str | None:
+    """secp256k1 library used by the resident signer: coincurve (libsecp256k1), else ecdsa, else None."""
+    if coincurve is not None:
+        return "coincurve"
+    if EcdsaSigningKey is not None:
+        return "ecdsa"
+    return None
+
+
+def _secp_key(secret: int):
+    """Library signing key for a secret (raises when neither library is installed)."""
+    raw = secret.to_bytes(32, "big")
+    backend = _secp_backend()
+    if backend == "coincurve":
+        return coincurve.PrivateKey(raw)
+    if backend == "ecdsa":
+        return EcdsaSigningKey.from_string(raw, curve=ECDSA_SECP256K1)
+    raise RuntimeError("no secp256k1 library installed (coincurve or ecdsa)")
+
+
+def _secp_pubkey(key) -> bytes:
+    """Compressed (33-byte) public key of a _secp_key."""
+    if coincurve is not None and isinstance(key, coincurve.PrivateKey):
+        return key.public_key.format(compressed=True)
+    return key.get_verifying_key().to_string("compressed")
+
+
+def _secp_sign_digest(key, digest: bytes) -> bytes:
+    """Return a deterministic (RFC 6979) low-S r||s signature (64 bytes) over a 32-byte digest."""
+    if coincurve is not None and isinstance(key, coincurve.PrivateKey):
+        # libsecp256k1 always produces low-S signatures.
+        return bytes.fromhex(_der_to_rs_hex(key.sign(digest, hasher=None)))
+    return key.sign_digest_deterministic(digest, hashfunc=hashlib.sha256, sigencode=ecdsa_sigencode_string_canonize)
+
+
+def _bip39_seed(mnemonic: str, passphrase: str = "") -> bytes:
+    import unicodedata
+
+    mn = unicodedata.normalize("NFKD", " ".join(mnemonic.split()))
+    salt = unicodedata.normalize("NFKD", "mnemonic" + (passphrase or ""))
+    return hashlib.pbkdf2_hmac("sha512", mn.encode("utf-8"), salt.encode("utf-8"), 2048)
+
+
+def _bip32_derive_secret(seed: bytes, path: str = COSMOS_HD_PATH) -> int:
+    """Derive the secp256k1 secret for an HD path (defaults to the Cosmos path)."""
+    n = _SECP256K1_N
+    master = hmac.new(b"Bitcoin seed", seed, hashlib.sha512).digest()
+    secret = int.from_bytes(master[:32], "big")
+    chain = master[32:]
+    parts = [p for p in (path or "").strip().split("/") if p and p != "m"]
+    for part in parts:
+        hardened = part.endswith("'") or part.endswith("h")
+        idx = int(part.rstrip("'h"))
+        if hardened:
+            idx += 0x80000000
+            data = b"\x00" + secret.to_bytes(32, "big") + idx.to_bytes(4, "big")
+        else:
+            data = _secp_pubkey(_secp_key(secret)) + idx.to_bytes(4, "big")
+        digest = hmac.new(chain, data, hashlib.sha512).digest()
+        il = int.from_bytes(digest[:32], "big")
+        if il >= n:
+            raise ValueError("invalid child key")
+        secret = (il + secret) % n
+        if secret == 0:
+            raise ValueError("invalid child key")
+        chain = digest[32:]
+    return secret
+
+
+def _adr036_sign_bytes(signer_address: str, data: bytes) -> bytes:
+    """Canonical ADR-036 StdSignDoc bytes (same layout as docs/sdk/python/arkeo_client.py)."""
+    doc = {
+        "account_number": "0",
+        "chain_id": "",
+        "fee": {"amount": [], "gas": "0"},
+        "memo": "",
+        "msgs": [
+            {
+                "type": "sign/MsgSignData",
+                "value": {"data": base64.b64encode(data).decode("ascii"), "signer": signer_address},
+            }
+        ],
+        "sequence": "0",
+    }
+    return json.dumps(doc, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+class ResidentSigner:
+    """Client key held in memory; signs arkauth preimages without spawning signhere."""
+
+    def __init__(self, key_name: str, secret: int, address: str = "", scheme: str = "raw"):
+        self.key_name = key_name
+        self.key = _secp_key(secret)
+        self.pubkey = _secp_pubkey(self.key)
+        self.address = address
+        self.scheme = scheme
+        self.loaded_at = time.time()
+        self.generation = _RESIDENT_SIGNERS_GEN
+        self.sign_count = 0
+
+    def sign(self, preimage: str) -> tuple[str | None, str]:
+        """Return (r||s hex, error) for the preimage, matching the signhere output format."""
+        try:
+            msg = preimage.encode("utf-8")
+            if self.scheme == "adr036":
+                if not self.address:
+                    return None, "adr036_signer_address_missing"
+                msg = _adr036_sign_bytes(self.address, msg)
+            sig = _secp_sign_digest(self.key, hashlib.sha256(msg).digest())
+            self.sign_count += 1
+            return sig.hex(), ""
+        except Exception as e:
+            return None, f"resident_sign_error={e}"
+
+
+def _load_resident_signer(client_key: str, scheme: str = "raw") -> tuple["ResidentSigner | None", str | None]:
+    """Derive the client key from the stored mnemonic and check it matches the keyring pubkey."""
+    settings = _merge_subscriber_settings()
+    settings_key = settings.get("KEY_NAME") or KEY_NAME
+    if str(client_key) != str(settings_key):
+        return None, f"client key {client_key} is not the hot wallet key {settings_key}"
+    mnemonic, _source = _read_hotwallet_mnemonic(settings)
+    if not mnemonic:
+        return None, "mnemonic unavailable"
+    if _secp_backend() is None:
+        return None, "no secp256k1 library installed (coincurve or ecdsa)"
+    try:
+        secret = _bip32_derive_secret(_bip39_seed(mnemonic), COSMOS_HD_PATH)
+    except Exception as e:
+        return None, f"key derivation failed: {e}"
+    raw_pub, _bech, pub_err = derive_pubkeys(client_key, KEYRING)
+    if pub_err or not raw_pub:
+        return None, f"keyring pubkey unavailable: {pub_err}"
+    addr, addr_err = derive_address(client_key, KEYRING)
+    signer = ResidentSigner(client_key, secret, address=(addr or "") if not addr_err else "", scheme=scheme)
+    try:
+        keyring_pub = base64.b64decode(raw_pub)
+    except Exception:
+        keyring_pub = b""
+    if keyring_pub != signer.pubkey:
+        return None, "derived pubkey does not match keyring pubkey"
+    return signer, None
+
+
+def _resident_signer(client_key: str, scheme: str = "raw", log_cb=None) -> "ResidentSigner | None":
+    """Return the resident signer for a key/scheme, loading it on first use (None means use signhere).
+
+    The load (key derivation plus arkeod keyring lookups) runs outside the registry lock, so one
+    slow load only holds up callers of the same key/scheme. A failed load is retried after
+    PROXY_SIGNER_RETRY_SECS, doubling up to PROXY_SIGNER_RETRY_MAX_SECS.
+    """
+    cache_key = f"{client_key}:{scheme}"
+    with _RESIDENT_SIGNERS_LOCK:
+        signer = _RESIDENT_SIGNERS.get(cache_key)
+        if signer is not None:
+            return signer
+        failed = _RESIDENT_SIGNER_FAILS.get(cache_key)
+        if failed and time.time() < failed[0]:
+            return None
+        loading = _RESIDENT_SIGNER_LOADING.get(cache_key)
+        owner = loading is None
+        if owner:
+            loading = _RESIDENT_SIGNER_LOADING[cache_key] = threading.Event()
+        gen = _RESIDENT_SIGNERS_GEN
+    if not owner:
+        loading.wait(PROXY_SIGNER_LOAD_WAIT_SECS)
+        with _RESIDENT_SIGNERS_LOCK:
+            return _RESIDENT_SIGNERS.get(cache_key)
+    try:
+        signer, err = _load_resident_signer(client_key, scheme=scheme)
+    except Exception as e:
+        signer, err = None, str(e)
+    with _RESIDENT_SIGNERS_LOCK:
+        if _RESIDENT_SIGNER_LOADING.get(cache_key) is loading:
+            _RESIDENT_SIGNER_LOADING.pop(cache_key, None)
+        if gen == _RESIDENT_SIGNERS_GEN:
+            # A reset while loading means the wallet changed; drop this result.
+            if signer is not None:
+                _RESIDENT_SIGNERS[cache_key] = signer
+                _RESIDENT_SIGNER_FAILS.pop(cache_key, None)
+            else:
+                backoff = PROXY_SIGNER_RETRY_SECS if not failed else min(PROXY_SIGNER_RETRY_MAX_SECS, failed[1] * 2)
+                _RESIDENT_SIGNER_FAILS[cache_key] = (time.time() + backoff, backoff)
+        elif signer is not None:
+            signer = None
+    loading.set()
+    if callable(log_cb):
+        try:
+            if signer:
+                log_cb("info", f"resident signer loaded key={client_key} scheme={scheme} address={signer.address}")
+            else:
+                log_cb("warning", f"resident signer unavailable key={client_key} scheme={scheme} ({err}); retrying later")
+        except Exception:
+            pass
+    return signer
+
+
+def _sign_message_engine(
+    client_key: str,
+    contract_id: str,
+    nonce: int,
+    sign_template: str = PROXY_SIGN_TEMPLATE,
+    signer: "ResidentSigner | None" = None,
+    sign_mode: str | None = None,
+    sign_scheme: str | None = None,
+    log_cb=None,
+) -> tuple[str | None, str, str]:
+    """Sign the arkauth preimage; returns (sig_hex, error, engine) where engine is native|signhere.
+
+    log_cb(level, msg) receives diagnostics (the lane passes its listener logger).
+    """
+    preimage = sign_template.format(contract_id=contract_id, nonce=nonce)
+    mode = (sign_mode or PROXY_SIGN_MODE or "native").strip().lower()
+    scheme = (sign_scheme or PROXY_SIGN_SCHEME or "raw").strip().lower()
+    if mode == "native":
+        if (
+            signer is None
+            or signer.generation != _RESIDENT_SIGNERS_GEN
+            or signer.scheme != scheme
+            or signer.key_name != client_key
+        ):
+            signer = _resident_signer(client_key, scheme)
+        if signer is not None:
+            sig_hex, err = signer.sign(preimage)
+            if sig_hex:
+                return sig_hex, "", "native"
+            if scheme != "raw":
+                return None, err, "native"
+            msg = f"resident sign failed ({err}); falling back to signhere"
+            if callable(log_cb):
+                try:
+                    log_cb("warning", msg)
+                except Exception:
+                    pass
+            else:
+                print(f"[signer] {msg}", flush=True)
+    if scheme != "raw":
+        # signhere only produces raw signatures; falling back would change the scheme
+        return None, f"sign_scheme={scheme} needs the resident signer (unavailable)", mode
+    sig_hex, err = _sign_message_signhere(client_key, preimage)
+    return sig_hex, err, "signhere"
+
+
+def _sign_message(
+    client_key: str,
+    contract_id: str,
+    nonce: int,
+    sign_template: str = PROXY_SIGN_TEMPLATE,
+    signer: "ResidentSigner | None" = None,
+    sign_mode: str | None = None,
+    sign_scheme: str | None = None,
+) -> tuple[str | None, str]:
+    sig_hex, err, _engine = _sign_message_engine(
+        client_key, contract_id, nonce, sign_template, signer, sign_mode, sign_scheme
+    )
+    return sig_hex, err
+
+
+def _sign_message_signhere(client_key: str, preimage: str) -> tuple[str | None, str]:
+    """Sign a preimage by spawning signhere (legacy path, one process per signature)."""
+    # signhere has no home/keyring flags; ensure ~/.arkeo -> ARKEOD_HOME exists, then call plainly.
+    _ensure_signhere_home()
+    cmd = f'signhere -u "{client_key}" -m "{preimage}" | tail -n 1'
+    code, out = run(cmd)
+    out_clean = out.strip() if isinstance(out, str) else ""
+    if code != 0 or not out_clean:
+        return None, f"signhere_exit={code} output={out_clean}"
+    sig_hex = _b64_or_hex_to_rs_hex(out_clean).lower()
+    if not sig_hex or len(sig_hex) != 128:
+        return None, f"sig_parse_failed len={len(sig_hex)} raw={out_clean}"
+    return sig_hex, ""
+
+
+def _fetch_contract_config(
+    contract_id: int | str,
+    sentinel_url: str | None,
+    client_key: str,
+    sign_template: str = PROXY_SIGN_TEMPLATE,
+    timeout: int = 10,
+) -> tuple[bool, dict | None, str | None]:
+    """Fetch manage/contract/{id} from sentinel with signed arkauth."""
+    try:
+        cid = str(int(contract_id))
+    except Exception:
+        return False, None, "invalid contract id"
+    base = _normalize_sentinel_url(sentinel_url) or ""
+    base = base.rstrip("/")
+    if not base:
+        return False, None, "invalid sentinel url"
+    nonce = int(time.time())
+    sig, err = _sign_message(client_key, cid, nonce, sign_template)
+    if err or not sig:
         return False, None, err or "sign failed"
     qs = urllib.parse.urlencode({"arkcontract": f"{cid}:{nonce}:{sig}"})
     url = f"{base}/manage/contract/{cid}?{qs}"
@@ -7895,6 +9072,62 @@ class BypassError(Exception):
     pass
 
 
+_HTTP_POOL = HttpPool(PROXY_POOL_MAX_IDLE, PROXY_POOL_IDLE_SECS, PROXY_DNS_TTL) if PROXY_HTTP_POOL else None
+# Loop-side keep-alive client for sentinel forwards of async listeners (used only on the shared loop).
+_ASYNC_UPSTREAM = AsyncUpstreamPool(PROXY_POOL_MAX_IDLE, PROXY_POOL_IDLE_SECS)
+
+
+def _upstream_request(
+    method: str, url: str, data: bytes | None, headers: dict, timeout: float
+) -> tuple[int, bytes, dict]:
+    """Send an upstream request through the keep-alive pool; urllib handles redirects/env proxies."""
+    if _HTTP_POOL is not None:
+        try:
+            status, body, hdrs = _HTTP_POOL.request(method, url, body=data, headers=headers, timeout=timeout)
+            # Only idempotent requests are re-sent through urllib to follow a redirect.
+            if status not in REDIRECT_STATUSES or method not in ("GET", "HEAD"):
+                return status, body, hdrs
+        except PoolUnsupported:
+            pass
+    req = urllib.request.Request(url, data=data, headers=headers, method=method)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            return r.status, r.read(), dict(r.getheaders())
+    except urllib.error.HTTPError as e:
+        return e.code, e.read(), dict(e.headers)
+
+
+def _upstream_open(method: str, url: str, data: bytes | None, headers: dict, timeout: float) -> StreamedResponse:
+    """Like _upstream_request but returns once headers arrive; the caller reads or closes the body."""
+    if _HTTP_POOL is not None:
+        try:
+            resp = _HTTP_POOL.open(method, url, body=data, headers=headers, timeout=timeout)
+            if resp.status not in REDIRECT_STATUSES or method not in ("GET", "HEAD"):
+                return resp
+            resp.close()
+        except PoolUnsupported:
+            pass
+    req = urllib.request.Request(url, data=data, headers=headers, method=method)
+    try:
+        r = urllib.request.urlopen(req, timeout=timeout)
+        return StreamedResponse(r.status, dict(r.getheaders()), r)
+    except urllib.error.HTTPError as e:
+        return StreamedResponse(e.code, dict(e.headers), e)
+
+
+def _upstream_fetch(
+    method: str, url: str, data: bytes | None, headers: dict, timeout: float, stream: bool = False
+) -> tuple[int, bytes | StreamedResponse, dict]:
+    """Send an upstream request; with stream=True a 2xx body is returned unread as a StreamedResponse."""
+    if not stream:
+        return _upstream_request(method, url, data, headers, timeout)
+    resp = _upstream_open(method, url, data, headers, timeout)
+    if 200 <= int(resp.status or 0) < 300:
+        return resp.status, resp, resp.headers
+    # Error bodies are small and inspected by the lane (nonce/arkauth retries, wrapping): buffer them.
+    return resp.status, resp.read_all(), resp.headers
+
+
 def _forward_to_bypass(
     bypass_base: str,
     request_path: str,
@@ -7905,7 +9138,8 @@ def _forward_to_bypass(
     headers: dict | None = None,
     username: str | None = None,
     password: str | None = None,
-) -> tuple[int, bytes, dict, str, dict]:
+    stream: bool = False,
+) -> tuple[int, bytes | StreamedResponse, dict, str, dict]:
     """Forward the request to a bypass target without Arkeo auth."""
     method = (method or "POST").upper()
     base = (bypass_base or "").strip().rstrip("/")
@@ -7957,19 +9191,30 @@ def _forward_to_bypass(
         final_headers["Authorization"] = f"Basic {token}"
 
     data_bytes = body if method != "GET" else None
-    req = urllib.request.Request(url, data=data_bytes, headers=final_headers, method=method)
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as r:
-            return r.status, r.read(), dict(r.getheaders()), url, final_headers
-    except urllib.error.HTTPError as e:
-        return e.code, e.read(), dict(e.headers), url, final_headers
+        status, resp_body, resp_headers = _upstream_fetch(method, url, data_bytes, final_headers, timeout, stream=stream)
+        return status, resp_body, resp_headers, url, final_headers
     except (urllib.error.URLError, TimeoutError, socket.timeout) as e:
         raise BypassError(str(e))
     except Exception as e:
         raise BypassError(str(e))
 
 
-def _forward_to_sentinel(
+class UpstreamCall:
+    """One sentinel request yielded by the lane; its driver sends it inline or awaits it on the loop."""
+
+    __slots__ = ("method", "url", "data", "headers", "timeout", "stream")
+
+    def __init__(self, method: str, url: str, data: bytes | None, headers: dict, timeout: float, stream: bool = False):
+        self.method = method
+        self.url = url
+        self.data = data
+        self.headers = headers
+        self.timeout = timeout
+        self.stream = stream
+
+
+def _sentinel_call(
     sentinel: str,
     service_path: str,
     body: bytes | None,
@@ -7978,8 +9223,9 @@ def _forward_to_sentinel(
     as_header: bool = False,
     method: str = "POST",
     query_string: str | None = None,
-) -> tuple[int, bytes, dict, str, dict]:
-    """Forward the request to the sentinel, supporting POST and GET."""
+    stream: bool = False,
+) -> UpstreamCall:
+    """Build the sentinel request for a forward, supporting POST and GET."""
     method = (method or "POST").upper()
     url = f"{sentinel.rstrip('/')}/{service_path.lstrip('/')}"
     headers = {"Content-Type": "application/json", "Accept": "application/json"}
@@ -7998,20 +9244,66 @@ def _forward_to_sentinel(
         url = f"{url}?{'&'.join(qs_parts)}" if qs_parts else url
     # For GET we must not send a body or urllib will coerce to POST.
     data_bytes = body if method != "GET" else None
-    req = urllib.request.Request(url, data=data_bytes, headers=final_headers, method=method)
+    return UpstreamCall(method, url, data_bytes, final_headers, timeout, stream=stream)
+
+
+def _upstream_call_error(call: UpstreamCall, e: Exception) -> tuple[int, bytes, dict, str, dict]:
+    return (
+        502,
+        json.dumps({"error": "proxy_upstream_error", "detail": str(e)}).encode(),
+        {"Content-Type": "application/json"},
+        call.url,
+        call.headers,
+    )
+
+
+def _perform_upstream_call(call: UpstreamCall) -> tuple[int, bytes | StreamedResponse, dict, str, dict]:
+    """Send an UpstreamCall on this thread (stream=True: 2xx body left unread)."""
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as r:
-            return r.status, r.read(), dict(r.getheaders()), url, final_headers
-    except urllib.error.HTTPError as e:
-        return e.code, e.read(), dict(e.headers), url, final_headers
+        status, resp_body, resp_headers = _upstream_fetch(call.method, call.url, call.data, call.headers, call.timeout, stream=call.stream)
+        return status, resp_body, resp_headers, call.url, call.headers
     except Exception as e:
-        return (
-            502,
-            json.dumps({"error": "proxy_upstream_error", "detail": str(e)}).encode(),
-            {"Content-Type": "application/json"},
-            url,
-            final_headers,
+        return _upstream_call_error(call, e)
+
+
+async def _perform_upstream_call_async(call: UpstreamCall) -> tuple[int, bytes, dict, str, dict]:
+    """Send a buffered UpstreamCall through the loop's keep-alive client.
+
+    Requests that client cannot send (env proxy) and redirects of idempotent requests go through
+    _perform_upstream_call in the loop's executor, so both engines follow the same rules.
+    """
+    try:
+        status, resp_body, resp_headers = await _ASYNC_UPSTREAM.request(
+            call.method, call.url, body=call.data, headers=call.headers, timeout=call.timeout
         )
+        if status not in REDIRECT_STATUSES or call.method not in ("GET", "HEAD"):
+            return status, resp_body, resp_headers, call.url, call.headers
+    except PoolUnsupported:
+        pass
+    except asyncio.TimeoutError:
+        return _upstream_call_error(call, TimeoutError("timed out"))
+    except Exception as e:
+        return _upstream_call_error(call, e)
+    return await asyncio.get_running_loop().run_in_executor(None, _perform_upstream_call, call)
+
+
+def _run_upstream_calls(steps):
+    """Drive a generator that yields UpstreamCalls, sending each on this thread; returns its return value."""
+    result = None
+    try:
+        while True:
+            result = _perform_upstream_call(steps.send(result))
+    except StopIteration as stop:
+        return stop.value
+
+
+def _upstream_body_preview(resp_body) -> str:
+    """Body text kept in last_upstream for status/debug (streamed bodies are never held in memory)."""
+    if isinstance(resp_body, StreamedResponse):
+        return f"<streamed {resp_body.length if resp_body.length is not None else 'chunked'} bytes>"
+    if isinstance(resp_body, (bytes, bytearray)):
+        return resp_body.decode(errors="ignore")
+    return str(resp_body)
 
 
 def _redact_url_userinfo(url: str) -> str:
@@ -8067,6 +9359,204 @@ def _is_proxy_upstream_error(code: int | None, resp_body: bytes | str | None) ->
     return False
 
 
+# JSON-RPC reads that may be sent to two providers at once, per chain family (_service_family).
+# Explicit lists only: name prefixes also match state-changing calls (e.g. bitcoin getnewaddress).
+# EVM filter polling is left out: filters live on one node.
+_HEDGE_RPC_READS: dict[str, frozenset] = {
+    "evm": frozenset(
+        {
+            "eth_call",
+            "eth_chainId",
+            "eth_blockNumber",
+            "eth_gasPrice",
+            "eth_estimateGas",
+            "eth_feeHistory",
+            "eth_maxPriorityFeePerGas",
+            "eth_syncing",
+            "eth_protocolVersion",
+            "eth_getBalance",
+            "eth_getCode",
+            "eth_getStorageAt",
+            "eth_getTransactionCount",
+            "eth_getProof",
+            "eth_getLogs",
+            "eth_getBlockByHash",
+            "eth_getBlockByNumber",
+            "eth_getBlockReceipts",
+            "eth_getBlockTransactionCountByHash",
+            "eth_getBlockTransactionCountByNumber",
+            "eth_getTransactionByHash",
+            "eth_getTransactionByBlockHashAndIndex",
+            "eth_getTransactionByBlockNumberAndIndex",
+            "eth_getTransactionReceipt",
+            "eth_getUncleByBlockHashAndIndex",
+            "eth_getUncleByBlockNumberAndIndex",
+            "eth_getUncleCountByBlockHash",
+            "eth_getUncleCountByBlockNumber",
+            "net_version",
+            "net_listening",
+            "net_peerCount",
+            "web3_clientVersion",
+        }
+    ),
+    "cosmos": frozenset(
+        {
+            "abci_info",
+            "abci_query",
+            "block",
+            "block_by_hash",
+            "block_results",
+            "block_search",
+            "blockchain",
+            "commit",
+            "consensus_params",
+            "genesis",
+            "header",
+            "header_by_hash",
+            "health",
+            "net_info",
+            "num_unconfirmed_txs",
+            "status",
+            "tx",
+            "tx_search",
+            "validators",
+        }
+    ),
+    "btc": frozenset(
+        {
+            "getbestblockhash",
+            "getblock",
+            "getblockchaininfo",
+            "getblockcount",
+            "getblockhash",
+            "getblockheader",
+            "getblockstats",
+            "getchaintips",
+            "getdifficulty",
+            "getmempoolinfo",
+            "getnetworkinfo",
+            "getrawtransaction",
+            "gettxout",
+            "estimatesmartfee",
+        }
+    ),
+    "solana": frozenset(
+        {
+            "getAccountInfo",
+            "getBalance",
+            "getBlock",
+            "getBlockHeight",
+            "getBlockTime",
+            "getBlocks",
+            "getEpochInfo",
+            "getFeeForMessage",
+            "getGenesisHash",
+            "getHealth",
+            "getLatestBlockhash",
+            "getMinimumBalanceForRentExemption",
+            "getMultipleAccounts",
+            "getProgramAccounts",
+            "getRecentPrioritizationFees",
+            "getSignatureStatuses",
+            "getSignaturesForAddress",
+            "getSlot",
+            "getSupply",
+            "getTokenAccountBalance",
+            "getTokenAccountsByOwner",
+            "getTokenSupply",
+            "getTransaction",
+            "getVersion",
+            "isBlockhashValid",
+        }
+    ),
+    "polkadot": frozenset(
+        {
+            "chain_getBlock",
+            "chain_getBlockHash",
+            "chain_getFinalizedHead",
+            "chain_getHeader",
+            "rpc_methods",
+            "state_call",
+            "state_getMetadata",
+            "state_getRuntimeVersion",
+            "state_getStorage",
+            "system_chain",
+            "system_health",
+            "system_name",
+            "system_properties",
+            "system_version",
+        }
+    ),
+    "sui": frozenset(
+        {
+            "sui_getChainIdentifier",
+            "sui_getCheckpoint",
+            "sui_getLatestCheckpointSequenceNumber",
+            "sui_getObject",
+            "sui_getTotalTransactionBlocks",
+            "sui_getTransactionBlock",
+            "sui_multiGetObjects",
+            "sui_multiGetTransactionBlocks",
+            "suix_getAllBalances",
+            "suix_getBalance",
+            "suix_getCoins",
+            "suix_getOwnedObjects",
+            "suix_getReferenceGasPrice",
+        }
+    ),
+    "near": frozenset(
+        {
+            "block",
+            "chunk",
+            "gas_price",
+            "health",
+            "network_info",
+            "query",
+            "status",
+            "tx",
+            "EXPERIMENTAL_tx_status",
+            "validators",
+        }
+    ),
+}
+
+
+def _is_hedgeable_request(method: str, service_path: str, body: bytes | None, family: str = "evm") -> bool:
+    """True for requests that only read state: REST GETs and JSON-RPC calls (or batches) on the family's read list."""
+    method = (method or "").upper()
+    if method in ("GET", "HEAD"):
+        # CometBFT also serves broadcast_tx_* over GET.
+        return "broadcast" not in (service_path or "").lower()
+    if method != "POST" or not body:
+        return False
+    try:
+        payload = json.loads(body)
+    except Exception:
+        return False
+    reads = _HEDGE_RPC_READS.get(family) or frozenset()
+    calls = payload if isinstance(payload, list) else [payload]
+    if not calls:
+        return False
+    for call in calls:
+        name = call.get("method") if isinstance(call, dict) else None
+        if not isinstance(name, str) or name not in reads:
+            return False
+    return True
+
+
+def _hedge_delay_secs(cfg: dict, listener_id, provider_pubkey: str) -> float:
+    """Seconds to wait on a provider before hedging: its recent PROXY_HEDGE_QUANTILE latency, else hedge_delay_ms."""
+    delay_ms = None
+    if listener_id is not None and provider_pubkey:
+        try:
+            delay_ms = _RT_METRICS.recent_quantile(str(listener_id), str(provider_pubkey), PROXY_HEDGE_QUANTILE)
+        except Exception:
+            delay_ms = None
+    if delay_ms is None:
+        delay_ms = _safe_float(cfg.get("hedge_delay_ms", PROXY_HEDGE_DELAY_MS), PROXY_HEDGE_DELAY_MS)
+    return max(PROXY_HEDGE_MIN_DELAY_MS, float(delay_ms)) / 1000.0
+
+
 _TXHASH_RE = re.compile(r'(?i)\btxhash\b[:\s"]+([0-9A-Fa-f]{64})')
 
 
@@ -8279,19 +9769,20 @@ def _wait_for_new_contract(cfg: dict, client_pub: str, svc_id: int, start_height
     node = cfg.get("node_rpc") or ARKEOD_NODE
     provider_filter = cfg.get("create_provider_pubkey") or cfg.get("provider_pubkey")
     while time.time() < deadline:
-        contracts = _fetch_contracts(node, active_only=True, client_filter=client_pub)
         cur_h, height_from_cache = _get_height_with_source(node)
         try:
             height_skew = int(PROXY_HEIGHT_SKEW or 0) if height_from_cache else 0
         except Exception:
             height_skew = 0
-        c = _select_active_contract(
-            contracts,
+        c, _src = _lookup_active_contract(
+            node,
             client_pub,
             svc_id,
             cur_h,
-            provider_filter=provider_filter,
+            provider_filter,
             height_skew=height_skew,
+            service_name=cfg.get("service_name"),
+            fresh=True,
         )
         if c and _safe_int(c.get("height")) >= start_height:
             return c
@@ -8299,10 +9790,899 @@ def _wait_for_new_contract(cfg: dict, client_pub: str, svc_id: int, start_height
     return None
 
 
+def _open_contract_error_detail(
+    out_text: str | None,
+    deposit_val: int | None,
+    fees_val: str | None,
+) -> tuple[str | None, str | None]:
+    if not out_text:
+        return None, None
+    low = str(out_text).lower()
+    if "insufficient funds" in low or "not enough balance" in low:
+        acct = ""
+        try:
+            m = re.search(r"account\s+([a-z0-9]+):\s+insufficient funds", out_text, re.IGNORECASE)
+            if not m:
+                m = re.search(r"for account\s+([a-z0-9]+)", out_text, re.IGNORECASE)
+            if m:
+                acct = m.group(1)
+        except Exception:
+            acct = ""
+        parts = ["insufficient funds to open contract"]
+        if acct:
+            parts.append(f"account={acct}")
+        if deposit_val is not None:
+            parts.append(f"deposit={deposit_val}")
+        if fees_val:
+            parts.append(f"fees={fees_val}")
+        return "insufficient_funds", " ".join(parts)
+    if "account sequence mismatch" in low:
+        expected = ""
+        got = ""
+        try:
+            m_exp = re.search(r"expected\s+(\d+)", out_text, re.IGNORECASE)
+            m_got = re.search(r"got\s+(\d+)", out_text, re.IGNORECASE)
+            if m_exp:
+                expected = m_exp.group(1)
+            if m_got:
+                got = m_got.group(1)
+        except Exception:
+            expected, got = "", ""
+        detail = "account sequence mismatch"
+        if expected or got:
+            detail = f"{detail} expected={expected or '?'} got={got or '?'}"
+        return "account_sequence_mismatch", detail
+    if "signature verification failed" in low or "verify account number" in low:
+        acct_num = ""
+        chain_id = ""
+        try:
+            m_acc = re.search(r"account number\s*\((\d+)\)", out_text, re.IGNORECASE)
+            m_chain = re.search(r"chain-id\s*\(([^)]+)\)", out_text, re.IGNORECASE)
+            if m_acc:
+                acct_num = m_acc.group(1)
+            if m_chain:
+                chain_id = m_chain.group(1)
+        except Exception:
+            acct_num, chain_id = "", ""
+        detail = "signature verification failed"
+        if acct_num:
+            detail += f" account_number={acct_num}"
+        if chain_id:
+            detail += f" chain_id={chain_id}"
+        return "signature_verification_failed", detail
+    if "chain-id" in low and ("mismatch" in low or "wrong chain-id" in low):
+        chain_id = ""
+        try:
+            m_chain = re.search(r"chain-id\s*\(([^)]+)\)", out_text, re.IGNORECASE)
+            if m_chain:
+                chain_id = m_chain.group(1)
+        except Exception:
+            chain_id = ""
+        detail = "chain-id mismatch"
+        if chain_id:
+            detail += f" chain_id={chain_id}"
+        return "chain_id_mismatch", detail
+    return None, None
+
+
+def _open_candidate_contract(
+    cfg: dict,
+    cand: dict,
+    provider_filter: str,
+    sentinel: str,
+    client_pub: str,
+    svc_id: int,
+    cur_height: int,
+    log_cb=None,
+) -> tuple[dict | None, str | None, str | None]:
+    """Open a contract with a candidate provider and wait for it on chain.
+
+    Returns (contract, err_code, err_detail); err_code is set when the open-contract tx failed.
+    """
+
+    def _log(level: str, msg: str) -> None:
+        if log_cb:
+            try:
+                log_cb(level, msg)
+            except Exception:
+                pass
+
+    node = cfg.get("node_rpc") or ARKEOD_NODE
+    cfg_create = dict(cfg)
+    cfg_create["create_provider_pubkey"] = provider_filter
+    cfg_create["create_delegate"] = client_pub
+    cfg_create["provider_pubkey"] = provider_filter
+    cfg_create["provider_sentinel_api"] = sentinel
+    # Align settlement duration with provider if known.
+    try:
+        if cand.get("settlement_duration"):
+            cfg_create["create_settlement"] = cand.get("settlement_duration")
+    except Exception:
+        pass
+    # Align pay-as-you-go rate if advertised.
+    try:
+        rate_info = cand.get("pay_as_you_go_rate")
+        if isinstance(rate_info, dict) and rate_info.get("amount"):
+            amt = str(rate_info.get("amount"))
+            denom = str(rate_info.get("denom") or "")
+            cfg_create["create_rate"] = f"{amt}{denom}"
+    except Exception:
+        pass
+    # Align QPM if advertised.
+    try:
+        if cand.get("queries_per_minute") is not None:
+            cfg_create["create_qpm"] = cand.get("queries_per_minute")
+    except Exception:
+        pass
+    start_height = cur_height or _get_current_height(node)
+    try:
+        _log(
+            "info",
+            "open-contract attempt "
+            f"deposit={_safe_int(cfg_create.get('create_deposit', PROXY_CREATE_DEPOSIT), PROXY_CREATE_DEPOSIT)} "
+            f"rate={cfg_create.get('create_rate', PROXY_CREATE_RATE)} "
+            f"dur={_safe_int(cfg_create.get('create_duration', PROXY_CREATE_DURATION), PROXY_CREATE_DURATION)} "
+            f"qpm={_safe_int(cfg_create.get('create_qpm', PROXY_CREATE_QPM), PROXY_CREATE_QPM)} "
+            f"settlement={_safe_int(cfg_create.get('create_settlement', PROXY_CREATE_SETTLEMENT), PROXY_CREATE_SETTLEMENT)} "
+            f"provider={provider_filter}"
+        )
+    except Exception:
+        pass
+    txhash, out, _dep, ok = _create_contract_now(cfg_create, client_pub, log_cb=log_cb)
+    if out:
+        _log("info", f"open-contract response: {out.strip()}")
+    if txhash:
+        _log("info", f"open-contract txhash={txhash}")
+    if not ok:
+        _log("info", "open-contract failed; skipping contract wait")
+        err_code, err_detail = _open_contract_error_detail(
+            out,
+            _dep,
+            cfg_create.get("create_fees", PROXY_CREATE_FEES),
+        )
+        return None, err_code or "open_contract_failed", err_detail
+    wait_sec = _safe_int(cfg_create.get("create_timeout_sec", PROXY_CREATE_TIMEOUT), PROXY_CREATE_TIMEOUT)
+    active = _wait_for_new_contract(cfg_create, client_pub, svc_id, start_height, wait_sec)
+    if active:
+        _log(
+            "info",
+            f"auto-created contract id={active.get('id')} height={active.get('height')} provider={provider_filter}",
+        )
+    return active, None, None
+
+
+def _adopt_new_contract(server_ref, cfg: dict, provider_filter: str, active: dict) -> None:
+    """Cache a freshly opened contract and reset the provider's CORS-configured flag."""
+    try:
+        if server_ref is not None:
+            server_ref.contract_cache[provider_filter] = {"contract": active, "cached_at": time.time()}
+    except Exception:
+        pass
+    try:
+        _contract_index(active.get("client")).upsert(active)
+    except Exception:
+        pass
+    # New contract: reset CORS configured flag for this provider.
+    try:
+        desired = cfg.get("cors_allowed_origins")
+        if server_ref is not None and isinstance(server_ref.cors_configured, dict):
+            server_ref.cors_configured[provider_filter] = {
+                "contract_id": str(active.get("id")),
+                "cors_origins": desired,
+                "cors_configured": False,
+            }
+        _update_top_service_contract(cfg.get("listener_id"), provider_filter, active.get("id"), desired, cors_configured=False)
+    except Exception:
+        pass
+
+
+
+_CLIENT_CONTRACTS: dict[tuple[str, str], tuple[float, list]] = {}
+_CLIENT_CONTRACTS_LOCK = threading.Lock()
+
+
+def _client_contracts_shared(node: str, client_pub: str, max_age: float) -> tuple[float, list]:
+    """(scanned_at, contracts): client-filtered active contracts shared by all listener managers."""
+    key = (str(node or ""), str(client_pub))
+    with _CLIENT_CONTRACTS_LOCK:
+        hit = _CLIENT_CONTRACTS.get(key)
+        if hit and time.time() - hit[0] < max_age:
+            return hit
+        scanned_at = time.time()
+        contracts = _fetch_contracts(node, timeout=PROXY_CONTRACT_TIMEOUT, active_only=True, client_filter=client_pub)
+        _CLIENT_CONTRACTS[key] = (scanned_at, contracts)
+        return scanned_at, contracts
+
+
+def _contract_rate_amount(c: dict) -> int:
+    rate_val = c.get("rate") or c.get("rates") or c.get("pay_as_you_go_rate") or c.get("pay_as_you_go_rates")
+    if isinstance(rate_val, list):
+        rate_val = rate_val[0] if rate_val else None
+    return _parse_rate_amount(rate_val) if rate_val else 0
+
+
+class ContractManager:
+    """Per-listener background loop that keeps server.contract_cache warm.
+
+    Each tick refreshes the active contract per candidate provider (per-client chain query, or one
+    shared client-filtered scan when the CLI lacks it) through the contract index, caches it, and estimates time left from remaining blocks and deposit burn (nonces signed locally
+    since the last claim x rate). Renewal only covers providers whose contract served a request in
+    the last active_secs: their contract is polled more often inside the renew window, and the
+    replacement is opened here as soon as the old one stops being usable, so busy lanes read the
+    cache instead of opening contracts on the request path. Idle providers and first opens are left
+    to the request path, so a listener without traffic does not keep paying for contracts.
+    """
+
+    def __init__(
+        self,
+        server,
+        interval: float | None = None,
+        renew_secs: float | None = None,
+        active_secs: float | None = None,
+    ):
+        self.server = server
+        self.interval = max(5.0, float(interval or PROXY_CONTRACT_REFRESH_SECS))
+        self.renew_secs = max(0.0, float(renew_secs if renew_secs is not None else PROXY_CONTRACT_RENEW_SECS))
+        self.active_secs = max(0.0, float(active_secs if active_secs is not None else PROXY_CONTRACT_ACTIVE_SECS))
+        self.stop_event = threading.Event()
+        self.wake = threading.Event()
+        self.lock = threading.Lock()
+        # provider -> last assessment (contract id, remaining blocks/deposit, burn rate, eta)
+        self.providers: dict[str, dict] = {}
+        # contract id -> (sampled_at, local nonce) for burn-rate estimation
+        self.burn_samples: dict[str, tuple[float, int]] = {}
+        self.burn_qps: dict[str, float] = {}
+        self.open_backoff: dict[str, float] = {}
+        # provider -> when a request last went through its contract successfully
+        self.last_served: dict[str, float] = {}
+        self.last_tick_at: float | None = None
+        self.last_error: str | None = None
+        self.poked = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        self.wake.set()
+
+    def poke(self) -> None:
+        """Ask for an immediate refresh (a lane missed the cache)."""
+        self.poked = True
+        self.wake.set()
+
+    def note_served(self, provider: str) -> None:
+        """A request was served through this provider's contract; keep renewing it."""
+        self.last_served[str(provider)] = time.time()
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "interval_sec": self.interval,
+                "renew_sec": self.renew_secs,
+                "active_sec": self.active_secs,
+                "last_tick_at": self.last_tick_at,
+                "last_error": self.last_error,
+                "providers": {pk: dict(v) for pk, v in self.providers.items()},
+            }
+
+    def _log(self, level: str, msg: str) -> None:
+        _proxy_log(self.server, level, f"[contracts] {msg}")
+
+    def _run(self) -> None:
+        while not self.stop_event.is_set():
+            next_in = self.interval
+            try:
+                next_in = self.tick()
+                with self.lock:
+                    self.last_error = None
+            except Exception as e:
+                with self.lock:
+                    self.last_error = str(e)
+                self._log("warning", f"refresh failed: {e}")
+            with self.lock:
+                self.last_tick_at = time.time()
+            self.wake.wait(next_in)
+            self.wake.clear()
+
+    def _client_pub(self) -> str:
+        srv = self.server
+        client_pub = getattr(srv, "client_pubkey", "") or ""
+        if not client_pub:
+            client_key = srv.cfg.get("client_key") or KEY_NAME
+            _raw, bech, err = derive_pubkeys(client_key, KEYRING)
+            if not err and bech:
+                client_pub = bech
+                srv.client_pubkey = bech
+        return client_pub
+
+    def _local_nonce(self, cid: str) -> int:
+        store = (getattr(self.server, "nonce_stores", None) or {}).get(cid)
+        if store is not None:
+            return _safe_int(getattr(store, "nonce", 0), 0)
+        return _safe_int(_read_persisted_nonce(self.server.cfg.get("listener_id"), cid), 0)
+
+    def _assess(self, c: dict, effective_height: int) -> dict:
+        """Remaining blocks/deposit and the estimated seconds until the contract stops being usable."""
+        cid = str(c.get("id"))
+        now = time.time()
+        rate_amt = _contract_rate_amount(c)
+        remaining_blocks = _safe_int(c.get("height")) + _safe_int(c.get("duration")) - effective_height
+        local_nonce = self._local_nonce(cid)
+        # paid covers claimed nonces; nonces signed since the last claim are still owed.
+        unclaimed = max(0, local_nonce - _safe_int(c.get("nonce")))
+        remaining_deposit = _safe_int(c.get("deposit")) - _safe_int(c.get("paid")) - unclaimed * rate_amt
+        prev = self.burn_samples.get(cid)
+        if prev and now > prev[0] and local_nonce >= prev[1]:
+            qps = (local_nonce - prev[1]) / (now - prev[0])
+            old = self.burn_qps.get(cid)
+            self.burn_qps[cid] = qps if old is None else 0.7 * old + 0.3 * qps
+        self.burn_samples[cid] = (now, local_nonce)
+        qps = self.burn_qps.get(cid) or 0.0
+        eta_blocks = max(0.0, remaining_blocks * PROXY_BLOCK_TIME_SECS)
+        eta_deposit = None
+        if rate_amt > 0 and qps > 0:
+            eta_deposit = max(0.0, remaining_deposit / (rate_amt * qps))
+        eta = eta_blocks if eta_deposit is None else min(eta_blocks, eta_deposit)
+        return {
+            "contract_id": cid,
+            "remaining_blocks": remaining_blocks,
+            "remaining_deposit": remaining_deposit,
+            "burn_qps": round(qps, 3),
+            "eta_sec": int(eta),
+            "exhausted": remaining_blocks <= 0 or (rate_amt > 0 and remaining_deposit < rate_amt),
+        }
+
+    def tick(self) -> float:
+        srv = self.server
+        cfg = srv.cfg
+        client_pub = self._client_pub()
+        if not client_pub:
+            return self.interval
+        node = cfg.get("node_rpc") or ARKEOD_NODE
+        svc_id = _safe_int(cfg.get("service_id"), 0)
+        cur_height, from_cache = _get_height_with_source(node)
+        height_skew = int(PROXY_HEIGHT_SKEW or 0) if from_cache else 0
+        effective_height = cur_height + height_skew
+        # Without the per-client query, managers of every listener share one scan; a poke (cache miss) forces a fresh one.
+        max_age = 0.0 if self.poked else self.interval / 2
+        self.poked = False
+        idx = _contract_index(client_pub)
+        if not _contract_query_enabled(node):
+            _client_contracts_shared(node, client_pub, max_age)
+        auto_create = _safe_bool(cfg.get("auto_create", PROXY_AUTO_CREATE), bool(PROXY_AUTO_CREATE))
+        next_in = self.interval
+        seen: dict[str, dict] = {}
+        for cand in _candidate_providers(cfg):
+            if self.stop_event.is_set():
+                break
+            provider = cand.get("provider_pubkey") if isinstance(cand, dict) else None
+            if not provider:
+                continue
+            sentinel = _normalize_sentinel_url(cand.get("sentinel_url") or cfg.get("provider_sentinel_api") or SENTINEL_URI_DEFAULT)
+            if _contract_query_enabled(node):
+                active, _src = _lookup_active_contract(
+                    node,
+                    client_pub,
+                    svc_id,
+                    cur_height,
+                    provider,
+                    height_skew=height_skew,
+                    service_name=cfg.get("service_name"),
+                    fresh=True,
+                    allow_scan=False,
+                )
+            else:
+                active = idx.active(client_pub, provider, svc_id, effective_height)
+            info = self._assess(active, effective_height) if active else {"contract_id": None, "exhausted": True}
+            with _lane_lock(srv, "contract", provider):
+                cached = srv.contract_cache.get(provider)
+                cached_c = cached.get("contract") if isinstance(cached, dict) else None
+                if active and not info["exhausted"]:
+                    # Refresh from chain (deposit/paid/nonce move as claims settle).
+                    srv.contract_cache[provider] = {"contract": active, "cached_at": time.time()}
+                elif isinstance(cached_c, dict) and (active is None or str(cached_c.get("id")) == info["contract_id"]):
+                    # Gone from the chain, expired or out of deposit: lanes must not keep signing against it.
+                    srv.contract_cache.pop(provider, None)
+                    self._log("info", f"dropped contract provider={provider} contract_id={cached_c.get('id')}")
+            last_served = self.last_served.get(provider)
+            in_use = last_served is not None and time.time() - last_served <= self.active_secs
+            info["last_served_at"] = last_served
+            renew_due = info["exhausted"] or info.get("eta_sec", 0) <= self.renew_secs
+            if in_use and renew_due and active and not info["exhausted"]:
+                # Still usable but inside the renew window: watch it closely so the switch happens on time.
+                next_in = min(next_in, max(5.0, min(self.interval / 4, info["eta_sec"] / 2)))
+            if in_use and info["exhausted"] and auto_create and time.time() >= self.open_backoff.get(provider, 0.0):
+                self._open_replacement(cand, provider, sentinel, client_pub, svc_id, cur_height)
+                info = dict(info, replaced=bool(srv.contract_cache.get(provider)))
+            seen[provider] = info
+        with self.lock:
+            self.providers = seen
+        return next_in
+
+    def _open_replacement(self, cand: dict, provider: str, sentinel: str, client_pub: str, svc_id: int, cur_height: int) -> None:
+        srv = self.server
+        cooldown = getattr(srv, "cooldowns", {}).get(provider)
+        if cooldown and time.time() < cooldown:
+            return
+        with _lane_lock(srv, "contract", provider):
+            cached = srv.contract_cache.get(provider)
+            if isinstance(cached, dict) and cached.get("contract"):
+                return
+        self._log("info", f"opening replacement contract provider={provider}")
+        # The opener dedupes against lanes that asked for the same provider; they pick the contract up from the cache.
+        job = srv.contract_opener.request(cand, provider, sentinel, client_pub, svc_id)
+        create_timeout = _safe_int(srv.cfg.get("create_timeout_sec", PROXY_CREATE_TIMEOUT), PROXY_CREATE_TIMEOUT)
+        if not job.done.wait(create_timeout + self.interval):
+            return
+        if job.contract:
+            self.open_backoff.pop(provider, None)
+            return
+        self._log("warning", f"replacement contract not ready provider={provider} error={job.err or 'wait_timeout'} {job.detail or ''}".rstrip())
+        self.open_backoff[provider] = time.time() + max(self.interval, float(PROXY_OPEN_COOLDOWN or 0))
+
+
+class _OpenJob:
+    """One background contract open for a provider; requests parked on it resume when it finishes."""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.started_at = time.time()
+        self.done = threading.Event()
+        self.contract: dict | None = None
+        self.err: str | None = None
+        self.detail: str | None = None
+        # (work item, expiry timer)
+        self.parked: list[tuple[WorkItem, threading.Timer]] = []
+
+
+class ContractOpener:
+    """Per-listener pipeline that opens contracts off the request path.
+
+    Opening a contract broadcasts a tx and then waits up to create_timeout_sec for it to land.
+    Done on a lane, that held every queued request behind it. Lanes now queue the open here and
+    move on to a candidate that already has a contract. When none has one, the request is parked
+    on the open and put back on the lane when the open finishes, or answered 503
+    contract_opening once create_park_sec passes. Opens run one at a time, so txs signed with
+    the client key never race on the account sequence.
+    """
+
+    def __init__(self, server, max_parked: int | None = None):
+        self.server = server
+        self.max_parked = PROXY_CREATE_PARK_MAX if max_parked is None else max(0, int(max_parked))
+        self.lock = threading.Lock()
+        self.jobs: dict[str, _OpenJob] = {}
+        self.q: queue.Queue = queue.Queue()
+        self.stop_event = threading.Event()
+        self.stats = {"opened": 0, "failed": 0, "parked": 0, "park_expired": 0}
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        self.q.put(None)
+
+    def _log(self, level: str, msg: str) -> None:
+        _proxy_log(self.server, level, f"[contracts] {msg}")
+
+    def pending(self, provider: str) -> _OpenJob | None:
+        with self.lock:
+            return self.jobs.get(provider)
+
+    def request(self, cand: dict, provider: str, sentinel: str, client_pub: str, svc_id: int) -> _OpenJob:
+        """Queue an open for provider, or return the one already queued or running."""
+        with self.lock:
+            job = self.jobs.get(provider)
+            if job is None:
+                job = self.jobs[provider] = _OpenJob(provider)
+                self.q.put((job, cand, sentinel, client_pub, svc_id))
+            return job
+
+    def park(self, work: WorkItem, job: _OpenJob, until: float) -> bool:
+        """Hold work until job finishes (then re-queue it on the lane) or until `until`; False if it cannot be parked."""
+        wait = until - time.time()
+        if wait <= 0:
+            return False
+        with self.lock:
+            if not job.done.is_set():
+                if sum(len(j.parked) for j in self.jobs.values()) >= self.max_parked:
+                    return False
+                timer = threading.Timer(wait, self._expire, args=(job, work))
+                timer.daemon = True
+                job.parked.append((work, timer))
+                self.stats["parked"] += 1
+                timer.start()
+                return True
+        # Finished between the lane's check and now: run it again right away.
+        self._resume(work)
+        return True
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "opening": {pk: {"started_at": j.started_at, "parked": len(j.parked)} for pk, j in self.jobs.items()},
+                **self.stats,
+            }
+
+    def _resume(self, work: WorkItem) -> None:
+        if work.cancelled:
+            return
+        lane = getattr(self.server, "lane_exec", None)
+        if lane is not None and lane.submit(work):
+            return
+        work.complete(
+            {
+                "status": 503,
+                "body": json.dumps({"error": "listener busy", "detail": "lane queue full", "request_id": work.request_id}),
+                "headers": {"Content-Type": "application/json", "X-Arkeo-Request-Id": work.request_id},
+            }
+        )
+
+    def _expire(self, job: _OpenJob, work: WorkItem) -> None:
+        with self.lock:
+            entry = next((e for e in job.parked if e[0] is work), None)
+            if entry is None:
+                return
+            job.parked.remove(entry)
+            self.stats["park_expired"] += 1
+        retry = max(1, int(job.started_at + _safe_int(self.server.cfg.get("create_timeout_sec", PROXY_CREATE_TIMEOUT), PROXY_CREATE_TIMEOUT) - time.time()))
+        work.complete(
+            {
+                "status": 503,
+                "body": json.dumps(
+                    {
+                        "error": "contract_opening",
+                        "detail": f"contract with provider {job.provider} is still being opened",
+                        "request_id": work.request_id,
+                    }
+                ),
+                "headers": {"Content-Type": "application/json", "X-Arkeo-Request-Id": work.request_id, "Retry-After": str(retry)},
+            }
+        )
+
+    def _run(self) -> None:
+        while not self.stop_event.is_set():
+            item = self.q.get()
+            if item is None:
+                break
+            job = item[0]
+            try:
+                self._open(*item)
+            except Exception as e:
+                job.err = "open_contract_failed"
+                job.detail = str(e)
+                self._log("warning", f"open failed provider={job.provider}: {e}")
+            finally:
+                with self.lock:
+                    if self.jobs.get(job.provider) is job:
+                        self.jobs.pop(job.provider, None)
+                    job.done.set()
+                    parked, job.parked = job.parked, []
+                for work, timer in parked:
+                    timer.cancel()
+                    self._resume(work)
+
+    def _open(self, job: _OpenJob, cand: dict, sentinel: str, client_pub: str, svc_id: int) -> None:
+        srv = self.server
+        provider = job.provider
+        with _lane_lock(srv, "contract", provider):
+            cached = srv.contract_cache.get(provider)
+            if isinstance(cached, dict) and cached.get("contract"):
+                job.contract = cached.get("contract")
+                return
+        started = time.time()
+        self._log("info", f"opening contract provider={provider}")
+        # Height 0: take the current height now, not when the job was queued.
+        active, err, detail = _open_candidate_contract(
+            srv.cfg, cand, provider, sentinel, client_pub, svc_id, 0, log_cb=lambda lvl, m: self._log(lvl, m)
+        )
+        if active:
+            with _lane_lock(srv, "contract", provider):
+                _adopt_new_contract(srv, srv.cfg, provider, active)
+            job.contract = active
+            with self.lock:
+                self.stats["opened"] += 1
+            return
+        job.err = err or "no_active_contract"
+        job.detail = detail
+        with self.lock:
+            self.stats["failed"] += 1
+        listener_id = srv.cfg.get("listener_id")
+        # Same bookkeeping a lane did after a failed inline open.
+        try:
+            _set_top_service_status(listener_id, provider, "Down")
+        except Exception:
+            pass
+        try:
+            _update_top_service_metrics(listener_id, provider, time.time() - started, include_in_avg=False)
+        except Exception:
+            pass
+        try:
+            if PROXY_OPEN_COOLDOWN:
+                srv.cooldowns[provider] = time.time() + PROXY_OPEN_COOLDOWN
+        except Exception:
+            pass
+
+
+def _proxy_log(server, level: str, msg: str) -> None:
+    logger = getattr(server, "logger", None)
+    if not logger:
+        return
+    fn = getattr(logger, level, None)
+    if callable(fn):
+        try:
+            fn(msg)
+        except Exception:
+            pass
+
+
+def _proxy_client_ip(headers, peer_ip: str, trust_forwarded: bool) -> str:
+    if trust_forwarded:
+        xr = headers.get("X-Real-Ip", "")
+        if xr:
+            return xr.split(",")[0].strip()
+        xf = headers.get("X-Forwarded-For", "")
+        if xf:
+            return xf.split(",")[0].strip()
+    ip = peer_ip or ""
+    if ":" in ip and ip.count(":") == 1:
+        ip = ip.split(":")[0]
+    return ip
+
+
+def _proxy_cors_headers(cfg: dict, headers) -> dict:
+    """CORS headers for a proxy JSON response (empty when the origin is not allowed)."""
+    try:
+        origin = headers.get("Origin")
+    except Exception:
+        origin = None
+    allowed_origin = _resolve_proxy_cors_origin(origin, cfg)
+    out = {}
+    if allowed_origin:
+        out["Access-Control-Allow-Origin"] = allowed_origin
+        if allowed_origin != "*":
+            out["Access-Control-Allow-Credentials"] = "true"
+            out["Vary"] = "Origin"
+    return out
+
+
+def _proxy_preflight_headers(cfg: dict, headers) -> dict:
+    """Headers answering a CORS preflight (OPTIONS) on a listener port."""
+    out = _proxy_cors_headers(cfg, headers)
+    if out:
+        out["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
+        out["Access-Control-Allow-Headers"] = headers.get("Access-Control-Request-Headers", "*")
+        out["Access-Control-Max-Age"] = "86400"
+    return out
+
+
+def _proxy_exception_payload(server, e: Exception) -> dict:
+    try:
+        last = getattr(server, "last_candidate", {}) if hasattr(server, "last_candidate") else {}
+        last_nonce = getattr(server, "last_nonce", None)
+        last_nonce_source = getattr(server, "last_nonce_source", None)
+    except Exception:
+        last, last_nonce, last_nonce_source = {}, None, None
+    return {
+        "error": "proxy_exception",
+        "detail": str(e),
+        "sentinel": last.get("sentinel"),
+        "provider": last.get("provider"),
+        "service_id": last.get("service_id"),
+        "service_name": last.get("service_name"),
+        "last_nonce": last_nonce,
+        "last_nonce_source": last_nonce_source,
+    }
+
+
+def _arkeostatus_payload(server, headers) -> dict:
+    """Build the /arkeostatus payload for a listener (shared by the threaded and async engines)."""
+    cfg = server.cfg
+    node = cfg.get("node_rpc") or ARKEOD_NODE
+    sentinel = cfg.get("provider_sentinel_api") or SENTINEL_URI_DEFAULT
+    service_id = cfg.get("service_id")
+    service_name = cfg.get("service_name")
+    client_key = cfg.get("client_key") or KEY_NAME
+    client_pub_local = getattr(server, "client_pubkey", "") or ""
+    if not client_pub_local:
+        raw, bech, err = derive_pubkeys(client_key, KEYRING)
+        if not err:
+            client_pub_local = bech
+            server.client_pubkey = bech
+    try:
+        req_origin = headers.get("Origin")
+    except Exception:
+        req_origin = None
+    allow_origin = _resolve_proxy_cors_origin(req_origin, cfg)
+    payload = {
+        "client_pub_local": client_pub_local,
+        "active_contract": getattr(server, "active_contract", None),
+        "last_code": getattr(server, "last_code", None),
+        "last_nonce": getattr(server, "last_nonce", None),
+        "provider_pubkey": cfg.get("provider_pubkey"),
+        "service_id": service_id,
+        "service_name": service_name,
+        "sentinel": cfg.get("provider_sentinel_api"),
+        "height": None,
+        "active_contract_provider_moniker": None,
+        "cors_request_origin": req_origin,
+        "cors_allow_origin": allow_origin,
+    }
+    try:
+        height_val, _from_cache = _get_height_with_source(node)
+        payload["height"] = height_val
+    except Exception:
+        payload["height"] = None
+
+    # If we don't already have an active_contract cached, try to select one
+    if not payload.get("active_contract"):
+        try:
+            cur_h, height_from_cache = _get_height_with_source(node)
+            try:
+                height_skew = int(PROXY_HEIGHT_SKEW or 0) if height_from_cache else 0
+            except Exception:
+                height_skew = 0
+            # ensure contract cache map
+            if not hasattr(server, "contract_cache"):
+                server.contract_cache = {}
+            contract_cache = server.contract_cache
+
+            candidates = _candidate_providers(cfg)
+            provider_filter = None
+            sentinel = None
+            if candidates:
+                provider_filter = candidates[0].get("provider_pubkey") or cfg.get("provider_pubkey")
+                sentinel = candidates[0].get("sentinel_url") or cfg.get("provider_sentinel_api")
+            if not provider_filter:
+                provider_filter = cfg.get("provider_pubkey")
+            active = None
+            cache_entry = contract_cache.get(provider_filter) if provider_filter else None
+            if cache_entry:
+                active = cache_entry.get("contract")
+            if not active:
+                active, _src = _lookup_active_contract(
+                    node,
+                    client_pub_local,
+                    _safe_int(service_id, 0),
+                    cur_h,
+                    provider_filter,
+                    height_skew=height_skew,
+                    service_name=service_name,
+                )
+            if active and provider_filter:
+                try:
+                    contract_cache[provider_filter] = {"contract": active, "cached_at": time.time()}
+                except Exception:
+                    pass
+        except Exception as e:
+            payload["active_contract_detail"] = f"Failed to load contract: {e}"
+            active = None
+        if active:
+            payload["active_contract"] = active
+            try:
+                pm = _active_provider_moniker(active.get("provider"))
+                if pm:
+                    payload["active_contract_provider_moniker"] = pm
+                    active = dict(active)
+                    active["provider_moniker"] = pm
+                    payload["active_contract"] = active
+            except Exception:
+                pass
+            try:
+                _update_top_service_contract(cfg.get("listener_id"), provider_filter or active.get("provider"), active.get("id"), None)
+            except Exception:
+                pass
+            payload["active_contract_detail"] = "Active contract found for the selected provider service."
+            try:
+                cid = active.get("id")
+                if cid and client_pub_local:
+                    payload["contract_claims_url"] = f"{sentinel}/claims?contract_id={cid}&client={client_pub_local}"
+                if cid:
+                    payload["contract_manage_url_hint"] = f"{sentinel}/manage/contract/{cid}"
+                if cid and sentinel:
+                    ok_cfg, cfg_data, cfg_err = _fetch_contract_config(
+                        cid,
+                        sentinel,
+                        client_key,
+                        cfg.get("sign_template", PROXY_SIGN_TEMPLATE),
+                    )
+                    if ok_cfg and cfg_data is not None:
+                        payload["contract_config"] = cfg_data
+                    elif cfg_err:
+                        payload["contract_config_error"] = cfg_err
+            except Exception:
+                pass
+            if provider_filter:
+                payload["provider_pubkey"] = provider_filter
+            try:
+                server.active_contract = active
+                if hasattr(server, "active_contracts") and provider_filter:
+                    server.active_contracts[provider_filter] = active
+            except Exception:
+                pass
+            # try to pick last nonce if cached
+            try:
+                if hasattr(server, "last_nonce_cache"):
+                    last_nc = server.last_nonce_cache
+                    if isinstance(last_nc, dict):
+                        payload["last_nonce"] = last_nc.get(str(active.get("id")))
+            except Exception:
+                pass
+        else:
+            payload["active_contract_detail"] = "No active contract found for the selected provider service."
+    # If we already had an active_contract cached, still try to enrich with moniker
+    if payload.get("active_contract") and not payload.get("active_contract_provider_moniker"):
+        try:
+            pm = _active_provider_moniker(payload["active_contract"].get("provider"))
+            if pm:
+                payload["active_contract_provider_moniker"] = pm
+                ac = dict(payload["active_contract"])
+                ac["provider_moniker"] = pm
+                payload["active_contract"] = ac
+        except Exception:
+            pass
+    return payload
+
+
 class PaygProxyHandler(BaseHTTPRequestHandler):
     server_version = "ArkeoPaygProxy/1.0"
     protocol_version = "HTTP/1.1"
 
+    def setup(self):
+        # Idle timeout for persistent client connections (applied to the socket by StreamRequestHandler).
+        cfg = getattr(self.server, "cfg", None) or {}
+        idle = _safe_float(cfg.get("client_idle_secs", PROXY_CLIENT_IDLE_SECS), PROXY_CLIENT_IDLE_SECS)
+        self.timeout = idle if idle > 0 else None
+        self.requests_served = 0
+        self.body_consumed = False
+        super().setup()
+        try:
+            # Header and body are written separately; avoid Nagle/delayed-ACK stalls on reused connections.
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except Exception:
+            pass
+
+    def handle_one_request(self):
+        self.body_consumed = False
+        super().handle_one_request()
+
+    def _keep_alive(self) -> bool:
+        """Decide whether this connection can stay open after the current response."""
+        cfg = getattr(self.server, "cfg", None) or {}
+        if not _safe_bool(cfg.get("client_keepalive", PROXY_CLIENT_KEEPALIVE), PROXY_CLIENT_KEEPALIVE):
+            return False
+        if getattr(self.server, "shutting_down", False):
+            return False
+        conn_hdr = (self.headers.get("Connection", "") or "").lower() if self.headers else ""
+        if "close" in conn_hdr:
+            return False
+        if self.request_version != "HTTP/1.1" and "keep-alive" not in conn_hdr:
+            return False
+        # The next request can only be parsed if this one's body was fully read off the socket.
+        if self.headers.get("Transfer-Encoding"):
+            return False
+        if not self.body_consumed and _safe_int(self.headers.get("Content-Length"), 0) > 0:
+            return False
+        max_requests = _safe_int(cfg.get("client_max_requests", PROXY_CLIENT_MAX_REQUESTS), PROXY_CLIENT_MAX_REQUESTS)
+        return self.requests_served < max_requests
+
+    def _send_connection_headers(self):
+        """Emit Connection/Keep-Alive headers and set close_connection for the current response."""
+        self.requests_served = getattr(self, "requests_served", 0) + 1
+        if self._keep_alive():
+            cfg = getattr(self.server, "cfg", None) or {}
+            max_requests = _safe_int(cfg.get("client_max_requests", PROXY_CLIENT_MAX_REQUESTS), PROXY_CLIENT_MAX_REQUESTS)
+            idle = int(_safe_float(cfg.get("client_idle_secs", PROXY_CLIENT_IDLE_SECS), PROXY_CLIENT_IDLE_SECS))
+            self.send_header("Connection", "keep-alive")
+            self.send_header("Keep-Alive", f"timeout={idle}, max={max(0, max_requests - self.requests_served)}")
+            self.close_connection = False
+        else:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+
     def log_message(self, format, *args):
         # Silence default stderr logging; handled via per-listener logger
         if hasattr(self.server, "logger") and self.server.logger:
@@ -8312,15 +10692,7 @@ class PaygProxyHandler(BaseHTTPRequestHandler):
                 pass
 
     def _log(self, level: str, msg: str):
-        logger = getattr(self.server, "logger", None)
-        if not logger:
-            return
-        fn = getattr(logger, level, None)
-        if callable(fn):
-            try:
-                fn(msg)
-            except Exception:
-                pass
+        _proxy_log(self.server, level, msg)
 
     def _near_log_rotation(self) -> bool:
         """Return True if a rotation would occur for this log write."""
@@ -8358,54 +10730,25 @@ class PaygProxyHandler(BaseHTTPRequestHandler):
         return True
 
     def _client_ip(self, trust_forwarded: bool) -> str:
-        if trust_forwarded:
-            xr = self.headers.get("X-Real-Ip", "")
-            if xr:
-                return xr.split(",")[0].strip()
-            xf = self.headers.get("X-Forwarded-For", "")
-            if xf:
-                return xf.split(",")[0].strip()
-        ip = self.client_address[0]
-        if ":" in ip and ip.count(":") == 1:
-            ip = ip.split(":")[0]
-        return ip
+        return _proxy_client_ip(self.headers, self.client_address[0], trust_forwarded)
 
     def do_OPTIONS(self):
         """Handle CORS preflight for proxy endpoints."""
-        try:
-            origin = self.headers.get("Origin")
-        except Exception:
-            origin = None
-        allowed_origin = _resolve_proxy_cors_origin(origin, self.server.cfg)
-        allow_headers = self.headers.get("Access-Control-Request-Headers", "*")
         self.send_response(204)
-        if allowed_origin:
-            self.send_header("Access-Control-Allow-Origin", allowed_origin)
-            if allowed_origin != "*":
-                self.send_header("Access-Control-Allow-Credentials", "true")
-                self.send_header("Vary", "Origin")
-            self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
-            self.send_header("Access-Control-Allow-Headers", allow_headers)
-            self.send_header("Access-Control-Max-Age", "86400")
+        for hk, hv in _proxy_preflight_headers(self.server.cfg, self.headers).items():
+            self.send_header(hk, hv)
+        self.send_header("Content-Length", "0")
+        self._send_connection_headers()
         self.end_headers()
-        self.close_connection = True
 
     def _send_json(self, status: int, payload: dict, extra_headers: dict | None = None):
         body_bytes = json.dumps(payload, indent=2).encode()
         self.send_response(status)
         self.send_header("Content-Type", "application/json")
         self.send_header("Content-Length", str(len(body_bytes)))
-        self.send_header("Connection", "close")
-        try:
-            origin = self.headers.get("Origin")
-        except Exception:
-            origin = None
-        allowed_origin = _resolve_proxy_cors_origin(origin, self.server.cfg)
-        if allowed_origin:
-            self.send_header("Access-Control-Allow-Origin", allowed_origin)
-            if allowed_origin != "*":
-                self.send_header("Access-Control-Allow-Credentials", "true")
-                self.send_header("Vary", "Origin")
+        self._send_connection_headers()
+        for hk, hv in _proxy_cors_headers(self.server.cfg, self.headers).items():
+            self.send_header(hk, hv)
         if extra_headers:
             for k, v in extra_headers.items():
                 self.send_header(k, v)
@@ -8414,8 +10757,7 @@ class PaygProxyHandler(BaseHTTPRequestHandler):
             self.wfile.write(body_bytes)
             self.wfile.flush()
         except Exception:
-            pass
-        self.close_connection = True
+            self.close_connection = True
 
     def do_GET(self):
         # Special status endpoint for health of the listener itself (use /arkeostatus to avoid intercepting upstream /status)
@@ -8423,151 +10765,7 @@ class PaygProxyHandler(BaseHTTPRequestHandler):
         # Pass server ref into cfg for lane helper access to active contract
         cfg["_server_ref"] = self.server
         if self.path.strip("/").split("?")[0] == "arkeostatus":
-            node = cfg.get("node_rpc") or ARKEOD_NODE
-            sentinel = cfg.get("provider_sentinel_api") or SENTINEL_URI_DEFAULT
-            service_id = cfg.get("service_id")
-            service_name = cfg.get("service_name")
-            client_key = cfg.get("client_key") or KEY_NAME
-            client_pub_local = getattr(self.server, "client_pubkey", "") or ""
-            if not client_pub_local:
-                raw, bech, err = derive_pubkeys(client_key, KEYRING)
-                if not err:
-                    client_pub_local = bech
-                    self.server.client_pubkey = bech
-            try:
-                req_origin = self.headers.get("Origin")
-            except Exception:
-                req_origin = None
-            allow_origin = _resolve_proxy_cors_origin(req_origin, cfg)
-            payload = {
-                "client_pub_local": client_pub_local,
-                "active_contract": getattr(self.server, "active_contract", None),
-                "last_code": getattr(self.server, "last_code", None),
-                "last_nonce": getattr(self.server, "last_nonce", None),
-                "provider_pubkey": cfg.get("provider_pubkey"),
-                "service_id": service_id,
-                "service_name": service_name,
-                "sentinel": cfg.get("provider_sentinel_api"),
-                "height": None,
-                "active_contract_provider_moniker": None,
-                "cors_request_origin": req_origin,
-                "cors_allow_origin": allow_origin,
-            }
-            try:
-                height_val, _from_cache = _get_height_with_source(node)
-                payload["height"] = height_val
-            except Exception:
-                payload["height"] = None
-
-            # If we don't already have an active_contract cached, try to select one
-            if not payload.get("active_contract"):
-                try:
-                    cur_h, height_from_cache = _get_height_with_source(node)
-                    try:
-                        height_skew = int(PROXY_HEIGHT_SKEW or 0) if height_from_cache else 0
-                    except Exception:
-                        height_skew = 0
-                    # ensure contract cache map
-                    if not hasattr(self.server, "contract_cache"):
-                        self.server.contract_cache = {}
-                    contract_cache = self.server.contract_cache
-
-                    candidates = _candidate_providers(cfg)
-                    provider_filter = None
-                    sentinel = None
-                    if candidates:
-                        provider_filter = candidates[0].get("provider_pubkey") or cfg.get("provider_pubkey")
-                        sentinel = candidates[0].get("sentinel_url") or cfg.get("provider_sentinel_api")
-                    if not provider_filter:
-                        provider_filter = cfg.get("provider_pubkey")
-                    active = None
-                    cache_entry = contract_cache.get(provider_filter) if provider_filter else None
-                    if cache_entry:
-                        active = cache_entry.get("contract")
-                    if not active:
-                        contracts = _fetch_contracts(node, timeout=PROXY_CONTRACT_TIMEOUT, active_only=True, client_filter=client_pub_local)
-                        active = _select_active_contract(
-                            contracts or [],
-                            client_pub_local,
-                            _safe_int(service_id, 0),
-                            cur_h,
-                            provider_filter=provider_filter,
-                            height_skew=height_skew,
-                        )
-                    if active and provider_filter:
-                        try:
-                            contract_cache[provider_filter] = {"contract": active, "cached_at": time.time()}
-                        except Exception:
-                            pass
-                except Exception as e:
-                    payload["active_contract_detail"] = f"Failed to load contract: {e}"
-                    active = None
-                if active:
-                    payload["active_contract"] = active
-                    try:
-                        pm = _active_provider_moniker(active.get("provider"))
-                        if pm:
-                            payload["active_contract_provider_moniker"] = pm
-                            active = dict(active)
-                            active["provider_moniker"] = pm
-                            payload["active_contract"] = active
-                    except Exception:
-                        pass
-                    try:
-                        _update_top_service_contract(cfg.get("listener_id"), provider_filter or active.get("provider"), active.get("id"), None)
-                    except Exception:
-                        pass
-                    payload["active_contract_detail"] = "Active contract found for the selected provider service."
-                    try:
-                        cid = active.get("id")
-                        if cid and client_pub_local:
-                            payload["contract_claims_url"] = f"{sentinel}/claims?contract_id={cid}&client={client_pub_local}"
-                        if cid:
-                            payload["contract_manage_url_hint"] = f"{sentinel}/manage/contract/{cid}"
-                        if cid and sentinel:
-                            ok_cfg, cfg_data, cfg_err = _fetch_contract_config(
-                                cid,
-                                sentinel,
-                                client_key,
-                                cfg.get("sign_template", PROXY_SIGN_TEMPLATE),
-                            )
-                            if ok_cfg and cfg_data is not None:
-                                payload["contract_config"] = cfg_data
-                            elif cfg_err:
-                                payload["contract_config_error"] = cfg_err
-                    except Exception:
-                        pass
-                    if provider_filter:
-                        payload["provider_pubkey"] = provider_filter
-                    try:
-                        self.server.active_contract = active
-                        if hasattr(self.server, "active_contracts") and provider_filter:
-                            self.server.active_contracts[provider_filter] = active
-                    except Exception:
-                        pass
-                    # try to pick last nonce if cached
-                    try:
-                        if hasattr(self.server, "last_nonce_cache"):
-                            last_nc = self.server.last_nonce_cache
-                            if isinstance(last_nc, dict):
-                                payload["last_nonce"] = last_nc.get(str(active.get("id")))
-                    except Exception:
-                        pass
-                else:
-                    payload["active_contract_detail"] = "No active contract found for the selected provider service."
-            # If we already had an active_contract cached, still try to enrich with moniker
-            if payload.get("active_contract") and not payload.get("active_contract_provider_moniker"):
-                try:
-                    pm = _active_provider_moniker(payload["active_contract"].get("provider"))
-                    if pm:
-                        payload["active_contract_provider_moniker"] = pm
-                        ac = dict(payload["active_contract"])
-                        ac["provider_moniker"] = pm
-                        payload["active_contract"] = ac
-                except Exception:
-                    pass
-
-            return self._send_json(200, payload)
+            return self._send_json(200, _arkeostatus_payload(self.server, self.headers))
         # Forward GET requests through the same payg flow (needed for REST-style services/tests)
         try:
             return self._do_post_inner(method="GET")
@@ -8581,24 +10779,8 @@ class PaygProxyHandler(BaseHTTPRequestHandler):
             return self._do_post_inner()
         except Exception as e:
             tb = traceback.format_exc()
-            try:
-                last = getattr(self.server, "last_candidate", {}) if hasattr(self.server, "last_candidate") else {}
-                last_nonce = getattr(self.server, "last_nonce", None)
-                last_nonce_source = getattr(self.server, "last_nonce_source", None)
-            except Exception:
-                last, last_nonce, last_nonce_source = {}, None, None
             self._log("error", f"unhandled proxy exception: {e}\n{tb}")
-            payload = {
-                "error": "proxy_exception",
-                "detail": str(e),
-                "sentinel": last.get("sentinel"),
-                "provider": last.get("provider"),
-                "service_id": last.get("service_id"),
-                "service_name": last.get("service_name"),
-                "last_nonce": last_nonce,
-                "last_nonce_source": last_nonce_source,
-            }
-            return self._send_json(502, payload)
+            return self._send_json(502, _proxy_exception_payload(self.server, e))
 
 def _do_post_inner(self, method: str = "POST"):
     sem = getattr(self.server, "lane_sem", None)
@@ -8620,19 +10802,19 @@ def _do_post_inner(self, method: str = "POST"):
             except Exception:
                 pass
 
-def _do_post_inner_core(self, method: str = "POST"):
-    """Parse request, enforce whitelist, enqueue to lane, return upstream response."""
-    cfg = self.server.cfg
+def _lane_admit(server, method: str, raw_path: str, headers, body: bytes, client_ip: str, on_done=None, defer_upstream=None):
+    """Enforce the whitelist and enqueue a request on the listener's lane.
+
+    Returns (work, None) once queued (or already completed from the response cache), or
+    (None, (status, payload, extra_headers)) to answer right away.
+    """
+    cfg = server.cfg
     # Make the server available to the lane worker for caching/state.
-    cfg["_server_ref"] = self.server
+    cfg["_server_ref"] = server
     method = (method or "POST").upper()
     req_id = uuid.uuid4().hex
-    try:
-        body_len = int(self.headers.get("Content-Length", "0"))
-    except Exception:
-        body_len = 0
 
-    parsed_path = urllib.parse.urlparse(self.path or "/")
+    parsed_path = urllib.parse.urlparse(raw_path or "/")
     incoming_path = parsed_path.path or "/"
     service = cfg.get("service_name") or cfg.get("service_slug") or cfg.get("service_id") or ""
     svc_id = _safe_int(cfg.get("service_id"), 0)
@@ -8652,61 +10834,36 @@ def _do_post_inner_core(self, method: str = "POST"):
         service_path = f"{service}/{remainder}" if service else remainder
 
     try:
-        body = self.rfile.read(body_len) if body_len > 0 else b""
-    except Exception:
-        body = b""
-
-    try:
-        self._log("info", f"req start service={service} svc_id={svc_id} bytes={len(body)} method={method}")
+        _proxy_log(server, "info", f"req start service={service} svc_id={svc_id} bytes={len(body)} method={method}")
     except Exception:
         pass
 
-    trust_forwarded = _safe_bool(cfg.get("trust_forwarded", PROXY_TRUST_FORWARDED), bool(PROXY_TRUST_FORWARDED))
-    client_ip = self._client_ip(trust_forwarded)
+    log_ctx = f"listener={cfg.get('listener_id')} method={method} path={req_path} service={service} service_id={svc_id} ip={client_ip}"
     wl = _parse_whitelist(cfg.get("whitelist_ips") or PROXY_WHITELIST_IPS)
     allow_all = any(ip == "0.0.0.0" for ip in wl)
     if not allow_all:
         if client_ip not in wl:
             try:
-                self._log("warning", f"whitelist block ip={client_ip} wl={wl}")
+                _proxy_log(server, "warning", f"whitelist block ip={client_ip} wl={wl}")
             except Exception:
                 pass
             try:
-                self._log(
-                    "error",
-                    f"request failed code=403 error=ip_not_whitelisted listener={cfg.get('listener_id')} "
-                    f"method={method} path={req_path} service={service} service_id={svc_id} ip={client_ip} request_id={req_id}",
-                )
+                _proxy_log(server, "error", f"request failed code=403 error=ip_not_whitelisted {log_ctx} request_id={req_id}")
             except Exception:
                 pass
-            return self._send_json(
+            return None, (
                 403,
                 {"error": "ip not whitelisted", "ip": client_ip, "request_id": req_id},
                 {"X-Arkeo-Request-Id": req_id},
             )
 
-    lane = getattr(self.server, "lane_exec", None)
-    lane_timeout = getattr(self.server, "lane_timeout", PROXY_TIMEOUT_SECS)
-    if not lane:
-        try:
-            self._log(
-                "error",
-                f"request failed code=500 error=lane_not_initialized listener={cfg.get('listener_id')} "
-                f"method={method} path={req_path} service={service} service_id={svc_id} ip={client_ip} request_id={req_id}",
-            )
-        except Exception:
-            pass
-        return self._send_json(
-            500,
-            {"error": "lane_not_initialized", "request_id": req_id},
-            {"X-Arkeo-Request-Id": req_id},
-        )
-
+    lane = getattr(server, "lane_exec", None)
+    lane_timeout = getattr(server, "lane_timeout", PROXY_TIMEOUT_SECS)
     work = WorkItem(
         method=method,
         path=service_path,
         query=orig_query,
-        headers=dict(self.headers),
+        headers=dict(headers),
         body=body,
         client_ip=client_ip,
         deadline=time.time() + float(lane_timeout),
@@ -8715,12 +10872,46 @@ def _do_post_inner_core(self, method: str = "POST"):
     )
     try:
         work.request_id = req_id
+        work.log_ctx = log_ctx
+        work.on_done = on_done
+        if defer_upstream is not None:
+            work.defer_upstream = lambda call, lane: defer_upstream(work, call, lane)
     except Exception:
         pass
     try:
-        setattr(self.server, "last_request_id", req_id)
+        setattr(server, "last_request_id", req_id)
     except Exception:
         pass
+
+    # Response cache: answer repeat reads of fixed results without a paid request.
+    work.cache_rule = _response_cache_rule(cfg, method, service_path, orig_query, body, headers)
+    if work.cache_rule is not None:
+        try:
+            hit = _RESPONSE_CACHE.get(work.cache_rule)
+        except Exception:
+            hit = None
+        if hit is not None:
+            value, content_type = hit
+            _proxy_log(server, "info", f"cache hit {log_ctx} request_id={req_id}")
+            work.complete(
+                {
+                    "status": 200,
+                    "body": cache_hit_body(work.cache_rule, value),
+                    "headers": {"Content-Type": content_type, "X-Arkeo-Cache": "hit"},
+                }
+            )
+            return work, None
+
+    if not lane:
+        try:
+            _proxy_log(server, "error", f"request failed code=500 error=lane_not_initialized {log_ctx} request_id={req_id}")
+        except Exception:
+            pass
+        return None, (
+            500,
+            {"error": "lane_not_initialized", "request_id": req_id},
+            {"X-Arkeo-Request-Id": req_id},
+        )
     if not lane.submit(work):
         qsz_val = None
         qmax_val = None
@@ -8732,21 +10923,21 @@ def _do_post_inner_core(self, method: str = "POST"):
                 qsz = None
             qsz_val = qsz
             try:
-                qmax_val = lane.q.maxsize
+                qmax_val = lane.maxsize
             except Exception:
                 qmax_val = None
             if qsz is not None:
-                self._log("warning", f"lane queue full qsize={qsz}")
+                _proxy_log(server, "warning", f"lane queue full qsize={qsz}")
             else:
-                self._log("warning", "lane queue full")
+                _proxy_log(server, "warning", "lane queue full")
         except Exception:
             pass
         try:
-            self._log(
+            _proxy_log(
+                server,
                 "error",
-                f"request failed code=503 error=lane_queue_full listener={cfg.get('listener_id')} "
-                f"method={method} path={req_path} service={service} service_id={svc_id} "
-                f"ip={client_ip} qsize={qsz_val if qsz_val is not None else 'unknown'} "
+                f"request failed code=503 error=lane_queue_full {log_ctx} "
+                f"qsize={qsz_val if qsz_val is not None else 'unknown'} "
                 f"request_id={req_id}",
             )
         except Exception:
@@ -8754,7 +10945,7 @@ def _do_post_inner_core(self, method: str = "POST"):
         detail = None
         if qsz_val is not None or qmax_val is not None:
             detail = f"lane queue full size={qsz_val} max={qmax_val}"
-        return self._send_json(
+        return None, (
             503,
             {"error": "listener busy", "detail": detail or "lane queue full", "request_id": req_id},
             {"X-Arkeo-Request-Id": req_id},
@@ -8766,40 +10957,82 @@ def _do_post_inner_core(self, method: str = "POST"):
         except Exception:
             qsz_after = None
         if qsz_after is not None:
-            self._log("info", f"lane enqueue ok qsize={qsz_after}")
+            _proxy_log(server, "info", f"lane enqueue ok qsize={qsz_after}")
     except Exception:
         pass
+    return work, None
+
 
+def _response_cache_rule(cfg: dict, method: str, service_path: str, query: str, body: bytes, headers):
+    """CacheRule when the listener caches responses and this request may be served from cache."""
+    if not _safe_bool(cfg.get("response_cache", PROXY_RESPONSE_CACHE), PROXY_RESPONSE_CACHE):
+        return None
     try:
-        resp = work.response.get(timeout=lane_timeout)
+        # Forced-provider requests (tests, rechecks) must reach the provider.
+        if headers.get("X-Arkeo-Force-Provider"):
+            return None
+        if str(headers.get("Cache-Control") or "").strip().lower() in ("no-cache", "no-store"):
+            return None
+        return cache_rule_for_request(
+            str(cfg.get("listener_id")),
+            cfg.get("service_family") or _service_family(cfg.get("service_id"), cfg.get("service_name")),
+            method,
+            service_path,
+            query,
+            body,
+        )
     except Exception:
-        work.cancelled = True
-        try:
-            qsz = None
-            try:
-                qsz = lane.q.qsize()
-            except Exception:
-                qsz = None
-            if qsz is not None:
-                self._log("warning", f"lane timeout waiting for worker response qsize={qsz}")
-            else:
-                self._log("warning", "lane timeout waiting for worker response")
-        except Exception:
-            pass
+        return None
+
+
+def _response_cache_store(rule, resp: dict, cfg: dict) -> None:
+    """Store a lane answer for a cacheable request and tag it X-Arkeo-Cache: miss."""
+    try:
+        body = resp.get("body")
+        if int(resp.get("status") or 0) != 200 or not isinstance(body, (bytes, bytearray, str)):
+            return
+        if isinstance(body, str):
+            body = body.encode()
+        hdrs = resp.get("headers") if isinstance(resp.get("headers"), dict) else {}
+        head_ttl = _safe_float(cfg.get("response_cache_head_ttl_ms", PROXY_CACHE_HEAD_TTL_MS), PROXY_CACHE_HEAD_TTL_MS) / 1000.0
+        _RESPONSE_CACHE.store_value(rule, bytes(body), hdrs.get("Content-Type") or "application/json", head_ttl)
+        hdrs["X-Arkeo-Cache"] = "miss"
+    except Exception:
+        pass
+
+
+def _lane_timeout_reply(server, work: WorkItem) -> tuple[int, dict, dict]:
+    """Cancel a request whose lane response did not arrive in time and build the 503 reply."""
+    work.cancelled = True
+    _discard_lane_result(work)
+    lane = getattr(server, "lane_exec", None)
+    lane_timeout = getattr(server, "lane_timeout", PROXY_TIMEOUT_SECS)
+    req_id = getattr(work, "request_id", None)
+    try:
+        qsz = None
         try:
-            self._log(
-                "error",
-                f"request failed code=503 error=lane_timeout listener={cfg.get('listener_id')} "
-                f"method={method} path={req_path} service={service} service_id={svc_id} ip={client_ip} request_id={req_id}",
-            )
+            qsz = lane.q.qsize()
         except Exception:
-            pass
-        return self._send_json(
-            503,
-            {"error": "timeout", "detail": f"lane timeout {lane_timeout}s", "request_id": req_id},
-            {"X-Arkeo-Request-Id": req_id},
-        )
+            qsz = None
+        if qsz is not None:
+            _proxy_log(server, "warning", f"lane timeout waiting for worker response qsize={qsz}")
+        else:
+            _proxy_log(server, "warning", "lane timeout waiting for worker response")
+    except Exception:
+        pass
+    try:
+        _proxy_log(server, "error", f"request failed code=503 error=lane_timeout {getattr(work, 'log_ctx', '')} request_id={req_id}")
+    except Exception:
+        pass
+    return (
+        503,
+        {"error": "timeout", "detail": f"lane timeout {lane_timeout}s", "request_id": req_id},
+        {"X-Arkeo-Request-Id": req_id},
+    )
 
+
+def _lane_reply(server, resp: dict, headers, req_id: str) -> tuple[int, dict, bytes]:
+    """Turn a lane worker result into (status, headers, body) with request id and CORS applied."""
     status = resp.get("status", 502)
     body_bytes = resp.get("body", b"")
     hdrs = resp.get("headers", {})
@@ -8809,34 +11042,137 @@ def _do_post_inner_core(self, method: str = "POST"):
         hdrs["X-Arkeo-Request-Id"] = req_id
     except Exception:
         pass
-    try:
-        self.send_response(status)
-        origin = self.headers.get("Origin")
-        allowed_origin = _resolve_proxy_cors_origin(origin, self.server.cfg)
-        if allowed_origin:
-            hdrs["Access-Control-Allow-Origin"] = allowed_origin
-            if allowed_origin != "*":
-                hdrs.setdefault("Access-Control-Allow-Credentials", "true")
-                hdrs.setdefault("Vary", "Origin")
-            else:
-                hdrs.pop("Access-Control-Allow-Credentials", None)
-                hdrs.pop("Vary", None)
+    origin = headers.get("Origin")
+    allowed_origin = _resolve_proxy_cors_origin(origin, server.cfg)
+    if allowed_origin:
+        hdrs["Access-Control-Allow-Origin"] = allowed_origin
+        if allowed_origin != "*":
+            hdrs.setdefault("Access-Control-Allow-Credentials", "true")
+            hdrs.setdefault("Vary", "Origin")
         else:
-            hdrs.pop("Access-Control-Allow-Origin", None)
             hdrs.pop("Access-Control-Allow-Credentials", None)
+            hdrs.pop("Vary", None)
+    else:
+        hdrs.pop("Access-Control-Allow-Origin", None)
+        hdrs.pop("Access-Control-Allow-Credentials", None)
+    return status, hdrs, body_bytes
+
+
+class _StreamFrames:
+    """Iterator of client frames for a streamed upstream body: raw bytes, or HTTP/1.1 chunks with optional trailers.
+
+    Memory stays at one PROXY_STREAM_CHUNK buffer whatever the response size. Raises if the upstream ends
+    short of its Content-Length so the writer drops the connection instead of sending a truncated body.
+    """
+
+    def __init__(self, stream: StreamedResponse, chunked: bool, trailers: bool):
+        self.stream = stream
+        self.chunked = chunked
+        self.trailers = trailers
+        self.done = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> bytes:
+        if self.done:
+            raise StopIteration
+        data = self.stream.read(PROXY_STREAM_CHUNK)
+        if data:
+            return b"%x\r\n%s\r\n" % (len(data), data) if self.chunked else data
+        self.done = True
+        total = self.stream.bytes_read
+        if not self.chunked:
+            if self.stream.length is not None and total < self.stream.length:
+                raise ConnectionError(f"upstream closed after {total} of {self.stream.length} bytes")
+            raise StopIteration
+        tail = b"0\r\n"
+        if self.trailers:
+            stream_ms = int((time.time() - self.stream.opened_at) * 1000)
+            tail += f"X-Arkeo-Stream-Bytes: {total}\r\nX-Arkeo-Stream-Ms: {stream_ms}\r\n".encode()
+        return tail + b"\r\n"
+
+    def close(self) -> None:
+        self.stream.close()
+
+
+def _stream_framing(stream: StreamedResponse, request_version: str, headers) -> tuple[_StreamFrames, dict, bool]:
+    """Pick framing for a streamed body: (frames, framing headers, close_after).
+
+    Content-Length is passed through when known. HTTP/1.1 clients get chunked encoding otherwise, or when
+    they accept trailers (TE: trailers) so stream size/duration can follow the body; HTTP/1.0 clients get a
+    close-delimited body.
+    """
+    te = (headers.get("TE", "") or "").lower() if headers is not None else ""
+    want_trailers = "trailers" in te and request_version == "HTTP/1.1"
+    if request_version == "HTTP/1.1" and (stream.length is None or want_trailers):
+        hdrs = {"Transfer-Encoding": "chunked"}
+        if want_trailers:
+            hdrs["Trailer"] = "X-Arkeo-Stream-Bytes, X-Arkeo-Stream-Ms"
+        return _StreamFrames(stream, True, want_trailers), hdrs, False
+    if stream.length is not None:
+        return _StreamFrames(stream, False, False), {"Content-Length": str(stream.length)}, False
+    return _StreamFrames(stream, False, False), {}, True
+
+
+def _do_post_inner_core(self, method: str = "POST"):
+    """Parse request, enforce whitelist, enqueue to lane, return upstream response."""
+    cfg = self.server.cfg
+    try:
+        body_len = int(self.headers.get("Content-Length", "0"))
+    except Exception:
+        body_len = 0
+    try:
+        body = self.rfile.read(body_len) if body_len > 0 else b""
+        self.body_consumed = len(body) == body_len
+    except Exception:
+        body = b""
+
+    trust_forwarded = _safe_bool(cfg.get("trust_forwarded", PROXY_TRUST_FORWARDED), bool(PROXY_TRUST_FORWARDED))
+    client_ip = self._client_ip(trust_forwarded)
+    work, early = _lane_admit(self.server, method, self.path, self.headers, body, client_ip)
+    if work is None:
+        return self._send_json(*early)
+
+    lane_timeout = getattr(self.server, "lane_timeout", PROXY_TIMEOUT_SECS)
+    try:
+        resp = work.response.get(timeout=lane_timeout)
+    except Exception:
+        return self._send_json(*_lane_timeout_reply(self.server, work))
+
+    frames = None
+    try:
+        status, hdrs, body_bytes = _lane_reply(self.server, resp, self.headers, work.request_id)
+        self.send_response(status)
         for hk, hv in hdrs.items():
             self.send_header(hk, hv)
-        self.send_header("Content-Length", str(len(body_bytes)))
-        self.send_header("Connection", "close")
-        self.end_headers()
-        if body_bytes:
-            self.wfile.write(body_bytes)
-        self.close_connection = True
+        if isinstance(body_bytes, StreamedResponse):
+            frames, framing, close_after = _stream_framing(body_bytes, self.request_version, self.headers)
+            for hk, hv in framing.items():
+                self.send_header(hk, hv)
+            if close_after:
+                self.send_header("Connection", "close")
+                self.close_connection = True
+            else:
+                self._send_connection_headers()
+            self.end_headers()
+            for frame in frames:
+                self.wfile.write(frame)
+        else:
+            self.send_header("Content-Length", str(len(body_bytes)))
+            self._send_connection_headers()
+            self.end_headers()
+            if body_bytes:
+                self.wfile.write(body_bytes)
     except Exception as e:
+        self.close_connection = True
         try:
             self._log("error", f"failed to send lane response: {e}")
         except Exception:
             pass
+    finally:
+        if frames is not None:
+            frames.close()
     return
 
 # Bind the lane-aware handlers to the handler class
@@ -8849,9 +11185,137 @@ class PaygProxyServer(socketserver.ThreadingMixIn, HTTPServer):
     daemon_threads = True
 
 
+def _async_json_response(server, headers, status: int, payload: dict, extra_headers: dict | None = None) -> AsyncResponse:
+    hdrs = {"Content-Type": "application/json"}
+    hdrs.update(_proxy_cors_headers(server.cfg, headers))
+    if extra_headers:
+        hdrs.update(extra_headers)
+    return AsyncResponse(status, hdrs, json.dumps(payload, indent=2).encode())
 
-def _test_payload_for_service(service_id, service_name):
-    """Return (body_bytes, headers_dict, method_label) for a simple test."""
+
+async def _async_upstream_step(work: WorkItem, call: UpstreamCall, lane) -> None:
+    """Await a lane's deferred sentinel call on the loop, then hand the request back to the lane."""
+    try:
+        work.step_result = await _perform_upstream_call_async(call)
+    except BaseException as e:
+        work.step_result = _upstream_call_error(call, e)
+        if not isinstance(e, Exception):
+            raise
+    finally:
+        lane.resume(work)
+
+
+async def _async_lane_request(server, request, method: str) -> AsyncResponse:
+    """Async counterpart of _do_post_inner: same admission/lane path, awaiting the lane result on the loop.
+
+    Sentinel calls are awaited on the loop too (see _run_lane_steps), so a request in flight costs a
+    coroutine and a socket; server.inflight_max bounds them instead of the threaded lane_sem.
+    """
+    inflight_max = getattr(server, "inflight_max", 0)
+    if inflight_max and server.inflight >= inflight_max:
+        req_id = uuid.uuid4().hex
+        return _async_json_response(
+            server,
+            request.headers,
+            503,
+            {"error": "listener busy", "detail": "in-flight limit reached", "request_id": req_id},
+            {"X-Arkeo-Request-Id": req_id},
+        )
+    server.inflight += 1
+    try:
+        cfg = server.cfg
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+
+        def _on_done(resp: dict):
+            loop.call_soon_threadsafe(lambda: fut.done() or fut.set_result(resp))
+
+        def _defer_upstream(work: WorkItem, call: UpstreamCall, lane) -> None:
+            asyncio.run_coroutine_threadsafe(_async_upstream_step(work, call, lane), loop)
+
+        trust_forwarded = _safe_bool(cfg.get("trust_forwarded", PROXY_TRUST_FORWARDED), bool(PROXY_TRUST_FORWARDED))
+        client_ip = _proxy_client_ip(request.headers, request.peer[0], trust_forwarded)
+        work, early = _lane_admit(
+            server, method, request.path, request.headers, request.body, client_ip, on_done=_on_done, defer_upstream=_defer_upstream
+        )
+        if work is None:
+            return _async_json_response(server, request.headers, *early)
+        lane_timeout = getattr(server, "lane_timeout", PROXY_TIMEOUT_SECS)
+        try:
+            resp = await asyncio.wait_for(fut, lane_timeout)
+        except asyncio.TimeoutError:
+            return _async_json_response(server, request.headers, *_lane_timeout_reply(server, work))
+        status, hdrs, body_bytes = _lane_reply(server, resp, request.headers, work.request_id)
+        if isinstance(body_bytes, StreamedResponse):
+            frames, framing, close_after = _stream_framing(body_bytes, request.version, request.headers)
+            hdrs.update(framing)
+            return AsyncResponse(status, hdrs, close=close_after, stream=frames)
+        return AsyncResponse(status, hdrs, body_bytes)
+    finally:
+        server.inflight -= 1
+
+
+async def _async_proxy_handle(server, request) -> AsyncResponse:
+    """Request entry point for async listeners; mirrors PaygProxyHandler's do_OPTIONS/do_GET/do_POST."""
+    cfg = server.cfg
+    cfg["_server_ref"] = server
+    method = request.method.upper()
+    if method == "OPTIONS":
+        return AsyncResponse(204, _proxy_preflight_headers(cfg, request.headers))
+    if method not in ("GET", "POST"):
+        return _async_json_response(server, request.headers, 501, {"error": "unsupported method", "method": method})
+    if method == "GET" and request.path.strip("/").split("?")[0] == "arkeostatus":
+        # Chain/sentinel lookups are blocking; keep them off the event loop.
+        payload = await asyncio.get_running_loop().run_in_executor(None, _arkeostatus_payload, server, request.headers)
+        return _async_json_response(server, request.headers, 200, payload)
+    try:
+        return await _async_lane_request(server, request, method)
+    except Exception as e:
+        tb = traceback.format_exc()
+        if method == "GET":
+            _proxy_log(server, "error", f"unhandled proxy exception (GET): {e}\n{tb}")
+            return _async_json_response(server, request.headers, 502, {"error": "proxy_exception", "detail": str(e)})
+        _proxy_log(server, "error", f"unhandled proxy exception: {e}\n{tb}")
+        return _async_json_response(server, request.headers, 502, _proxy_exception_payload(server, e))
+
+
+class AsyncPaygProxyServer(AsyncHttpServer):
+    """Listener served from the shared asyncio loop; exposes the same srv attributes as PaygProxyServer."""
+
+    server_version = PaygProxyHandler.server_version
+
+    def __init__(self, server_address):
+        self.cfg: dict = {}
+        self.logger = None
+        # Requests admitted and not yet answered (touched only on the loop thread).
+        self.inflight = 0
+        self.inflight_max = PROXY_ASYNC_MAX_INFLIGHT
+        super().__init__(server_address, _async_proxy_handle)
+
+    @property
+    def keepalive(self) -> bool:
+        return _safe_bool(self.cfg.get("client_keepalive", PROXY_CLIENT_KEEPALIVE), PROXY_CLIENT_KEEPALIVE)
+
+    @property
+    def idle_timeout(self) -> float | None:
+        idle = _safe_float(self.cfg.get("client_idle_secs", PROXY_CLIENT_IDLE_SECS), PROXY_CLIENT_IDLE_SECS)
+        return idle if idle > 0 else None
+
+    @property
+    def max_requests(self) -> int:
+        return max(1, _safe_int(self.cfg.get("client_max_requests", PROXY_CLIENT_MAX_REQUESTS), PROXY_CLIENT_MAX_REQUESTS))
+
+    def log_request(self, request, status: int) -> None:
+        if self.logger:
+            try:
+                self.logger.info('"%s" %s -' % (request.requestline, status))
+            except Exception:
+                pass
+
+
+
+def _service_family(service_id, service_name) -> str:
+    """Chain family of a service: evm, btc, cosmos, polkadot, solana, sui or near (evm if unknown)."""
     name = (service_name or "").lower()
     sid = str(service_id or "").strip()
 
@@ -8924,6 +11388,42 @@ def _test_payload_for_service(service_id, service_name):
     sui_ids = {"333", "334"}
     near_ids = {"261", "262", "263"}
 
+    # ID-based routing first
+    if sid in evm_ids or sid in base_ids:
+        return "evm"
+    if sid in btc_ids:
+        return "btc"
+    if sid in cosmos_ids:
+        return "cosmos"
+    if sid in polkadot_ids:
+        return "polkadot"
+    if sid in solana_ids:
+        return "solana"
+    if sid in sui_ids:
+        return "sui"
+    if sid in near_ids:
+        return "near"
+
+    # Name-based fallback
+    if name.startswith("eth") or "ethereum" in name or "evm" in name or name.startswith("base"):
+        return "evm"
+    if name.startswith("btc") or "bitcoin" in name:
+        return "btc"
+    if any(prefix in name for prefix in ("osmosis", "gaia", "arkeo", "cosmos")):
+        return "cosmos"
+    if "polkadot" in name or name.startswith("dot"):
+        return "polkadot"
+    if name.startswith("sol"):
+        return "solana"
+    if name.startswith("sui"):
+        return "sui"
+    if name.startswith("near"):
+        return "near"
+    return "evm"
+
+
+def _test_payload_for_service(service_id, service_name):
+    """Return (body_bytes, headers_dict, method_label) for a simple test."""
     headers = {"Content-Type": "application/json"}
 
     def evm_payload(method: str = "eth_blockNumber"):
@@ -8954,44 +11454,16 @@ def _test_payload_for_service(service_id, service_name):
         body = {"jsonrpc": "2.0", "method": "status", "params": [], "id": "dontcare"}
         return json.dumps(body).encode(), headers, "status JSON-RPC"
 
-    # ID-based routing first
-    if sid in evm_ids:
-        return evm_payload()
-    if sid in base_ids:
-        return evm_payload()
-    if sid in btc_ids:
-        return btc_payload()
-    if sid in cosmos_ids:
-        return cosmos_payload()
-    if sid in polkadot_ids:
-        return polkadot_payload()
-    if sid in solana_ids:
-        return solana_payload()
-    if sid in sui_ids:
-        return sui_payload()
-    if sid in near_ids:
-        return near_payload()
-
-    # Name-based fallback
-    if name.startswith("eth") or "ethereum" in name or "evm" in name:
-        return evm_payload()
-    if name.startswith("base"):
-        return evm_payload()
-    if name.startswith("btc") or "bitcoin" in name:
-        return btc_payload()
-    if any(prefix in name for prefix in ("osmosis", "gaia", "arkeo", "cosmos")):
-        return cosmos_payload()
-    if "polkadot" in name or name.startswith("dot"):
-        return polkadot_payload()
-    if name.startswith("sol"):
-        return solana_payload()
-    if name.startswith("sui"):
-        return sui_payload()
-    if name.startswith("near"):
-        return near_payload()
-
+    payloads = {
+        "btc": btc_payload,
+        "cosmos": cosmos_payload,
+        "polkadot": polkadot_payload,
+        "solana": solana_payload,
+        "sui": sui_payload,
+        "near": near_payload,
+    }
     # Default EVM-style test
-    return evm_payload()
+    return payloads.get(_service_family(service_id, service_name), evm_payload)()
 
 
 def _test_listener_port(
@@ -9093,6 +11565,28 @@ def _build_listener_health_request(listener: dict) -> tuple[str, str, bytes | No
     return method, path, payload_bytes, headers
 
 
+def _top_service_sentinel(listener: dict, provider_pubkey: str) -> str | None:
+    """Sentinel for a listener's provider: stored sentinel_url, else the active service's metadata_uri.
+
+    Works on a stored listener or a live listener cfg (both carry top_services/service_id).
+    """
+    svc_id = listener.get("service_id") or listener.get("service")
+    for ts in listener.get("top_services") or []:
+        if not isinstance(ts, dict) or str(ts.get("provider_pubkey") or ts.get("pubkey")) != str(provider_pubkey):
+            continue
+        if ts.get("sentinel_url"):
+            return _normalize_sentinel_url(ts.get("sentinel_url"))
+        active = _active_service_lookup(provider_pubkey, ts.get("service_id") or ts.get("service") or svc_id)
+        active_raw = active.get("raw") if isinstance(active.get("raw"), dict) else {}
+        mu = active.get("metadata_uri") or active_raw.get("metadata_uri") or ts.get("metadata_uri")
+        if _is_external(mu):
+            return _sentinel_from_metadata_uri(mu)
+        break
+    if str(listener.get("provider_pubkey") or "") == str(provider_pubkey):
+        return _normalize_sentinel_url(listener.get("provider_sentinel_api") or listener.get("sentinel_url"))
+    return None
+
+
 def _recheck_down_providers_once() -> dict:
     data = _ensure_listeners_file()
     listeners = data.get("listeners") if isinstance(data, dict) else []
@@ -9101,6 +11595,7 @@ def _recheck_down_providers_once() -> dict:
     checked = 0
     ok_count = 0
     fail_count = 0
+    handed = 0
     for listener in listeners:
         if DOWN_PROVIDER_RECHECK_MAX > 0 and checked >= DOWN_PROVIDER_RECHECK_MAX:
             break
@@ -9121,6 +11616,15 @@ def _recheck_down_providers_once() -> dict:
         headers["X-Arkeo-Ignore-Metrics"] = "1"
         headers["X-Arkeo-Return-Timings"] = "1"
         for pk in down_providers:
+            if PROXY_BREAKER:
+                # Down providers with a sentinel to probe (including statuses from before a restart)
+                # go to the breakers, which check /metadata.json instead of sending a paid request.
+                sentinel = _top_service_sentinel(listener, pk)
+                if sentinel:
+                    if not _BREAKERS.is_open(str(listener.get("id")), pk):
+                        _BREAKERS.trip(str(listener.get("id")), pk, sentinel)
+                        handed += 1
+                    continue
             if DOWN_PROVIDER_RECHECK_MAX > 0 and checked >= DOWN_PROVIDER_RECHECK_MAX:
                 break
             headers["X-Arkeo-Force-Provider"] = pk
@@ -9134,12 +11638,16 @@ def _recheck_down_providers_once() -> dict:
             checked += 1
             if ok and (code is None or int(code) < 400):
                 ok_count += 1
+                if PROXY_BREAKER:
+                    _BREAKERS.close(str(listener.get("id")), pk)
                 print(f"[recheck] up listener={listener.get('id')} provider={pk} code={code}", flush=True)
             else:
                 fail_count += 1
     if checked:
         print(f"[recheck] checked={checked} ok={ok_count} failed={fail_count}", flush=True)
-    return {"checked": checked, "ok": ok_count, "failed": fail_count}
+    if handed:
+        print(f"[recheck] handed {handed} down provider(s) to the circuit breakers", flush=True)
+    return {"checked": checked, "ok": ok_count, "failed": fail_count, "breaker_probes": handed}
 
 
 def _down_provider_recheck_loop() -> None:
@@ -9161,76 +11669,22 @@ def _down_provider_recheck_loop() -> None:
         time.sleep(sleep_s)
 
 
-def _min_payg_rate(raw: dict) -> tuple[int | None, str | None]:
-    """Return (amount_int, denom) for the lowest pay_as_you_go_rate entry, or (None, None) if missing."""
-    if not isinstance(raw, dict):
-        return None, None
-    rates = raw.get("pay_as_you_go_rate") or raw.get("pay_as_you_go_rates") or []
-    if not isinstance(rates, list):
-        return None, None
-    best_amt = None
-    best_denom = None
-    for r in rates:
-        if not isinstance(r, dict):
-            continue
-        denom = r.get("denom") or r.get("Denom")
-        amt = r.get("amount") or r.get("Amount")
-        if amt is None:
-            continue
-        try:
-            amt_int = int(amt)
-        except (TypeError, ValueError):
-            continue
-        if best_amt is None or amt_int < best_amt:
-            best_amt = amt_int
-            best_denom = denom
-    return best_amt, best_denom
-
-
 def _top_active_services_by_payg(service_id: str, limit: int = 3, preferred_location: str | None = None) -> list[dict]:
     """Return up to `limit` active services for the given service_id, sorted by location then pay-as-you-go rate."""
     if not service_id:
         return []
-    # build provider lookup for moniker/status
-    provider_lookup: dict[str, str] = {}
-    provider_location_lookup: dict[str, str] = {}
-    try:
-        ap = _load_cached("active_providers")
-        prov_list = ap.get("providers") if isinstance(ap, dict) else []
-        if isinstance(prov_list, list):
-            for p in prov_list:
-                if not isinstance(p, dict):
-                    continue
-                pk = p.get("pubkey") or p.get("pub_key") or p.get("pubKey")
-                if not pk:
-                    continue
-                meta = p.get("metadata") or {}
-                moniker = (
-                    (meta.get("config") or {}).get("moniker")
-                    or meta.get("moniker")
-                    or (p.get("provider") or {}).get("moniker")
-                )
-                provider_lookup[pk] = moniker or ""
-                loc = _provider_location_from_meta(p)
-                if loc:
-                    provider_location_lookup[pk] = loc
-    except Exception:
-        pass
-    try:
-        data = _load_cached("active_services")
-    except Exception:
-        data = {}
-    entries = data.get("active_services") or []
-    if not isinstance(entries, list):
-        return []
-    candidates: list[dict] = []
+    idx = _provider_index()
+    services = idx.get("services") or {}
+    providers = idx.get("providers") or {}
     sid_str = str(service_id)
-    for e in entries:
+    candidates: list[dict] = []
+    # by_service is already ordered by rate then pubkey; only a location preference re-sorts it
+    for provider_pk in (idx.get("by_service") or {}).get(sid_str) or []:
+        if not preferred_location and len(candidates) >= limit:
+            break
+        e = (services.get(provider_pk) or {}).get(sid_str)
         if not isinstance(e, dict):
             continue
-        sid_val = e.get("service_id") or e.get("id") or e.get("service")
-        if sid_str != str(sid_val):
-            continue
         raw = e.get("raw") if isinstance(e.get("raw"), dict) else e
         settle = e.get("settlement_duration") or (raw.get("settlement_duration") if isinstance(raw, dict) else None)
         qpm = None
@@ -9241,9 +11695,9 @@ def _top_active_services_by_payg(service_id: str, limit: int = 3, preferred_loca
             min_dur = raw.get("min_contract_duration")
             max_dur = raw.get("max_contract_duration")
         amt, denom = _min_payg_rate(raw or {})
-        provider_pk = e.get("provider_pubkey") or ""
-        moniker = provider_lookup.get(provider_pk) or "(Inactive)"
-        provider_location = provider_location_lookup.get(provider_pk) or ""
+        info = providers.get(provider_pk) or {}
+        moniker = info.get("moniker") or info.get("chain_moniker") or "(Inactive)"
+        provider_location = info.get("location") or ""
         candidates.append(
             {
                 "provider_pubkey": provider_pk,
@@ -9258,16 +11712,9 @@ def _top_active_services_by_payg(service_id: str, limit: int = 3, preferred_loca
                 "raw": e,
             }
         )
-    # sort: first by missing rate (push down), then by amount asc
-    def _sort_key(item: dict):
-        rate = item.get("pay_as_you_go_rate") or {}
-        amt = rate.get("amount")
-        # push None to bottom by treating None as very large
-        amt_key = amt if isinstance(amt, int) else (1 << 62)
-        loc_score = _location_match_score(preferred_location, item.get("provider_location"))
-        return (loc_score, amt_key, item.get("provider_pubkey") or "")
-
-    candidates.sort(key=_sort_key)
+    if preferred_location:
+        # stable sort keeps the rate/pubkey order within each location score
+        candidates.sort(key=lambda item: _location_match_score(preferred_location, item.get("provider_location")))
     return candidates[:limit]
 
 
@@ -9403,10 +11850,8 @@ def providers_with_contracts():
             entries = ps["service"]
         elif entries := [ps]:
             pass
-        if pk in prov_services_lookup:
-            prov_services_lookup[pk].extend(entries)
-        else:
-            prov_services_lookup[pk] = entries
+        # entries may be a list from the shared (read-only) cache; extend a list of our own
+        prov_services_lookup.setdefault(pk, []).extend(entries)
 
     def contract_matches_provider(contract: dict, pubkey: str) -> bool:
         if not isinstance(contract, dict):
@@ -9518,6 +11963,16 @@ def cache_status():
     return jsonify(payload)
 
 
+@app.get("/api/cache-changes")
+def cache_changes():
+    """Return provider/service/contract change sets recorded by the cache sync after ?since=<seq>."""
+    try:
+        since = int(request.args.get("since", "0"))
+    except (TypeError, ValueError):
+        since = 0
+    return jsonify(ChangeLog(CACHE_CHANGE_LOG_PATH).since(since))
+
+
 @app.get("/api/cache-counts")
 def cache_counts():
     """Return counts derived from cached files (active providers/services/contracts/chains)."""
@@ -9629,6 +12084,23 @@ def _sanitize_listener_payload(payload: dict, existing_ports: set[int], current_
                 return None, "bypass_cooldown_sec must be a number"
         else:
             bypass_cooldown_sec = ""
+    lanes = None
+    if "lanes" in payload:
+        raw_lanes = str(payload.get("lanes") if payload.get("lanes") is not None else "").strip()
+        if raw_lanes:
+            try:
+                lanes = int(raw_lanes)
+            except Exception:
+                return None, "lanes must be an integer"
+            if lanes < 1 or lanes > 64:
+                return None, "lanes must be between 1 and 64"
+        else:
+            lanes = ""
+    engine = None
+    if "engine" in payload:
+        engine = str(payload.get("engine") or "").strip().lower()
+        if engine and engine not in PROXY_ENGINES:
+            return None, f"engine must be one of: {', '.join(PROXY_ENGINES)}"
     port_val = payload.get("port")
     port: int | None = None
     if port_val not in (None, ""):
@@ -9656,6 +12128,8 @@ def _sanitize_listener_payload(payload: dict, existing_ports: set[int], current_
         "bypass_password": bypass_password,
         "bypass_timeout_sec": bypass_timeout_sec,
         "bypass_cooldown_sec": bypass_cooldown_sec,
+        "lanes": lanes,
+        "engine": engine,
         "health_method": health_method,
         "health_payload": health_payload,
         "health_header": health_header,
@@ -9725,6 +12199,8 @@ def create_listener():
         "bypass_password": clean.get("bypass_password") or "",
         "bypass_timeout_sec": clean.get("bypass_timeout_sec") if clean.get("bypass_timeout_sec") is not None else "",
         "bypass_cooldown_sec": clean.get("bypass_cooldown_sec") if clean.get("bypass_cooldown_sec") is not None else "",
+        "lanes": clean.get("lanes") if clean.get("lanes") is not None else "",
+        "engine": clean.get("engine") or "",
         "health_method": clean.get("health_method") or "POST",
         "health_payload": clean.get("health_payload") or "",
         "health_header": clean.get("health_header") or "",
@@ -9838,6 +12314,10 @@ def update_listener(listener_id: str):
             l["bypass_timeout_sec"] = clean.get("bypass_timeout_sec")
         if clean.get("bypass_cooldown_sec") is not None:
             l["bypass_cooldown_sec"] = clean.get("bypass_cooldown_sec")
+        if clean.get("lanes") is not None:
+            l["lanes"] = clean.get("lanes")
+        if clean.get("engine") is not None:
+            l["engine"] = clean.get("engine")
         l["health_method"] = clean.get("health_method") or l.get("health_method") or "POST"
         l["health_payload"] = clean.get("health_payload") if clean.get("health_payload") is not None else l.get("health_payload", "")
         l["health_header"] = clean.get("health_header") if clean.get("health_header") is not None else l.get("health_header", "")
@@ -9943,6 +12423,10 @@ def update_listener(listener_id: str):
                 l["bypass_timeout_sec"] = clean.get("bypass_timeout_sec")
             if clean.get("bypass_cooldown_sec") is not None:
                 l["bypass_cooldown_sec"] = clean.get("bypass_cooldown_sec")
+            if clean.get("lanes") is not None:
+                l["lanes"] = clean.get("lanes")
+            if clean.get("engine") is not None:
+                l["engine"] = clean.get("engine")
             l["health_method"] = clean.get("health_method") or l.get("health_method") or "POST"
             l["health_payload"] = clean.get("health_payload") if clean.get("health_payload") is not None else l.get("health_payload", "")
             l["health_header"] = clean.get("health_header") if clean.get("health_header") is not None else l.get("health_header", "")
@@ -10034,6 +12518,17 @@ def delete_listener(listener_id: str):
                     pass
         except Exception:
             pass
+        # Drop runtime state (status, metrics, nonces) for the removed listener.
+        _ROUTER.drop_listener(str(listener_id))
+        _BREAKERS.drop_listener(str(listener_id))
+        _RESPONSE_CACHE.drop_scope(str(listener_id))
+        try:
+            store = _runtime_store()
+            if store is not None:
+                _RT_METRICS.drop_listener(str(listener_id))
+                store.delete_listener(str(listener_id))
+        except Exception:
+            pass
     new_list.sort(key=lambda x: x.get("port") if isinstance(x, dict) else 0)
     data["listeners"] = new_list
     data["fetched_at"] = _timestamp()
@@ -10058,6 +12553,7 @@ def delete_listener(listener_id: str):
 def reset_listener_metrics(listener_id: str):
     """Clear response-time metrics for a listener's top services (used before polling)."""
     updated: dict | None = None
+    store = _runtime_store()
 
     def _mut(data: dict) -> bool:
         nonlocal updated
@@ -10070,6 +12566,10 @@ def reset_listener_metrics(listener_id: str):
             if str(l.get("id")) != str(listener_id):
                 continue
             top = l.get("top_services") if isinstance(l.get("top_services"), list) else []
+            if store is not None:
+                pks = [str(ts.get("provider_pubkey")) for ts in top if isinstance(ts, dict) and ts.get("provider_pubkey")]
+                _RT_METRICS.reset(str(listener_id), pks)
+                store.reset_metrics(str(listener_id), pks)
             for ts in top:
                 if not isinstance(ts, dict):
                     continue
@@ -10080,8 +12580,11 @@ def reset_listener_metrics(listener_id: str):
                 # Per-provider warm-up: ignore the first sample after reset.
                 ts["rt_ignore_next"] = True
             l["top_services"] = top
-            l["updated_at"] = _timestamp()
             updated = l
+            if store is not None:
+                # Metrics live in the runtime store; listeners.json is left untouched.
+                return False
+            l["updated_at"] = _timestamp()
             return True
         return False
 
@@ -10380,6 +12883,24 @@ def test_listener(listener_id: str):
             payload["last_nonce"] = getattr(srv, "last_nonce", None)
             payload["last_nonce_source"] = getattr(srv, "last_nonce_source", None)
             payload["last_nonce_cache"] = getattr(srv, "last_nonce_cache", None)
+            mgr = getattr(srv, "contract_mgr", None)
+            if mgr is not None:
+                payload["contract_manager"] = mgr.snapshot()
+            opener = getattr(srv, "contract_opener", None)
+            if opener is not None:
+                payload["contract_opener"] = opener.snapshot()
+            hedge_stats = getattr(srv, "hedge_stats", None)
+            if isinstance(hedge_stats, dict):
+                payload["hedge"] = dict(hedge_stats)
+            payload["routing"] = {
+                "policy": str(target.get("routing") or PROXY_ROUTING).strip().lower(),
+                "providers": _ROUTER.snapshot(str(listener_id)),
+            }
+            if PROXY_BREAKER:
+                payload["breakers"] = _BREAKERS.snapshot(str(listener_id))
+            if _safe_bool(target.get("response_cache", PROXY_RESPONSE_CACHE), PROXY_RESPONSE_CACHE):
+                payload["response_cache"] = _RESPONSE_CACHE.stats(str(listener_id))
+            payload["contract_index"] = _CONTRACT_INDEX.summary()
             last_timings = getattr(srv, "last_timings", None)
             if isinstance(last_timings, dict):
                 payload["last_timings"] = last_timings
@@ -11249,6 +13770,20 @@ _recheck_thread = threading.Thread(target=_down_provider_recheck_loop, daemon=Tr
 _recheck_thread.start()
 _telemetry_thread = threading.Thread(target=_telemetry_bootstrap, daemon=True)
 _telemetry_thread.start()
+_metrics_flush_thread = threading.Thread(target=_rt_metrics_flush_loop, daemon=True)
+_metrics_flush_thread.start()
+_breaker_thread = threading.Thread(target=_breaker_probe_loop, daemon=True)
+_breaker_thread.start()
+atexit.register(_flush_rt_metrics)
+atexit.register(_flush_all_listener_nonces)
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=API_PORT)
+    import signal
+
+    def _on_sigterm(*_args):
+        # supervisord stops programs with SIGTERM; exit normally so atexit flushes metrics and nonces.
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, _on_sigterm)
+    # Listener servers and their state live in this process, so it is served threaded only.
+    serve(app, API_PORT)
@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+"""Minimal asyncio HTTP/1.1 server and upstream client for the async PAYG listener engine.
+
+Every async listener port is served from one shared event loop thread, so idle and
+waiting client connections cost a coroutine instead of an OS thread. Requests are parsed
+into the same header object BaseHTTPRequestHandler uses (http.client.HTTPMessage) and
+handed to an async handler; persistent connections follow the threaded engine's
+keep-alive rules (HTTP/1.1 or explicit keep-alive, idle timeout, max requests).
+
+AsyncUpstreamPool is the loop-side counterpart of http_pool.HttpPool: a keep-alive
+client whose requests are awaited on the same loop, so a request waiting on a sentinel
+holds a socket and a coroutine rather than a lane thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import email.parser
+import email.utils
+import http.client
+import base64
+import socket
+import ssl
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import deque
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from http_pool import DEFAULT_USER_AGENT, PoolUnsupported
+
+MAX_LINE = 65536
+MAX_HEADERS = 100
+MAX_BODY = 32 * 1024 * 1024
+SYS_VERSION = "Python/" + sys.version.split()[0]
+
+
+class BadRequest(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class AsyncRequest:
+    __slots__ = ("method", "path", "version", "headers", "body", "peer", "requestline")
+
+    def __init__(self, method: str, path: str, version: str, headers: http.client.HTTPMessage, body: bytes, peer: Tuple[str, int], requestline: str):
+        self.method = method
+        self.path = path
+        self.version = version
+        self.headers = headers
+        self.body = body
+        self.peer = peer
+        self.requestline = requestline
+
+
+class AsyncResponse:
+    """A response body given as bytes, or as stream: a blocking iterator of ready-to-send frames.
+
+    Streamed responses carry their own framing headers (Content-Length or Transfer-Encoding); frames are
+    pulled in the loop's executor so a slow upstream never blocks the event loop.
+    """
+
+    __slots__ = ("status", "headers", "body", "close", "stream")
+
+    def __init__(self, status: int, headers: Optional[Dict[str, str]] = None, body: bytes = b"", close: bool = False, stream=None):
+        self.status = int(status)
+        self.headers = headers or {}
+        self.body = body or b""
+        self.close = close
+        self.stream = stream
+
+
+class EventLoopThread:
+    """A background thread running one asyncio loop forever."""
+
+    def __init__(self, name: str = "async-http"):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def call(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the loop from another thread and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+
+_SHARED_LOOP: Optional[EventLoopThread] = None
+_SHARED_LOOP_LOCK = threading.Lock()
+
+
+def shared_loop() -> EventLoopThread:
+    global _SHARED_LOOP
+    with _SHARED_LOOP_LOCK:
+        if _SHARED_LOOP is None:
+            _SHARED_LOOP = EventLoopThread()
+        return _SHARED_LOOP
+
+
+Handler = Callable[["AsyncHttpServer", AsyncRequest], Awaitable[AsyncResponse]]
+
+
+class AsyncHttpServer:
+    """Listening socket served by the shared loop; mirrors socketserver's serve_forever/shutdown/server_close."""
+
+    server_version = "AsyncHTTP/1.0"
+    protocol_version = "HTTP/1.1"
+    keepalive = True
+    idle_timeout: Optional[float] = 15.0
+    max_requests = 100
+
+    def __init__(self, server_address: Tuple[str, int], handler: Handler, loop_thread: Optional[EventLoopThread] = None):
+        self.server_address = server_address
+        self.handler = handler
+        self.loop_thread = loop_thread or shared_loop()
+        self.shutting_down = False
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._stopped = threading.Event()
+        # writer -> True while a request is being handled on that connection
+        self._conns: Dict[asyncio.StreamWriter, bool] = {}
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.socket.bind(server_address)
+            self.socket.listen(socket.SOMAXCONN)
+            self.socket.setblocking(False)
+        except OSError:
+            self.socket.close()
+            raise
+
+    # lifecycle -----------------------------------------------------------------------------------------
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        """Start accepting on the shared loop and block until shutdown() (keeps the threaded lifecycle)."""
+        try:
+            self.loop_thread.call(self._start())
+        except Exception:
+            self._stopped.set()
+            raise
+        while not self._stopped.wait(poll_interval):
+            pass
+
+    async def _start(self):
+        self._server = await asyncio.start_server(self._serve_conn, sock=self.socket, limit=MAX_LINE)
+
+    def shutdown(self) -> None:
+        self.shutting_down = True
+        try:
+            self.loop_thread.call(self._stop(), timeout=10)
+        except Exception:
+            pass
+        self._stopped.set()
+
+    async def _stop(self):
+        if self._server is not None:
+            self._server.close()
+        # Idle keep-alive connections are closed now; busy ones close after their response.
+        for writer, busy in list(self._conns.items()):
+            if not busy:
+                writer.close()
+
+    def server_close(self) -> None:
+        try:
+            self.socket.close()
+        except Exception:
+            pass
+
+    def connection_count(self) -> int:
+        return len(self._conns)
+
+    # hooks -------------------------------------------------------------------------------------------------
+    def log_request(self, request: AsyncRequest, status: int) -> None:
+        pass
+
+    # connection handling ---------------------------------------------------------------------------------
+    async def _read(self, aw):
+        if self.idle_timeout:
+            return await asyncio.wait_for(aw, self.idle_timeout)
+        return await aw
+
+    async def _read_line(self, reader: asyncio.StreamReader) -> bytes:
+        try:
+            line = await self._read(reader.readuntil(b"\n"))
+        except asyncio.LimitOverrunError:
+            raise BadRequest(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "line too long")
+        except asyncio.IncompleteReadError as e:
+            if e.partial:
+                raise BadRequest(HTTPStatus.BAD_REQUEST, "incomplete request")
+            raise
+        return line
+
+    async def _read_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, peer) -> AsyncRequest:
+        requestline = (await self._read_line(reader)).decode("iso-8859-1").rstrip("\r\n")
+        words = requestline.split()
+        if len(words) != 3 or not words[2].startswith("HTTP/"):
+            raise BadRequest(HTTPStatus.BAD_REQUEST, f"Bad request syntax ({requestline!r})")
+        method, path, version = words
+        if version not in ("HTTP/1.0", "HTTP/1.1"):
+            raise BadRequest(HTTPStatus.HTTP_VERSION_NOT_SUPPORTED, f"Invalid HTTP version ({version})")
+
+        lines = []
+        while True:
+            line = await self._read_line(reader)
+            if line in (b"\r\n", b"\n"):
+                break
+            lines.append(line)
+            if len(lines) > MAX_HEADERS:
+                raise BadRequest(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "too many headers")
+        headers = email.parser.Parser(_class=http.client.HTTPMessage).parsestr(b"".join(lines).decode("iso-8859-1"))
+
+        if (headers.get("Expect", "") or "").lower() == "100-continue" and version == "HTTP/1.1":
+            writer.write(f"{version} 100 Continue\r\n\r\n".encode("latin-1"))
+            await writer.drain()
+
+        te = (headers.get("Transfer-Encoding", "") or "").lower()
+        if te:
+            if te != "chunked":
+                raise BadRequest(HTTPStatus.NOT_IMPLEMENTED, f"unsupported transfer-encoding {te}")
+            body = await self._read_chunked(reader)
+        else:
+            try:
+                length = int(headers.get("Content-Length", "0") or 0)
+            except ValueError:
+                raise BadRequest(HTTPStatus.BAD_REQUEST, "bad content-length")
+            if length < 0:
+                raise BadRequest(HTTPStatus.BAD_REQUEST, "bad content-length")
+            if length > MAX_BODY:
+                raise BadRequest(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request body too large")
+            body = await self._read(reader.readexactly(length)) if length else b""
+        return AsyncRequest(method, path, version, headers, body, peer, requestline)
+
+    async def _read_chunked(self, reader: asyncio.StreamReader) -> bytes:
+        parts = []
+        total = 0
+        while True:
+            size_line = (await self._read_line(reader)).split(b";", 1)[0].strip()
+            try:
+                size = int(size_line, 16)
+            except ValueError:
+                raise BadRequest(HTTPStatus.BAD_REQUEST, "bad chunk size")
+            if size == 0:
+                # trailers
+                while (await self._read_line(reader)) not in (b"\r\n", b"\n"):
+                    pass
+                return b"".join(parts)
+            total += size
+            if total > MAX_BODY:
+                raise BadRequest(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request body too large")
+            parts.append(await self._read(reader.readexactly(size)))
+            await self._read_line(reader)
+
+    def _keep_alive(self, request: AsyncRequest, response: AsyncResponse, served: int) -> bool:
+        if not self.keepalive or self.shutting_down or response.close:
+            return False
+        conn_hdr = (request.headers.get("Connection", "") or "").lower()
+        if "close" in conn_hdr:
+            return False
+        if request.version != "HTTP/1.1" and "keep-alive" not in conn_hdr:
+            return False
+        return served < self.max_requests
+
+    def _encode_head(self, version: str, status: int, headers: Dict[str, str]) -> bytes:
+        try:
+            phrase = HTTPStatus(status).phrase
+        except ValueError:
+            phrase = ""
+        out = [f"{version} {status} {phrase}\r\n"]
+        for k, v in headers.items():
+            out.append(f"{k}: {v}\r\n")
+        out.append("\r\n")
+        return "".join(out).encode("latin-1", "strict")
+
+    async def _write_response(self, writer: asyncio.StreamWriter, request: Optional[AsyncRequest], response: AsyncResponse, keep: bool, served: int) -> None:
+        headers = {
+            "Server": f"{self.server_version} {SYS_VERSION}",
+            "Date": email.utils.formatdate(usegmt=True),
+        }
+        headers.update(response.headers)
+        send_body = not (request is not None and request.method == "HEAD")
+        if response.stream is None:
+            headers["Content-Length"] = str(len(response.body))
+        if keep:
+            headers["Connection"] = "keep-alive"
+            headers["Keep-Alive"] = f"timeout={int(self.idle_timeout or 0)}, max={max(0, self.max_requests - served)}"
+        else:
+            headers["Connection"] = "close"
+        writer.write(self._encode_head(self.protocol_version, response.status, headers))
+        if response.stream is not None:
+            await self._write_stream(writer, response.stream if send_body else None)
+            return
+        if send_body and response.body:
+            writer.write(response.body)
+        await writer.drain()
+
+    async def _write_stream(self, writer: asyncio.StreamWriter, stream) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            await writer.drain()
+            while stream is not None:
+                try:
+                    frame = await loop.run_in_executor(None, next, stream, None)
+                except Exception as e:
+                    # Upstream failed mid-body: the only signal left is dropping the connection.
+                    raise ConnectionError(f"stream aborted: {e}")
+                if frame is None:
+                    break
+                writer.write(frame)
+                await writer.drain()
+        finally:
+            close = getattr(stream, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception:
+                    pass
+
+    async def _serve_conn(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info("peername") or ("", 0)
+        try:
+            sock = writer.get_extra_info("socket")
+            if sock is not None:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except Exception:
+            pass
+        self._conns[writer] = False
+        served = 0
+        try:
+            while not self.shutting_down:
+                try:
+                    request = await self._read_request(reader, writer, peer)
+                except BadRequest as e:
+                    body = e.message.encode("utf-8", "replace")
+                    await self._write_response(writer, None, AsyncResponse(e.status, {"Content-Type": "text/plain"}, body), False, served)
+                    break
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, OSError):
+                    break
+                self._conns[writer] = True
+                served += 1
+                try:
+                    response = await self.handler(self, request)
+                except Exception as e:
+                    response = AsyncResponse(500, {"Content-Type": "text/plain"}, str(e).encode("utf-8", "replace"), close=True)
+                keep = self._keep_alive(request, response, served)
+                self.log_request(request, response.status)
+                await self._write_response(writer, request, response, keep, served)
+                self._conns[writer] = False
+                if not keep:
+                    break
+        except (ConnectionError, OSError, asyncio.CancelledError):
+            pass
+        finally:
+            self._conns.pop(writer, None)
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+
+class _UpstreamConn:
+    __slots__ = ("reader", "writer", "last_used")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.time()
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class _StaleConnection(Exception):
+    """A reused connection was closed by the server before any response bytes arrived."""
+
+
+class AsyncUpstreamPool:
+    """Keep-alive HTTP/1.1 client for coroutines on one event loop; request() returns (status, body, headers).
+
+    State is only touched from the loop thread, so there are no locks. Bodies are read in full
+    (Content-Length, chunked or close-delimited). Requests the pool cannot send (env proxy,
+    unsupported scheme) raise PoolUnsupported, like HttpPool.
+    """
+
+    def __init__(self, max_idle: int = 8, idle_timeout: float = 30.0):
+        self.max_idle = max(1, int(max_idle))
+        self.idle_timeout = float(idle_timeout)
+        self.ssl_context = ssl.create_default_context()
+        self.proxies = urllib.request.getproxies()
+        self.idle: Dict[Tuple[str, str, int], deque] = {}
+        self.stats_counts = {"requests": 0, "hits": 0, "misses": 0, "stale_retries": 0, "closed": 0, "in_flight": 0}
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 15.0,
+    ) -> Tuple[int, bytes, Dict[str, str]]:
+        parts = urllib.parse.urlsplit(url)
+        scheme = (parts.scheme or "http").lower()
+        if scheme not in ("http", "https"):
+            raise PoolUnsupported(f"unsupported scheme {scheme}")
+        host = parts.hostname or ""
+        if not host:
+            raise PoolUnsupported("missing host")
+        if self.proxies.get(scheme) and not urllib.request.proxy_bypass(host):
+            raise PoolUnsupported("env proxy configured")
+        port = parts.port or (443 if scheme == "https" else 80)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+
+        send_headers = dict(headers or {})
+        lower = {k.lower() for k in send_headers}
+        if "host" not in lower:
+            default_port = 443 if scheme == "https" else 80
+            send_headers["Host"] = host if port == default_port else f"{host}:{port}"
+        if "user-agent" not in lower:
+            send_headers["User-Agent"] = DEFAULT_USER_AGENT
+        if (parts.username or parts.password) and "authorization" not in lower:
+            cred = f"{urllib.parse.unquote(parts.username or '')}:{urllib.parse.unquote(parts.password or '')}"
+            send_headers["Authorization"] = "Basic " + base64.b64encode(cred.encode("utf-8")).decode("ascii")
+        if body is not None or method.upper() in ("POST", "PUT", "PATCH"):
+            send_headers["Content-Length"] = str(len(body or b""))
+        head = [f"{method} {target} HTTP/1.1\r\n"]
+        for k, v in send_headers.items():
+            head.append(f"{k}: {v}\r\n")
+        head.append("\r\n")
+        payload = "".join(head).encode("latin-1") + (body or b"")
+
+        key = (scheme, host, port)
+        self.stats_counts["requests"] += 1
+        self.stats_counts["in_flight"] += 1
+        try:
+            return await asyncio.wait_for(self._exchange(key, method.upper(), payload), timeout)
+        finally:
+            self.stats_counts["in_flight"] -= 1
+
+    async def _exchange(self, key, method: str, payload: bytes):
+        # A pooled connection may have been closed by the server while idle; retry once on a fresh one.
+        for attempt in (0, 1):
+            conn, reused = await self._acquire(key)
+            try:
+                status, body, resp_headers, keep = await self._round_trip(conn, method, payload, reused)
+            except _StaleConnection:
+                conn.close()
+                if attempt == 0:
+                    self.stats_counts["stale_retries"] += 1
+                    continue
+                raise ConnectionError("upstream closed the connection")
+            except BaseException:
+                # Includes cancellation by the request timeout: the connection is mid-response.
+                conn.close()
+                raise
+            if keep:
+                self._release(key, conn)
+            else:
+                self.stats_counts["closed"] += 1
+                conn.close()
+            return status, body, resp_headers
+        raise ConnectionError("unreachable")
+
+    async def _acquire(self, key) -> Tuple[_UpstreamConn, bool]:
+        now = time.time()
+        idle = self.idle.get(key)
+        while idle:
+            conn = idle.pop()
+            if now - conn.last_used <= self.idle_timeout and not conn.reader.at_eof():
+                self.stats_counts["hits"] += 1
+                return conn, True
+            self.stats_counts["closed"] += 1
+            conn.close()
+        self.stats_counts["misses"] += 1
+        scheme, host, port = key
+        reader, writer = await asyncio.open_connection(
+            host,
+            port,
+            ssl=self.ssl_context if scheme == "https" else None,
+            server_hostname=host if scheme == "https" else None,
+            limit=MAX_LINE,
+        )
+        try:
+            sock = writer.get_extra_info("socket")
+            if sock is not None:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except Exception:
+            pass
+        return _UpstreamConn(reader, writer), False
+
+    def _release(self, key, conn: _UpstreamConn) -> None:
+        idle = self.idle.setdefault(key, deque())
+        if len(idle) >= self.max_idle:
+            self.stats_counts["closed"] += 1
+            conn.close()
+            return
+        conn.last_used = time.time()
+        idle.append(conn)
+
+    async def _round_trip(self, conn: _UpstreamConn, method: str, payload: bytes, reused: bool):
+        reader = conn.reader
+        try:
+            conn.writer.write(payload)
+            await conn.writer.drain()
+            line = await reader.readline()
+        except (ConnectionError, OSError):
+            if reused:
+                raise _StaleConnection()
+            raise
+        if not line:
+            if reused:
+                raise _StaleConnection()
+            raise ConnectionError("upstream closed the connection")
+        while True:
+            words = line.decode("iso-8859-1").rstrip("\r\n").split(None, 2)
+            if len(words) < 2 or not words[0].startswith("HTTP/"):
+                raise ConnectionError(f"bad upstream status line {line[:80]!r}")
+            version = words[0]
+            try:
+                status = int(words[1])
+            except ValueError:
+                raise ConnectionError(f"bad upstream status line {line[:80]!r}")
+            resp_headers = await self._read_headers(reader)
+            if 100 <= status < 200 and status != 101:
+                line = await reader.readline()
+                continue
+            break
+
+        lower = {k.lower(): v for k, v in resp_headers.items()}
+        conn_hdr = (lower.get("connection", "") or "").lower()
+        keep = "close" not in conn_hdr and (version == "HTTP/1.1" or "keep-alive" in conn_hdr)
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            return status, b"", resp_headers, keep
+        if "chunked" in (lower.get("transfer-encoding", "") or "").lower():
+            return status, await self._read_chunked(reader), resp_headers, keep
+        length = lower.get("content-length")
+        if length is not None:
+            try:
+                n = int(length)
+            except ValueError:
+                raise ConnectionError(f"bad upstream content-length {length!r}")
+            return status, await reader.readexactly(n) if n > 0 else b"", resp_headers, keep
+        # Close-delimited body: the connection cannot be reused.
+        return status, await reader.read(), resp_headers, False
+
+    @staticmethod
+    async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+        lines = []
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            lines.append(line)
+            if len(lines) > MAX_HEADERS:
+                raise ConnectionError("too many upstream headers")
+        msg = email.parser.Parser(_class=http.client.HTTPMessage).parsestr(b"".join(lines).decode("iso-8859-1"))
+        return dict(msg.items())
+
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+        parts = []
+        while True:
+            size_line = (await reader.readline()).split(b";", 1)[0].strip()
+            try:
+                size = int(size_line, 16)
+            except ValueError:
+                raise ConnectionError("bad upstream chunk size")
+            if size == 0:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(parts)
+            parts.append(await reader.readexactly(size))
+            await reader.readline()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the admin API; read from another thread, so values may be a moment stale."""
+        out: Dict[str, Any] = dict(self.stats_counts)
+        out["idle"] = {f"{k[0]}://{k[1]}:{k[2]}": len(v) for k, v in list(self.idle.items())}
+        out["max_idle_per_host"] = self.max_idle
+        out["idle_timeout_sec"] = self.idle_timeout
+        return out
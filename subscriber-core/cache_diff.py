@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""Content hashes, record diffs and the change log behind incremental cache rebuilds.
+
+fetch_once hashes each fetched input while ignoring volatile fields such as fetched_at. It
+rebuilds only the derived caches whose inputs changed and leaves unchanged files alone. Hashes
+are kept in a small state file in CACHE_DIR, so the fetch loop and admin-triggered refreshes
+agree. Record-level diffs of providers, services and contracts are appended to a bounded
+change log (cache_changes.json) that consumers poll by sequence number.
+
+Both files are written by the cache_fetcher daemon and by admin-triggered refreshes in the
+API process, so writes hold an flock on <path>.lock and go through a pid-unique temp file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+VOLATILE_KEYS = frozenset({"fetched_at", "_duration_sec", "etag", "last_modified"})
+
+
+def _strip(obj: Any, volatile: frozenset) -> Any:
+    if isinstance(obj, dict):
+        return {k: _strip(v, volatile) for k, v in obj.items() if k not in volatile}
+    if isinstance(obj, (list, tuple)):
+        return [_strip(v, volatile) for v in obj]
+    return obj
+
+
+def content_hash(obj: Any, volatile: frozenset = VOLATILE_KEYS) -> str:
+    """Stable digest of a JSON-like value, ignoring volatile keys at any depth."""
+    blob = json.dumps(_strip(obj, volatile), sort_keys=True, separators=(",", ":"), ensure_ascii=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def record_hashes(records: Iterable[Any], key_fn: Callable[[dict], Optional[str]]) -> Dict[str, str]:
+    """{record key: content hash}; records without a key are skipped, duplicate keys get a #n suffix."""
+    out: Dict[str, str] = {}
+    for rec in records:
+        if not isinstance(rec, dict):
+            continue
+        key = key_fn(rec)
+        if not key:
+            continue
+        unique = key
+        n = 1
+        while unique in out:
+            n += 1
+            unique = f"{key}#{n}"
+        out[unique] = content_hash(rec)
+    return out
+
+
+def diff_hashes(old: Dict[str, str], new: Dict[str, str]) -> Dict[str, List[str]]:
+    return {
+        "added": sorted(k for k in new if k not in old),
+        "removed": sorted(k for k in old if k not in new),
+        "updated": sorted(k for k in new if k in old and old[k] != new[k]),
+    }
+
+
+def diff_is_empty(diff: Dict[str, List[str]]) -> bool:
+    return not (diff.get("added") or diff.get("removed") or diff.get("updated"))
+
+
+def _file_sig(path: str) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+@contextmanager
+def _file_lock(path: str, timeout: float = 3.0):
+    """Hold an exclusive flock on <path>.lock across processes; proceeds unlocked if it cannot be had."""
+    lock_fh = None
+    try:
+        import fcntl  # POSIX-only; acceptable in this environment
+
+        lock_fh = open(f"{path}.lock", "w")
+        deadline = time.time() + timeout
+        while True:
+            try:
+                fcntl.flock(lock_fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.time() > deadline:
+                    print(f"[cache] write lock timeout for {path}; writing without it", flush=True)
+                    lock_fh.close()
+                    lock_fh = None
+                    break
+                time.sleep(0.05)
+    except Exception as e:
+        print(f"[cache] lock acquire failed for {path}: {e}", flush=True)
+        if lock_fh:
+            try:
+                lock_fh.close()
+            except Exception:
+                pass
+        lock_fh = None
+    try:
+        yield
+    finally:
+        if lock_fh:
+            try:
+                import fcntl
+
+                fcntl.flock(lock_fh, fcntl.LOCK_UN)
+            except Exception:
+                pass
+            try:
+                lock_fh.close()
+            except Exception:
+                pass
+
+
+def _write_json(path: str, payload: Any) -> None:
+    # pid-unique: another process may be writing the same file (see _file_lock).
+    tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=True, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+class BuildState:
+    """Input/output hashes and per-record hashes from the last build, persisted as JSON."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.inputs: Dict[str, str] = {}
+        self.outputs: Dict[str, Dict[str, Any]] = {}
+        self.records: Dict[str, Dict[str, str]] = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            if isinstance(raw, dict):
+                self.inputs = dict(raw.get("inputs") or {})
+                self.outputs = dict(raw.get("outputs") or {})
+                self.records = dict(raw.get("records") or {})
+        except (OSError, ValueError):
+            pass
+
+    def input_unchanged(self, name: str, digest: str) -> bool:
+        return self.inputs.get(name) == digest
+
+    def set_input(self, name: str, digest: str) -> None:
+        self.inputs[name] = digest
+
+    def output_current(self, name: str, path: str, digest: str) -> bool:
+        """True when path still holds exactly what we last wrote for name."""
+        rec = self.outputs.get(name)
+        return bool(rec) and rec.get("hash") == digest and rec.get("sig") == _file_sig(path)
+
+    def output_hash(self, name: str) -> Optional[str]:
+        rec = self.outputs.get(name)
+        return rec.get("hash") if rec else None
+
+    def set_output(self, name: str, path: str, digest: str) -> None:
+        self.outputs[name] = {"hash": digest, "sig": _file_sig(path)}
+
+    def swap_records(self, name: str, hashes: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """Store new record hashes; returns the previous ones (None on the first build)."""
+        old = self.records.get(name)
+        self.records[name] = hashes
+        return old
+
+    def save(self) -> None:
+        with _file_lock(self.path):
+            _write_json(self.path, {"inputs": self.inputs, "outputs": self.outputs, "records": self.records})
+
+
+class ChangeLog:
+    """Bounded, sequence-numbered log of record changes, stored as one JSON file."""
+
+    def __init__(self, path: str, max_entries: int = 200):
+        self.path = path
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            if isinstance(raw, dict) and isinstance(raw.get("entries"), list):
+                return raw
+        except (OSError, ValueError):
+            pass
+        return {"seq": 0, "entries": []}
+
+    def append(self, source: str, changes: Dict[str, Any]) -> int:
+        """Record one change set; returns its sequence number."""
+        # The thread lock orders appends in this process; the file lock orders them across processes.
+        with self._lock, _file_lock(self.path):
+            log = self._load()
+            seq = int(log.get("seq") or 0) + 1
+            entry = {"seq": seq, "at": time.time(), "source": source}
+            entry.update(changes)
+            entries = (log.get("entries") or []) + [entry]
+            _write_json(self.path, {"seq": seq, "entries": entries[-self.max_entries:]})
+            return seq
+
+    def since(self, seq: int) -> Dict[str, Any]:
+        """Entries after seq; truncated is True when older entries were already dropped."""
+        log = self._load()
+        cur = int(log.get("seq") or 0)
+        if seq > cur:
+            # The log was reset under the caller; hand back everything and flag a resync.
+            return {"seq": cur, "changes": list(log.get("entries") or []), "truncated": True}
+        entries = [e for e in log.get("entries") or [] if int(e.get("seq") or 0) > seq]
+        oldest = int(entries[0]["seq"]) if entries else cur + 1
+        return {"seq": cur, "changes": entries, "truncated": seq > 0 and oldest > seq + 1}
+
+
+class PartCache:
+    """Derived per-record output, reused while the record's signature is unchanged."""
+
+    def __init__(self):
+        self.parts: Dict[str, Any] = {}
+        self._next: Dict[str, Any] = {}
+        self.reused = 0
+        self.rebuilt = 0
+
+    def begin(self) -> None:
+        self._next = {}
+        self.reused = 0
+        self.rebuilt = 0
+
+    def get(self, sig: str, build: Callable[[], Any]) -> Any:
+        if sig in self.parts:
+            self.reused += 1
+            value = self.parts[sig]
+        else:
+            self.rebuilt += 1
+            value = build()
+        self._next[sig] = value
+        return value
+
+    def end(self) -> Tuple[int, int]:
+        """Drop parts of records that disappeared; returns (reused, rebuilt)."""
+        self.parts = self._next
+        self._next = {}
+        return self.reused, self.rebuilt
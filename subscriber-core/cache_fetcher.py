@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 """Periodic Arkeo cache fetcher for subscriber-core.
 
-Fetches providers, contracts, and services from arkeod every CACHE_FETCH_INTERVAL
-seconds and writes JSON to CACHE_DIR for use by the UI or other helpers.
+Fetches providers, contracts, and services from the Arkeo node every CACHE_FETCH_INTERVAL
+seconds and writes JSON to CACHE_DIR for use by the UI or other helpers. Queries go to the
+node's REST/RPC endpoints (chain_client) and fall back to the arkeod CLI.
 """
 
 from __future__ import annotations
@@ -10,13 +11,22 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import re
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Tuple
 from urllib import request, error
 from urllib.parse import urlparse
 
+from cache_snapshot import load_json_file, write_snapshot
+from provider_index import build_provider_index
+from cache_diff import BuildState, ChangeLog, PartCache, content_hash, diff_hashes, diff_is_empty, record_hashes
+from chain_client import ChainClient, ChainQueryError, client_for
+from metadata_fetcher import MetadataFetcher
+from sync_scheduler import BlockSyncScheduler
+
 ARKEOD_HOME = os.path.expanduser(os.getenv("ARKEOD_HOME", "/root/.arkeo"))
 # These are dynamically refreshed from subscriber-settings.json before each fetch cycle
 ARKEOD_NODE = os.getenv("ARKEOD_NODE") or os.getenv("EXTERNAL_ARKEOD_NODE") or "https://rpc-seed.arkeo.network"
@@ -26,9 +36,15 @@ CACHE_FETCH_INTERVAL = 0  # populated below via env
 STATUS_FILE = os.path.join(CACHE_DIR, "_sync_status.json")
 SUBSCRIBER_SETTINGS_PATH = os.path.join(CONFIG_DIR, "subscriber-settings.json")
 METADATA_CACHE_PATH = os.path.join(CACHE_DIR, "metadata.json")
+BUILD_STATE_PATH = os.path.join(CACHE_DIR, "_build_state.json")
+CHANGE_LOG_PATH = os.path.join(CACHE_DIR, "cache_changes.json")
 METADATA_TTL_SECONDS = int(os.getenv("METADATA_TTL_SECONDS", "3600"))  # 1 hour default
 MIN_SERVICE_BOND = int(os.getenv("MIN_SERVICE_BOND", "100000000"))  # 100_000_000 default
 SERVICE_TYPES_TTL_SECONDS = int(os.getenv("SERVICE_TYPES_TTL_SECONDS", "3600"))  # 1 hour default
+# Chain queries go to the node's REST/RPC endpoints first ("native"); "cli" always shells out to arkeod.
+CHAIN_QUERY_MODE = (os.getenv("CHAIN_QUERY_MODE") or "native").strip().lower()
+ARKEOD_REST = os.getenv("ARKEOD_REST", "")  # REST (LCD) base; derived from ARKEOD_NODE when empty
+_NATIVE_LAST_ERR = None
 _CONTRACTS_PAGE_MODE = None
 _PROVIDERS_PAGE_MODE = None
 _SERVICE_TYPES_PAGE_MODE = None
@@ -44,6 +60,56 @@ def run_list(cmd: List[str]) -> Tuple[int, str]:
         return e.returncode, e.output.decode("utf-8")
 
 
+def _chain_client() -> ChainClient | None:
+    """Native chain client for the current ARKEOD_NODE, or None in CLI mode."""
+    if CHAIN_QUERY_MODE == "cli":
+        return None
+    return client_for(ARKEOD_NODE, ARKEOD_REST or None)
+
+
+def _native_failed(what: str, err: Exception) -> None:
+    global _NATIVE_LAST_ERR
+    msg = f"{what}: {err}"
+    if msg != _NATIVE_LAST_ERR:
+        print(f"[cache] native query failed, using arkeod CLI ({msg})", flush=True)
+    _NATIVE_LAST_ERR = msg
+
+
+def _native_page(
+    resource: str,
+    page_key: str | None = None,
+    page: int | None = None,
+    limit: int | None = None,
+    count_total: bool = False,
+) -> Dict[str, Any] | None:
+    """One list page from the REST endpoint; None means fall back to the CLI."""
+    client = _chain_client()
+    if client is None:
+        return None
+    offset = None
+    if page and page > 1:
+        if not limit:
+            return None
+        offset = (page - 1) * limit
+    try:
+        return client.list_page(resource, page_key=page_key, offset=offset, limit=limit, count_total=count_total)
+    except ChainQueryError as e:
+        _native_failed(resource, e)
+        return None
+
+
+def fetch_status(cmd: List[str]) -> Dict[str, Any]:
+    """Node status from RPC /status, falling back to `arkeod status`."""
+    client = _chain_client()
+    if client is not None:
+        try:
+            return {"fetched_at": timestamp(), "exit_code": 0, "cmd": cmd, "data": client.status()}
+        except ChainQueryError as e:
+            _native_failed("status", e)
+    code, out = run_list(cmd)
+    return normalize_result("status", code, out, cmd)
+
+
 def timestamp() -> str:
     return datetime.now(timezone.utc).isoformat()
 
@@ -102,7 +168,7 @@ def build_commands() -> Dict[str, List[str]]:
         "status": [*base, "status"],
         "provider-services": [*base, "query", "arkeo", "list-providers", "-o", "json"],
         "provider-contracts": [*base, "query", "arkeo", "list-contracts", "-o", "json"],
-        # service-types are fetched via CLI (supports pagination)
+        # service-types are fetched page by page (REST or CLI, see fetch_services_rest)
         "service-types": [],
     }
 
@@ -267,91 +333,98 @@ def fetch_services_rest() -> Dict[str, Any]:
             page=page if page_mode == "page" else None,
             limit=per_page_limit or None,
         )
-        try:
-            code, out = run_list(cmd)
-        except Exception as e:
-            return {
-                "fetched_at": timestamp(),
-                "exit_code": 1,
-                "cmd": ["arkeod query arkeo all-services"],
-                "error": f"rest_err={rest_err}; rpc_exec_err={e}",
-            }
-        if code != 0:
-            if "unknown flag" in out and "--limit" in out:
-                _SERVICE_TYPES_LIMIT_SUPPORTED = False
-                per_page_limit = None
-                page_key = None
-                page = 1
-                pages = 0
-                seen_keys.clear()
-                services = []
-                raw_seen = 0
-                last_pagination = {}
-                continue
-            if page_mode == "page-key" and "unknown flag" in out and "page-key" in out:
-                page_mode = "page"
-                if not forced_mode:
-                    _SERVICE_TYPES_PAGE_MODE = "page"
-                page_key = None
-                page = 1
-                pages = 0
-                seen_keys.clear()
-                services = []
-                raw_seen = 0
-                last_pagination = {}
-                continue
-            if page_mode == "page" and "unknown flag" in out and "--page" in out:
-                page_mode = "none"
-                if not forced_mode:
-                    _SERVICE_TYPES_PAGE_MODE = "none"
-                page_key = None
-                page = 1
-                pages = 0
-                seen_keys.clear()
-                services = []
-                raw_seen = 0
-                last_pagination = {}
-                continue
-            return {
-                "fetched_at": timestamp(),
-                "exit_code": code,
-                "cmd": cmd,
-                "error": f"rpc_err={out}",
-            }
-        try:
-            data_val: Any = json.loads(out)
-        except json.JSONDecodeError:
-            parsed = _parse_services_text(out)
-            if parsed:
+        data_val = _native_page(
+            "services",
+            page_key=page_key if page_mode == "page-key" else None,
+            page=page if page_mode == "page" else None,
+            limit=per_page_limit or None,
+        )
+        if data_val is None:
+            try:
+                code, out = run_list(cmd)
+            except Exception as e:
                 return {
                     "fetched_at": timestamp(),
-                    "exit_code": 0,
+                    "exit_code": 1,
+                    "cmd": ["arkeod query arkeo all-services"],
+                    "error": f"rest_err={rest_err}; rpc_exec_err={e}",
+                }
+            if code != 0:
+                if "unknown flag" in out and "--limit" in out:
+                    _SERVICE_TYPES_LIMIT_SUPPORTED = False
+                    per_page_limit = None
+                    page_key = None
+                    page = 1
+                    pages = 0
+                    seen_keys.clear()
+                    services = []
+                    raw_seen = 0
+                    last_pagination = {}
+                    continue
+                if page_mode == "page-key" and "unknown flag" in out and "page-key" in out:
+                    page_mode = "page"
+                    if not forced_mode:
+                        _SERVICE_TYPES_PAGE_MODE = "page"
+                    page_key = None
+                    page = 1
+                    pages = 0
+                    seen_keys.clear()
+                    services = []
+                    raw_seen = 0
+                    last_pagination = {}
+                    continue
+                if page_mode == "page" and "unknown flag" in out and "--page" in out:
+                    page_mode = "none"
+                    if not forced_mode:
+                        _SERVICE_TYPES_PAGE_MODE = "none"
+                    page_key = None
+                    page = 1
+                    pages = 0
+                    seen_keys.clear()
+                    services = []
+                    raw_seen = 0
+                    last_pagination = {}
+                    continue
+                return {
+                    "fetched_at": timestamp(),
+                    "exit_code": code,
                     "cmd": cmd,
-                    "data": {"services": parsed},
-                    "parsed_from": "arkeod all-services",
+                    "error": f"rpc_err={out}",
                 }
-            return {
-                "fetched_at": timestamp(),
-                "exit_code": 1,
-                "cmd": cmd,
-                "error": f"rest_err={rest_err}; rpc_parse_failed",
-            }
-        if isinstance(data_val, str):
-            parsed = _parse_services_text(data_val)
-            if parsed:
+            try:
+                data_val: Any = json.loads(out)
+            except json.JSONDecodeError:
+                parsed = _parse_services_text(out)
+                if parsed:
+                    return {
+                        "fetched_at": timestamp(),
+                        "exit_code": 0,
+                        "cmd": cmd,
+                        "data": {"services": parsed},
+                        "parsed_from": "arkeod all-services",
+                    }
                 return {
                     "fetched_at": timestamp(),
-                    "exit_code": 0,
+                    "exit_code": 1,
                     "cmd": cmd,
-                    "data": {"services": parsed},
-                    "parsed_from": "arkeod all-services",
+                    "error": f"rest_err={rest_err}; rpc_parse_failed",
+                }
+            if isinstance(data_val, str):
+                parsed = _parse_services_text(data_val)
+                if parsed:
+                    return {
+                        "fetched_at": timestamp(),
+                        "exit_code": 0,
+                        "cmd": cmd,
+                        "data": {"services": parsed},
+                        "parsed_from": "arkeod all-services",
+                    }
+                return {
+                    "fetched_at": timestamp(),
+                    "exit_code": 1,
+                    "cmd": cmd,
+                    "error": f"rest_err={rest_err}; rpc_parse_failed",
                 }
-            return {
-                "fetched_at": timestamp(),
-                "exit_code": 1,
-                "cmd": cmd,
-                "error": f"rest_err={rest_err}; rpc_parse_failed",
-            }
 
         page_services = _extract_service_types_list(data_val)
         if page_services:
@@ -389,13 +462,173 @@ def fetch_services_rest() -> Dict[str, Any]:
     }
 
 
-def _contracts_list_cmd(page_key: str | None = None, page: int | None = None, limit: int | None = None) -> list[str]:
+_NEXT_KEY_RE = re.compile(r'"next_?[kK]ey"\s*:\s*"([^"]+)"')
+
+
+class _Page:
+    """One fetched list page: parsed REST data, or raw CLI output parsed on demand."""
+
+    def __init__(self, cmd: List[str], code: int = 0, out: str = "", data: Any = None):
+        self.cmd = cmd
+        self.code = code
+        self.out = out
+        self.data = data
+
+    def next_key_hint(self) -> str | None:
+        """next_key without a full parse; pagination trails the list in CLI JSON."""
+        if self.data is not None:
+            pagination = _extract_pagination(self.data)
+            next_key = pagination.get("next_key") or pagination.get("nextKey") if isinstance(pagination, dict) else None
+            return str(next_key) if next_key else None
+        match = _NEXT_KEY_RE.search(self.out[-1024:])
+        return match.group(1) if match else None
+
+    def parsed(self) -> Any:
+        if self.data is None:
+            self.data = json.loads(self.out)
+        return self.data
+
+
+def _fetch_list_page(
+    resource: str,
+    cmd_fn: Callable[..., List[str]],
+    page_key: str | None = None,
+    page: int | None = None,
+    limit: int | None = None,
+    count_total: bool = False,
+) -> _Page:
+    cmd = cmd_fn(page_key=page_key, page=page, limit=limit, count_total=count_total)
+    data = _native_page(resource, page_key=page_key, page=page, limit=limit, count_total=count_total)
+    if data is not None:
+        return _Page(cmd, data=data)
+    code, out = run_list(cmd)
+    return _Page(cmd, code, out)
+
+
+def _page_data(pg: _Page, what: str) -> Tuple[Any, Dict[str, Any] | None]:
+    """(parsed page, None) or (None, error payload)."""
+    if pg.code != 0:
+        return None, {"fetched_at": timestamp(), "exit_code": pg.code, "cmd": pg.cmd, "error": pg.out}
+    try:
+        return pg.parsed(), None
+    except json.JSONDecodeError:
+        return None, {"fetched_at": timestamp(), "exit_code": 1, "cmd": pg.cmd, "error": f"invalid JSON from {what}"}
+
+
+def _next_key(pagination: Any) -> str | None:
+    if not isinstance(pagination, dict):
+        return None
+    next_key = pagination.get("next_key") or pagination.get("nextKey")
+    return str(next_key) if next_key else None
+
+
+def _fetch_all_pages(
+    resource: str,
+    cmd_fn: Callable[..., List[str]],
+    extract: Callable[[Any], list],
+    what: str,
+    page_mode: str,
+    limit: int | None,
+    total_cap: int,
+) -> Dict[str, Any]:
+    """Collect every page of a list query.
+
+    page-key mode requests the next page as soon as its key shows up in the raw output, so the
+    fetch overlaps parsing the current page. page mode reads the total from the first page and
+    fetches the remaining offsets on PAGE_FETCH_WORKERS threads, reassembled in page order.
+    Returns {"items", "pages", "pagination"}, {"error": payload}, or {"unsupported": True}
+    when the CLI rejects --page-key.
+    """
+    items: list = []
+    pages = 0
+    last_pagination: Dict[str, Any] = {}
+    pool = ThreadPoolExecutor(max_workers=max(1, PAGE_FETCH_WORKERS), thread_name_prefix=f"pages-{resource}")
+    try:
+        if page_mode == "page-key":
+            seen_keys: set[str] = set()
+            pending = pool.submit(_fetch_list_page, resource, cmd_fn, limit=limit, count_total=True)
+            hint = None
+            while pending is not None:
+                pg = pending.result()
+                pending = None
+                if pg.code != 0 and "unknown flag" in pg.out and "page-key" in pg.out:
+                    return {"unsupported": True}
+                hint = pg.next_key_hint() if pg.code == 0 else None
+                if hint and hint not in seen_keys and not (total_cap and len(items) >= total_cap):
+                    pending = pool.submit(_fetch_list_page, resource, cmd_fn, page_key=hint, limit=limit)
+                data, err = _page_data(pg, what)
+                if err is not None:
+                    return {"error": err}
+                items.extend(extract(data))
+                pages += 1
+                last_pagination = _extract_pagination(data)
+                next_key = _next_key(last_pagination)
+                if (total_cap and len(items) >= total_cap) or not next_key or next_key in seen_keys:
+                    break
+                seen_keys.add(next_key)
+                if pending is None or next_key != hint:
+                    if pending is not None:
+                        pending.cancel()
+                    pending = pool.submit(_fetch_list_page, resource, cmd_fn, page_key=next_key, limit=limit)
+        else:
+            data, err = _page_data(_fetch_list_page(resource, cmd_fn, page=1, limit=limit, count_total=True), what)
+            if err is not None:
+                return {"error": err}
+            page_items = extract(data)
+            items.extend(page_items)
+            pages = 1
+            last_pagination = _extract_pagination(data)
+            try:
+                total = int(last_pagination.get("total") or 0) if isinstance(last_pagination, dict) else 0
+            except (TypeError, ValueError):
+                total = 0
+            if total_cap:
+                total = min(total, total_cap) if total else 0
+            done = not page_items or (limit and len(page_items) < limit) or (total_cap and len(items) >= total_cap)
+            page = 2
+            while not done:
+                # First batch covers the reported total; after that probe a window at a time
+                # until an empty or short page (the set may have grown mid-walk).
+                last = -(-total // limit) if (total and limit and page == 2) else 0
+                if last >= page:
+                    batch = list(range(page, last + 1))
+                else:
+                    batch = list(range(page, page + max(1, PAGE_FETCH_WORKERS)))
+                futures = [pool.submit(_fetch_list_page, resource, cmd_fn, page=p, limit=limit) for p in batch]
+                for fut in futures:
+                    data, err = _page_data(fut.result(), what)
+                    if err is not None:
+                        return {"error": err}
+                    page_items = extract(data)
+                    if not page_items:
+                        done = True
+                        break
+                    items.extend(page_items)
+                    pages += 1
+                    last_pagination = _extract_pagination(data)
+                    if (limit and len(page_items) < limit) or (total_cap and len(items) >= total_cap):
+                        done = True
+                        break
+                page += len(batch)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return {"items": items, "pages": pages, "pagination": last_pagination}
+
+
+def _contracts_list_cmd(
+    page_key: str | None = None,
+    page: int | None = None,
+    limit: int | None = None,
+    count_total: bool = False,
+) -> list[str]:
     cmd = ["arkeod", "--home", ARKEOD_HOME]
     if ARKEOD_NODE:
         cmd.extend(["--node", ARKEOD_NODE])
     cmd.extend(["query", "arkeo", "list-contracts", "-o", "json"])
     if limit:
         cmd.extend(["--limit", str(limit)])
+    if count_total:
+        cmd.append("--count-total")
     if page_key:
         cmd.extend(["--page-key", str(page_key)])
     elif page:
@@ -408,94 +641,39 @@ def fetch_contracts_paginated() -> Dict[str, Any]:
     global _CONTRACTS_PAGE_MODE
     forced_mode = _env_page_mode("CONTRACTS_PAGE_MODE")
     page_mode = forced_mode or _CONTRACTS_PAGE_MODE or "page-key"
-    page_key = None
-    page = 1
-    pages = 0
-    seen_keys: set[str] = set()
-    contracts: list[dict[str, Any]] = []
-    raw_seen = 0
     total_cap = _env_int("CONTRACTS_PAGE_LIMIT", 0)
-    per_page_limit = _page_limit("CONTRACTS_PAGE_SIZE")
-    last_pagination: Dict[str, Any] = {}
-
-    while True:
-        cmd = _contracts_list_cmd(
-            page_key=page_key if page_mode == "page-key" else None,
-            page=page if page_mode == "page" else None,
-            limit=per_page_limit or None,
-        )
-        code, out = run_list(cmd)
-        if code != 0:
-            if page_mode == "page-key" and "unknown flag" in out and "page-key" in out:
-                page_mode = "page"
-                if not forced_mode:
-                    _CONTRACTS_PAGE_MODE = "page"
-                page_key = None
-                page = 1
-                pages = 0
-                seen_keys.clear()
-                contracts = []
-                raw_seen = 0
-                last_pagination = {}
-                continue
-            return {
-                "fetched_at": timestamp(),
-                "exit_code": code,
-                "cmd": cmd,
-                "error": out,
-            }
-        try:
-            data = json.loads(out)
-        except json.JSONDecodeError:
-            return {
-                "fetched_at": timestamp(),
-                "exit_code": 1,
-                "cmd": cmd,
-                "error": "invalid JSON from list-contracts",
-            }
-        page_contracts = _extract_contracts_list(data)
-        if isinstance(page_contracts, list):
-            contracts.extend(page_contracts)
-            raw_seen += len(page_contracts)
-        pages += 1
-        last_pagination = _extract_pagination(data)
-
-        if total_cap and raw_seen >= total_cap:
-            break
-
-        if page_mode == "page-key":
-            next_key = None
-            if isinstance(last_pagination, dict):
-                next_key = last_pagination.get("next_key") or last_pagination.get("nextKey")
-            if not next_key:
-                break
-            next_key = str(next_key)
-            if next_key in seen_keys:
-                break
-            seen_keys.add(next_key)
-            page_key = next_key
-        else:
-            if not page_contracts:
-                break
-            page += 1
-
-    payload = {
+    per_page_limit = _page_limit("CONTRACTS_PAGE_SIZE") or None
+
+    result = _fetch_all_pages("contracts", _contracts_list_cmd, _extract_contracts_list, "list-contracts", page_mode, per_page_limit, total_cap)
+    if result.get("unsupported"):
+        if not forced_mode:
+            _CONTRACTS_PAGE_MODE = "page"
+        result = _fetch_all_pages("contracts", _contracts_list_cmd, _extract_contracts_list, "list-contracts", "page", per_page_limit, total_cap)
+    if "error" in result:
+        return result["error"]
+    return {
         "fetched_at": timestamp(),
         "exit_code": 0,
-        "cmd": _contracts_list_cmd(limit=per_page_limit or None),
-        "data": {"contracts": contracts, "pagination": last_pagination},
-        "pages": pages,
+        "cmd": _contracts_list_cmd(limit=per_page_limit),
+        "data": {"contracts": result["items"], "pagination": result["pagination"]},
+        "pages": result["pages"],
     }
-    return payload
 
 
-def _providers_list_cmd(page_key: str | None = None, page: int | None = None, limit: int | None = None) -> list[str]:
+def _providers_list_cmd(
+    page_key: str | None = None,
+    page: int | None = None,
+    limit: int | None = None,
+    count_total: bool = False,
+) -> list[str]:
     cmd = ["arkeod", "--home", ARKEOD_HOME]
     if ARKEOD_NODE:
         cmd.extend(["--node", ARKEOD_NODE])
     cmd.extend(["query", "arkeo", "list-providers", "-o", "json"])
     if limit:
         cmd.extend(["--limit", str(limit)])
+    if count_total:
+        cmd.append("--count-total")
     if page_key:
         cmd.extend(["--page-key", str(page_key)])
     elif page:
@@ -508,83 +686,22 @@ def fetch_provider_services_paginated() -> Dict[str, Any]:
     global _PROVIDERS_PAGE_MODE
     forced_mode = _env_page_mode("PROVIDER_SERVICES_PAGE_MODE")
     page_mode = forced_mode or _PROVIDERS_PAGE_MODE or "page-key"
-    page_key = None
-    page = 1
-    pages = 0
-    seen_keys: set[str] = set()
-    providers: list[dict[str, Any]] = []
-    raw_seen = 0
     total_cap = _env_int("PROVIDER_SERVICES_PAGE_LIMIT", 0)
-    per_page_limit = _page_limit("PROVIDER_SERVICES_PAGE_SIZE")
-    last_pagination: Dict[str, Any] = {}
-
-    while True:
-        cmd = _providers_list_cmd(
-            page_key=page_key if page_mode == "page-key" else None,
-            page=page if page_mode == "page" else None,
-            limit=per_page_limit or None,
-        )
-        code, out = run_list(cmd)
-        if code != 0:
-            if page_mode == "page-key" and "unknown flag" in out and "page-key" in out:
-                page_mode = "page"
-                if not forced_mode:
-                    _PROVIDERS_PAGE_MODE = "page"
-                page_key = None
-                page = 1
-                pages = 0
-                seen_keys.clear()
-                providers = []
-                raw_seen = 0
-                last_pagination = {}
-                continue
-            return {
-                "fetched_at": timestamp(),
-                "exit_code": code,
-                "cmd": cmd,
-                "error": out,
-            }
-        try:
-            data = json.loads(out)
-        except json.JSONDecodeError:
-            return {
-                "fetched_at": timestamp(),
-                "exit_code": 1,
-                "cmd": cmd,
-                "error": "invalid JSON from list-providers",
-            }
-        page_providers = _extract_providers_list(data)
-        if page_providers:
-            providers.extend(page_providers)
-            raw_seen += len(page_providers)
-        pages += 1
-        last_pagination = _extract_pagination(data)
-
-        if total_cap and raw_seen >= total_cap:
-            break
-
-        if page_mode == "page-key":
-            next_key = None
-            if isinstance(last_pagination, dict):
-                next_key = last_pagination.get("next_key") or last_pagination.get("nextKey")
-            if not next_key:
-                break
-            next_key = str(next_key)
-            if next_key in seen_keys:
-                break
-            seen_keys.add(next_key)
-            page_key = next_key
-        else:
-            if not page_providers:
-                break
-            page += 1
-
+    per_page_limit = _page_limit("PROVIDER_SERVICES_PAGE_SIZE") or None
+
+    result = _fetch_all_pages("providers", _providers_list_cmd, _extract_providers_list, "list-providers", page_mode, per_page_limit, total_cap)
+    if result.get("unsupported"):
+        if not forced_mode:
+            _PROVIDERS_PAGE_MODE = "page"
+        result = _fetch_all_pages("providers", _providers_list_cmd, _extract_providers_list, "list-providers", "page", per_page_limit, total_cap)
+    if "error" in result:
+        return result["error"]
     return {
         "fetched_at": timestamp(),
         "exit_code": 0,
-        "cmd": _providers_list_cmd(limit=per_page_limit or None),
-        "data": {"providers": providers, "pagination": last_pagination},
-        "pages": pages,
+        "cmd": _providers_list_cmd(limit=per_page_limit),
+        "data": {"providers": result["items"], "pagination": result["pagination"]},
+        "pages": result["pages"],
     }
 
 
@@ -702,6 +819,21 @@ def _page_limit(override_env: str) -> int | None:
 
 # Resolve fetch interval after helpers are defined
 CACHE_FETCH_INTERVAL = _env_int("CACHE_FETCH_INTERVAL", 300)
+PAGE_FETCH_WORKERS = _env_int("PAGE_FETCH_WORKERS", 4)
+# metadata_uri fetches: pool size, per-host cap, timeout, and max backoff for unreachable hosts
+_METADATA_FETCHER = MetadataFetcher(
+    timeout=_env_int("METADATA_FETCH_TIMEOUT", 5),
+    workers=_env_int("METADATA_FETCH_WORKERS", 16),
+    per_host=_env_int("METADATA_FETCH_PER_HOST", 2),
+    backoff_max=_env_int("METADATA_BACKOFF_MAX_SECONDS", 3600),
+)
+# Incremental rebuilds: record-level change log, last derived payloads, per-record active_services parts
+_CHANGE_LOG = ChangeLog(CHANGE_LOG_PATH, _env_int("CACHE_CHANGE_LOG_MAX", 200))
+_LAST_BUILT: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+_ACTIVE_SERVICE_PARTS = PartCache()
+# "blocks" follows new blocks and refreshes only what their events touched; "interval" is the fixed loop
+CACHE_SYNC_MODE = (os.getenv("CACHE_SYNC_MODE") or "blocks").strip().lower()
+CACHE_BLOCK_POLL_SECONDS = max(1, _env_int("CACHE_BLOCK_POLL_SECONDS", 3))
 
 
 def _load_metadata_cache() -> dict[str, dict[str, Any]]:
@@ -719,8 +851,7 @@ def _load_metadata_cache() -> dict[str, dict[str, Any]]:
 
 def _load_cache_file(path: str) -> Dict[str, Any]:
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return load_json_file(path)
     except Exception:
         return {}
 
@@ -810,19 +941,33 @@ def _update_metadata_cache_from_providers(provider_services_payload: Dict[str, A
             return True
         return (now - ts) > METADATA_TTL_SECONDS
 
+    jobs: dict[str, tuple[str | None, str | None]] = {}
     for mu in uris:
         entry = cache_map.get(mu)
         if entry and not _is_stale(entry):
             continue
-        data_val, err_val, status_val = fetch_metadata_uri(mu)
-        if status_val == 1:
+        if isinstance(entry, dict) and entry.get("status") in (1, "1"):
+            jobs[mu] = (entry.get("etag"), entry.get("last_modified"))
+        else:
+            jobs[mu] = (None, None)
+
+    for mu, res in _METADATA_FETCHER.fetch_many(jobs).items():
+        if res.not_modified and isinstance(cache_map.get(mu), dict):
+            cache_map[mu] = dict(cache_map[mu], fetched_at=timestamp())
+        elif res.status == 1:
             cache_map[mu] = {
                 "metadata_uri": mu,
                 "fetched_at": timestamp(),
-                "data": data_val,
+                "data": res.data,
                 "error": None,
-                "status": status_val,
+                "status": res.status,
             }
+        if res.status == 1:
+            for key, val in (("etag", res.etag), ("last_modified", res.last_modified)):
+                if val:
+                    cache_map[mu][key] = val
+                else:
+                    cache_map[mu].pop(key, None)
             changed = True
         else:
             # Drop failed/invalid entries from cache so only valid metadata is persisted
@@ -961,9 +1106,79 @@ def build_providers_metadata(provider_payload: Dict[str, Any]) -> Dict[str, Any]
     return out
 
 
-def build_active_services(provider_services_payload: Dict[str, Any], metadata_cache: dict[str, Any] | None = None) -> Dict[str, Any]:
+def _active_services_for_entry(entry: dict[str, Any], meta_cache: dict[str, Any]) -> list[dict[str, Any]]:
+    """active_services items contributed by one provider-services record."""
+    pk = entry.get("pub_key") or entry.get("pubkey") or entry.get("pubKey")
+    if not pk:
+        return []
+    status_val = entry.get("status")
+    status_str = str(status_val).strip().lower() if status_val is not None else ""
+    if status_str not in {"online", "1"} and status_val not in (1, True):
+        return []
+    mu = entry.get("metadata_uri") or entry.get("metadataUri")
+    if not mu or not _is_external(mu):
+        return []
+    meta_entry = meta_cache.get(mu) if meta_cache else None
+    meta_ok = bool(meta_entry and (meta_entry.get("status") == 1 or meta_entry.get("status") == "1"))
+    if not meta_ok:
+        return []
+    # bond threshold
+    bond_val = entry.get("bond") or entry.get("service_bond") or entry.get("bond_amount")
+    try:
+        bond_int = int(bond_val)
+    except Exception:
+        bond_int = 0
+    if bond_int < MIN_SERVICE_BOND:
+        return []
+
+    items: list[dict[str, Any]] = []
+    # Services list may be nested; if absent, still emit the provider-level service if present
+    services_field = []
+    if isinstance(entry.get("services"), list):
+        services_field = entry["services"]
+    elif isinstance(entry.get("service"), list):
+        services_field = entry["service"]
+    if services_field:
+        for svc in services_field:
+            if not isinstance(svc, dict):
+                continue
+            svc_status = svc.get("status")
+            svc_status_str = str(svc_status).strip().lower() if svc_status is not None else ""
+            if svc_status_str not in {"online", "1"} and svc_status not in (1, True):
+                continue
+            items.append(
+                {
+                    "provider_pubkey": pk,
+                    "service_id": svc.get("service_id") or svc.get("id") or svc.get("service"),
+                    "service": svc.get("service") or svc.get("name"),
+                    "metadata_uri": mu,
+                    "metadata": meta_entry.get("data") if isinstance(meta_entry, dict) else None,
+                    "raw": svc,
+                }
+            )
+    else:
+        items.append(
+            {
+                "provider_pubkey": pk,
+                "service_id": entry.get("service_id") or entry.get("id") or entry.get("service"),
+                "service": entry.get("service") or entry.get("name"),
+                "metadata_uri": mu,
+                "metadata": meta_entry.get("data") if isinstance(meta_entry, dict) else None,
+                "raw": entry,
+            }
+        )
+    return items
+
+
+def build_active_services(
+    provider_services_payload: Dict[str, Any],
+    metadata_cache: dict[str, Any] | None = None,
+    parts: PartCache | None = None,
+) -> Dict[str, Any]:
     """
     Build active_services.json directly from provider-services by selecting ONLINE providers/services with cached metadata.
+
+    With parts, items of records whose content and metadata are unchanged are reused from the last build.
     """
     t_start = time.time()
     data = provider_services_payload.get("data") if isinstance(provider_services_payload, dict) else {}
@@ -977,74 +1192,30 @@ def build_active_services(provider_services_payload: Dict[str, Any], metadata_ca
 
     active_services: list[dict[str, Any]] = []
     meta_cache = metadata_cache or {}
+    meta_hashes: dict[str, str] = {}
+    if parts is not None:
+        parts.begin()
 
     for entry in prov_entries:
         if not isinstance(entry, dict):
             continue
-        pk = entry.get("pub_key") or entry.get("pubkey") or entry.get("pubKey")
-        if not pk:
-            continue
-        status_val = entry.get("status")
-        status_str = str(status_val).strip().lower() if status_val is not None else ""
-        if status_str not in {"online", "1"} and status_val not in (1, True):
-            continue
-        mu = entry.get("metadata_uri") or entry.get("metadataUri")
-        if not mu or not _is_external(mu):
-            continue
-        meta_entry = meta_cache.get(mu) if meta_cache else None
-        meta_ok = bool(meta_entry and (meta_entry.get("status") == 1 or meta_entry.get("status") == "1"))
-        if not meta_ok:
-            continue
-        # bond threshold
-        bond_val = entry.get("bond") or entry.get("service_bond") or entry.get("bond_amount")
-        try:
-            bond_int = int(bond_val)
-        except Exception:
-            bond_int = 0
-        if bond_int < MIN_SERVICE_BOND:
+        if parts is None:
+            active_services.extend(_active_services_for_entry(entry, meta_cache))
             continue
-
-        # Services list may be nested; if absent, still emit the provider-level service if present
-        services_field = []
-        if isinstance(entry.get("services"), list):
-            services_field = entry["services"]
-        elif isinstance(entry.get("service"), list):
-            services_field = entry["service"]
-        if services_field:
-            for svc in services_field:
-                if not isinstance(svc, dict):
-                    continue
-                svc_status = svc.get("status")
-                svc_status_str = str(svc_status).strip().lower() if svc_status is not None else ""
-                if svc_status_str not in {"online", "1"} and svc_status not in (1, True):
-                    continue
-                active_services.append(
-                    {
-                        "provider_pubkey": pk,
-                        "service_id": svc.get("service_id") or svc.get("id") or svc.get("service"),
-                        "service": svc.get("service") or svc.get("name"),
-                        "metadata_uri": mu,
-                        "metadata": meta_entry.get("data") if isinstance(meta_entry, dict) else None,
-                        "raw": svc,
-                    }
-                )
-        else:
-            active_services.append(
-                {
-                    "provider_pubkey": pk,
-                    "service_id": entry.get("service_id") or entry.get("id") or entry.get("service"),
-                    "service": entry.get("service") or entry.get("name"),
-                    "metadata_uri": mu,
-                    "metadata": meta_entry.get("data") if isinstance(meta_entry, dict) else None,
-                    "raw": entry,
-                }
-            )
+        mu = str(entry.get("metadata_uri") or entry.get("metadataUri") or "")
+        if mu not in meta_hashes:
+            meta_hashes[mu] = content_hash(meta_cache.get(mu)) if mu else ""
+        sig = content_hash(entry) + meta_hashes[mu]
+        active_services.extend(parts.get(sig, lambda e=entry: _active_services_for_entry(e, meta_cache)))
 
     out = {
         "fetched_at": timestamp(),
         "source": "provider-services",
         "active_services": active_services,
     }
+    if parts is not None:
+        reused, rebuilt = parts.end()
+        print(f"[cache] active_services records reused={reused} rebuilt={rebuilt}", flush=True)
     out["_duration_sec"] = round(time.time() - t_start, 3)
     return out
 
@@ -1239,6 +1410,7 @@ def write_cache(name: str, payload: Dict[str, Any]) -> None:
             json.dump(payload, f, ensure_ascii=True, indent=2)
         os.replace(tmp_path, path)
         print(f"[cache] wrote {name} -> {path} (exit={payload.get('exit_code')})", flush=True)
+        write_snapshot(path, payload)
     except OSError as e:
         print(f"[cache] failed to write {name}: {e}", flush=True)
         try:
@@ -1248,6 +1420,78 @@ def write_cache(name: str, payload: Dict[str, Any]) -> None:
             pass
 
 
+def _write_cache_if_changed(state: BuildState, name: str, payload: Dict[str, Any], digest: str | None = None) -> bool:
+    """write_cache unless the file still holds the same content (fetched_at aside)."""
+    path = os.path.join(CACHE_DIR, f"{name}.json")
+    digest = digest or content_hash(payload)
+    if state.output_current(name, path, digest):
+        print(f"[cache] {name} unchanged; skip write", flush=True)
+        return False
+    write_cache(name, payload)
+    state.set_output(name, path, digest)
+    return True
+
+
+def _derive_cache(state: BuildState, name: str, input_digest: str, build: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+    """Build and write a derived cache unless its inputs are unchanged since the last build; (payload, built)."""
+    path = os.path.join(CACHE_DIR, f"{name}.json")
+    if state.input_unchanged(name, input_digest) and os.path.isfile(path):
+        last = _LAST_BUILT.get(name)
+        if last and last[0] == input_digest:
+            return last[1], False
+        payload = _load_cache_file(path)
+        if payload:
+            _LAST_BUILT[name] = (input_digest, payload)
+            return payload, False
+    payload = build()
+    _write_cache_if_changed(state, name, payload)
+    state.set_input(name, input_digest)
+    _LAST_BUILT[name] = (input_digest, payload)
+    return payload, True
+
+
+def _provider_record_key(rec: dict) -> str | None:
+    pk = rec.get("pub_key") or rec.get("pubkey") or rec.get("pubKey")
+    if not pk:
+        return None
+    svc = rec.get("service") or rec.get("service_id") or rec.get("id") or ""
+    return f"{pk}/{svc}"
+
+
+def _contract_record_key(rec: dict) -> str | None:
+    cid = rec.get("id") or rec.get("contract_id")
+    return str(cid) if cid is not None else None
+
+
+def _log_record_changes(state: BuildState, name: str, records: list, key_fn: Callable[[dict], str | None], kind: str) -> bool:
+    """Diff records against the last build and append the change set to the change log."""
+    hashes = record_hashes(records, key_fn)
+    old = state.swap_records(name, hashes)
+    if old is None:
+        _CHANGE_LOG.append(name, {"reset": True, "counts": {kind: len(hashes)}})
+        return True
+    diff = diff_hashes(old, hashes)
+    if diff_is_empty(diff):
+        return False
+    changes: Dict[str, Any] = {kind: diff}
+    if kind == "services":
+        # provider-services records are per provider/service; roll them up per provider pubkey.
+        old_pks = {k.split("/", 1)[0] for k in old}
+        new_pks = {k.split("/", 1)[0] for k in hashes}
+        touched = {k.split("/", 1)[0] for k in diff["added"] + diff["removed"] + diff["updated"]}
+        changes["providers"] = {
+            "added": sorted(new_pks - old_pks),
+            "removed": sorted(old_pks - new_pks),
+            "updated": sorted(touched & old_pks & new_pks),
+        }
+    seq = _CHANGE_LOG.append(name, changes)
+    print(
+        f"[cache] {name} changed seq={seq} +{len(diff['added'])} -{len(diff['removed'])} ~{len(diff['updated'])}",
+        flush=True,
+    )
+    return True
+
+
 def _load_listeners() -> Dict[str, Any]:
     path = os.path.join(CACHE_DIR, "listeners.json")
     try:
@@ -1405,7 +1649,9 @@ def _sync_listeners_from_active(active_services_payload: Dict[str, Any], active_
                 if mon:
                     merged["provider_moniker"] = mon
                 new_top.append(merged)
-                listener_changed = True
+                # Only rewrite listeners.json when the entry actually changed.
+                if merged != ts:
+                    listener_changed = True
             else:
                 # No longer active -> drop it
                 listener_changed = True
@@ -1429,12 +1675,30 @@ def _sync_listeners_from_active(active_services_payload: Dict[str, Any], active_
     }
 
 
-def fetch_once(commands: Dict[str, List[str]] | None = None, record_status: bool = False) -> Dict[str, Dict[str, Any]]:
+# Datasets whose payloads feed the derived caches (and the BuildState hashes behind them).
+_DERIVED_SOURCES = {"provider-services", "provider-contracts"}
+
+
+def fetch_once(
+    commands: Dict[str, List[str]] | None = None,
+    record_status: bool = False,
+    datasets: set[str] | None = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Fetch every dataset (or only datasets) and rebuild the caches derived from what was fetched."""
     results: Dict[str, Dict[str, Any]] = {}
     _refresh_runtime_settings()
     loop_start = time.time()
-    print(f"[cache] fetch_once start node={ARKEOD_NODE}", flush=True)
+    # Per-block height/validator refreshes derive nothing: skip the build state and the start/done lines.
+    derived = datasets is None or bool(set(datasets) & _DERIVED_SOURCES)
+    if derived:
+        print(f"[cache] fetch_once start node={ARKEOD_NODE}", flush=True)
     commands = build_commands()
+    if datasets is not None:
+        wanted = set(datasets)
+        if "provider-services" in wanted:
+            # TTL-cached; active_service_types needs it next to fresh provider-services
+            wanted.add("service-types")
+        commands = {k: v for k, v in commands.items() if k in wanted}
     start_ts = timestamp()
     if record_status:
         mark_sync_start(start_ts)
@@ -1444,6 +1708,8 @@ def fetch_once(commands: Dict[str, List[str]] | None = None, record_status: bool
     try:
         metadata_cache: dict[str, dict[str, Any]] | None = None
         stage_times: Dict[str, float] = {}
+        state = BuildState(BUILD_STATE_PATH) if derived else None
+        digests: Dict[str, str] = {}
         for name, cmd in commands.items():
             t0 = time.time()
             if name == "service-types":
@@ -1465,6 +1731,11 @@ def fetch_once(commands: Dict[str, List[str]] | None = None, record_status: bool
                 if payload.get("exit_code") != 0:
                     ok = False
                     fatal_errors.append(f"{name} exit={payload.get('exit_code')}")
+            elif name == "status":
+                payload = fetch_status(cmd)
+                if payload.get("exit_code") != 0:
+                    ok = False
+                    fatal_errors.append(f"{name} exit={payload.get('exit_code')}")
             else:
                 code, out = run_list(cmd)
                 payload = normalize_result(name, code, out, cmd)
@@ -1529,12 +1800,19 @@ def fetch_once(commands: Dict[str, List[str]] | None = None, record_status: bool
                                     s["metadata_uri_active"] = True
                 except Exception:
                     pass
-            if name != "status":
+            if name in ("provider-services", "provider-contracts") and payload.get("exit_code") == 0:
+                if name == "provider-services":
+                    _log_record_changes(state, name, _extract_providers_list(payload.get("data")), _provider_record_key, "services")
+                else:
+                    _log_record_changes(state, name, _extract_contracts_list(payload.get("data")), _contract_record_key, "contracts")
+                digests[name] = content_hash(payload)
+                _write_cache_if_changed(state, name, payload, digests[name])
+            elif name != "status":
                 write_cache(name, payload)
             results[name] = payload
             stage_times[name] = time.time() - t0
         # expose metadata cache in results for UI visibility
-        if metadata_cache is None:
+        if metadata_cache is None and datasets is None:
             try:
                 metadata_cache = _load_metadata_cache()
             except Exception:
@@ -1544,36 +1822,80 @@ def fetch_once(commands: Dict[str, List[str]] | None = None, record_status: bool
         # Derive active_services.json first, directly from provider-services + metadata cache
         active_services_payload = None
         active_providers_payload = None
+        # Each derived cache is rebuilt (and rewritten) only when the hash of its inputs changed.
         if "provider-services" in results and results["provider-services"].get("exit_code") == 0:
+            services_in = content_hash(
+                [
+                    digests.get("provider-services") or content_hash(results["provider-services"]),
+                    content_hash(metadata_cache or {}),
+                    MIN_SERVICE_BOND,
+                ]
+            )
             t0 = time.time()
-            active_services_payload = build_active_services(results["provider-services"], metadata_cache or {})
-            write_cache("active_services", active_services_payload)
+            active_services_payload, built = _derive_cache(
+                state,
+                "active_services",
+                services_in,
+                lambda: build_active_services(results["provider-services"], metadata_cache or {}, parts=_ACTIVE_SERVICE_PARTS),
+            )
             results["active_services"] = active_services_payload
-            stage_times["active_services_build"] = time.time() - t0
+            stage_times["active_services_build" if built else "active_services_skip"] = time.time() - t0
             # Derive active_providers.json from active_services
             t1 = time.time()
-            active_providers_payload = build_active_providers_from_active_services(active_services_payload, results["provider-services"], metadata_cache or {})
-            write_cache("active_providers", active_providers_payload)
+            active_providers_payload, built = _derive_cache(
+                state,
+                "active_providers",
+                services_in,
+                lambda: build_active_providers_from_active_services(active_services_payload, results["provider-services"], metadata_cache or {}),
+            )
             results["active_providers"] = active_providers_payload
-            stage_times["active_providers_build"] = time.time() - t1
+            stage_times["active_providers_build" if built else "active_providers_skip"] = time.time() - t1
+            # Derive provider_index.json (lookup maps for the proxy) from both
+            t3 = time.time()
+            index_in = content_hash(
+                [
+                    state.output_hash("active_services") or content_hash(active_services_payload),
+                    state.output_hash("active_providers") or content_hash(active_providers_payload),
+                ]
+            )
+            _, built = _derive_cache(
+                state,
+                "provider_index",
+                index_in,
+                lambda: build_provider_index(active_services_payload, active_providers_payload),
+            )
+            stage_times["provider_index_build" if built else "provider_index_skip"] = time.time() - t3
             # Derive active_service_types.json if service-types cache exists
             if "service-types" in results and results["service-types"].get("exit_code") == 0:
                 t2 = time.time()
-                ast_payload = build_active_service_types(active_services_payload, results["service-types"])
-                write_cache("active_service_types", ast_payload)
+                types_in = content_hash(
+                    [state.output_hash("active_services") or content_hash(active_services_payload), content_hash(results["service-types"])]
+                )
+                ast_payload, built = _derive_cache(
+                    state,
+                    "active_service_types",
+                    types_in,
+                    lambda: build_active_service_types(active_services_payload, results["service-types"]),
+                )
                 results["active_service_types"] = ast_payload
-                stage_times["active_service_types_build"] = time.time() - t2
-        else:
+                stage_times["active_service_types_build" if built else "active_service_types_skip"] = time.time() - t2
+        elif datasets is None or "provider-services" in datasets:
             print("[cache] skip active_services/active_providers_build (provider-services failed)", flush=True)
         # Derive subscribers.json from provider-contracts if available
         if "provider-contracts" in results and results["provider-contracts"].get("exit_code") == 0:
             t0 = time.time()
-            subscribers_payload = build_subscribers_from_contracts(results["provider-contracts"])
-            write_cache("subscribers", subscribers_payload)
+            subscribers_payload, built = _derive_cache(
+                state,
+                "subscribers",
+                digests.get("provider-contracts") or content_hash(results["provider-contracts"]),
+                lambda: build_subscribers_from_contracts(results["provider-contracts"]),
+            )
             results["subscribers"] = subscribers_payload
-            stage_times["subscribers_build"] = time.time() - t0
-        else:
+            stage_times["subscribers_build" if built else "subscribers_skip"] = time.time() - t0
+        elif datasets is None or "provider-contracts" in datasets:
             print("[cache] skip subscribers_build (provider-contracts failed)", flush=True)
+        if state is not None:
+            state.save()
     except Exception as e:
         ok = False
         error_msg = str(e)
@@ -1583,15 +1905,37 @@ def fetch_once(commands: Dict[str, List[str]] | None = None, record_status: bool
             final_err = error_msg or ("; ".join(fatal_errors) if fatal_errors else None)
             mark_sync_end(ok=ok, error=final_err)
         # emit timings
-        try:
-            total = time.time() - loop_start
-            stage_parts = " ".join([f"{k}={stage_times[k]:.2f}s" for k in stage_times])
-            print(f"[cache] fetch_once done total={total:.2f}s {stage_parts}", flush=True)
-        except Exception:
-            pass
+        if derived:
+            try:
+                total = time.time() - loop_start
+                stage_parts = " ".join([f"{k}={stage_times[k]:.2f}s" for k in stage_times])
+                print(f"[cache] fetch_once done total={total:.2f}s {stage_parts}", flush=True)
+            except Exception:
+                pass
     return results
 
 
+def _block_scheduler(full_interval: int) -> BlockSyncScheduler:
+    """Follow new blocks and re-fetch only the datasets their events touched; full cycle every full_interval."""
+
+    def _sync(datasets: set[str] | None) -> None:
+        # Height-only updates do not flip the UI's sync-in-progress status.
+        fetch_once(record_status=datasets is None or bool(datasets - {"status"}), datasets=datasets)
+
+    print(f"[cache] following blocks every {CACHE_BLOCK_POLL_SECONDS}s (full sync every {full_interval}s)", flush=True)
+    return BlockSyncScheduler(
+        latest_height=lambda: _chain_client().latest_height(timeout=5),
+        block_events=lambda height: _chain_client().block_events(height, timeout=10),
+        sync=_sync,
+        datasets=build_commands().keys(),
+        full_interval=full_interval,
+        poll_interval=CACHE_BLOCK_POLL_SECONDS,
+        max_catchup=_env_int("CACHE_BLOCK_MAX_CATCHUP", 50),
+        # Settles/claims land almost every block; coalesce their contract refetches.
+        min_refresh={"provider-contracts": max(0, _env_int("CACHE_CONTRACTS_MIN_REFRESH_SECONDS", 60))},
+    )
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Arkeo cache fetcher")
     parser.add_argument("--once", action="store_true", help="Run a single fetch cycle then exit")
@@ -1617,9 +1961,11 @@ def main() -> None:
     if args.once:
         fetch_once(record_status=True)
         return
-    while True:
-        fetch_once(record_status=True)
-        time.sleep(interval)
+    if CACHE_SYNC_MODE == "interval" or _chain_client() is None:
+        while True:
+            fetch_once(record_status=True)
+            time.sleep(interval)
+    _block_scheduler(interval).run_forever()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""In-memory circuit breakers for a listener's providers.
+
+Each (listener, provider) breaker is closed, open or half_open:
+
+- closed: requests flow. The breaker trips open after `consecutive` failures in a row, or
+  once the last `window` outcomes hold at least `min_requests` with an error rate of
+  `error_rate` or more.
+- open: the provider is skipped for `open_secs`. The period doubles (up to `open_max_secs`)
+  on each failed probe, and when the breaker trips again within `open_max_secs` of closing,
+  since the probe cannot see every failure a paid request can.
+- half_open: the open period is over and a probe is running. The probe is an unpaid GET of the
+  sentinel's /metadata.json; success closes the breaker, failure opens it again.
+
+State lives only in this process; transitions never touch disk. on_close(listener_id,
+provider_pubkey) runs after a probe closes a breaker, so the caller can route to the provider
+again.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class _Breaker:
+    __slots__ = ("state", "outcomes", "failures", "open_until", "open_secs", "trips", "sentinel", "closed_at")
+
+    def __init__(self, window: int):
+        self.state = CLOSED
+        self.outcomes: deque = deque(maxlen=window)
+        self.failures = 0
+        self.open_until = 0.0
+        self.open_secs = 0.0
+        self.trips = 0
+        self.sentinel: Optional[str] = None
+        self.closed_at = 0.0
+
+
+class CircuitBreakers:
+    def __init__(
+        self,
+        probe: Callable[[str], bool],
+        error_rate: float = 0.5,
+        min_requests: int = 5,
+        window: int = 20,
+        consecutive: int = 3,
+        open_secs: float = 10.0,
+        open_max_secs: float = 300.0,
+        on_close: Optional[Callable[[str, str], None]] = None,
+    ):
+        self.probe = probe
+        self.error_rate = error_rate
+        self.min_requests = max(1, int(min_requests))
+        self.window = max(1, int(window))
+        self.consecutive = max(1, int(consecutive))
+        self.base_open_secs = max(0.5, float(open_secs))
+        self.open_max_secs = max(self.base_open_secs, float(open_max_secs))
+        self.on_close = on_close
+        self.lock = threading.Lock()
+        self.entries: Dict[Tuple[str, str], _Breaker] = {}
+
+    def _entry(self, listener_id: str, provider_pubkey: str) -> _Breaker:
+        key = (str(listener_id), str(provider_pubkey))
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = _Breaker(self.window)
+        return entry
+
+    def _open(self, entry: _Breaker, secs: float) -> None:
+        entry.state = OPEN
+        entry.open_secs = min(self.open_max_secs, max(self.base_open_secs, secs))
+        entry.open_until = time.time() + entry.open_secs
+
+    def _close(self, entry: _Breaker) -> None:
+        entry.state = CLOSED
+        entry.outcomes.clear()
+        entry.failures = 0
+        entry.closed_at = time.time()
+
+    def _trip(self, entry: _Breaker) -> None:
+        entry.trips += 1
+        flapping = entry.closed_at and time.time() - entry.closed_at < self.open_max_secs
+        self._open(entry, entry.open_secs * 2 if flapping else self.base_open_secs)
+
+    def record(self, listener_id: str, provider_pubkey: str, ok: bool, sentinel: Optional[str] = None) -> Optional[str]:
+        """Feed one request outcome; returns the new state when this outcome tripped the breaker."""
+        with self.lock:
+            entry = self._entry(listener_id, provider_pubkey)
+            if sentinel:
+                entry.sentinel = sentinel
+            if entry.state != CLOSED:
+                # Stragglers from before the trip; the probe decides when to close.
+                return None
+            entry.outcomes.append(bool(ok))
+            entry.failures = 0 if ok else entry.failures + 1
+            if ok:
+                return None
+            samples = len(entry.outcomes)
+            errors = samples - sum(entry.outcomes)
+            if entry.failures >= self.consecutive or (
+                samples >= self.min_requests and errors / samples >= self.error_rate
+            ):
+                self._trip(entry)
+                return OPEN
+        return None
+
+    def trip(self, listener_id: str, provider_pubkey: str, sentinel: Optional[str] = None) -> None:
+        """Open a closed breaker (e.g. a provider already marked down) so the probe loop checks it."""
+        with self.lock:
+            entry = self._entry(listener_id, provider_pubkey)
+            if sentinel:
+                entry.sentinel = sentinel
+            if entry.state == CLOSED:
+                self._trip(entry)
+
+    def close(self, listener_id: str, provider_pubkey: str) -> None:
+        """Close an open breaker once the provider answered another way (e.g. a paid recheck)."""
+        with self.lock:
+            entry = self.entries.get((str(listener_id), str(provider_pubkey)))
+            if entry is not None and entry.state != CLOSED:
+                self._close(entry)
+
+    def is_open(self, listener_id: str, provider_pubkey: str) -> bool:
+        with self.lock:
+            entry = self.entries.get((str(listener_id), str(provider_pubkey)))
+            return entry is not None and entry.state != CLOSED
+
+    def allowed(self, listener_id: str, candidates: List[dict]) -> List[dict]:
+        """Candidates whose breaker is closed; all of them if every breaker is open."""
+        keep = [c for c in candidates if not self.is_open(listener_id, c.get("provider_pubkey") or "")]
+        return keep or list(candidates)
+
+    def drop_listener(self, listener_id: str) -> None:
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == str(listener_id)]:
+                self.entries.pop(key, None)
+
+    def snapshot(self, listener_id: str) -> Dict[str, Dict[str, Any]]:
+        now = time.time()
+        out: Dict[str, Dict[str, Any]] = {}
+        with self.lock:
+            for (lid, pk), entry in self.entries.items():
+                if lid != str(listener_id):
+                    continue
+                samples = len(entry.outcomes)
+                out[pk] = {
+                    "state": entry.state,
+                    "error_rate": round((samples - sum(entry.outcomes)) / samples, 3) if samples else 0.0,
+                    "consecutive_failures": entry.failures,
+                    "trips": entry.trips,
+                    "retry_in_sec": round(max(0.0, entry.open_until - now), 1) if entry.state == OPEN else None,
+                }
+        return out
+
+    def probe_due(self) -> int:
+        """Probe every open breaker whose open period is over; returns the number probed."""
+        now = time.time()
+        due: List[Tuple[Tuple[str, str], Optional[str]]] = []
+        with self.lock:
+            for key, entry in self.entries.items():
+                if entry.state == OPEN and entry.open_until <= now:
+                    entry.state = HALF_OPEN
+                    due.append((key, entry.sentinel))
+        for (lid, pk), sentinel in due:
+            try:
+                ok = bool(sentinel) and bool(self.probe(sentinel))
+            except Exception:
+                ok = False
+            with self.lock:
+                entry = self.entries.get((lid, pk))
+                if entry is None or entry.state != HALF_OPEN:
+                    continue
+                if ok:
+                    self._close(entry)
+                else:
+                    self._open(entry, entry.open_secs * 2)
+            if ok and self.on_close is not None:
+                try:
+                    self.on_close(lid, pk)
+                except Exception:
+                    pass
+        return len(due)
+
+    def run_probe_loop(self, interval: float = 1.0, log=print) -> None:
+        while True:
+            time.sleep(max(0.2, interval))
+            try:
+                self.probe_due()
+            except Exception as e:
+                try:
+                    log(f"[breaker] probe loop error: {e}")
+                except Exception:
+                    pass
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Local index of open contracts keyed by (client, provider, service).
+
+Lanes and the contract manager look up the active contract for a client/provider/service
+without paging every contract on chain. Only contracts of tracked clients (our listener
+keys) are kept, so memory and lookup cost follow our own contracts, not network size.
+
+The index is fed incrementally: from the cache fetcher's provider-contracts snapshot
+(re-read only when the file changes), from client-filtered chain scans and per-client
+queries, and from contracts we open. A source only removes entries it is newer than, so
+a stale snapshot never drops a contract opened after it was taken.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from cache_snapshot import read_snapshot
+
+Key = Tuple[str, str, int]
+
+
+def _as_int(val: Any, default: int = 0) -> int:
+    try:
+        return int(val)
+    except (TypeError, ValueError):
+        return default
+
+
+def _extract_contracts(data: Any) -> List[dict]:
+    if isinstance(data, list):
+        return [c for c in data if isinstance(c, dict)]
+    if isinstance(data, dict):
+        for key in ("data", "result"):
+            inner = data.get(key)
+            if isinstance(inner, (dict, list)):
+                found = _extract_contracts(inner)
+                if found:
+                    return found
+        items = data.get("contracts") or data.get("contract") or []
+        if isinstance(items, list):
+            return [c for c in items if isinstance(c, dict)]
+    return []
+
+
+class ContractIndex:
+    """Open contracts of tracked clients in per-(client, provider, service) buckets."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clients: set = set()
+        self.buckets: Dict[Key, Dict[str, dict]] = {}
+        self.by_id: Dict[str, Key] = {}
+        # contract id -> time the entry was last confirmed by a source
+        self.seen_at: Dict[str, float] = {}
+        self.snapshot_sig: Optional[Tuple[int, int]] = None
+        self.stats = {"hits": 0, "misses": 0, "snapshot_loads": 0, "upserts": 0, "removals": 0}
+
+    @staticmethod
+    def key_of(c: dict) -> Optional[Key]:
+        client = c.get("client")
+        provider = c.get("provider")
+        if not client or not provider or c.get("id") is None:
+            return None
+        return str(client), str(provider), _as_int(c.get("service"))
+
+    @staticmethod
+    def _is_open(c: dict) -> bool:
+        return _as_int(c.get("settlement_height")) == 0
+
+    def track_client(self, client: str) -> bool:
+        """Start indexing a client's contracts; True when newly tracked (forces a snapshot reload)."""
+        if not client:
+            return False
+        with self.lock:
+            if client in self.clients:
+                return False
+            self.clients.add(client)
+            self.snapshot_sig = None
+            return True
+
+    def _remove_locked(self, cid: str) -> None:
+        key = self.by_id.pop(cid, None)
+        self.seen_at.pop(cid, None)
+        if key is None:
+            return
+        bucket = self.buckets.get(key)
+        if bucket is not None:
+            bucket.pop(cid, None)
+            if not bucket:
+                self.buckets.pop(key, None)
+        self.stats["removals"] += 1
+
+    def _upsert_locked(self, c: dict, seen_at: float) -> bool:
+        key = self.key_of(c)
+        if key is None or key[0] not in self.clients:
+            return False
+        cid = str(c.get("id"))
+        if not self._is_open(c):
+            if cid in self.by_id:
+                self._remove_locked(cid)
+                return True
+            return False
+        if self.seen_at.get(cid, 0.0) > seen_at:
+            # A newer source already reported this contract.
+            return False
+        old_key = self.by_id.get(cid)
+        if old_key is not None and old_key != key:
+            self._remove_locked(cid)
+        changed = self.buckets.get(key, {}).get(cid) != c
+        self.buckets.setdefault(key, {})[cid] = c
+        self.by_id[cid] = key
+        self.seen_at[cid] = seen_at
+        if changed:
+            self.stats["upserts"] += 1
+        return changed
+
+    def upsert(self, c: dict, seen_at: Optional[float] = None) -> bool:
+        with self.lock:
+            return self._upsert_locked(c, time.time() if seen_at is None else seen_at)
+
+    def remove(self, cid: str) -> None:
+        with self.lock:
+            self._remove_locked(str(cid))
+
+    def drop_key(self, client: str, provider: str, service: int, before: float) -> int:
+        """Forget (client, provider, service) contracts not confirmed since before (chain reports none)."""
+        key = (str(client), str(provider), _as_int(service))
+        with self.lock:
+            stale = [cid for cid in self.buckets.get(key, {}) if self.seen_at.get(cid, 0.0) <= before]
+            for cid in stale:
+                self._remove_locked(cid)
+        return len(stale)
+
+    def sync_client(self, client: str, contracts: List[dict], as_of: float) -> int:
+        """Apply an authoritative list of a client's open contracts observed at as_of; returns changes."""
+        changes = 0
+        with self.lock:
+            if client not in self.clients:
+                return 0
+            present = set()
+            for c in contracts:
+                if not isinstance(c, dict) or str(c.get("client")) != client:
+                    continue
+                present.add(str(c.get("id")))
+                if self._upsert_locked(c, as_of):
+                    changes += 1
+            for cid, key in list(self.by_id.items()):
+                if key[0] == client and cid not in present and self.seen_at.get(cid, 0.0) <= as_of:
+                    self._remove_locked(cid)
+                    changes += 1
+        return changes
+
+    def load_snapshot(self, path: str) -> int:
+        """Sync tracked clients from a provider-contracts snapshot file if it changed since the last load."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return 0
+        sig = (st.st_mtime_ns, st.st_size)
+        with self.lock:
+            if sig == self.snapshot_sig or not self.clients:
+                return 0
+            clients = set(self.clients)
+        ok, data = read_snapshot(path, st)
+        try:
+            if not ok:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        contracts = _extract_contracts(data)
+        by_client: Dict[str, List[dict]] = {c: [] for c in clients}
+        for c in contracts:
+            owner = str(c.get("client"))
+            if owner in by_client:
+                by_client[owner].append(c)
+        as_of = st.st_mtime
+        changes = 0
+        for client, items in by_client.items():
+            changes += self.sync_client(client, items, as_of)
+        with self.lock:
+            self.snapshot_sig = sig
+            self.stats["snapshot_loads"] += 1
+        return changes
+
+    def active(self, client: str, provider: str, service: int, effective_height: int) -> Optional[dict]:
+        """Newest usable contract for (client, provider, service), or None."""
+        key = (str(client), str(provider), _as_int(service))
+        with self.lock:
+            bucket = self.buckets.get(key)
+            best = None
+            for c in (bucket or {}).values():
+                if _as_int(c.get("deposit")) <= 0:
+                    continue
+                if _as_int(c.get("height")) + _as_int(c.get("duration")) <= effective_height:
+                    continue
+                if best is None or _as_int(c.get("id")) > _as_int(best.get("id")):
+                    best = c
+            self.stats["hits" if best else "misses"] += 1
+            return best
+
+    def contracts_for_client(self, client: str) -> List[dict]:
+        with self.lock:
+            return [c for key, bucket in self.buckets.items() if key[0] == client for c in bucket.values()]
+
+    def summary(self) -> Dict[str, Any]:
+        with self.lock:
+            out = dict(self.stats)
+            out["clients"] = len(self.clients)
+            out["contracts"] = len(self.by_id)
+            out["keys"] = len(self.buckets)
+        return out
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""Keep-alive HTTP connection pool for PAYG upstream forwarding.
+
+One pool per (scheme, host, port) is shared by every lane and listener in the
+process. Idle connections are reused (HTTP/1.1 keep-alive), host lookups are
+cached for a short TTL and TLS sessions are resumed on new connections. Counters
+are kept per pool so the admin API can report hit/miss rates.
+"""
+
+from __future__ import annotations
+
+import base64
+import http.client
+import socket
+import ssl
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_USER_AGENT = "Python-urllib/%d.%d" % sys.version_info[:2]
+# Statuses the pool hands back to the caller instead of following (callers fall back to urllib).
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+class PoolUnsupported(Exception):
+    """The request cannot go through the pool (env proxy configured, unsupported scheme)."""
+
+
+class StreamedResponse:
+    """Upstream response whose body is read incrementally.
+
+    on_eof runs once the body has been read to the end (pooled connections go back to the pool);
+    on_abort runs when the response is closed early (the connection cannot be reused).
+    """
+
+    def __init__(self, status: int, headers: Dict[str, str], fp, on_eof=None, on_abort=None):
+        self.status = status
+        self.headers = headers
+        self.fp = fp
+        self.on_eof = on_eof
+        self.on_abort = on_abort
+        self.finished = False
+        self.bytes_read = 0
+        self.opened_at = time.time()
+        length = None
+        for k, v in headers.items():
+            if k.lower() == "content-length":
+                try:
+                    length = int(v)
+                except (TypeError, ValueError):
+                    length = None
+        self.length: Optional[int] = length
+
+    def read(self, amt: int = 65536) -> bytes:
+        if self.finished:
+            return b""
+        try:
+            data = self.fp.read(amt)
+        except Exception:
+            self.close()
+            raise
+        if not data:
+            self._finish(self.on_eof)
+        else:
+            self.bytes_read += len(data)
+        return data
+
+    def read_all(self) -> bytes:
+        parts = []
+        while True:
+            data = self.read(65536)
+            if not data:
+                return b"".join(parts)
+            parts.append(data)
+
+    def _finish(self, cb) -> None:
+        if self.finished:
+            return
+        self.finished = True
+        try:
+            if cb is not None:
+                cb()
+            else:
+                self.fp.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        self._finish(self.on_abort)
+
+
+class _DnsCache:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries: Dict[Tuple[str, int], Tuple[float, List[tuple]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, host: str, port: int) -> List[tuple]:
+        key = (host, port)
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        addrs = [info[4][:2] for info in infos]
+        with self.lock:
+            self.entries[key] = (now + self.ttl, addrs)
+        return addrs
+
+    def forget(self, host: str, port: int) -> None:
+        with self.lock:
+            self.entries.pop((host, port), None)
+
+
+def _connect(addrs: List[tuple], timeout: float) -> socket.socket:
+    last_err: Optional[Exception] = None
+    for addr in addrs:
+        try:
+            return socket.create_connection(addr, timeout=timeout)
+        except OSError as e:
+            last_err = e
+    raise last_err or OSError("no addresses")
+
+
+class _PooledHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, host: str, port: int, timeout: float, pool: "_HostPool"):
+        super().__init__(host, port, timeout=timeout)
+        self.pool = pool
+
+    def connect(self):
+        self.sock = _connect(self.pool.resolve(), self.timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+class _PooledHTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, host: str, port: int, timeout: float, pool: "_HostPool"):
+        super().__init__(host, port, timeout=timeout, context=pool.ssl_context)
+        self.pool = pool
+
+    def connect(self):
+        raw = _connect(self.pool.resolve(), self.timeout)
+        raw.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        session = self.pool.tls_session
+        self.sock = self.pool.ssl_context.wrap_socket(raw, server_hostname=self.host, session=session)
+        if getattr(self.sock, "session_reused", False):
+            self.pool.count("tls_resumed")
+        try:
+            self.pool.tls_session = self.sock.session
+        except Exception:
+            pass
+
+
+class _HostPool:
+    def __init__(self, owner: "HttpPool", scheme: str, host: str, port: int):
+        self.owner = owner
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.lock = threading.Lock()
+        self.idle: deque = deque()
+        self.ssl_context = owner.ssl_context if scheme == "https" else None
+        self.tls_session = None
+        self.stats = {"hits": 0, "misses": 0, "stale_retries": 0, "closed": 0, "tls_resumed": 0, "requests": 0}
+
+    def count(self, key: str, n: int = 1) -> None:
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + n
+
+    def resolve(self) -> List[tuple]:
+        return self.owner.dns.resolve(self.host, self.port)
+
+    def acquire(self, timeout: float):
+        """Return (conn, reused)."""
+        now = time.time()
+        with self.lock:
+            while self.idle:
+                conn, last_used = self.idle.pop()
+                if now - last_used <= self.owner.idle_timeout:
+                    self.stats["hits"] += 1
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    return conn, True
+                self.stats["closed"] += 1
+                conn.close()
+            self.stats["misses"] += 1
+        cls = _PooledHTTPSConnection if self.scheme == "https" else _PooledHTTPConnection
+        return cls(self.host, self.port, timeout, self), False
+
+    def release(self, conn) -> None:
+        with self.lock:
+            if len(self.idle) < self.owner.max_idle:
+                self.idle.append((conn, time.time()))
+                return
+            self.stats["closed"] += 1
+        conn.close()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            out = dict(self.stats)
+            out["idle"] = len(self.idle)
+        return out
+
+
+class HttpPool:
+    """Process-wide keep-alive pool: request() returns (status, body, headers) without raising on HTTP errors."""
+
+    def __init__(self, max_idle: int = 8, idle_timeout: float = 30.0, dns_ttl: float = 60.0):
+        self.max_idle = max(1, int(max_idle))
+        self.idle_timeout = float(idle_timeout)
+        self.dns = _DnsCache(dns_ttl)
+        self.ssl_context = ssl.create_default_context()
+        self.lock = threading.Lock()
+        self.pools: Dict[Tuple[str, str, int], _HostPool] = {}
+        self.proxies = urllib.request.getproxies()
+
+    def _pool_for(self, scheme: str, host: str, port: int) -> _HostPool:
+        key = (scheme, host, port)
+        with self.lock:
+            pool = self.pools.get(key)
+            if pool is None:
+                pool = _HostPool(self, scheme, host, port)
+                self.pools[key] = pool
+            return pool
+
+    def _send(self, method: str, url: str, body: Optional[bytes], headers: Optional[Dict[str, str]], timeout: float):
+        """Send a request on a pooled connection and return (pool, conn, response) once headers are in."""
+        parts = urllib.parse.urlsplit(url)
+        scheme = (parts.scheme or "http").lower()
+        if scheme not in ("http", "https"):
+            raise PoolUnsupported(f"unsupported scheme {scheme}")
+        host = parts.hostname or ""
+        if not host:
+            raise PoolUnsupported("missing host")
+        if self.proxies.get(scheme) and not urllib.request.proxy_bypass(host):
+            raise PoolUnsupported("env proxy configured")
+        port = parts.port or (443 if scheme == "https" else 80)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+
+        send_headers = dict(headers or {})
+        lower = {k.lower() for k in send_headers}
+        if "user-agent" not in lower:
+            send_headers["User-Agent"] = DEFAULT_USER_AGENT
+        if (parts.username or parts.password) and "authorization" not in lower:
+            cred = f"{urllib.parse.unquote(parts.username or '')}:{urllib.parse.unquote(parts.password or '')}"
+            send_headers["Authorization"] = "Basic " + base64.b64encode(cred.encode("utf-8")).decode("ascii")
+
+        pool = self._pool_for(scheme, host, port)
+        pool.count("requests")
+        # A pooled connection may have been closed by the server while idle; retry once on a fresh one.
+        for attempt in (0, 1):
+            conn, reused = pool.acquire(timeout)
+            try:
+                conn.request(method, target, body=body, headers=send_headers)
+                resp = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError, http.client.BadStatusLine):
+                conn.close()
+                if reused and attempt == 0:
+                    pool.count("stale_retries")
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                if not reused:
+                    pool.owner.dns.forget(host, port)
+                raise
+            return pool, conn, resp
+        raise http.client.HTTPException("unreachable")
+
+    @staticmethod
+    def _done(pool: _HostPool, conn, resp) -> None:
+        if resp.will_close:
+            conn.close()
+            pool.count("closed")
+        else:
+            pool.release(conn)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 15.0,
+    ) -> Tuple[int, bytes, Dict[str, str]]:
+        pool, conn, resp = self._send(method, url, body, headers, timeout)
+        try:
+            data = resp.read()
+        except Exception:
+            conn.close()
+            raise
+        resp_headers = dict(resp.getheaders())
+        self._done(pool, conn, resp)
+        return resp.status, data, resp_headers
+
+    def open(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 15.0,
+    ) -> StreamedResponse:
+        """Like request() but returns once headers arrive; the body is read through the StreamedResponse."""
+        pool, conn, resp = self._send(method, url, body, headers, timeout)
+
+        def _abort():
+            conn.close()
+            pool.count("closed")
+
+        return StreamedResponse(resp.status, dict(resp.getheaders()), resp, on_eof=lambda: self._done(pool, conn, resp), on_abort=_abort)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            pools = list(self.pools.values())
+        hosts = {f"{p.scheme}://{p.host}:{p.port}": p.snapshot() for p in pools}
+        totals: Dict[str, int] = {}
+        for snap in hosts.values():
+            for k, v in snap.items():
+                totals[k] = totals.get(k, 0) + int(v or 0)
+        with self.dns.lock:
+            dns = {"hits": self.dns.hits, "misses": self.dns.misses, "entries": len(self.dns.entries)}
+        return {
+            "max_idle_per_host": self.max_idle,
+            "idle_timeout_sec": self.idle_timeout,
+            "dns_ttl_sec": self.dns.ttl,
+            "dns": dns,
+            "totals": totals,
+            "hosts": hosts,
+        }
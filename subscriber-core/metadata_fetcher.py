@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Concurrent fetching of provider metadata_uri documents.
+
+Every cache sync refreshes one metadata URI per online provider service. URIs are fetched on
+a bounded thread pool with a per-host cap and revalidated with If-None-Match /
+If-Modified-Since, so unchanged metadata costs a 304. Hosts that cannot be reached are parked
+with exponential backoff instead of costing a full timeout on every cycle.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib import error, request
+from urllib.parse import urlparse
+
+
+class FetchResult:
+    """Outcome of one metadata fetch; status is 1 on success (including a 304 revalidation)."""
+
+    __slots__ = ("data", "error", "status", "etag", "last_modified", "not_modified", "skipped")
+
+    def __init__(
+        self,
+        data: Any = None,
+        error: Optional[str] = None,
+        status: int = 0,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        not_modified: bool = False,
+        skipped: bool = False,
+    ):
+        self.data = data
+        self.error = error
+        self.status = status
+        self.etag = etag
+        self.last_modified = last_modified
+        self.not_modified = not_modified
+        self.skipped = skipped
+
+    def as_tuple(self) -> Tuple[Any, Optional[str], int]:
+        """(parsed_or_raw, error_or_None, status_flag), the shape fetch_metadata_uri returns."""
+        return self.data, self.error, self.status
+
+
+class MetadataFetcher:
+    """Thread-pool metadata fetcher with per-host limits, revalidation and a dead-host backoff."""
+
+    def __init__(
+        self,
+        timeout: float = 5.0,
+        workers: int = 16,
+        per_host: int = 2,
+        backoff_base: float = 60.0,
+        backoff_max: float = 3600.0,
+    ):
+        self.timeout = timeout
+        self.workers = max(1, int(workers))
+        self.per_host = max(1, int(per_host))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        # host -> (consecutive failures, retry_at)
+        self._dead: Dict[str, Tuple[int, float]] = {}
+        self.stats = {"fetched": 0, "not_modified": 0, "failed": 0, "skipped": 0}
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        try:
+            return (urlparse(url).netloc or url).lower()
+        except Exception:
+            return url
+
+    def backoff_remaining(self, host: str) -> float:
+        with self._lock:
+            dead = self._dead.get(host)
+        if not dead:
+            return 0.0
+        return max(0.0, dead[1] - time.time())
+
+    def _slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(host)
+            if slot is None:
+                slot = self._slots[host] = threading.BoundedSemaphore(self.per_host)
+            return slot
+
+    def _record(self, host: str, reachable: bool) -> None:
+        with self._lock:
+            if reachable:
+                self._dead.pop(host, None)
+                return
+            failures = self._dead.get(host, (0, 0.0))[0] + 1
+            delay = min(self.backoff_max, self.backoff_base * (2 ** (failures - 1)))
+            self._dead[host] = (failures, time.time() + delay)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def fetch(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> FetchResult:
+        """Fetch one URI, sending validators when a cached copy exists."""
+        host = self.host_of(url)
+        wait = self.backoff_remaining(host)
+        if wait > 0:
+            self._count("skipped")
+            return FetchResult(error=f"{host} unreachable; retrying in {int(wait)}s", skipped=True)
+        headers = {"Accept": "application/json"}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        with self._slot(host):
+            try:
+                with request.urlopen(request.Request(url, headers=headers), timeout=self.timeout) as resp:
+                    body = resp.read().decode("utf-8", errors="replace")
+                    new_etag = resp.headers.get("ETag")
+                    new_modified = resp.headers.get("Last-Modified")
+            except error.HTTPError as e:
+                # The host answered, so it is not dead even when the answer is an error.
+                self._record(host, True)
+                if e.code == 304:
+                    self._count("not_modified")
+                    return FetchResult(
+                        status=1,
+                        etag=e.headers.get("ETag") or etag,
+                        last_modified=e.headers.get("Last-Modified") or last_modified,
+                        not_modified=True,
+                    )
+                self._count("failed")
+                return FetchResult(error=str(e))
+            except Exception as e:
+                self._record(host, False)
+                self._count("failed")
+                return FetchResult(error=str(e))
+        self._record(host, True)
+        self._count("fetched")
+        try:
+            data = json.loads(body)
+        except json.JSONDecodeError:
+            data = body
+        return FetchResult(data=data, status=1, etag=new_etag, last_modified=new_modified)
+
+    def fetch_many(self, jobs: Dict[str, Tuple[Optional[str], Optional[str]]]) -> Dict[str, FetchResult]:
+        """Fetch {url: (etag, last_modified)} concurrently; returns {url: FetchResult}."""
+        if not jobs:
+            return {}
+        # Interleave hosts so pool threads do not queue up behind one host's per-host cap.
+        by_host: Dict[str, List[str]] = {}
+        for url in jobs:
+            by_host.setdefault(self.host_of(url), []).append(url)
+        order: List[str] = []
+        queues = list(by_host.values())
+        while queues:
+            order.extend(q.pop(0) for q in queues)
+            queues = [q for q in queues if q]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(order)), thread_name_prefix="metadata") as pool:
+            futures = {url: pool.submit(self.fetch, url, *jobs[url]) for url in order}
+            return {url: fut.result() for url, fut in futures.items()}
+
+    def summary(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            out: Dict[str, Any] = dict(self.stats)
+            out["backoff_hosts"] = {
+                host: {"failures": failures, "retry_in": round(retry_at - now, 1)}
+                for host, (failures, retry_at) in self._dead.items()
+                if retry_at > now
+            }
+        return out
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Prebuilt provider/service lookups derived from active_services and active_providers.
+
+Routing a proxied request needs three lookups: the active_services entry for a (provider,
+service) pair, a provider's moniker and location, and the providers of a service ordered by
+pay-as-you-go rate. The fetcher writes these as provider_index.json whenever either source
+cache changes, so the admin API answers them with dict lookups instead of list scans.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+INDEX_VERSION = 1
+# Sort key for services without a usable pay-as-you-go rate; keeps them after priced ones.
+NO_RATE = 1 << 62
+
+
+def min_payg_rate(raw: dict) -> Tuple[Optional[int], Optional[str]]:
+    """Return (amount_int, denom) for the lowest pay_as_you_go_rate entry, or (None, None) if missing."""
+    if not isinstance(raw, dict):
+        return None, None
+    rates = raw.get("pay_as_you_go_rate") or raw.get("pay_as_you_go_rates") or []
+    if not isinstance(rates, list):
+        return None, None
+    best_amt = None
+    best_denom = None
+    for r in rates:
+        if not isinstance(r, dict):
+            continue
+        denom = r.get("denom") or r.get("Denom")
+        amt = r.get("amount") or r.get("Amount")
+        if amt is None:
+            continue
+        try:
+            amt_int = int(amt)
+        except (TypeError, ValueError):
+            continue
+        if best_amt is None or amt_int < best_amt:
+            best_amt = amt_int
+            best_denom = denom
+    return best_amt, best_denom
+
+
+def provider_location(p: Optional[dict]) -> Optional[str]:
+    if not isinstance(p, dict):
+        return None
+    meta = p.get("metadata") or {}
+    location = (
+        (meta.get("config") or {}).get("location")
+        or meta.get("location")
+        or (p.get("provider") or {}).get("location")
+        or p.get("location")
+    )
+    return location or None
+
+
+def _service_id(entry: dict) -> str:
+    return str(entry.get("service_id") or entry.get("service") or entry.get("id"))
+
+
+def build_provider_index(active_services_payload: Dict[str, Any], active_providers_payload: Dict[str, Any]) -> Dict[str, Any]:
+    """{"services": {pubkey: {service_id: entry}}, "providers": {pubkey: {...}}, "by_service": {service_id: [pubkey]}}.
+
+    by_service lists each service's providers by lowest pay-as-you-go rate, then pubkey. When an
+    active_services list repeats a (provider, service) pair, the first entry wins.
+    """
+    providers: Dict[str, Dict[str, Any]] = {}
+    prov_list = active_providers_payload.get("providers") if isinstance(active_providers_payload, dict) else []
+    for p in prov_list if isinstance(prov_list, list) else []:
+        if not isinstance(p, dict):
+            continue
+        pk = p.get("pubkey") or p.get("pub_key") or p.get("pubKey")
+        if not pk:
+            continue
+        meta = p.get("metadata") or {}
+        info = {
+            # metadata moniker, and the on-chain one used when metadata has none
+            "moniker": (meta.get("config") or {}).get("moniker") or meta.get("moniker") or None,
+            "chain_moniker": (p.get("provider") or {}).get("moniker") or None,
+            "location": provider_location(p),
+        }
+        prev = providers.setdefault(str(pk), info)
+        for key, val in info.items():
+            if prev.get(key) is None:
+                prev[key] = val
+
+    services: Dict[str, Dict[str, Any]] = {}
+    ranked: Dict[str, List[Tuple[int, str]]] = {}
+    entries = active_services_payload.get("active_services") if isinstance(active_services_payload, dict) else []
+    for e in entries if isinstance(entries, list) else []:
+        if not isinstance(e, dict):
+            continue
+        pk = str(e.get("provider_pubkey") or "")
+        sid = _service_id(e)
+        by_sid = services.setdefault(pk, {})
+        if sid in by_sid:
+            continue
+        by_sid[sid] = e
+        raw = e.get("raw") if isinstance(e.get("raw"), dict) else e
+        amt, _ = min_payg_rate(raw)
+        ranked.setdefault(sid, []).append((amt if isinstance(amt, int) else NO_RATE, pk))
+
+    return {
+        "version": INDEX_VERSION,
+        "services": services,
+        "providers": providers,
+        "by_service": {sid: [pk for _, pk in sorted(items)] for sid, items in ranked.items()},
+    }
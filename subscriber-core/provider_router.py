@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Latency- and error-aware ordering of a listener's provider candidates.
+
+The lane reports every sentinel forward here (in flight while it runs, then its latency and
+whether the provider failed it). Each (listener, provider) keeps a sliding window of outcomes,
+an EWMA of latency and an in-flight count, all in memory. order() turns the failover list from
+_candidate_providers into a routing order:
+
+- ordered: keep the list as is (location, then pay-as-you-go rate).
+- ewma: lowest expected cost first, where cost is the latency EWMA scaled by in-flight requests
+  and by the window's error rate.
+- p2c: power of two choices; the cheaper of two random candidates goes first, so load spreads
+  over healthy providers instead of piling onto the single best one. The rest follow by cost.
+
+Providers above the error-rate limit go last under ewma and p2c. When the caller passes the
+providers that already hold a contract, those rank ahead of the rest, so re-measuring or
+load-spreading never sends a request to a provider that would need a paid contract open first.
+Candidates priced above the rate ceiling are dropped under every policy; candidates without a
+known rate are kept.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+POLICIES = ("ordered", "ewma", "p2c")
+
+
+def rate_amount(rate: Any) -> Optional[int]:
+    """Integer amount of a pay-as-you-go rate dict ({"denom", "amount"}), or None."""
+    if not isinstance(rate, dict):
+        return None
+    amt = rate.get("amount") or rate.get("Amount")
+    try:
+        return int(amt)
+    except (TypeError, ValueError):
+        return None
+
+
+class _ProviderStats:
+    __slots__ = ("window", "ewma", "inflight")
+
+    def __init__(self):
+        self.window: deque = deque()
+        self.ewma: Optional[float] = None
+        self.inflight = 0
+
+
+class ProviderRouter:
+    def __init__(self, window_secs: float = 60.0, alpha: float = 0.3, max_error_rate: float = 0.5, min_samples: int = 5):
+        self.window_secs = max(1.0, float(window_secs))
+        self.alpha = alpha
+        self.max_error_rate = max_error_rate
+        self.min_samples = max(1, int(min_samples))
+        self.lock = threading.Lock()
+        self.entries: Dict[Tuple[str, str], _ProviderStats] = {}
+
+    def _entry(self, listener_id: str, provider_pubkey: str) -> _ProviderStats:
+        key = (str(listener_id), str(provider_pubkey))
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = _ProviderStats()
+        return entry
+
+    def _trim(self, entry: _ProviderStats, now: float) -> None:
+        cutoff = now - self.window_secs
+        while entry.window and entry.window[0][0] < cutoff:
+            entry.window.popleft()
+
+    def start(self, listener_id: str, provider_pubkey: str) -> None:
+        with self.lock:
+            self._entry(listener_id, provider_pubkey).inflight += 1
+
+    def finish(self, listener_id: str, provider_pubkey: str, latency_ms: float, ok: bool) -> None:
+        now = time.time()
+        with self.lock:
+            entry = self._entry(listener_id, provider_pubkey)
+            entry.inflight = max(0, entry.inflight - 1)
+            entry.window.append((now, float(latency_ms), bool(ok)))
+            self._trim(entry, now)
+            if ok:
+                # Failures are often fast (refused, 5xx); keep them out of the latency estimate.
+                entry.ewma = float(latency_ms) if entry.ewma is None else self.alpha * latency_ms + (1 - self.alpha) * entry.ewma
+
+    def drop_listener(self, listener_id: str) -> None:
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == str(listener_id)]:
+                self.entries.pop(key, None)
+
+    def _stats(self, entry: _ProviderStats, now: float) -> Dict[str, Any]:
+        self._trim(entry, now)
+        samples = len(entry.window)
+        errors = sum(1 for _, _, ok in entry.window if not ok)
+        return {
+            "samples": samples,
+            "error_rate": (errors / samples) if samples else 0.0,
+            "ewma_ms": round(entry.ewma, 1) if entry.ewma is not None else None,
+            "mean_ms": round(sum(ms for _, ms, _ in entry.window) / samples, 1) if samples else None,
+            "inflight": entry.inflight,
+        }
+
+    def snapshot(self, listener_id: str) -> Dict[str, Dict[str, Any]]:
+        """{provider_pubkey: {samples, error_rate, ewma_ms, mean_ms, inflight}} for one listener."""
+        now = time.time()
+        with self.lock:
+            return {pk: self._stats(entry, now) for (lid, pk), entry in self.entries.items() if lid == str(listener_id)}
+
+    def _cost(self, stats: Dict[str, Any]) -> float:
+        # Providers with nothing in the window (new, or unused for a window) cost least, so each
+        # gets re-measured; the +1 keeps in-flight requests counting for them too. Without a
+        # success, the window's mean latency stands in for the EWMA.
+        if not stats["samples"]:
+            ewma = 0.0
+        else:
+            ewma = stats["ewma_ms"] if stats["ewma_ms"] is not None else stats["mean_ms"]
+        return (ewma + 1.0) * (1 + stats["inflight"]) / max(0.05, 1.0 - stats["error_rate"])
+
+    def order(
+        self,
+        listener_id: str,
+        candidates: List[dict],
+        policy: str = "ordered",
+        max_rate: Optional[int] = None,
+        contracted: Optional[Collection[str]] = None,
+    ) -> List[dict]:
+        """Return candidates in routing order for the policy, without those priced above max_rate.
+
+        contracted: provider pubkeys that already hold a usable contract (None: not known).
+        """
+        if max_rate is not None:
+            candidates = [
+                c
+                for c in candidates
+                if rate_amount(c.get("pay_as_you_go_rate")) is None or rate_amount(c.get("pay_as_you_go_rate")) <= max_rate
+            ]
+        if policy not in ("ewma", "p2c") or len(candidates) < 2:
+            return list(candidates)
+
+        now = time.time()
+        with self.lock:
+            stats = [self._stats(self._entry(listener_id, c.get("provider_pubkey") or ""), now) for c in candidates]
+        ranked = []
+        for pos, (cand, st) in enumerate(zip(candidates, stats)):
+            unhealthy = st["samples"] >= self.min_samples and st["error_rate"] > self.max_error_rate
+            needs_open = contracted is not None and (cand.get("provider_pubkey") or "") not in contracted
+            # pos breaks ties in the configured order.
+            ranked.append((unhealthy, needs_open, self._cost(st), pos, cand))
+        ranked.sort(key=lambda r: r[:4])
+        if policy == "p2c":
+            # Spread over the best tier only: healthy, and holding a contract when any does.
+            healthy = [r for r in ranked if not r[0] and r[1] == ranked[0][1]]
+            if len(healthy) >= 2:
+                a, b = random.sample(healthy, 2)
+                first = min(a, b, key=lambda r: r[:4])
+                ranked.remove(first)
+                ranked.insert(0, first)
+        return [r[4] for r in ranked]
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""Cache for listener responses whose result cannot change.
+
+rule_for_request() decides from the request alone whether a response may be cached, using
+the service family (evm, btc, cosmos, polkadot, solana, sui, near) that _service_family()
+derives for the listener:
+
+- immutable: the result is fixed once it exists (chain id, block by hash, CometBFT block at a
+  height, ...).
+- final: fixed once its block is `finality_blocks` behind the head. Used for EVM
+  receipts/transactions by hash and blocks by number. The head is learned from
+  eth_blockNumber answers passing through the listener, and nothing is cached before one.
+- head: follows the chain head (eth_blockNumber, status, ...); cached only with a head TTL.
+
+store_value() checks the answer (no JSON-RPC error, non-null result) before anything is
+stored. JSON-RPC entries hold only the result, and hits are re-wrapped with the caller's
+request id. Batches are never cached.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+IMMUTABLE = "immutable"
+FINAL = "final"
+HEAD = "head"
+
+_EVM_IMMUTABLE = {
+    "eth_chainId",
+    "net_version",
+    "eth_getBlockByHash",
+    "eth_getBlockTransactionCountByHash",
+    "eth_getTransactionByBlockHashAndIndex",
+    "eth_getUncleByBlockHashAndIndex",
+}
+# Their blockHash/blockNumber fields change if the block is reorganised away.
+_EVM_FINAL_BY_RESULT = {"eth_getTransactionReceipt", "eth_getTransactionByHash"}
+_EVM_HEAD = {"eth_blockNumber", "eth_gasPrice", "eth_maxPriorityFeePerGas"}
+
+# CometBFT has instant finality: anything addressed by height or hash is fixed.
+_COSMOS_IMMUTABLE = {"genesis", "block_by_hash", "header_by_hash", "tx"}
+_COSMOS_AT_HEIGHT = {"block", "block_results", "commit", "header", "validators"}
+_COSMOS_HEAD = {"status", "abci_info"}
+_COSMOS_REST = (
+    (re.compile(r"/cosmos/base/tendermint/v1beta1/blocks/\d+$"), IMMUTABLE),
+    (re.compile(r"/cosmos/base/tendermint/v1beta1/blocks/latest$"), HEAD),
+    (re.compile(r"/cosmos/tx/v1beta1/txs/[0-9A-Fa-f]{64}$"), IMMUTABLE),
+)
+
+_SIMPLE_RULES = {
+    # Verbose getblock/getblockheader include a changing confirmations count; raw forms do not.
+    "btc": {"getblockcount": HEAD, "getbestblockhash": HEAD},
+    "polkadot": {"system_chain": IMMUTABLE, "chain_getFinalizedHead": HEAD},
+    "solana": {"getGenesisHash": IMMUTABLE, "getSlot": HEAD, "getBlockHeight": HEAD},
+    "sui": {"sui_getChainIdentifier": IMMUTABLE, "sui_getLatestCheckpointSequenceNumber": HEAD},
+    "near": {"status": HEAD},
+}
+
+
+class CacheRule:
+    __slots__ = ("key", "kind", "height", "rpc_id", "rpc_version", "head_method")
+
+    def __init__(self, key: Tuple[str, str, str], kind: str, height: Optional[int] = None):
+        self.key = key
+        self.kind = kind
+        # Block number named by the request (final rules); None to read it from the result.
+        self.height = height
+        # JSON-RPC envelope of the request; rpc_version is None for REST requests.
+        self.rpc_id: Any = None
+        self.rpc_version: Optional[str] = None
+        # eth_blockNumber answers update the listener's head.
+        self.head_method = False
+
+
+def _block_number(val: Any) -> Optional[int]:
+    if isinstance(val, bool):
+        return None
+    if isinstance(val, int):
+        return val
+    if isinstance(val, str):
+        try:
+            return int(val, 16) if val.lower().startswith("0x") else int(val)
+        except ValueError:
+            return None
+    return None
+
+
+def _first_param(params: Any, name: Optional[str] = None) -> Any:
+    if isinstance(params, list):
+        return params[0] if params else None
+    if isinstance(params, dict) and name:
+        return params.get(name)
+    return None
+
+
+def _rpc_kind(family: str, method: str, params: Any) -> Tuple[Optional[str], Optional[int]]:
+    if family == "evm":
+        if method in _EVM_IMMUTABLE:
+            return IMMUTABLE, None
+        if method in _EVM_FINAL_BY_RESULT:
+            return FINAL, None
+        if method in _EVM_HEAD:
+            return HEAD, None
+        if method == "eth_getBlockByNumber":
+            tag = _first_param(params)
+            num = _block_number(tag)
+            if num is not None:
+                return FINAL, num
+            if tag == "earliest":
+                return IMMUTABLE, None
+            if tag in ("latest", "safe", "finalized"):
+                return HEAD, None
+        return None, None
+    if family == "cosmos":
+        if method in _COSMOS_IMMUTABLE:
+            return (IMMUTABLE, None) if params else (None, None)
+        if method in _COSMOS_AT_HEIGHT:
+            return (IMMUTABLE if _block_number(_first_param(params, "height")) is not None else HEAD), None
+        if method in _COSMOS_HEAD:
+            return HEAD, None
+        return None, None
+    if family == "btc" and method in ("getblock", "getblockheader") and isinstance(params, list) and len(params) >= 2:
+        # verbosity 0 / verbose=false: the raw block or header
+        if params[1] in (0, False):
+            return IMMUTABLE, None
+        return None, None
+    if family == "polkadot" and method in ("chain_getBlock", "chain_getHeader"):
+        return (IMMUTABLE, None) if _first_param(params) else (None, None)
+    if family == "sui" and method == "sui_getCheckpoint":
+        return (IMMUTABLE, None) if _first_param(params) is not None else (None, None)
+    return _SIMPLE_RULES.get(family, {}).get(method), None
+
+
+def rule_for_request(
+    scope: str, family: str, http_method: str, service_path: str, query: str, body: Optional[bytes]
+) -> Optional[CacheRule]:
+    """CacheRule for a cacheable request, else None. scope keeps entries per listener."""
+    http_method = (http_method or "").upper()
+    if http_method == "GET":
+        path = "/" + (service_path or "").lstrip("/")
+        kind = None
+        if family == "cosmos":
+            for pattern, rest_kind in _COSMOS_REST:
+                if pattern.search(path):
+                    kind = rest_kind
+                    break
+        if kind is None:
+            return None
+        return CacheRule((scope, family, f"GET {path}?{query or ''}"), kind)
+    if http_method != "POST" or not body:
+        return None
+    try:
+        payload = json.loads(body)
+    except Exception:
+        return None
+    if not isinstance(payload, dict) or not isinstance(payload.get("method"), str):
+        return None
+    method = payload["method"]
+    params = payload.get("params")
+    kind, height = _rpc_kind(family, method, params)
+    if kind is None:
+        return None
+    try:
+        params_key = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return None
+    rule = CacheRule((scope, family, f"{method} {params_key}"), kind, height)
+    rule.rpc_id = payload.get("id")
+    rule.rpc_version = str(payload.get("jsonrpc") or "1.0")
+    rule.head_method = family == "evm" and method == "eth_blockNumber"
+    return rule
+
+
+def hit_body(rule: CacheRule, value: bytes) -> bytes:
+    """Response body for a cache hit: REST bodies as stored, JSON-RPC results re-wrapped."""
+    if rule.rpc_version is None:
+        return value
+    rid = json.dumps(rule.rpc_id).encode()
+    if rule.rpc_version == "2.0":
+        return b'{"jsonrpc":"2.0","id":' + rid + b',"result":' + value + b"}"
+    return b'{"result":' + value + b',"error":null,"id":' + rid + b"}"
+
+
+class ResponseCache:
+    """LRU bounded by total bytes; entries may carry a TTL."""
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int, finality_blocks: int = 64):
+        self.max_bytes = max(0, int(max_bytes))
+        self.max_entry_bytes = max(0, int(max_entry_bytes))
+        self.finality_blocks = max(0, int(finality_blocks))
+        self.lock = threading.Lock()
+        # key -> (value, content_type, expires_at or 0, size)
+        self.entries: "OrderedDict[Tuple[str, str, str], Tuple[bytes, str, float, int]]" = OrderedDict()
+        self.bytes = 0
+        self.heads: Dict[str, int] = {}
+        self.counts: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, scope: str, name: str) -> None:
+        by_scope = self.counts.setdefault(scope, {"hits": 0, "misses": 0, "stores": 0})
+        by_scope[name] = by_scope.get(name, 0) + 1
+
+    def get(self, rule: CacheRule) -> Optional[Tuple[bytes, str]]:
+        """(value, content_type) for a live entry, counting the hit or miss."""
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(rule.key)
+            if entry is not None and entry[2] and entry[2] <= now:
+                self._remove(rule.key)
+                entry = None
+            if entry is None:
+                self._count(rule.key[0], "misses")
+                return None
+            self.entries.move_to_end(rule.key)
+            self._count(rule.key[0], "hits")
+            return entry[0], entry[1]
+
+    def _remove(self, key) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[3]
+
+    def store_value(self, rule: CacheRule, body: bytes, content_type: str, head_ttl: float) -> bool:
+        """Store a successful answer if the rule allows it; returns True when stored."""
+        if rule.rpc_version is None:
+            value = body
+        else:
+            try:
+                payload = json.loads(body)
+            except Exception:
+                return False
+            if not isinstance(payload, dict) or payload.get("error") is not None or payload.get("result") is None:
+                return False
+            result = payload["result"]
+            if rule.head_method:
+                head = _block_number(result)
+                if head is not None:
+                    with self.lock:
+                        self.heads[rule.key[0]] = max(head, self.heads.get(rule.key[0], 0))
+            if rule.kind == FINAL:
+                height = rule.height
+                if height is None and isinstance(result, dict):
+                    height = _block_number(result.get("blockNumber"))
+                with self.lock:
+                    head = self.heads.get(rule.key[0])
+                if height is None or head is None or height > head - self.finality_blocks:
+                    return False
+            value = json.dumps(result, separators=(",", ":")).encode()
+        ttl = 0.0
+        if rule.kind == HEAD:
+            if head_ttl <= 0:
+                return False
+            ttl = head_ttl
+        size = len(value) + len(rule.key[2]) + 64
+        if size > self.max_entry_bytes or size > self.max_bytes:
+            return False
+        with self.lock:
+            self._remove(rule.key)
+            self.entries[rule.key] = (value, content_type, time.time() + ttl if ttl else 0.0, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes and self.entries:
+                self._remove(next(iter(self.entries)))
+            self._count(rule.key[0], "stores")
+        return True
+
+    def drop_scope(self, scope: str) -> None:
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == scope]:
+                self._remove(key)
+            self.heads.pop(scope, None)
+            self.counts.pop(scope, None)
+
+    def stats(self, scope: str) -> Dict[str, Any]:
+        with self.lock:
+            entries = [e for k, e in self.entries.items() if k[0] == scope]
+            out: Dict[str, Any] = dict(self.counts.get(scope) or {"hits": 0, "misses": 0, "stores": 0})
+            out.update(
+                {
+                    "entries": len(entries),
+                    "bytes": sum(e[3] for e in entries),
+                    "head": self.heads.get(scope),
+                    "total_bytes": self.bytes,
+                    "max_bytes": self.max_bytes,
+                }
+            )
+            return out
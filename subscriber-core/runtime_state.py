@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+"""SQLite-backed runtime state for subscriber-core PAYG listeners.
+
+listeners.json is the admin-edited configuration. Values the proxy updates on the
+request path (per-provider status, response-time metrics, last contract/CORS state
+and per-contract nonce high-water marks) live here instead, keyed by
+listener/provider/contract, so a request never rewrites the whole listeners document.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+CACHE_DIR = os.getenv("CACHE_DIR", "/app/cache")
+RUNTIME_STATE_DB = os.getenv("RUNTIME_STATE_DB") or os.path.join(CACHE_DIR, "runtime_state.sqlite3")
+
+RT_EWMA_ALPHA = float(os.getenv("RT_EWMA_ALPHA", "0.2"))
+# Log-bucket growth factor for the latency histogram (~1% relative error on percentiles).
+RT_HIST_GROWTH = 1.02
+_RT_HIST_LOG = math.log(RT_HIST_GROWTH)
+# In-memory window of each provider's latest samples, for percentiles that follow current conditions.
+RT_RECENT_SAMPLES = max(1, int(os.getenv("RT_RECENT_SAMPLES", "64")))
+
+# top_services keys owned by the runtime store (never written back to listeners.json).
+PROVIDER_RUNTIME_KEYS = (
+    "status_updated_at",
+    "rt_avg_ms",
+    "rt_count",
+    "rt_last_ms",
+    "rt_updated_at",
+    "rt_ignore_next",
+    "rt_ewma_ms",
+    "rt_p50_ms",
+    "rt_p95_ms",
+    "rt_p99_ms",
+    "last_contract_id",
+    "last_cors_origins",
+    "cors_configured",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS provider_state (
+    listener_id TEXT NOT NULL,
+    provider_pubkey TEXT NOT NULL,
+    status TEXT,
+    status_updated_at TEXT,
+    rt_avg_ms REAL,
+    rt_count INTEGER,
+    rt_last_ms INTEGER,
+    rt_updated_at TEXT,
+    rt_ignore_next INTEGER,
+    last_contract_id TEXT,
+    last_cors_origins TEXT,
+    cors_configured INTEGER,
+    rt_ewma_ms REAL,
+    rt_p50_ms REAL,
+    rt_p95_ms REAL,
+    rt_p99_ms REAL,
+    rt_hist TEXT,
+    PRIMARY KEY (listener_id, provider_pubkey)
+);
+CREATE TABLE IF NOT EXISTS contract_nonce (
+    listener_id TEXT NOT NULL,
+    contract_id TEXT NOT NULL,
+    nonce INTEGER NOT NULL,
+    updated_at TEXT,
+    PRIMARY KEY (listener_id, contract_id)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class RuntimeStateStore:
+    """Small WAL-mode SQLite store; one shared connection guarded by a lock."""
+
+    def __init__(self, path: str = RUNTIME_STATE_DB):
+        self.path = path
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        except OSError:
+            pass
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL is durable across process crashes in WAL mode; only an OS crash can drop the last commits.
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.executescript(_SCHEMA)
+        # Columns added after the first release of the schema.
+        cols = {row["name"] for row in self.conn.execute("PRAGMA table_info(provider_state)").fetchall()}
+        for col, kind in (
+            ("rt_ewma_ms", "REAL"),
+            ("rt_p50_ms", "REAL"),
+            ("rt_p95_ms", "REAL"),
+            ("rt_p99_ms", "REAL"),
+            ("rt_hist", "TEXT"),
+        ):
+            if col not in cols:
+                self.conn.execute(f"ALTER TABLE provider_state ADD COLUMN {col} {kind}")
+
+    def _ensure_provider_row(self, listener_id: str, provider_pubkey: str) -> None:
+        self.conn.execute(
+            "INSERT OR IGNORE INTO provider_state (listener_id, provider_pubkey) VALUES (?, ?)",
+            (str(listener_id), str(provider_pubkey)),
+        )
+
+    # ---- per-provider state
+
+    def set_status(self, listener_id: str, provider_pubkey: str, status: str) -> bool:
+        """Store a provider status; returns False when it was already set to that value."""
+        with self.lock:
+            cur = self.conn.execute(
+                "SELECT status FROM provider_state WHERE listener_id=? AND provider_pubkey=?",
+                (str(listener_id), str(provider_pubkey)),
+            ).fetchone()
+            if cur is not None and cur["status"] == status:
+                return False
+            self._ensure_provider_row(listener_id, provider_pubkey)
+            self.conn.execute(
+                "UPDATE provider_state SET status=?, status_updated_at=? WHERE listener_id=? AND provider_pubkey=?",
+                (status, timestamp(), str(listener_id), str(provider_pubkey)),
+            )
+            return True
+
+    def set_contract(
+        self,
+        listener_id: str,
+        provider_pubkey: str,
+        contract_id: str,
+        origins: Any = None,
+        cors_configured: Optional[bool] = None,
+    ) -> None:
+        with self.lock:
+            self._ensure_provider_row(listener_id, provider_pubkey)
+            sets = ["last_contract_id=?"]
+            args: list = [str(contract_id)]
+            if origins is not None:
+                sets.append("last_cors_origins=?")
+                args.append(json.dumps(origins))
+            if cors_configured is not None:
+                sets.append("cors_configured=?")
+                args.append(1 if cors_configured else 0)
+            args.extend([str(listener_id), str(provider_pubkey)])
+            self.conn.execute(
+                f"UPDATE provider_state SET {', '.join(sets)} WHERE listener_id=? AND provider_pubkey=?",
+                args,
+            )
+
+    def reset_metrics(self, listener_id: str, provider_pubkeys: Iterable[str]) -> None:
+        """Clear response-time metrics and skip the next sample for each provider."""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for pk in provider_pubkeys:
+                    self._ensure_provider_row(listener_id, pk)
+                    self.conn.execute(
+                        "UPDATE provider_state SET rt_avg_ms=NULL, rt_count=NULL, rt_last_ms=NULL, "
+                        "rt_updated_at=NULL, rt_ewma_ms=NULL, rt_p50_ms=NULL, rt_p95_ms=NULL, rt_p99_ms=NULL, "
+                        "rt_hist=NULL, rt_ignore_next=1 WHERE listener_id=? AND provider_pubkey=?",
+                        (str(listener_id), str(pk)),
+                    )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def load_metrics(self, listener_id: str, provider_pubkey: str) -> Optional[Dict[str, Any]]:
+        """Return the persisted aggregate for one provider (used to seed the in-memory aggregator)."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT rt_avg_ms, rt_count, rt_last_ms, rt_updated_at, rt_ignore_next, rt_ewma_ms, rt_hist "
+                "FROM provider_state WHERE listener_id=? AND provider_pubkey=?",
+                (str(listener_id), str(provider_pubkey)),
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def write_metrics(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Persist aggregator snapshots in one transaction."""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for r in rows:
+                    self._ensure_provider_row(r["listener_id"], r["provider_pubkey"])
+                    self.conn.execute(
+                        "UPDATE provider_state SET rt_avg_ms=?, rt_count=?, rt_last_ms=?, rt_updated_at=?, "
+                        "rt_ignore_next=?, rt_ewma_ms=?, rt_p50_ms=?, rt_p95_ms=?, rt_p99_ms=?, rt_hist=? "
+                        "WHERE listener_id=? AND provider_pubkey=?",
+                        (
+                            r.get("rt_avg_ms"),
+                            r.get("rt_count"),
+                            r.get("rt_last_ms"),
+                            r.get("rt_updated_at"),
+                            1 if r.get("rt_ignore_next") else None,
+                            r.get("rt_ewma_ms"),
+                            r.get("rt_p50_ms"),
+                            r.get("rt_p95_ms"),
+                            r.get("rt_p99_ms"),
+                            r.get("rt_hist"),
+                            str(r["listener_id"]),
+                            str(r["provider_pubkey"]),
+                        ),
+                    )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def provider_states(self, listener_id: Optional[str] = None) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Return {(listener_id, provider_pubkey): {field: value}} with unset fields omitted."""
+        with self.lock:
+            if listener_id is None:
+                rows = self.conn.execute("SELECT * FROM provider_state").fetchall()
+            else:
+                rows = self.conn.execute(
+                    "SELECT * FROM provider_state WHERE listener_id=?", (str(listener_id),)
+                ).fetchall()
+        out: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for row in rows:
+            fields: Dict[str, Any] = {}
+            for key in ("status",) + PROVIDER_RUNTIME_KEYS:
+                val = row[key]
+                if val is None:
+                    continue
+                if key == "last_cors_origins":
+                    try:
+                        val = json.loads(val)
+                    except Exception:
+                        pass
+                elif key in ("cors_configured", "rt_ignore_next"):
+                    val = bool(val)
+                fields[key] = val
+            out[(row["listener_id"], row["provider_pubkey"])] = fields
+        return out
+
+    # ---- per-contract nonces
+
+    def set_nonce(self, listener_id: str, contract_id: str, nonce: int, exact: bool = False) -> None:
+        """Record a nonce high-water mark; never moves backwards unless exact (clean-stop write-back)."""
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO contract_nonce (listener_id, contract_id, nonce, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(listener_id, contract_id) DO UPDATE SET nonce=excluded.nonce, updated_at=excluded.updated_at "
+                + ("" if exact else "WHERE excluded.nonce > contract_nonce.nonce"),
+                (str(listener_id), str(contract_id), int(nonce), timestamp()),
+            )
+
+    def get_nonce(self, listener_id: str, contract_id: str) -> Optional[int]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT nonce FROM contract_nonce WHERE listener_id=? AND contract_id=?",
+                (str(listener_id), str(contract_id)),
+            ).fetchone()
+        return int(row["nonce"]) if row is not None else None
+
+    # ---- housekeeping
+
+    def delete_listener(self, listener_id: str) -> None:
+        with self.lock:
+            self.conn.execute("DELETE FROM provider_state WHERE listener_id=?", (str(listener_id),))
+            self.conn.execute("DELETE FROM contract_nonce WHERE listener_id=?", (str(listener_id),))
+
+    def import_listeners(self, data: Dict[str, Any]) -> int:
+        """One-time import of runtime fields still stored in listeners.json; returns rows touched."""
+        with self.lock:
+            done = self.conn.execute("SELECT value FROM meta WHERE key='listeners_imported'").fetchone()
+            if done is not None:
+                return 0
+        touched = 0
+        listeners = data.get("listeners") if isinstance(data, dict) else []
+        for l in listeners if isinstance(listeners, list) else []:
+            if not isinstance(l, dict) or not l.get("id"):
+                continue
+            lid = str(l.get("id"))
+            nc = l.get("nonce_cache")
+            if isinstance(nc, dict):
+                for cid, val in nc.items():
+                    try:
+                        self.set_nonce(lid, cid, int(val))
+                        touched += 1
+                    except Exception:
+                        continue
+            for ts in l.get("top_services") if isinstance(l.get("top_services"), list) else []:
+                if not isinstance(ts, dict) or not ts.get("provider_pubkey"):
+                    continue
+                pk = str(ts.get("provider_pubkey"))
+                if not any(k in ts for k in PROVIDER_RUNTIME_KEYS):
+                    continue
+                with self.lock:
+                    self._ensure_provider_row(lid, pk)
+                    self.conn.execute(
+                        "UPDATE provider_state SET status=?, status_updated_at=?, rt_avg_ms=?, rt_count=?, rt_last_ms=?, "
+                        "rt_updated_at=?, rt_ignore_next=?, last_contract_id=?, last_cors_origins=?, cors_configured=? "
+                        "WHERE listener_id=? AND provider_pubkey=?",
+                        (
+                            ts.get("status") if ts.get("status_updated_at") else None,
+                            ts.get("status_updated_at"),
+                            ts.get("rt_avg_ms"),
+                            ts.get("rt_count"),
+                            ts.get("rt_last_ms"),
+                            ts.get("rt_updated_at"),
+                            1 if ts.get("rt_ignore_next") else None,
+                            str(ts.get("last_contract_id")) if ts.get("last_contract_id") is not None else None,
+                            json.dumps(ts.get("last_cors_origins")) if "last_cors_origins" in ts else None,
+                            (1 if ts.get("cors_configured") else 0) if "cors_configured" in ts else None,
+                            lid,
+                            pk,
+                        ),
+                    )
+                touched += 1
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('listeners_imported', ?)", (timestamp(),)
+            )
+        return touched
+
+
+class LatencyHistogram:
+    """Sparse log-bucketed histogram (HDR-style) for latency percentiles in milliseconds."""
+
+    def __init__(self, buckets: Optional[Dict[int, int]] = None):
+        self.buckets: Dict[int, int] = dict(buckets or {})
+        self.total = sum(self.buckets.values())
+
+    def add(self, ms: float) -> None:
+        idx = int(round(math.log(max(float(ms), 1.0)) / _RT_HIST_LOG))
+        self.buckets[idx] = self.buckets.get(idx, 0) + 1
+        self.total += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.total <= 0:
+            return None
+        rank = max(1, int(math.ceil(q * self.total)))
+        seen = 0
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if seen >= rank:
+                return round(RT_HIST_GROWTH ** idx, 1)
+        return round(RT_HIST_GROWTH ** max(self.buckets), 1)
+
+    def dumps(self) -> str:
+        return json.dumps({str(k): v for k, v in self.buckets.items()}, separators=(",", ":"))
+
+    @classmethod
+    def loads(cls, raw: Optional[str]) -> "LatencyHistogram":
+        try:
+            data = json.loads(raw) if raw else {}
+            return cls({int(k): int(v) for k, v in data.items()})
+        except Exception:
+            return cls()
+
+
+class _ProviderMetrics:
+    __slots__ = ("count", "mean", "ewma", "last_ms", "updated_at", "ignore_next", "hist", "recent", "dirty")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.ewma: Optional[float] = None
+        self.last_ms: Optional[int] = None
+        self.updated_at: Optional[str] = None
+        self.ignore_next = False
+        self.hist = LatencyHistogram()
+        self.recent: deque = deque(maxlen=RT_RECENT_SAMPLES)
+        self.dirty = False
+
+
+class MetricsAggregator:
+    """In-memory per-listener/per-provider response-time aggregates, flushed to the store on a timer.
+
+    Samples are recorded without touching disk; snapshot() serves live values to the API and
+    flush() persists changed entries (EWMA, running mean, count, p50/p95/p99 and the histogram).
+    """
+
+    def __init__(self, store_getter, alpha: float = RT_EWMA_ALPHA):
+        self.store_getter = store_getter
+        self.alpha = alpha
+        self.lock = threading.Lock()
+        self.entries: Dict[Tuple[str, str], _ProviderMetrics] = {}
+
+    def _entry(self, listener_id: str, provider_pubkey: str) -> _ProviderMetrics:
+        key = (str(listener_id), str(provider_pubkey))
+        entry = self.entries.get(key)
+        if entry is not None:
+            return entry
+        entry = _ProviderMetrics()
+        store = self.store_getter()
+        if store is not None:
+            try:
+                row = store.load_metrics(key[0], key[1]) or {}
+                entry.count = int(row.get("rt_count") or 0)
+                entry.mean = float(row.get("rt_avg_ms") or 0.0)
+                entry.ewma = row.get("rt_ewma_ms")
+                entry.last_ms = row.get("rt_last_ms")
+                entry.updated_at = row.get("rt_updated_at")
+                entry.ignore_next = bool(row.get("rt_ignore_next"))
+                entry.hist = LatencyHistogram.loads(row.get("rt_hist"))
+            except Exception:
+                pass
+        self.entries[key] = entry
+        return entry
+
+    def record(self, listener_id: str, provider_pubkey: str, rt_ms: int, include_in_avg: bool = True) -> None:
+        with self.lock:
+            entry = self._entry(listener_id, provider_pubkey)
+            entry.last_ms = int(rt_ms)
+            entry.updated_at = timestamp()
+            entry.dirty = True
+            if entry.ignore_next:
+                # Warm-up sample after reset-metrics: keep as last, exclude from aggregates.
+                entry.ignore_next = False
+                return
+            if not include_in_avg:
+                return
+            entry.count += 1
+            entry.mean += (rt_ms - entry.mean) / entry.count
+            entry.ewma = float(rt_ms) if entry.ewma is None else (self.alpha * rt_ms + (1 - self.alpha) * entry.ewma)
+            entry.hist.add(rt_ms)
+            entry.recent.append(int(rt_ms))
+
+    def recent_quantile(self, listener_id: str, provider_pubkey: str, q: float, min_samples: int = 8) -> Optional[float]:
+        """q-quantile (ms) of the provider's recent samples, else of its histogram; None below min_samples."""
+        with self.lock:
+            entry = self._entry(listener_id, provider_pubkey)
+            if len(entry.recent) >= min_samples:
+                ordered = sorted(entry.recent)
+                rank = max(1, int(math.ceil(q * len(ordered))))
+                return float(ordered[min(rank, len(ordered)) - 1])
+            if entry.hist.total >= min_samples:
+                return entry.hist.quantile(q)
+        return None
+
+    def reset(self, listener_id: str, provider_pubkeys: Iterable[str]) -> None:
+        with self.lock:
+            for pk in provider_pubkeys:
+                entry = _ProviderMetrics()
+                entry.ignore_next = True
+                self.entries[(str(listener_id), str(pk))] = entry
+
+    def drop_listener(self, listener_id: str) -> None:
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == str(listener_id)]:
+                self.entries.pop(key, None)
+
+    @staticmethod
+    def _fields(entry: _ProviderMetrics) -> Dict[str, Any]:
+        fields: Dict[str, Any] = {}
+        if entry.last_ms is not None:
+            fields["rt_last_ms"] = entry.last_ms
+        if entry.updated_at:
+            fields["rt_updated_at"] = entry.updated_at
+        if entry.count:
+            fields["rt_count"] = entry.count
+            fields["rt_avg_ms"] = entry.mean
+            fields["rt_p50_ms"] = entry.hist.quantile(0.50)
+            fields["rt_p95_ms"] = entry.hist.quantile(0.95)
+            fields["rt_p99_ms"] = entry.hist.quantile(0.99)
+        if entry.ewma is not None:
+            fields["rt_ewma_ms"] = round(entry.ewma, 1)
+        if entry.ignore_next:
+            fields["rt_ignore_next"] = True
+        return fields
+
+    def snapshot(self) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Live fields keyed like RuntimeStateStore.provider_states()."""
+        with self.lock:
+            return {key: self._fields(entry) for key, entry in self.entries.items()}
+
+    def flush(self) -> int:
+        """Write dirty entries to the store; returns the number written."""
+        store = self.store_getter()
+        if store is None:
+            return 0
+        rows = []
+        with self.lock:
+            for (lid, pk), entry in self.entries.items():
+                if not entry.dirty:
+                    continue
+                row = self._fields(entry)
+                row.update({"listener_id": lid, "provider_pubkey": pk, "rt_hist": entry.hist.dumps()})
+                rows.append(row)
+                entry.dirty = False
+        if not rows:
+            return 0
+        try:
+            store.write_metrics(rows)
+        except Exception:
+            # Keep them dirty so the next flush retries.
+            with self.lock:
+                for row in rows:
+                    entry = self.entries.get((row["listener_id"], row["provider_pubkey"]))
+                    if entry is not None:
+                        entry.dirty = True
+            raise
+        return len(rows)
+
+    def run_flush_loop(self, interval: float, log=print) -> None:
+        while True:
+            time.sleep(max(0.5, interval))
+            try:
+                self.flush()
+            except Exception as e:
+                try:
+                    log(f"[metrics] flush failed: {e}")
+                except Exception:
+                    pass
+
+
+def strip_runtime_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of a listeners payload without store-owned runtime fields."""
+    if not isinstance(data, dict):
+        return data
+    out = dict(data)
+    listeners = data.get("listeners")
+    if not isinstance(listeners, list):
+        return out
+    clean_listeners = []
+    for l in listeners:
+        if not isinstance(l, dict):
+            clean_listeners.append(l)
+            continue
+        cl = {k: v for k, v in l.items() if k != "nonce_cache"}
+        top = l.get("top_services")
+        if isinstance(top, list):
+            cl["top_services"] = [
+                {k: v for k, v in ts.items() if k not in PROVIDER_RUNTIME_KEYS} if isinstance(ts, dict) else ts
+                for ts in top
+            ]
+        clean_listeners.append(cl)
+    out["listeners"] = clean_listeners
+    return out
+
+
+def overlay_runtime_fields(data: Dict[str, Any], states: Dict[Tuple[str, str], Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge stored runtime fields into the top_services entries of a listeners payload (in place)."""
+    if not isinstance(data, dict) or not states:
+        return data
+    listeners = data.get("listeners")
+    for l in listeners if isinstance(listeners, list) else []:
+        if not isinstance(l, dict):
+            continue
+        lid = str(l.get("id"))
+        for ts in l.get("top_services") if isinstance(l.get("top_services"), list) else []:
+            if not isinstance(ts, dict):
+                continue
+            fields = states.get((lid, str(ts.get("provider_pubkey"))))
+            if fields:
+                ts.update(fields)
+    return data
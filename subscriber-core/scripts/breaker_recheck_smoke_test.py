@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Smoke test for reinstating Down providers through the circuit breakers.
+
+Run inside the container:
+    python3 scripts/breaker_recheck_smoke_test.py
+
+It imports admin_api against an empty temp CACHE_DIR/CONFIG_DIR/ARKEOD_HOME, registers one
+listener whose top_services carry no sentinel_url (as stored listeners do), and checks that:
+
+- a provider marked Down gets its sentinel from the provider index metadata_uri, is probed
+  and comes back Up;
+- a Down status left over from before a restart (no breaker yet) is handed to the breakers
+  by the recheck loop and comes back Up;
+- a Down provider with no sentinel anywhere falls back to the paid recheck.
+
+The sentinel probe and the paid test request are replaced with recorders, so nothing leaves
+the container. Exits non-zero on failure.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import types
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LISTENER_ID = "1"
+PORT = 62999
+SERVICE_ID = 7
+PK_INDEXED = "arkeopub1indexed"
+PK_UNKNOWN = "arkeopub1unknown"
+SENTINEL = "http://sentinel.example:3636"
+
+
+def main() -> int:
+    tmp = tempfile.mkdtemp(prefix="breaker-smoke-")
+    for name in ("CACHE_DIR", "CONFIG_DIR", "ARKEOD_HOME"):
+        os.environ[name] = os.path.join(tmp, name.lower())
+        os.makedirs(os.environ[name], exist_ok=True)
+    os.environ["PROXY_BREAKER"] = "true"
+    os.environ["DOWN_PROVIDER_RECHECK_INTERVAL"] = "0"
+    sys.path.insert(0, APP_DIR)
+    import admin_api as api
+
+    top = [
+        {"provider_pubkey": PK_INDEXED, "status": "Up"},
+        {"provider_pubkey": PK_UNKNOWN, "status": "Up"},
+    ]
+    listener = {
+        "id": LISTENER_ID,
+        "port": PORT,
+        "status": "active",
+        "service_id": SERVICE_ID,
+        "top_services": top,
+    }
+    with open(api.LISTENERS_FILE, "w", encoding="utf-8") as f:
+        json.dump({"listeners": [listener]}, f)
+    cfg = {"listener_id": LISTENER_ID, "service_id": SERVICE_ID, "top_services": [dict(ts) for ts in top]}
+    with api._LISTENER_LOCK:
+        api._LISTENER_SERVERS[PORT] = {"server": types.SimpleNamespace(cfg=cfg), "listener_id": LISTENER_ID}
+
+    index = {"services": {PK_INDEXED: {str(SERVICE_ID): {"metadata_uri": f"{SENTINEL}/metadata.json"}}}, "providers": {}}
+    api._provider_index = lambda *a, **k: index
+    probed = []
+    api._BREAKERS.probe = lambda sentinel: probed.append(sentinel) or True
+    paid = []
+
+    def _paid_test(port, payload, headers, method="POST", path="/"):
+        pk = headers.get("X-Arkeo-Force-Provider")
+        paid.append(pk)
+        api._set_top_service_status(LISTENER_ID, pk, "Up")
+        return True, b"{}", None, {}, 200
+
+    api._test_listener_port = _paid_test
+
+    def status(pk):
+        for l in api._ensure_listeners_file().get("listeners") or []:
+            for ts in l.get("top_services") or []:
+                if ts.get("provider_pubkey") == pk:
+                    return ts.get("status")
+        return None
+
+    def run_probes():
+        for entry in api._BREAKERS.entries.values():
+            entry.open_until = 0.0
+        api._BREAKERS.probe_due()
+
+    failures = []
+
+    # 1. Marked Down by the lane: tripped with the indexed sentinel, probed back Up.
+    api._set_top_service_status(LISTENER_ID, PK_INDEXED, "Down")
+    if not api._BREAKERS.is_open(LISTENER_ID, PK_INDEXED):
+        failures.append("Down provider did not trip its breaker")
+    run_probes()
+    if probed != [SENTINEL]:
+        failures.append(f"probe sentinel {probed!r}, want [{SENTINEL!r}]")
+    if status(PK_INDEXED) != "Up":
+        failures.append(f"indexed provider status {status(PK_INDEXED)!r} after probe, want 'Up'")
+
+    # 2. Down from before a restart: no breaker exists until the recheck loop hands it over.
+    api._set_top_service_status(LISTENER_ID, PK_INDEXED, "Down")
+    api._BREAKERS.drop_listener(LISTENER_ID)
+    probed.clear()
+    result = api._recheck_down_providers_once()
+    if result.get("breaker_probes") != 1 or paid:
+        failures.append(f"restart recheck {result!r}, paid={paid!r}; want one breaker probe, no paid request")
+    run_probes()
+    if probed != [SENTINEL] or status(PK_INDEXED) != "Up":
+        failures.append(f"restart Down provider not reinstated (probed={probed!r}, status={status(PK_INDEXED)!r})")
+
+    # 3. No sentinel anywhere: the paid recheck still runs and reinstates it.
+    api._set_top_service_status(LISTENER_ID, PK_UNKNOWN, "Down")
+    if api._BREAKERS.is_open(LISTENER_ID, PK_UNKNOWN):
+        failures.append("provider without a sentinel was handed to a breaker it cannot probe")
+    result = api._recheck_down_providers_once()
+    if paid != [PK_UNKNOWN] or result.get("ok") != 1:
+        failures.append(f"no-sentinel recheck {result!r}, paid={paid!r}; want one paid recheck")
+    if status(PK_UNKNOWN) != "Up":
+        failures.append(f"no-sentinel provider status {status(PK_UNKNOWN)!r}, want 'Up'")
+
+    if failures:
+        print("FAIL")
+        for f in failures:
+            print(f"  - {f}")
+        return 1
+    print("OK: Down providers come back via the breaker probe, after a restart, and via the paid recheck")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
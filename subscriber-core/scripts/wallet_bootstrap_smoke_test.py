@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Smoke test for the first-boot wallet bootstrap on an empty keyring.
+
+Run inside the container (needs arkeod on PATH):
+    python3 scripts/wallet_bootstrap_smoke_test.py
+
+It imports admin_api in a fresh interpreter with ARKEOD_HOME, CONFIG_DIR and CACHE_DIR
+pointed at an empty temp directory, so the import-time _bootstrap_wallets() has to create
+the hot wallet (which resets the resident signers through _delete_hotwallet). It then checks
+that the mnemonic was captured in subscriber-settings.json and that the resident signer
+loads from it and signs. Exits non-zero on failure.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, sys
+sys.path.insert(0, sys.argv[1])
+import admin_api
+
+signer = admin_api._resident_signer(admin_api.KEY_NAME, "raw")
+sig, err = signer.sign("1:1:") if signer else (None, "resident signer unavailable")
+print("RESULT " + json.dumps({"signed": bool(sig), "err": err}))
+"""
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        for key in ("KEY_MNEMONIC", "SUBSCRIBER_SETTINGS_PATH", "ADMIN_PASSWORD_PATH"):
+            env.pop(key, None)
+        env.update(
+            {
+                "ARKEOD_HOME": os.path.join(tmp, "arkeo"),
+                "CONFIG_DIR": os.path.join(tmp, "config"),
+                "CACHE_DIR": os.path.join(tmp, "cache"),
+                "KEY_KEYRING_BACKEND": "test",
+            }
+        )
+        os.makedirs(env["CACHE_DIR"], exist_ok=True)
+        proc = subprocess.run(
+            [sys.executable, "-c", CHILD, APP_DIR],
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        out = proc.stdout + proc.stderr
+        failures = []
+        if proc.returncode != 0:
+            failures.append(f"import exited {proc.returncode}")
+        if "wallet bootstrap failed" in out:
+            failures.append("wallet bootstrap raised")
+        if "Arkeo wallet created" not in out:
+            failures.append("hot wallet was not created")
+        settings_path = os.path.join(env["CONFIG_DIR"], "subscriber-settings.json")
+        try:
+            with open(settings_path, "r", encoding="utf-8") as f:
+                settings = json.load(f)
+        except (OSError, ValueError):
+            settings = {}
+        if not settings.get("KEY_MNEMONIC"):
+            failures.append(f"KEY_MNEMONIC missing from {settings_path}")
+        result = {}
+        for line in out.splitlines():
+            if line.startswith("RESULT "):
+                result = json.loads(line[len("RESULT "):])
+        if not result.get("signed"):
+            failures.append(f"resident signer did not sign: {result.get('err')}")
+
+    if failures:
+        print("FAIL")
+        for f in failures:
+            print(f"  - {f}")
+        print("--- output ---")
+        print(out[-4000:])
+        return 1
+    print("OK: wallet created on an empty keyring, mnemonic captured, resident signer loaded")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())